@@ -0,0 +1,155 @@
+import socket
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from es_database.AlertEngine import AlertEngine, IndexSink, validate_webhook_url
+from es_database.EngineConfig import EngineConfig
+
+
+def resolves_to(*addresses):
+    return patch(
+        'es_database.AlertEngine.socket.getaddrinfo',
+        return_value=[(socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, 443)) for address in addresses]
+    )
+
+
+def article(**fields):
+    return dict({
+        'headline': 'Apple beats earnings expectations',
+        'summary': 'Quarterly revenue rose',
+        'companies': [{'name': 'Apple Inc', 'ticker': 'AAPL'}],
+        'categories': ['earnings'],
+        'sentiment': 'positive',
+        'regions': ['US'],
+        'source': 'Reuters'
+    }, **fields)
+
+
+class TestAlertMatching(unittest.TestCase):
+    def setUp(self):
+        self.es = MagicMock()
+        self.engine = AlertEngine(self.es, EngineConfig())
+        # skip reloading saved queries from the (mocked) index
+        self.engine._loaded_at = time.time()
+
+    def matched_names(self, doc):
+        return sorted(saved['name'] for saved in self.engine.match(doc))
+
+    def test_filters_and_text(self):
+        self.engine.add_query({'name': 'aapl', 'filters': {'companies.ticker': 'aapl'}})
+        self.engine.add_query({'name': 'earnings', 'query_text': 'Apple earnings'})
+        self.engine.add_query({'name': 'negative', 'filters': {'companies.ticker': ['AAPL'], 'sentiment': 'negative'}})
+        self.engine.add_query({'name': 'msft', 'filters': {'companies.ticker': 'MSFT'}})
+        self.assertEqual(self.matched_names(article()), ['aapl', 'earnings'])
+
+    def test_list_filters_match_any_value(self):
+        self.engine.add_query({'name': 'wires', 'filters': {'source': ['Bloomberg', 'reuters']}})
+        self.assertEqual(self.matched_names(article()), ['wires'])
+        self.assertEqual(self.matched_names(article(source='CNBC')), [])
+
+    def test_every_query_token_must_match(self):
+        self.engine.add_query({'name': 'guidance', 'query_text': 'apple guidance'})
+        self.assertEqual(self.matched_names(article()), [])
+        # company names count as text
+        self.engine.add_query({'name': 'inc', 'query_text': 'inc revenue'})
+        self.assertEqual(self.matched_names(article()), ['inc'])
+
+    def test_removed_query_stops_matching(self):
+        saved = self.engine.add_query({'name': 'aapl', 'filters': {'companies.ticker': 'AAPL'}})
+        self.es.delete.return_value = {'result': 'deleted'}
+        self.assertTrue(self.engine.remove_query(saved['id']))
+        self.assertEqual(self.matched_names(article()), [])
+        self.assertEqual(self.engine.postings, {})
+
+    def test_replacing_query_updates_postings(self):
+        self.engine.add_query({'name': 'alert', 'filters': {'source': 'Reuters'}}, query_id='q1')
+        self.engine.add_query({'name': 'alert', 'filters': {'source': 'CNBC'}}, query_id='q1')
+        self.assertEqual(self.matched_names(article()), [])
+        self.assertEqual(list(self.engine.postings), [('source', 'cnbc')])
+
+    def test_invalid_queries(self):
+        with self.assertRaises(ValueError):
+            self.engine.add_query({})
+        with self.assertRaises(ValueError):
+            self.engine.add_query({'filters': {'author': 'someone'}})
+        with self.assertRaises(ValueError):
+            self.engine.add_query({'query_text': 'apple', 'webhook_url': 'ftp://example.com/hook'})
+        self.es.index.assert_not_called()
+
+    def test_record_article_stores_matches(self):
+        saved = self.engine.add_query({'name': 'aapl', 'filters': {'companies.ticker': 'AAPL'}})
+        self.es.index.reset_mock()
+        self.engine.record_article('article-1', article())
+        self.es.index.assert_called_once()
+        kwargs = self.es.index.call_args.kwargs
+        self.assertEqual(kwargs['index'], self.engine.match_sink.index_name)
+        self.assertEqual(kwargs['id'], f"{saved['id']}-article-1")
+        self.assertEqual(kwargs['body']['headline'], 'Apple beats earnings expectations')
+        self.assertEqual(self.engine.matched, 1)
+
+
+class TestValidateWebhookUrl(unittest.TestCase):
+    def test_public_address(self):
+        with resolves_to('93.184.216.34'):
+            self.assertEqual(validate_webhook_url('https://example.com/hook'), 'https://example.com/hook')
+
+    def test_internal_addresses_rejected(self):
+        for address in ('127.0.0.1', '10.0.0.5', '169.254.169.254', '::1', '::ffff:127.0.0.1'):
+            with resolves_to('93.184.216.34', address), self.assertRaises(ValueError):
+                validate_webhook_url('https://example.com/hook')
+
+    def test_scheme_and_host_required(self):
+        for url in ('ftp://example.com/hook', 'https:///hook', 'example.com/hook'):
+            with self.assertRaises(ValueError):
+                validate_webhook_url(url)
+
+    def test_unresolvable_host(self):
+        with patch('es_database.AlertEngine.socket.getaddrinfo', side_effect=socket.gaierror):
+            with self.assertRaises(ValueError):
+                validate_webhook_url('https://nowhere.invalid/hook')
+
+    def test_allowed_hosts(self):
+        with resolves_to('10.0.0.5'):
+            self.assertEqual(validate_webhook_url('http://hooks.internal/a', ('hooks.internal',)), 'http://hooks.internal/a')
+        with self.assertRaises(ValueError):
+            validate_webhook_url('https://example.com/hook', ('hooks.internal',))
+
+
+class TestIndexSink(unittest.TestCase):
+    def setUp(self):
+        self.es = MagicMock()
+        self.sink = IndexSink(self.es, 'matches')
+
+    def test_drain_returns_only_matches_it_deleted(self):
+        self.es.search.return_value = {'hits': {'hits': [
+            {'_id': 'q-1', '_source': {'article_id': '1'}},
+            {'_id': 'q-2', '_source': {'article_id': '2'}}
+        ]}}
+        self.es.bulk.return_value = {'items': [
+            {'delete': {'result': 'deleted'}},
+            # drained by another worker in the meantime
+            {'delete': {'result': 'not_found'}}
+        ]}
+        self.assertEqual(self.sink.drain('q', limit=2), [{'article_id': '1'}])
+        self.assertEqual(self.es.search.call_args.kwargs['body']['query'], {'term': {'query_id': 'q'}})
+
+    def test_drain_empty(self):
+        self.es.search.return_value = {'hits': {'hits': []}}
+        self.assertEqual(self.sink.drain(), [])
+        self.es.bulk.assert_not_called()
+
+    def test_failed_delivery_is_counted(self):
+        self.es.index.side_effect = Exception("unavailable")
+        self.sink.deliver({'query_id': 'q', 'article_id': '1'})
+        self.assertEqual((self.sink.delivered, self.sink.failed), (0, 1))
+
+    def test_prunes_at_most_hourly(self):
+        for article_id in ('1', '2'):
+            self.sink.deliver({'query_id': 'q', 'article_id': article_id})
+        self.assertEqual(self.sink.delivered, 2)
+        self.es.delete_by_query.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+import numpy as np
+
+from es_database.AnomalyDetector import MS_PER_DAY, MS_PER_HOUR, AnomalyDetector
+
+
+def hourly_timestamps(count, start_ms=0):
+    return start_ms + np.arange(count, dtype=np.int64) * MS_PER_HOUR
+
+
+class TestAnomalyDetector(unittest.TestCase):
+    def test_rolling_z_score_matches_trailing_window(self):
+        counts = [10, 12, 8, 10, 12, 8, 40]
+        detector = AnomalyDetector(window=6, min_periods=3, seasonality=False)
+        scores = detector.score(counts, hourly_timestamps(len(counts)))
+
+        window = np.array(counts[:6], dtype=float)
+        # the std is floored at Poisson noise, sqrt(mean)
+        std = max(window.std(), np.sqrt(window.mean()))
+        self.assertAlmostEqual(scores['z_scores'][-1], (40 - window.mean()) / std)
+        self.assertAlmostEqual(scores['expected'][-1], window.mean())
+
+    def test_buckets_before_min_periods_are_not_scored(self):
+        detector = AnomalyDetector(window=24, min_periods=3, seasonality=False)
+        scores = detector.score([1, 50, 100, 5], hourly_timestamps(4))
+        np.testing.assert_array_equal(scores['z_scores'][:3], [0.0, 0.0, 0.0])
+
+    def test_poisson_floor_ignores_single_article_after_flat_period(self):
+        counts = [0] * 24 + [1]
+        detector = AnomalyDetector(window=24, min_periods=6, seasonality=False)
+        result = detector.detect(counts, hourly_timestamps(len(counts)), threshold=2.0)
+        self.assertEqual(result['spike_indices'].size, 0)
+
+    def test_detects_spike(self):
+        counts = [10] * 30 + [60]
+        detector = AnomalyDetector(window=24, min_periods=6, seasonality=False)
+        result = detector.detect(counts, hourly_timestamps(len(counts)), threshold=3.0)
+        self.assertEqual(result['spike_indices'].tolist(), [30])
+
+    def test_seasonality_removes_daily_pattern(self):
+        # busy business hours every day for a week
+        hours = np.arange(7 * 24)
+        counts = np.where((hours % 24 >= 9) & (hours % 24 < 17), 50.0, 5.0)
+        timestamps = hourly_timestamps(counts.size)
+
+        plain = AnomalyDetector(window=24, min_periods=6, seasonality=False)
+        seasonal = AnomalyDetector(window=24, min_periods=6, seasonality=True)
+        self.assertGreater(plain.detect(counts, timestamps, 2.0)['spike_indices'].size, 0)
+        self.assertEqual(seasonal.detect(counts, timestamps, 2.0)['spike_indices'].size, 0)
+
+        expected = seasonal.seasonal_baseline(counts, timestamps)
+        self.assertAlmostEqual(expected[10], 50.0)
+        self.assertAlmostEqual(expected[3], 5.0)
+
+    def test_seasonal_patterns_need_two_cycles(self):
+        counts = np.arange(36, dtype=float)
+        timestamps = hourly_timestamps(counts.size)
+        detector = AnomalyDetector()
+        # less than two days: no hour-of-day pattern, just the overall mean
+        np.testing.assert_allclose(detector.seasonal_baseline(counts, timestamps), counts.mean())
+
+    def test_weekday_pattern_after_two_weeks(self):
+        days = np.arange(21)
+        # epoch day 4 is a Monday; quiet weekends
+        weekday = (days + 3) % 7
+        counts = np.where(weekday >= 5, 2.0, 20.0)
+        timestamps = 4 * MS_PER_DAY + days.astype(np.int64) * MS_PER_DAY
+        expected = AnomalyDetector().seasonal_baseline(counts, timestamps)
+        np.testing.assert_allclose(expected, counts)
+
+    def test_ewm_matches_recursive_definition(self):
+        values = np.random.default_rng(7).uniform(0, 100, 2000)
+        alpha = 0.01
+        expected = np.empty_like(values)
+        expected[0] = values[0]
+        for i in range(1, values.size):
+            expected[i] = alpha * values[i] + (1 - alpha) * expected[i - 1]
+        np.testing.assert_allclose(AnomalyDetector.ewm(values, alpha), expected, rtol=1e-9)
+
+    def test_ewma_detects_spike(self):
+        counts = [10] * 48 + [80]
+        detector = AnomalyDetector(min_periods=6, seasonality=False, ewma_alpha=0.2)
+        result = detector.detect(counts, hourly_timestamps(len(counts)), threshold=3.0)
+        self.assertEqual(result['spike_indices'].tolist(), [48])
+        self.assertIn('ewma', detector.method)
+
+    def test_invalid_alpha(self):
+        with self.assertRaises(ValueError):
+            AnomalyDetector(ewma_alpha=1.5)
+
+    def test_empty_series(self):
+        scores = AnomalyDetector().score([], [])
+        self.assertEqual(scores['z_scores'].size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
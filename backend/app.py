@@ -40,7 +40,8 @@ logger.info(f"Python path: {sys.path}")
 
 # Set up custom logger if available, otherwise use the default logger
 try:
-    from utils.logger import get_logger, setup_request_logging, setup_debug_endpoints, performance_monitor
+    from utils.logger import get_logger, init_logging, setup_request_logging, setup_debug_endpoints, performance_monitor
+    init_logging()
     logger.info("Successfully imported custom logger from utils.logger")
 except ImportError as e:
     logger.warning(f"Could not import custom logger: {str(e)}. Using default logger.")
@@ -79,8 +80,8 @@ try:
     app = Flask(__name__)
     CORS(app)
     
-    # Set up request logging if available
-    app = setup_request_logging(app)
+    # Set up request logging if available (it registers hooks and returns nothing)
+    setup_request_logging(app)
     
     # Health check endpoint
     @app.route('/health', methods=['GET'])
@@ -123,7 +124,8 @@ try:
             if rule.endpoint != 'health_check':
                 # Get the view function from the backend app
                 view_func = backend_app.view_functions.get(rule.endpoint)
-                if view_func:
+                # Keep this app's own endpoints (e.g. 'static') when the names collide
+                if view_func and app.view_functions.get(rule.endpoint, view_func) is view_func:
                     app.add_url_rule(rule.rule, rule.endpoint, view_func, methods=rule.methods)
                     registered_routes += 1
                     logger.debug(f"Registered route {rule.rule} ({rule.endpoint})")
@@ -155,9 +157,9 @@ try:
                 'timestamp': datetime.now().isoformat()
             })
     
-    # Set up debug endpoints if in development mode
-    if os.getenv('ENVIRONMENT', 'development') == 'development':
-        app = setup_debug_endpoints(app)
+    # Set up debug endpoints if in development mode (unless copied from the backend app)
+    if os.getenv('ENVIRONMENT', 'development') == 'development' and 'debug.get_debug_status' not in app.view_functions:
+        setup_debug_endpoints(app)
     
     logger.info("Application initialization complete")
     
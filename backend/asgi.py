@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+ASGI application for Financial News Engine
+
+Async serving mode. /query is served on the event loop with the async
+Elasticsearch client (es_database.AsyncEngine), so one process can keep
+hundreds of searches in flight instead of one per worker thread. Every other
+route is served by the Flask app from backend.py on a thread pool.
+
+Run with:
+  uvicorn asgi:app --host 0.0.0.0 --port 5000
+  gunicorn -k uvicorn.workers.UvicornWorker asgi:app
+"""
+
+import os
+import time
+import uuid
+import traceback
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+from werkzeug.http import quote_etag
+
+import backend
+from backend import (
+    cache_search_results, cors_response_headers, degraded_search_response,
+    get_cached_search_entry, parse_search_args, search_cache_control, search_cache_key, search_etag,
+    search_response
+)
+from utils.circuit_breaker import CircuitOpenError
+from utils.logger import get_logger, request_id_var
+from utils.metrics import (
+    ENABLE_METRICS, http_request_duration_seconds, http_requests_in_progress, http_requests_total
+)
+from utils.responses import RESPONSE_COMPRESSION_MIN_BYTES, EncodedBody, is_not_modified, negotiate_encoding
+from utils.tracing import tracer
+
+logger = get_logger('asgi')
+
+# Threads serving the Flask routes (everything except the async routes)
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', os.getenv('GUNICORN_THREADS', '8')))
+
+
+class AsyncSearchApp:
+    """
+    ASGI app serving the search routes natively and the rest through Flask.
+
+    The async engine shares the synchronous engine's configuration and index
+    bounds, so it is created on the first search after BackEnd has attached
+    the engine; until then searches take the same fallback path as the Flask
+    app.
+    """
+
+    def __init__(self, wsgi_app, wsgi_threads: int = ASGI_WSGI_THREADS):
+        self.wsgi = WSGIMiddleware(wsgi_app, workers=wsgi_threads)
+        self.engine = None
+        self.routes = {('GET', '/query'): self.query}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        handler = self.routes.get((scope.get('method'), scope.get('path'))) if scope['type'] == 'http' else None
+        if handler is None:
+            await self.wsgi(scope, receive, send)
+            return
+        await self.handle(handler, scope, send)
+
+    async def lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # attach the engine in this worker (a no-op unless BACKEND_DEFER_ENGINE_INIT is set)
+                backend.backend.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.engine is not None:
+                    await self.engine.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def get_engine(self):
+        """
+        Get the async engine, creating it once the synchronous engine is attached.
+
+        Raises:
+            EngineUnavailableError: If the engine is not attached yet
+        """
+        if self.engine is None:
+            engine = backend.backend.require_engine()
+            from es_database.AsyncEngine import AsyncEngine
+            self.engine = AsyncEngine(engine.config, engine.storage)
+            logger.info(f"Async Elasticsearch client created (max {engine.config.async_max_connections} connections)")
+        return self.engine
+
+    async def handle(self, handler, scope, send) -> None:
+        """
+        Run a native route with the request ID, trace, metrics, CORS headers and
+        compression of the Flask app.
+
+        A handler returns the status, the payload (a dict, or an EncodedBody
+        that is already serialized) and additional response headers. An
+        'etag' header is checked against If-None-Match.
+        """
+        headers = {name.decode('latin1').lower(): value.decode('latin1') for name, value in scope['headers']}
+        request_id = headers.get('x-request-id') or str(uuid.uuid4())
+        token = request_id_var.set(request_id)
+        query_string = scope['query_string'].decode('latin1')
+        root = tracer.start_trace(
+            request_id, f"{scope['method']} {scope['path']}",
+            **{'http.method': scope['method'], 'http.target': f"{scope['path']}?{query_string}"}
+        )
+        start = time.perf_counter()
+        if ENABLE_METRICS:
+            http_requests_in_progress.inc()
+        status = 500
+        try:
+            args = {name: values[0] for name, values in parse_qs(query_string, keep_blank_values=True).items()}
+            extra_headers = {}
+            try:
+                status, payload, extra_headers = await handler(args, request_id)
+            except Exception as e:
+                logger.error(f"{scope['path']} endpoint error: {str(e)}", extra={
+                    'extra': {'traceback': traceback.format_exc()}
+                })
+                payload = {
+                    'error': str(e),
+                    'error_type': type(e).__name__,
+                    'timestamp': datetime.now().isoformat(),
+                    'request_id': request_id
+                }
+            etag = extra_headers.pop('etag', None)
+            if etag is not None:
+                extra_headers['etag'] = quote_etag(etag, weak=True)
+                if status == 200 and is_not_modified(headers.get('if-none-match'), etag):
+                    status = 304
+            if root is not None:
+                root.set_attribute('http.status_code', status)
+            with tracer.span('serialize'):
+                encoded = payload if isinstance(payload, EncodedBody) else EncodedBody.from_payload(payload)
+                encoding = None if status == 304 else negotiate_encoding(headers.get('accept-encoding'), len(encoded))
+                body = b'' if status == 304 else encoded.encode(encoding)
+            response_headers = {
+                'content-type': 'application/json',
+                'content-length': str(len(body)),
+                'x-request-id': request_id,
+                **cors_response_headers(headers.get('origin', ''), scope['method']),
+                **extra_headers
+            }
+            if encoding is not None:
+                response_headers['content-encoding'] = encoding
+            if len(encoded) >= RESPONSE_COMPRESSION_MIN_BYTES:
+                response_headers['vary'] = 'Accept-Encoding'
+            await send({
+                'type': 'http.response.start',
+                'status': status,
+                'headers': [(name.lower().encode('latin1'), value.encode('latin1'))
+                            for name, value in response_headers.items()]
+            })
+            await send({'type': 'http.response.body', 'body': body})
+        finally:
+            if ENABLE_METRICS:
+                labels = {'method': scope['method'], 'route': scope['path'], 'status': str(status)}
+                http_requests_total.labels(**labels).inc()
+                http_request_duration_seconds.labels(**labels).observe(time.perf_counter() - start)
+                http_requests_in_progress.dec()
+            tracer.finish_trace(root)
+            request_id_var.reset(token)
+
+    async def process_search_query(
+        self,
+        engine,
+        query_text: Optional[str] = None,
+        filters: Optional[Dict] = None,
+        time_range: Optional[Dict] = None
+    ):
+        """Async counterpart of BackEnd.process_search_query."""
+        logger.info(f"Processing search query: '{query_text}'", extra={
+            'extra': {'filters': filters, 'time_range': time_range}
+        })
+        start_time = time.time()
+        try:
+            results = await engine.search_news(query_text, filters, time_range)
+            hits_count = len(results['hits']['hits']) if results and 'hits' in results else 0
+            logger.info(f"Query completed with {hits_count} results", extra={
+                'extra': {'processing_time_ms': (time.time() - start_time) * 1000, 'hits_count': hits_count}
+            })
+            return results['hits']['hits']
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing search query: {str(e)}", extra={
+                'extra': {
+                    'processing_time_ms': (time.time() - start_time) * 1000,
+                    'traceback': traceback.format_exc()
+                }
+            })
+            # Let the caller serve degraded, uncacheable results instead of an empty page
+            raise
+
+    async def query(self, args: Dict, request_id: str) -> Tuple[int, Any, Dict[str, str]]:
+        """GET /query, with the same parameters, cache and fallback as the Flask route."""
+        params = parse_search_args(args)
+        logger.info("API query request received", extra={
+            'extra': {
+                'query': params['query_text'],
+                'source': params['source'],
+                'time_range': params['time_range'],
+                'sentiment': params['sentiment'],
+                'sort_by': params['sort_by'],
+                'sort_order': params['sort_order'],
+                'bypass_cache': params['bypass_cache']
+            }
+        })
+
+        cache_key = search_cache_key(params)
+        if not params['bypass_cache']:
+            with tracer.span('cache.lookup') as span:
+                cache_entry = get_cached_search_entry(cache_key)
+                if span is not None:
+                    span.set_attribute('cache.hit', cache_entry is not None)
+            if cache_entry:
+                return 200, cache_entry['body'], {
+                    'x-cache': 'HIT',
+                    'age': str(int(time.time() - cache_entry['timestamp'])),
+                    'cache-control': search_cache_control(),
+                    'etag': cache_entry['etag']
+                }
+
+        try:
+            # Take the fallback path below until the engine is attached
+            engine = self.get_engine()
+            results = await self.process_search_query(
+                engine, params['query_text'], params['filters'], params['time_range_obj']
+            )
+            response = search_response(results, params, request_id)
+            etag = search_etag(response)
+            if not params['bypass_cache']:
+                with tracer.span('cache.store'):
+                    cache_search_results(cache_key, response, etag)
+            return 200, response, {
+                'x-cache': 'MISS',
+                'cache-control': search_cache_control(params['bypass_cache']),
+                'etag': etag
+            }
+        except CircuitOpenError as open_error:
+            # Rejected without calling Elasticsearch; the breaker logged why it opened
+            logger.debug(f"Search rejected: {open_error}")
+            # caches must not keep stale or fallback results
+            return 200, degraded_search_response(params, cache_key, request_id, open_error), {
+                'cache-control': 'no-store'
+            }
+        except Exception as es_error:
+            # Already logged by process_search_query (or the engine is not attached yet)
+            logger.warning(f"Serving degraded search results: {str(es_error)}")
+            # caches must not keep stale or fallback results
+            return 200, degraded_search_response(params, cache_key, request_id, es_error), {
+                'cache-control': 'no-store'
+            }
+
+
+app = AsyncSearchApp(backend.app)
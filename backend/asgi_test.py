@@ -0,0 +1,203 @@
+import asyncio
+import importlib
+import json
+import sys
+import unittest
+from contextlib import nullcontext
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from elasticsearch import ConnectionError, NotFoundError
+
+from es_database import AsyncEngine as async_engine_module
+from es_database.AsyncEngine import AsyncEngine
+
+# Collected by pytest as part of the backend package, the Flask module is backend.backend
+server = importlib.import_module(f"{__package__}.backend" if __package__ else 'backend')
+
+# asgi.py imports the Flask module as a top-level 'backend'
+_package = sys.modules.get('backend')
+sys.modules['backend'] = server
+try:
+    asgi = importlib.import_module('asgi')
+finally:
+    sys.modules['backend'] = _package
+
+
+def call(app, path, query_string='', headers=None, method='GET'):
+    """Send one HTTP request through an ASGI app; returns (status, headers, body)."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': query_string.encode(),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 12345)
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = next(message for message in messages if message['type'] == 'http.response.start')
+    body = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.response.body')
+    return start['status'], {name.decode(): value.decode() for name, value in start['headers']}, body
+
+
+class FakeAsyncEngine:
+    def __init__(self, hits=None, error=None):
+        self.hits = hits or []
+        self.error = error
+        self.calls = []
+
+    async def search_news(self, query_text, filters=None, time_range=None):
+        self.calls.append(query_text)
+        if self.error is not None:
+            raise self.error
+        return {'hits': {'hits': self.hits}}
+
+
+class AsgiTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = asgi.AsyncSearchApp(server.app, wsgi_threads=2)
+        self.backend = server.BackEnd(start=False)
+        patcher = patch.object(server, 'backend', self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.clear_cache()
+        self.addCleanup(self.clear_cache)
+
+    @staticmethod
+    def clear_cache():
+        with server.search_results_cache_lock:
+            server.search_results_cache.clear()
+
+
+class TestNativeQuery(AsgiTestCase):
+    def test_search_then_cache_hit(self):
+        self.app.engine = FakeAsyncEngine(hits=[{'_id': 'a', '_source': {'headline': 'Apple beats'}}])
+
+        status, headers, body = call(self.app, '/query', 'query=apple', {'X-Request-ID': 'req-1'})
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['x-cache'], 'MISS')
+        self.assertEqual(headers['x-request-id'], 'req-1')
+        data = json.loads(body)
+        self.assertEqual(data['results'][0]['_id'], 'a')
+        self.assertEqual(data['metadata']['query'], 'apple')
+
+        status, cached_headers, _ = call(self.app, '/query', 'query=apple')
+        self.assertEqual(status, 200)
+        self.assertEqual(cached_headers['x-cache'], 'HIT')
+        self.assertEqual(cached_headers['etag'], headers['etag'])
+        self.assertEqual(self.app.engine.calls, ['apple'])
+
+    def test_not_modified(self):
+        self.app.engine = FakeAsyncEngine()
+        _, headers, _ = call(self.app, '/query', 'query=apple')
+
+        status, _, body = call(self.app, '/query', 'query=apple', {'If-None-Match': headers['etag']})
+
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b'')
+
+    def test_degraded_before_engine_attached(self):
+        status, headers, body = call(self.app, '/query', 'query=apple')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['cache-control'], 'no-store')
+        metadata = json.loads(body)['metadata']
+        self.assertTrue(metadata['degraded'])
+        self.assertIn('initializing', metadata['fallback_reason'])
+        self.assertIsNone(self.app.engine)
+
+    def test_degraded_on_search_error(self):
+        self.app.engine = FakeAsyncEngine(error=RuntimeError('search failed'))
+
+        status, headers, body = call(self.app, '/query', 'query=apple')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['cache-control'], 'no-store')
+        self.assertEqual(json.loads(body)['metadata']['fallback_reason'], 'search failed')
+        with server.search_results_cache_lock:
+            self.assertEqual(len(server.search_results_cache), 0)
+
+
+class TestRouting(AsgiTestCase):
+    def test_other_routes_served_by_flask(self):
+        status, _, body = call(self.app, '/ready')
+
+        self.assertEqual(status, 503)
+        self.assertEqual(json.loads(body)['status'], 'initializing')
+
+    def test_lifespan_starts_engine(self):
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        with patch.object(self.backend, 'start') as start:
+            asyncio.run(self.app({'type': 'lifespan'}, receive, send))
+
+        start.assert_called_once_with()
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+
+
+class FakeAsyncElasticsearch:
+    def __init__(self, error=None, document=None):
+        self.error = error
+        self.document = document
+
+    async def get(self, index, id):
+        if self.error is not None:
+            raise self.error
+        return {'_index': index, '_id': id, '_source': self.document}
+
+
+class TestAsyncEngineGetArticle(unittest.TestCase):
+    def setUp(self):
+        # keep these failures out of the shared circuit breakers
+        patcher = patch.object(async_engine_module, '_guard', lambda name: nullcontext())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def engine(self, es):
+        engine = AsyncEngine.__new__(AsyncEngine)
+        engine.config = SimpleNamespace(partitioned=False, index_name='news')
+        engine.index_name = 'news'
+        engine.storage = None
+        engine.es = es
+        return engine
+
+    def test_found(self):
+        engine = self.engine(FakeAsyncElasticsearch(document={'headline': 'A'}))
+        self.assertEqual(asyncio.run(engine.get_article_by_id('a')), {'headline': 'A'})
+
+    def test_not_found(self):
+        engine = self.engine(FakeAsyncElasticsearch(error=NotFoundError(404, 'not_found', {})))
+        self.assertIsNone(asyncio.run(engine.get_article_by_id('a')))
+        with self.assertRaisesRegex(ValueError, 'not found'):
+            asyncio.run(engine.search_by_id('a'))
+
+    def test_connection_error_propagates(self):
+        engine = self.engine(FakeAsyncElasticsearch(error=ConnectionError('N/A', 'refused', None)))
+        with self.assertRaises(ConnectionError):
+            asyncio.run(engine.get_article_by_id('a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
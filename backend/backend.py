@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from typing import Dict, Optional, List
 from dotenv import load_dotenv
 import logging
@@ -13,19 +13,52 @@ import uuid
 import hashlib
 import json
 from functools import lru_cache
+import random
+import threading
+from collections import OrderedDict
 
 # Load environment variables first
 load_dotenv()
 
 # Import our custom utilities
-from utils.logger import get_logger, setup_request_logging, setup_debug_endpoints, performance_monitor
+from utils.logger import get_logger, init_logging, setup_request_logging, setup_debug_endpoints, performance_monitor
 from utils.diagnostics import register_diagnostic_endpoints
-from utils.network import test_es_connection, network_diagnostics
+from utils.network import network_diagnostics
+from utils.stream_hub import EVENT_FIELDS, IndexPoller, StreamClient, stream_hub
+from utils.metrics import setup_metrics, search_cache_requests_total, record_ingested_article
+from utils.tracing import setup_tracing, tracer
+from utils.profiler import setup_profiling
+from utils.memory import setup_memory_diagnostics, register_structure
+from utils.circuit_breaker import CircuitOpenError, circuit_breakers
+from utils.responses import (
+    EncodedBody, dumps, encoded_response, json_response, payload_etag, setup_response_compression
+)
 
 # Create Flask app
 app = Flask(__name__)
 
+# Delay before the first engine initialization retry, doubled per failure
+ENGINE_INIT_BACKOFF_SECONDS = float(os.getenv('ENGINE_INIT_BACKOFF_SECONDS', '1'))
+# Upper bound on the delay between engine initialization retries
+ENGINE_INIT_MAX_BACKOFF_SECONDS = float(os.getenv('ENGINE_INIT_MAX_BACKOFF_SECONDS', '60'))
+# Retry-After sent with 503 responses while the engine is unavailable
+ENGINE_RETRY_AFTER_SECONDS = os.getenv('ENGINE_RETRY_AFTER_SECONDS', '5')
+# Cache-Control max-age for /article responses; clients revalidate with the ETag afterwards
+ARTICLE_CACHE_MAX_AGE_SECONDS = int(os.getenv('ARTICLE_CACHE_MAX_AGE_SECONDS', '300'))
+# Most query specs a single POST /query/batch request may hold
+QUERY_BATCH_MAX_QUERIES = int(os.getenv('QUERY_BATCH_MAX_QUERIES', '20'))
+# Most article IDs a single POST /articles request may ask for
+ARTICLES_BATCH_MAX_IDS = int(os.getenv('ARTICLES_BATCH_MAX_IDS', '100'))
+# Documents kept in the per-worker article cache behind POST /articles
+ARTICLE_CACHE_MAX_ITEMS = int(os.getenv('ARTICLE_CACHE_MAX_ITEMS', '1000'))
+# Seconds a cached article is served before it is fetched again; articles are
+# re-indexed by the loader process, so this is the only bound on staleness
+ARTICLE_CACHE_TTL_SECONDS = float(os.getenv('ARTICLE_CACHE_TTL_SECONDS', '60'))
+# Leave engine initialization to BackEnd.start() (called per worker after fork by gunicorn_managed.conf.py)
+BACKEND_DEFER_ENGINE_INIT = os.getenv('BACKEND_DEFER_ENGINE_INIT', 'false').lower() == 'true'
+
 # Initialize logger
+init_logging()
 logger = get_logger()
 logger.info("="*50)
 logger.info("BACKEND STARTING")
@@ -34,19 +67,6 @@ logger.info(f"Elasticsearch URL: {os.getenv('ELASTICSEARCH_URL', 'Not configured
 logger.info(f"Elasticsearch Index: {os.getenv('ELASTICSEARCH_INDEX', 'Not configured')}")
 logger.info("="*50)
 
-# Try to import Elasticsearch with version-specific handling
-try:
-    import elasticsearch
-    from elasticsearch import Elasticsearch
-    logger.info(f"Successfully imported elasticsearch version {elasticsearch.__version__}")
-    # Check which Elasticsearch version we're using to handle compatibility
-    es_major_version = int(elasticsearch.__version__.split('.')[0])
-    logger.info(f"Detected Elasticsearch major version: {es_major_version}")
-except Exception as e:
-    es_major_version = 0
-    logger.error(f"Error importing elasticsearch: {str(e)}")
-    logger.error("Will attempt to continue anyway")
-
 # Setup CORS
 # Define default CORS origins
 cors_origins = [
@@ -74,13 +94,12 @@ logger.info(f"Configured CORS origins: {cors_origins}")
 CORS(app, resources={r"/*": {"origins": cors_origins, "supports_credentials": True, "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "X-Api-Key", "X-Amz-Date", "X-Amz-Security-Token"], "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]}})
 
 # Add after_request handler to ensure CORS headers are set on all responses
-@app.after_request
-def add_cors_headers(response):
-    # Get the origin from the request
-    origin = request.headers.get('Origin', '')
-    
-    # Log all CORS requests for debugging
-    logger.debug(f"CORS request from origin: {origin}")
+CORS_ALLOW_METHODS = 'GET, POST, PUT, DELETE, OPTIONS, PATCH'
+CORS_ALLOW_HEADERS = 'Content-Type, Authorization, X-Requested-With, X-Api-Key, X-Amz-Date, X-Amz-Security-Token'
+
+def cors_response_headers(origin: str, method: str) -> Dict[str, str]:
+    """CORS headers for a response to a request from origin (also used by the ASGI app)."""
+    headers = {}
     
     # For production domains, set permissive CORS headers regardless of path
     if origin:
@@ -102,26 +121,53 @@ def add_cors_headers(response):
         
         # If origin is allowed or in development mode, set CORS headers
         if origin_allowed or os.getenv('FLASK_ENV') == 'development':
-            response.headers['Access-Control-Allow-Origin'] = origin
-            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS, PATCH'
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, X-Api-Key, X-Amz-Date, X-Amz-Security-Token'
-            response.headers['Access-Control-Allow-Credentials'] = 'true'
-            response.headers['Access-Control-Max-Age'] = '3600'
+            headers['Access-Control-Allow-Origin'] = origin
+            headers['Access-Control-Allow-Methods'] = CORS_ALLOW_METHODS
+            headers['Access-Control-Allow-Headers'] = CORS_ALLOW_HEADERS
+            headers['Access-Control-Allow-Credentials'] = 'true'
+            headers['Access-Control-Max-Age'] = '3600'
     
     # For OPTIONS requests always return 200 with headers
-    if request.method == 'OPTIONS':
-        response.headers['Access-Control-Allow-Origin'] = origin
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS, PATCH'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, X-Api-Key, X-Amz-Date, X-Amz-Security-Token'
-        response.headers['Access-Control-Max-Age'] = '3600'
+    if method == 'OPTIONS':
+        headers['Access-Control-Allow-Origin'] = origin
+        headers['Access-Control-Allow-Methods'] = CORS_ALLOW_METHODS
+        headers['Access-Control-Allow-Headers'] = CORS_ALLOW_HEADERS
+        headers['Access-Control-Max-Age'] = '3600'
         if origin:
-            response.headers['Access-Control-Allow-Credentials'] = 'true'
-            
+            headers['Access-Control-Allow-Credentials'] = 'true'
+    
+    return headers
+
+# Add after_request handler to ensure CORS headers are set on all responses
+@app.after_request
+def add_cors_headers(response):
+    # Get the origin from the request
+    origin = request.headers.get('Origin', '')
+    
+    # Log all CORS requests for debugging
+    logger.debug(f"CORS request from origin: {origin}")
+    
+    response.headers.update(cors_response_headers(origin, request.method))
     return response
 
 # Setup request logging middleware
 setup_request_logging(app)
 
+# Record request metrics and expose them on /metrics
+setup_metrics(app)
+
+# Trace requests (after request logging, which assigns g.request_id)
+setup_tracing(app)
+
+# Sampling profiler and per-request cProfile (after tracing, which holds the profiles)
+setup_profiling(app)
+
+# tracemalloc control and sizes of long-lived structures on /debug/memory
+setup_memory_diagnostics(app)
+
+# Compress JSON responses (last, so its after_request handler runs first)
+setup_response_compression(app)
+
 # Add explicit handling for preflight OPTIONS requests
 @app.route('/', defaults={'path': ''}, methods=['OPTIONS'])
 @app.route('/<path:path>', methods=['OPTIONS'])
@@ -146,8 +192,11 @@ def handle_preflight(path):
 # Maximum of 100 most recent search results will be cached
 # Each entry has a key hash(query params) -> {result, timestamp}
 search_results_cache = {}
+# Guards search_results_cache: request threads read, insert and evict concurrently
+search_results_cache_lock = threading.Lock()
 CACHE_MAX_ITEMS = 100
 CACHE_TTL_SECONDS = 5 * 60  # 5 minutes cache
+register_structure('search_results_cache', lambda: search_results_cache)
 
 # Function to generate a cache key based on query parameters
 def generate_cache_key(query_text, filters, time_range, sort_by, sort_order):
@@ -163,79 +212,221 @@ def generate_cache_key(query_text, filters, time_range, sort_by, sort_order):
     return hashlib.md5(key_str.encode()).hexdigest()
 
 # Function to get cached search results
-def get_cached_search_results(cache_key):
-    """Get search results from cache if they exist and are not expired."""
-    if cache_key in search_results_cache:
-        cache_entry = search_results_cache[cache_key]
+def get_cached_search_entry(cache_key, allow_stale=False):
+    """
+    Get a search cache entry if it exists and is not expired.
+    
+    The entry holds the results ('result') and the serialized hit response
+    ('body', an EncodedBody). With allow_stale, expired entries that have
+    not been evicted yet are returned too (used while the search circuit is
+    open).
+    """
+    with search_results_cache_lock:
+        cache_entry = search_results_cache.get(cache_key)
+    if cache_entry is not None:
         cache_age = time.time() - cache_entry['timestamp']
         
+        if allow_stale:
+            logger.debug(f"Stale cache lookup for key {cache_key[:8]}... ({cache_age:.0f}s old)")
+            return cache_entry
+        
         # Check if cache entry is still valid
         if cache_age < CACHE_TTL_SECONDS:
             logger.debug(f"Cache hit for key {cache_key[:8]}...")
-            return cache_entry['result']
-            
+            search_cache_requests_total.labels(result='hit').inc()
+            return cache_entry
+    
+    search_cache_requests_total.labels(result='miss').inc()
     return None
 
+def get_cached_search_results(cache_key, allow_stale=False):
+    """Get search results from cache if they exist and are not expired (see get_cached_search_entry)."""
+    cache_entry = get_cached_search_entry(cache_key, allow_stale)
+    return cache_entry['result'] if cache_entry else None
+
+def search_etag(result):
+    """ETag of a /query response: its results and query, without the per-request metadata."""
+    metadata = result.get('metadata', {})
+    return payload_etag({
+        'results': result.get('results'),
+        'query': metadata.get('query'),
+        'filters': metadata.get('filters'),
+        'sort': metadata.get('sort')
+    })
+
+def search_cache_control(bypass_cache=False):
+    """
+    Cache-Control of a /query response.
+    
+    Shared caches may keep results as long as this worker's cache does (the
+    Age header of a cache hit counts against max-age); results fetched with
+    bypass_cache must be revalidated.
+    """
+    if bypass_cache:
+        return 'no-cache'
+    return f"public, max-age={CACHE_TTL_SECONDS}"
+
 # Function to cache search results
-def cache_search_results(cache_key, result):
+def cache_search_results(cache_key, result, etag=None):
     """Cache search results with timestamp."""
-    # If cache is full, remove oldest entry
-    if len(search_results_cache) >= CACHE_MAX_ITEMS:
-        oldest_key = min(search_results_cache.keys(), 
-                        key=lambda k: search_results_cache[k]['timestamp'])
-        del search_results_cache[oldest_key]
-    
-    # Add new entry
-    search_results_cache[cache_key] = {
+    # Serialized once for every cache hit, outside the lock
+    cache_entry = {
         'result': result,
+        'body': EncodedBody.from_payload({**result, 'cached': True}),
+        'etag': etag or search_etag(result),
         'timestamp': time.time()
     }
+    with search_results_cache_lock:
+        # If cache is full, remove oldest entry
+        if cache_key not in search_results_cache and len(search_results_cache) >= CACHE_MAX_ITEMS:
+            oldest_key = min(search_results_cache.keys(), 
+                            key=lambda k: search_results_cache[k]['timestamp'])
+            del search_results_cache[oldest_key]
+        search_results_cache[cache_key] = cache_entry
     logger.debug(f"Cached result for key {cache_key[:8]}...")
     
     return result
 
+# Per-document cache for POST /articles, least recently used first
+# Each entry has a key article ID -> {document, timestamp}
+article_cache = OrderedDict()
+article_cache_lock = threading.Lock()
+# Fields POST /articles never fetches (the dense vectors are large and unused by listings)
+ARTICLES_SOURCE_EXCLUDES = ['embeddings']
+register_structure('article_cache', lambda: article_cache)
+
+def get_cached_articles(article_ids):
+    """Get the unexpired cached documents among article IDs, keyed by ID."""
+    now = time.time()
+    documents = {}
+    with article_cache_lock:
+        for article_id in article_ids:
+            cache_entry = article_cache.get(article_id)
+            if cache_entry is None:
+                continue
+            if now - cache_entry['timestamp'] >= ARTICLE_CACHE_TTL_SECONDS:
+                del article_cache[article_id]
+                continue
+            article_cache.move_to_end(article_id)
+            documents[article_id] = cache_entry['document']
+    return documents
+
+def cache_articles(documents):
+    """Cache documents keyed by article ID, evicting the least recently used ones."""
+    now = time.time()
+    with article_cache_lock:
+        for article_id, document in documents.items():
+            article_cache[article_id] = {'document': document, 'timestamp': now}
+            article_cache.move_to_end(article_id)
+        while len(article_cache) > ARTICLE_CACHE_MAX_ITEMS:
+            article_cache.popitem(last=False)
+
+class EngineUnavailableError(RuntimeError):
+    """Raised when a request needs the search engine before it is attached."""
+
+
 class BackEnd:
-    def __init__(self):
-        try:
-            # Log initialization
-            logger.info("Initializing backend components...")
-            
-            # Test Elasticsearch connection before initializing engine
-            es_test_result = self._test_elasticsearch_connection()
-            
-            # Initialize the Elasticsearch engine only if connection was successful
-            if es_test_result.get("success", False):
-                from es_database import Engine
-                self.engine = Engine()
-                self.engine.config.validate_config()
+    """
+    Holds the Elasticsearch engine, which is attached on a background thread.
+    
+    Startup never waits for Elasticsearch: the engine is created on a daemon
+    thread that retries with exponential backoff until it succeeds, so a
+    worker that starts while Elasticsearch is unreachable attaches it as soon
+    as it recovers. Until then `engine` is None and requests take the
+    degraded path.
+    """
+    
+    def __init__(self, start: bool = True):
+        self.engine = None
+        self.ready = threading.Event()
+        self.state = {
+            "status": "initializing",
+            "attempts": 0,
+            "last_error": None,
+            "last_attempt_at": None,
+            "next_retry_at": None,
+            "ready_at": None
+        }
+        self._thread = None
+        self._thread_pid = None
+        self._lock = threading.Lock()
+        if start:
+            self.start()
+    
+    def start(self) -> None:
+        """Start engine initialization in this process unless it is running or done."""
+        with self._lock:
+            if self.ready.is_set():
+                return
+            if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self._thread = threading.Thread(target=self._initialize_loop, name="engine-init", daemon=True)
+            self._thread.start()
+    
+    def _initialize_engine(self) -> None:
+        """Create the engine and hook up the ingest listeners."""
+        # imported here so elasticsearch, numpy and yfinance stay off the import path of the app
+        import elasticsearch
+        from es_database import Engine
+        logger.info(f"Using elasticsearch-py {getattr(elasticsearch, '__versionstr__', elasticsearch.__version__)}")
+        engine = Engine()
+        engine.config.validate_config()
+        engine.add_ingest_listener(record_ingested_article)
+        self.engine = engine
+    
+    def _initialize_loop(self) -> None:
+        delay = ENGINE_INIT_BACKOFF_SECONDS
+        while not self.ready.is_set():
+            self.state["attempts"] += 1
+            self.state["last_attempt_at"] = datetime.now().isoformat()
+            try:
+                logger.info(f"Initializing Elasticsearch engine (attempt {self.state['attempts']})")
+                self._initialize_engine()
+                self.state.update({
+                    "status": "ready",
+                    "last_error": None,
+                    "next_retry_at": None,
+                    "ready_at": datetime.now().isoformat()
+                })
+                self.ready.set()
                 logger.info("Backend initialized with Elasticsearch engine")
-            else:
-                logger.warning("Skipping Elasticsearch engine initialization due to connection failure")
-                self.engine = None
-        except Exception as e:
-            error_trace = traceback.format_exc()
-            logger.error(f"Failed to initialize backend: {str(e)}", extra={
-                'extra': {'traceback': error_trace}
-            })
-            self.engine = None
-
-    @performance_monitor(name="test_elasticsearch_connection")
-    def _test_elasticsearch_connection(self):
-        """Test the connection to Elasticsearch and log the results."""
-        # Use our advanced ES connection test utility
-        try:
-            result = test_es_connection()
-            
-            if result.get("success", False):
-                logger.info("Elasticsearch connection test successful")
-            else:
-                error_msg = result.get('error', 'Unknown error')
-                logger.error(f"Elasticsearch connection test failed: {error_msg}")
-                
-            return result
-        except Exception as e:
-            logger.error(f"Exception during Elasticsearch connection test: {str(e)}")
-            return {"success": False, "error": str(e)}
+                return
+            except Exception as e:
+                # jitter keeps the workers of one host from retrying in lockstep
+                wait = delay * random.uniform(0.5, 1.0)
+                self.state.update({
+                    "status": "degraded",
+                    "last_error": str(e),
+                    "next_retry_at": datetime.fromtimestamp(time.time() + wait).isoformat()
+                })
+                logger.warning(f"Elasticsearch engine initialization failed, retrying in {wait:.1f}s: {str(e)}", extra={
+                    'extra': {'attempt': self.state['attempts'], 'traceback': traceback.format_exc()}
+                })
+                time.sleep(wait)
+                delay = min(delay * 2, ENGINE_INIT_MAX_BACKOFF_SECONDS)
+    
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the engine is attached or the timeout expires."""
+        return self.ready.wait(timeout)
+    
+    def get_status(self) -> Dict:
+        return {"ready": self.ready.is_set(), **self.state, "circuit_breakers": circuit_breakers.status()}
+    
+    def require_engine(self):
+        """
+        Get the engine for a request.
+        
+        Raises:
+            EngineUnavailableError: If the engine is not attached yet
+        """
+        engine = self.engine
+        if engine is None:
+            raise EngineUnavailableError(
+                f"Search engine {self.state['status']}"
+                + (f": {self.state['last_error']}" if self.state['last_error'] else "")
+            )
+        return engine
 
     @performance_monitor(name="process_search_query")
     def process_search_query(
@@ -244,7 +435,15 @@ class BackEnd:
         filters: Optional[Dict] = None,
         time_range: Optional[Dict] = None
     ) -> Dict:
-        """Process a search query with optional filters and time range."""
+        """
+        Process a search query with optional filters and time range.
+        
+        Errors are logged and re-raised rather than turned into an empty result,
+        which /query would cache and mark as publicly cacheable.
+        
+        Raises:
+            EngineUnavailableError: If the engine is not attached yet
+        """
         query_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{hash(query_text or '')}"
         logger.info(f"Processing search query: '{query_text}'", extra={
             'extra': {
@@ -254,15 +453,10 @@ class BackEnd:
             }
         })
         
-        # Check if Elasticsearch engine is available
-        if self.engine is None:
-            logger.warning(f"Cannot process search query: Elasticsearch engine not available")
-            # Return empty results
-            return []
-        
+        engine = self.require_engine()
         start_time = time.time()
         try:
-            results = self.engine.search_news(query_text, filters, time_range)
+            results = engine.search_news(query_text, filters, time_range)
             processing_time = time.time() - start_time
             
             hits_count = len(results['hits']['hits']) if results and 'hits' in results else 0
@@ -275,6 +469,9 @@ class BackEnd:
             })
             
             return results['hits']['hits']
+        except CircuitOpenError:
+            # Rejected without calling Elasticsearch; the breaker logged why it opened
+            raise
         except Exception as e:
             processing_time = time.time() - start_time
             error_trace = traceback.format_exc()
@@ -285,8 +482,8 @@ class BackEnd:
                     'traceback': error_trace
                 }
             })
-            # Return empty results on error
-            return []
+            # Let the caller serve degraded, uncacheable results instead of an empty page
+            raise
 
     @performance_monitor(name="update_index")
     def update_index(self, articles: List[Dict] = None):
@@ -313,14 +510,46 @@ class BackEnd:
             })
             # Don't re-raise, just log the error
 
-# Initialize the backend
-try:
-    logger.info("Creating backend instance...")
-    backend = BackEnd()
-    logger.info("Backend instance created successfully")
-except Exception as e:
-    logger.critical(f"Failed to initialize backend: {str(e)}")
-    # Continue with Flask app, but endpoints will return errors
+# Initialize the backend; the engine is attached in the background
+logger.info("Creating backend instance...")
+backend = BackEnd(start=not BACKEND_DEFER_ENGINE_INIT)
+logger.info("Backend instance created, Elasticsearch engine initializing in the background")
+
+def warmup() -> Dict:
+    """
+    Load read-only state before gunicorn forks its workers (managed mode).
+    
+    Imports the engine modules (elasticsearch, numpy and yfinance through
+    DataValidator) and exercises the fallback path once, so workers share these
+    pages copy-on-write instead of each loading them. Nothing that holds
+    sockets or threads is created here; BackEnd.start() does that per worker.
+    
+    Returns:
+        Dict with the warmup duration and the number of modules loaded
+    """
+    start = time.perf_counter()
+    modules_before = len(sys.modules)
+    # Engine pulls in elasticsearch, numpy, yfinance and the alert, anomaly and rollup modules
+    import es_database
+    generate_mock_results("warmup")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"Warmup loaded {len(sys.modules) - modules_before} modules in {elapsed_ms:.2f}ms")
+    return {"elapsed_ms": elapsed_ms, "modules_loaded": len(sys.modules) - modules_before}
+
+def engine_unavailable(error: Exception):
+    """503 response for requests that need the engine before it is attached or while its circuit is open."""
+    response = jsonify({
+        'error': str(error),
+        'engine': backend.get_status(),
+        'timestamp': datetime.now().isoformat(),
+        'request_id': getattr(request, 'request_id', None)
+    })
+    response.status_code = 503
+    retry_after = getattr(error, 'retry_after', None)
+    response.headers['Retry-After'] = (
+        str(max(int(retry_after + 0.999), 1)) if retry_after is not None else ENGINE_RETRY_AFTER_SECONDS
+    )
+    return response
 
 # Register diagnostic endpoints
 logger.info("Registering diagnostic endpoints...")
@@ -334,34 +563,37 @@ logger.info(f"Registered diagnostic endpoints with prefix: {diagnostics_bp.url_p
 def cache_stats():
     """Get statistics about the search results cache."""
     current_time = time.time()
+    # Work on a snapshot so concurrent inserts and evictions cannot interfere
+    with search_results_cache_lock:
+        cache_snapshot = dict(search_results_cache)
     
     # Calculate statistics
-    total_entries = len(search_results_cache)
-    valid_entries = sum(1 for entry in search_results_cache.values() 
+    total_entries = len(cache_snapshot)
+    valid_entries = sum(1 for entry in cache_snapshot.values() 
                          if current_time - entry['timestamp'] < CACHE_TTL_SECONDS)
     
     # Calculate memory usage (approximate)
     import sys
     total_size = sys.getsizeof(search_results_cache)
-    for key, value in search_results_cache.items():
+    for key, value in cache_snapshot.items():
         total_size += sys.getsizeof(key)
         total_size += sys.getsizeof(value)
         if 'result' in value:
             total_size += sys.getsizeof(value['result'])
     
     # Get sample keys (first 10)
-    sample_keys = list(search_results_cache.keys())[:10]
+    sample_keys = list(cache_snapshot.keys())[:10]
     
     # Age information
     age_info = {}
-    if search_results_cache:
-        oldest_key = min(search_results_cache.keys(), 
-                        key=lambda k: search_results_cache[k]['timestamp'])
-        newest_key = max(search_results_cache.keys(), 
-                        key=lambda k: search_results_cache[k]['timestamp'])
+    if cache_snapshot:
+        oldest_key = min(cache_snapshot.keys(), 
+                        key=lambda k: cache_snapshot[k]['timestamp'])
+        newest_key = max(cache_snapshot.keys(), 
+                        key=lambda k: cache_snapshot[k]['timestamp'])
         
-        oldest_age = current_time - search_results_cache[oldest_key]['timestamp']
-        newest_age = current_time - search_results_cache[newest_key]['timestamp']
+        oldest_age = current_time - cache_snapshot[oldest_key]['timestamp']
+        newest_age = current_time - cache_snapshot[newest_key]['timestamp']
         
         age_info = {
             'oldest_entry_age_seconds': oldest_age,
@@ -393,7 +625,8 @@ def health_check():
             "elasticsearch": False,
             "backend_api": True
         },
-        "version": os.getenv('APP_VERSION', '1.0.0')
+        "version": os.getenv('APP_VERSION', '1.0.0'),
+        "engine": backend.get_status()
     }
     
     # Check Elasticsearch connectivity
@@ -453,118 +686,183 @@ def health_check():
     
     return jsonify(status)
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once the Elasticsearch engine is attached, 503 before."""
+    status = backend.get_status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+# Relative time_range values accepted by /query and their published_at lower bound
+SEARCH_TIME_RANGES = {
+    '24h': 'now-1d/d',
+    '7d': 'now-7d/d',
+    '30d': 'now-30d/d',
+    '90d': 'now-90d/d'
+}
+
+def parse_search_args(args) -> Dict:
+    """Read the /query parameters (shared by the Flask route and the ASGI app)."""
+    query_text = args.get('query', None)
+    source = args.get('source', None)
+    time_range = args.get('time_range', None)
+    sentiment = args.get('sentiment', None)
+    
+    # Build filter dictionary
+    filters = {}
+    if source:
+        filters["source"] = source
+    if sentiment:
+        filters["sentiment"] = sentiment
+    
+    return {
+        'query_text': query_text,
+        'source': source,
+        'time_range': time_range,
+        'sentiment': sentiment,
+        'sort_by': args.get('sort_by', 'relevance'),  # Default to relevance sorting
+        'sort_order': args.get('sort_order', 'desc'),  # Default to descending order
+        # Check if cache should be bypassed
+        'bypass_cache': args.get('bypass_cache', 'false').lower() == 'true',
+        'filters': filters,
+        # Format time range if provided
+        'time_range_obj': {'start': SEARCH_TIME_RANGES[time_range]} if time_range in SEARCH_TIME_RANGES else None
+    }
+
+def search_cache_key(params: Dict) -> str:
+    return generate_cache_key(
+        params['query_text'], params['filters'], params['time_range'], params['sort_by'], params['sort_order']
+    )
+
+def search_response(results, params: Dict, request_id: str, fallback_reason: Optional[str] = None) -> Dict:
+    """Format /query results using the structure expected by the frontend."""
+    metadata = {
+        'query': params['query_text'],
+        'filters': params['filters'],
+        'sort': {
+            'field': params['sort_by'],
+            'order': params['sort_order']
+        }
+    }
+    if fallback_reason is not None:
+        metadata['fallback'] = True
+        metadata['fallback_reason'] = fallback_reason
+        metadata['degraded'] = True
+    metadata['timestamp'] = datetime.now().isoformat()
+    metadata['request_id'] = request_id
+    return {
+        'results': results,  # This is what frontend expects - direct access to results
+        'metadata': metadata
+    }
+
+def fallback_search_results(params: Dict):
+    """Mock results served when the search engine is unavailable."""
+    return generate_mock_results(
+        params['query_text'], params['source'], params['time_range'], params['sentiment'],
+        params['sort_by'], params['sort_order']
+    )
+
+def degraded_search_response(params: Dict, cache_key: str, request_id: str, error: Exception) -> Dict:
+    """
+    Format the /query response served when the search failed.
+    
+    While the search circuit is open the last results cached for the query
+    are served even if they have expired; otherwise, or if there are none,
+    fallback results are. Either way metadata is marked degraded.
+    """
+    if isinstance(error, CircuitOpenError):
+        cached_result = get_cached_search_results(cache_key, allow_stale=True)
+        if cached_result:
+            return {
+                **cached_result,
+                'metadata': {
+                    **cached_result.get('metadata', {}),
+                    'degraded': True,
+                    'degraded_reason': str(error),
+                    'request_id': request_id
+                },
+                'cached': True,
+                'timestamp': datetime.now().isoformat(),
+                'request_id': request_id
+            }
+    return search_response(fallback_search_results(params), params, request_id, str(error))
+
 @app.route('/query', methods=['GET'])
 @performance_monitor(name="query_endpoint")
 def query():
     try:
         # Extract query parameters
-        query_text = request.args.get('query', None)
-        source = request.args.get('source', None)
-        time_range = request.args.get('time_range', None)
-        sentiment = request.args.get('sentiment', None)
-        sort_by = request.args.get('sort_by', 'relevance')  # Default to relevance sorting
-        sort_order = request.args.get('sort_order', 'desc')  # Default to descending order
-        
-        # Check if cache should be bypassed
-        bypass_cache = request.args.get('bypass_cache', 'false').lower() == 'true'
-        
-        # Build filter dictionary
-        filters = {}
-        if source:
-            filters["source"] = source
-        if sentiment:
-            filters["sentiment"] = sentiment
-        
-        # Format time range if provided
-        time_range_obj = None
-        if time_range:
-            if time_range == '24h':
-                time_range_obj = {'start': 'now-1d/d'}
-            elif time_range == '7d':
-                time_range_obj = {'start': 'now-7d/d'}
-            elif time_range == '30d':
-                time_range_obj = {'start': 'now-30d/d'}
-            elif time_range == '90d':
-                time_range_obj = {'start': 'now-90d/d'}
+        params = parse_search_args(request.args)
+        query_text = params['query_text']
+        bypass_cache = params['bypass_cache']
+        request_id = getattr(request, 'request_id', str(uuid.uuid4()))
         
         logger.info(f"API query request received", extra={
             'extra': {
                 'query': query_text,
-                'source': source,
-                'time_range': time_range,
-                'sentiment': sentiment,
-                'sort_by': sort_by,
-                'sort_order': sort_order,
+                'source': params['source'],
+                'time_range': params['time_range'],
+                'sentiment': params['sentiment'],
+                'sort_by': params['sort_by'],
+                'sort_order': params['sort_order'],
                 'bypass_cache': bypass_cache
             }
         })
         
         # Generate cache key
-        cache_key = generate_cache_key(query_text, filters, time_range, sort_by, sort_order)
+        cache_key = search_cache_key(params)
         
         # Try to get results from cache if not bypassing
         if not bypass_cache:
-            cached_result = get_cached_search_results(cache_key)
-            if cached_result:
+            with tracer.span('cache.lookup') as span:
+                cache_entry = get_cached_search_entry(cache_key)
+                if span is not None:
+                    span.set_attribute('cache.hit', cache_entry is not None)
+            if cache_entry:
                 logger.info(f"Returning cached search results for query: '{query_text}'")
-                return jsonify({
-                    **cached_result,
-                    'cached': True,
-                    'timestamp': datetime.now().isoformat(),
-                    'request_id': getattr(request, 'request_id', str(uuid.uuid4()))
-                })
+                # The body was serialized when it was cached; the request ID and
+                # response time travel in the X-Request-ID and Date headers
+                with tracer.span('serialize'):
+                    return encoded_response(cache_entry['body'], etag=cache_entry['etag'], headers={
+                        'X-Cache': 'HIT',
+                        'Age': str(int(time.time() - cache_entry['timestamp'])),
+                        'Cache-Control': search_cache_control()
+                    })
         
         try:
-            # Try to get results from Elasticsearch
-            results = backend.process_search_query(query_text, filters, time_range_obj)
+            # Take the fallback path below until the engine is attached
+            backend.require_engine()
             
-            # Format the response using the structure expected by frontend
-            response = {
-                'results': results,  # This is what frontend expects - direct access to results
-                'metadata': {
-                    'query': query_text,
-                    'filters': filters,
-                    'sort': {
-                        'field': sort_by,
-                        'order': sort_order
-                    },
-                    'timestamp': datetime.now().isoformat(),
-                    'request_id': getattr(request, 'request_id', str(uuid.uuid4()))
-                }
-            }
+            # Try to get results from Elasticsearch
+            results = backend.process_search_query(query_text, params['filters'], params['time_range_obj'])
+            response = search_response(results, params, request_id)
+            etag = search_etag(response)
             
             # Cache the result
             if not bypass_cache:
-                cache_search_results(cache_key, response)
+                with tracer.span('cache.store'):
+                    cache_search_results(cache_key, response, etag)
             
-            return jsonify(response)
+            with tracer.span('serialize'):
+                return json_response(response, etag=etag, headers={
+                    'X-Cache': 'MISS',
+                    'Cache-Control': search_cache_control(bypass_cache)
+                })
+        except CircuitOpenError as open_error:
+            # Rejected without calling Elasticsearch; the breaker logged why it opened
+            logger.debug(f"Search rejected: {open_error}")
+            return json_response(
+                degraded_search_response(params, cache_key, request_id, open_error),
+                headers={'Cache-Control': 'no-store'}
+            )
         except Exception as es_error:
-            # Log the Elasticsearch error
-            logger.error(f"Elasticsearch error: {str(es_error)}", extra={
-                'extra': {'traceback': traceback.format_exc()}
-            })
+            # Already logged by process_search_query (or the engine is not attached yet)
+            logger.warning(f"Serving degraded search results: {str(es_error)}")
             
-            # Generate fallback results
-            fallback_results = generate_mock_results(query_text, source, time_range, sentiment, sort_by, sort_order)
-            
-            # Format the response using the structure expected by frontend
-            response = {
-                'results': fallback_results,  # This is what frontend expects - direct access to results
-                'metadata': {
-                    'query': query_text,
-                    'filters': filters,
-                    'sort': {
-                        'field': sort_by,
-                        'order': sort_order
-                    },
-                    'fallback': True,
-                    'fallback_reason': str(es_error),
-                    'timestamp': datetime.now().isoformat(),
-                    'request_id': getattr(request, 'request_id', str(uuid.uuid4()))
-                }
-            }
-            
-            return jsonify(response)
+            # Serve stale cached or fallback results, which caches must not keep
+            return json_response(
+                degraded_search_response(params, cache_key, request_id, es_error),
+                headers={'Cache-Control': 'no-store'}
+            )
     except Exception as e:
         error_trace = traceback.format_exc()
         logger.error(f"Query endpoint error: {str(e)}", extra={
@@ -577,16 +875,117 @@ def query():
             'request_id': getattr(request, 'request_id', None)
         }), 500
 
+@app.route('/query/batch', methods=['POST'])
+@performance_monitor(name="query_batch_endpoint")
+def query_batch():
+    """
+    Run several /query searches in one request.
+    
+    JSON body: 'queries', a list of up to QUERY_BATCH_MAX_QUERIES objects
+    with the /query parameters. Queries found in the search cache are served
+    from it and the rest are sent to Elasticsearch in one _msearch; each
+    result is cached under the same key as the matching /query call. The
+    response holds one /query response per query, in order.
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        specs = payload.get('queries')
+        if not isinstance(specs, list) or not specs or not all(isinstance(spec, dict) for spec in specs):
+            return jsonify({'error': "'queries' must be a non-empty list of query objects"}), 400
+        if len(specs) > QUERY_BATCH_MAX_QUERIES:
+            return jsonify({'error': f"At most {QUERY_BATCH_MAX_QUERIES} queries per request"}), 400
+        request_id = getattr(request, 'request_id', str(uuid.uuid4()))
+        
+        queries = []
+        for spec in specs:
+            # JSON booleans are accepted where /query takes 'true'/'false'
+            params = parse_search_args({**spec, 'bypass_cache': str(spec.get('bypass_cache', False)).lower()})
+            queries.append((params, search_cache_key(params)))
+        
+        # Serialized response of each query; cache hits reuse their stored bodies
+        bodies = [None] * len(queries)
+        with tracer.span('cache.lookup') as span:
+            for position, (params, cache_key) in enumerate(queries):
+                if not params['bypass_cache']:
+                    cache_entry = get_cached_search_entry(cache_key)
+                    if cache_entry:
+                        bodies[position] = cache_entry['body'].identity
+            if span is not None:
+                span.set_attribute('cache.hits', sum(1 for body in bodies if body is not None))
+        
+        # Queries left for Elasticsearch, each sent once however often it was asked for
+        pending = {}
+        for position, (params, cache_key) in enumerate(queries):
+            if bodies[position] is None:
+                pending.setdefault(cache_key, (params, []))[1].append(position)
+        
+        if pending:
+            try:
+                # Take the fallback path below until the engine is attached
+                responses = backend.require_engine().search_news_batch([
+                    {'query_text': params['query_text'], 'filters': params['filters'],
+                     'time_range': params['time_range_obj']}
+                    for params, _ in pending.values()
+                ])
+                errors = [response.get('error') for response in responses]
+            except Exception as es_error:
+                if not isinstance(es_error, CircuitOpenError):
+                    logger.error(f"Elasticsearch error: {str(es_error)}", extra={
+                        'extra': {'traceback': traceback.format_exc()}
+                    })
+                responses, errors = [None] * len(pending), [es_error] * len(pending)
+            
+            for (cache_key, (params, positions)), response, error in zip(pending.items(), responses, errors):
+                if isinstance(error, dict):
+                    # this search failed inside an otherwise successful _msearch
+                    logger.error(f"Batch search failed: {error.get('reason')}", extra={'extra': {'error': error}})
+                    error = RuntimeError(error.get('reason') or error.get('type') or 'search failed')
+                if error is not None:
+                    result = degraded_search_response(params, cache_key, request_id, error)
+                else:
+                    result = search_response(response['hits']['hits'], params, request_id)
+                    if not params['bypass_cache']:
+                        cache_search_results(cache_key, result)
+                body = dumps(result)
+                for position in positions:
+                    bodies[position] = body
+        
+        metadata = {
+            'queries': len(queries),
+            'cached': len(queries) - sum(len(positions) for _, positions in pending.values()),
+            'searched': len(pending),
+            'timestamp': datetime.now().isoformat(),
+            'request_id': request_id
+        }
+        with tracer.span('serialize'):
+            body = b'{"results":[' + b','.join(bodies) + b'],"metadata":' + dumps(metadata) + b'}'
+            return encoded_response(EncodedBody(body), headers={'Cache-Control': 'no-store'})
+    except Exception as e:
+        error_trace = traceback.format_exc()
+        logger.error(f"Query batch endpoint error: {str(e)}", extra={
+            'extra': {'traceback': error_trace}
+        })
+        return jsonify({
+            'error': str(e),
+            'error_type': type(e).__name__,
+            'timestamp': datetime.now().isoformat(),
+            'request_id': getattr(request, 'request_id', None)
+        }), 500
+
+# Sample data for fallback results
+FALLBACK_SOURCES = ("Reuters", "Bloomberg", "Wall Street Journal", "CNBC", "Financial Times")
+FALLBACK_COMPANIES = ("Apple", "Tesla", "Microsoft", "Amazon", "Google", "Meta", "Netflix")
+FALLBACK_TICKERS = {company: company[:4].upper() for company in FALLBACK_COMPANIES}
+FALLBACK_SENTIMENTS = ("positive", "negative", "neutral")
+
 # Add a fallback mock results generator
 def generate_mock_results(query_text, source=None, time_range=None, sentiment=None, sort_by='relevance', sort_order='desc'):
     """Generate mock search results when Elasticsearch is unavailable."""
-    import random
-    from datetime import datetime, timedelta
+    from datetime import timedelta
     
-    # Sample data for fallback results
-    sources = ["Reuters", "Bloomberg", "Wall Street Journal", "CNBC", "Financial Times"]
-    companies = ["Apple", "Tesla", "Microsoft", "Amazon", "Google", "Meta", "Netflix"]
-    sentiments = ["positive", "negative", "neutral"]
+    sources = FALLBACK_SOURCES
+    companies = FALLBACK_COMPANIES
+    sentiments = FALLBACK_SENTIMENTS
     
     # Apply source filter if provided
     available_sources = [source] if source else sources
@@ -647,7 +1046,7 @@ def generate_mock_results(query_text, source=None, time_range=None, sentiment=No
                 "companies": [
                     {
                         "name": company,
-                        "ticker": company[:4].upper()
+                        "ticker": FALLBACK_TICKERS[company]
                     }
                 ]
             },
@@ -677,12 +1076,21 @@ def generate_mock_results(query_text, source=None, time_range=None, sentiment=No
 def get_article(article_id):
     try:
         logger.info(f"Retrieving article with ID: {article_id}")
-        article = backend.engine.get_article_by_id(article_id)
-        if article:
-            return jsonify(article)
+        document = backend.require_engine().get_article_document(article_id)
+        if document:
+            article = document['_source']
+            # Changes with every write of the document
+            etag = payload_etag([
+                document.get('_index'), document.get('_id'), document.get('_version'), article.get('updated_at')
+            ])
+            return json_response(article, etag=etag, headers={
+                'Cache-Control': f"public, max-age={ARTICLE_CACHE_MAX_AGE_SECONDS}"
+            })
         else:
             logger.warning(f"Article not found: {article_id}")
             return jsonify({'error': 'Article not found'}), 404
+    except (EngineUnavailableError, CircuitOpenError) as e:
+        return engine_unavailable(e)
     except Exception as e:
         error_trace = traceback.format_exc()
         logger.error(f"Get article endpoint error: {str(e)}", extra={
@@ -695,6 +1103,249 @@ def get_article(article_id):
             'request_id': getattr(request, 'request_id', None)
         }), 500
 
+@app.route('/articles', methods=['POST'])
+@performance_monitor(name="get_articles_endpoint")
+def get_articles():
+    """
+    Retrieve several articles in one request.
+    
+    JSON body: 'ids' (up to ARTICLES_BATCH_MAX_IDS article IDs) and optional
+    'fields' (top-level article fields to return). Cached articles are served
+    from the article cache and the rest are fetched with one mget. Articles
+    are returned in the order of 'ids'; IDs that do not exist get
+    found: false.
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        article_ids = payload.get('ids')
+        fields = payload.get('fields')
+        if not isinstance(article_ids, list) or not all(isinstance(article_id, str) and article_id
+                                                        for article_id in article_ids):
+            return jsonify({'error': "'ids' must be a list of article IDs"}), 400
+        if len(article_ids) > ARTICLES_BATCH_MAX_IDS:
+            return jsonify({'error': f"At most {ARTICLES_BATCH_MAX_IDS} article IDs per request"}), 400
+        if fields is not None and (not isinstance(fields, list)
+                                   or not all(isinstance(field, str) for field in fields)):
+            return jsonify({'error': "'fields' must be a list of field names"}), 400
+        
+        unique_ids = list(dict.fromkeys(article_ids))
+        with tracer.span('cache.lookup') as span:
+            documents = get_cached_articles(unique_ids)
+            if span is not None:
+                span.set_attribute('cache.hits', len(documents))
+        missing_ids = [article_id for article_id in unique_ids if article_id not in documents]
+        if missing_ids:
+            fetched = backend.require_engine().get_articles_by_ids(
+                missing_ids, source_excludes=ARTICLES_SOURCE_EXCLUDES
+            )
+            found = {document['_id']: document for document in fetched if document is not None}
+            cache_articles(found)
+            documents.update(found)
+        
+        articles = []
+        for article_id in article_ids:
+            document = documents.get(article_id)
+            if document is None:
+                articles.append({'id': article_id, 'found': False})
+                continue
+            article = document['_source']
+            if fields is not None:
+                article = {field: article[field] for field in fields if field in article}
+            articles.append({'id': article_id, 'found': True, 'article': article})
+        
+        logger.info(f"Retrieved {len(documents)} of {len(unique_ids)} articles", extra={
+            'extra': {'requested': len(unique_ids), 'cached': len(unique_ids) - len(missing_ids)}
+        })
+        with tracer.span('serialize'):
+            return json_response({
+                'articles': articles,
+                'metadata': {
+                    'requested': len(article_ids),
+                    'found': sum(1 for article in articles if article['found']),
+                    'cached': len(unique_ids) - len(missing_ids),
+                    'timestamp': datetime.now().isoformat(),
+                    'request_id': getattr(request, 'request_id', None)
+                }
+            })
+    except (EngineUnavailableError, CircuitOpenError) as e:
+        return engine_unavailable(e)
+    except Exception as e:
+        error_trace = traceback.format_exc()
+        logger.error(f"Get articles endpoint error: {str(e)}", extra={
+            'extra': {'traceback': error_trace}
+        })
+        return jsonify({
+            'error': str(e),
+            'error_type': type(e).__name__,
+            'timestamp': datetime.now().isoformat(),
+            'request_id': getattr(request, 'request_id', None)
+        }), 500
+
+def fetch_stream_articles(since_millis, size):
+    """Poll source of the /stream feed: articles written since a time, oldest first."""
+    if backend.engine is None:
+        return None
+    return backend.engine.get_articles_updated_since(since_millis, size, list(EVENT_FIELDS) + ['companies'])
+
+# Articles are indexed by the loader process, so each worker polls for them
+stream_poller = IndexPoller(stream_hub, fetch_stream_articles)
+
+@app.route('/stream', methods=['GET'])
+def stream():
+    """
+    Server-Sent Events feed of newly indexed articles.
+    
+    Optional comma-separated filters: source, ticker, sentiment. Clients resume
+    with the Last-Event-ID header (or the last_event_id query parameter).
+    """
+    client = StreamClient(
+        sources=request.args.get('source'),
+        tickers=request.args.get('ticker'),
+        sentiments=request.args.get('sentiment')
+    )
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    
+    stream_poller.ensure_running()
+    try:
+        resumed = stream_hub.subscribe(client, last_event_id)
+    except OverflowError as e:
+        logger.warning(f"Rejecting stream client: {str(e)}")
+        return jsonify({
+            'error': str(e),
+            'timestamp': datetime.now().isoformat(),
+            'request_id': getattr(request, 'request_id', None)
+        }), 503
+    
+    logger.info("Stream client connected", extra={
+        'extra': {
+            'sources': sorted(client.sources),
+            'tickers': sorted(client.tickers),
+            'sentiments': sorted(client.sentiments),
+            'last_event_id': last_event_id,
+            'resumed': resumed
+        }
+    })
+    return Response(
+        stream_hub.stream(client, resumed),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@app.route('/stream/stats', methods=['GET'])
+def stream_stats():
+    """Get statistics about the live article stream."""
+    return jsonify({
+        **stream_hub.get_stats(),
+        **stream_poller.get_stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+def get_alert_engine():
+    """Get the saved-query alert engine, or None when unavailable."""
+    return getattr(backend.engine, 'alerts', None) if backend.engine else None
+
+def alerts_unavailable():
+    return jsonify({
+        'error': 'Alerts are not available',
+        'timestamp': datetime.now().isoformat(),
+        'request_id': getattr(request, 'request_id', None)
+    }), 503
+
+@app.route('/alerts', methods=['GET', 'POST'])
+@performance_monitor(name="alerts_endpoint")
+def alerts():
+    """List saved alert queries or save a new one."""
+    alert_engine = get_alert_engine()
+    if alert_engine is None:
+        return alerts_unavailable()
+    
+    try:
+        if request.method == 'GET':
+            return jsonify({
+                'alerts': alert_engine.list_queries(),
+                'stats': alert_engine.get_stats(),
+                'timestamp': datetime.now().isoformat()
+            })
+        
+        payload = request.get_json(silent=True) or {}
+        try:
+            saved = alert_engine.add_query(payload, payload.get('id'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        logger.info(f"Saved alert query {saved['id']}", extra={
+            'extra': {'name': saved['name'], 'filters': saved['filters']}
+        })
+        return jsonify(saved), 201
+    except Exception as e:
+        error_trace = traceback.format_exc()
+        logger.error(f"Alerts endpoint error: {str(e)}", extra={
+            'extra': {'traceback': error_trace}
+        })
+        return jsonify({
+            'error': str(e),
+            'error_type': type(e).__name__,
+            'timestamp': datetime.now().isoformat(),
+            'request_id': getattr(request, 'request_id', None)
+        }), 500
+
+@app.route('/alerts/<alert_id>', methods=['DELETE'])
+@performance_monitor(name="delete_alert_endpoint")
+def delete_alert(alert_id):
+    """Delete a saved alert query."""
+    alert_engine = get_alert_engine()
+    if alert_engine is None:
+        return alerts_unavailable()
+    
+    try:
+        if not alert_engine.remove_query(alert_id):
+            return jsonify({'error': 'Alert not found'}), 404
+        logger.info(f"Deleted alert query {alert_id}")
+        return jsonify({'deleted': alert_id})
+    except Exception as e:
+        error_trace = traceback.format_exc()
+        logger.error(f"Delete alert endpoint error: {str(e)}", extra={
+            'extra': {'traceback': error_trace}
+        })
+        return jsonify({
+            'error': str(e),
+            'error_type': type(e).__name__,
+            'timestamp': datetime.now().isoformat(),
+            'request_id': getattr(request, 'request_id', None)
+        }), 500
+
+@app.route('/alerts/matches', methods=['GET'])
+@performance_monitor(name="alert_matches_endpoint")
+def alert_matches():
+    """Drain pending alert matches, optionally for a single saved query."""
+    alert_engine = get_alert_engine()
+    if alert_engine is None:
+        return alerts_unavailable()
+    
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    try:
+        matches = alert_engine.drain(request.args.get('alert_id'), limit)
+        return jsonify({
+            'matches': matches,
+            'count': len(matches),
+            'pending': alert_engine.pending(),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        error_trace = traceback.format_exc()
+        logger.error(f"Alert matches endpoint error: {str(e)}", extra={
+            'extra': {'traceback': error_trace}
+        })
+        return jsonify({
+            'error': str(e),
+            'error_type': type(e).__name__,
+            'timestamp': datetime.now().isoformat(),
+            'request_id': getattr(request, 'request_id', None)
+        }), 500
+
 @app.errorhandler(404)
 def not_found(error):
     logger.warning(f"404 Not Found: {request.path}")
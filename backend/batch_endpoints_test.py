@@ -0,0 +1,156 @@
+import importlib
+import unittest
+
+# Collected by pytest as part of the backend package, the Flask module is backend.backend
+server = importlib.import_module(f"{__package__}.backend" if __package__ else 'backend')
+
+
+class FakeEngine:
+    def __init__(self, articles=None, responses=None):
+        self.articles = articles or {}
+        self.responses = responses or {}
+        self.article_calls = []
+        self.search_calls = []
+
+    def get_articles_by_ids(self, article_ids, source_excludes=None):
+        self.article_calls.append((list(article_ids), source_excludes))
+        return [
+            {'_id': article_id, '_source': self.articles[article_id]} if article_id in self.articles else None
+            for article_id in article_ids
+        ]
+
+    def search_news_batch(self, queries):
+        self.search_calls.append(queries)
+        return [self.responses.get(query['query_text'], {'hits': {'hits': []}}) for query in queries]
+
+
+def hits(*headlines):
+    return {'hits': {'hits': [{'_id': headline, '_source': {'headline': headline}} for headline in headlines]}}
+
+
+class BatchEndpointTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = server.app.test_client()
+        self.original_engine = server.backend.engine
+        self.addCleanup(setattr, server.backend, 'engine', self.original_engine)
+        self.clear_caches()
+        self.addCleanup(self.clear_caches)
+
+    @staticmethod
+    def clear_caches():
+        with server.search_results_cache_lock:
+            server.search_results_cache.clear()
+        with server.article_cache_lock:
+            server.article_cache.clear()
+
+
+class TestArticlesEndpoint(BatchEndpointTestCase):
+    def setUp(self):
+        super().setUp()
+        self.engine = FakeEngine(articles={
+            'a': {'headline': 'A', 'source': 'Reuters'},
+            'b': {'headline': 'B', 'source': 'CNBC'}
+        })
+        server.backend.engine = self.engine
+
+    def test_request_order_duplicates_and_not_found(self):
+        response = self.client.post('/articles', json={'ids': ['b', 'missing', 'a', 'b']})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual([article['id'] for article in data['articles']], ['b', 'missing', 'a', 'b'])
+        self.assertEqual([article['found'] for article in data['articles']], [True, False, True, True])
+        self.assertEqual(data['articles'][0]['article']['headline'], 'B')
+        self.assertNotIn('article', data['articles'][1])
+        self.assertEqual(data['metadata']['requested'], 4)
+        self.assertEqual(data['metadata']['found'], 3)
+        # each ID is fetched once, without the embeddings
+        self.assertEqual(self.engine.article_calls, [(['b', 'missing', 'a'], ['embeddings'])])
+
+    def test_cached_articles_are_not_fetched_again(self):
+        self.client.post('/articles', json={'ids': ['a']})
+        data = self.client.post('/articles', json={'ids': ['a', 'b']}).get_json()
+        self.assertEqual(data['metadata']['cached'], 1)
+        self.assertEqual(self.engine.article_calls[-1][0], ['b'])
+
+    def test_fields(self):
+        data = self.client.post('/articles', json={'ids': ['a'], 'fields': ['source', 'nope']}).get_json()
+        self.assertEqual(data['articles'][0]['article'], {'source': 'Reuters'})
+
+    def test_validation(self):
+        for payload in ({}, {'ids': 'a'}, {'ids': ['a', 1]}, {'ids': ['']}, {'ids': ['a'], 'fields': 'source'},
+                        {'ids': ['id'] * (server.ARTICLES_BATCH_MAX_IDS + 1)}):
+            self.assertEqual(self.client.post('/articles', json=payload).status_code, 400, payload)
+
+    def test_engine_unavailable(self):
+        server.backend.engine = None
+        response = self.client.post('/articles', json={'ids': ['a']})
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response.headers)
+
+
+class TestQueryBatchEndpoint(BatchEndpointTestCase):
+    def setUp(self):
+        super().setUp()
+        self.engine = FakeEngine(responses={
+            'apple': hits('Apple up'),
+            'tesla': hits('Tesla down', 'Tesla recalls'),
+            'broken': {'error': {'type': 'search_phase_execution_exception', 'reason': 'all shards failed'}}
+        })
+        server.backend.engine = self.engine
+
+    def post(self, *queries):
+        response = self.client.post('/query/batch', json={'queries': list(queries)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'no-store')
+        return response.get_json()
+
+    def headlines(self, result):
+        return [hit['_source']['headline'] for hit in result['results']]
+
+    def test_results_in_request_order(self):
+        data = self.post({'query': 'tesla'}, {'query': 'apple'})
+        self.assertEqual([self.headlines(result) for result in data['results']],
+                         [['Tesla down', 'Tesla recalls'], ['Apple up']])
+        self.assertEqual(data['results'][1]['metadata']['query'], 'apple')
+
+    def test_duplicate_queries_are_searched_once(self):
+        data = self.post({'query': 'apple'}, {'query': 'tesla'}, {'query': 'apple'})
+        self.assertEqual([query['query_text'] for query in self.engine.search_calls[0]], ['apple', 'tesla'])
+        self.assertEqual(self.headlines(data['results'][2]), ['Apple up'])
+        self.assertEqual((data['metadata']['queries'], data['metadata']['searched'], data['metadata']['cached']),
+                         (3, 2, 0))
+
+    def test_cached_queries_are_not_searched(self):
+        self.post({'query': 'apple'})
+        data = self.post({'query': 'apple'}, {'query': 'tesla'})
+        self.assertEqual([query['query_text'] for query in self.engine.search_calls[-1]], ['tesla'])
+        self.assertEqual(data['metadata']['cached'], 1)
+        self.assertEqual(self.headlines(data['results'][0]), ['Apple up'])
+
+    def test_bypass_cache(self):
+        self.post({'query': 'apple'})
+        data = self.post({'query': 'apple', 'bypass_cache': True})
+        self.assertEqual(len(self.engine.search_calls), 2)
+        self.assertEqual(data['metadata']['cached'], 0)
+
+    def test_failed_search_is_degraded_and_not_cached(self):
+        data = self.post({'query': 'broken'}, {'query': 'apple'})
+        self.assertTrue(data['results'][0]['metadata']['degraded'])
+        self.assertEqual(self.headlines(data['results'][1]), ['Apple up'])
+        self.post({'query': 'broken'})
+        self.assertEqual([query['query_text'] for query in self.engine.search_calls[-1]], ['broken'])
+
+    def test_engine_unavailable_serves_fallback(self):
+        server.backend.engine = None
+        data = self.post({'query': 'apple'})
+        self.assertTrue(data['results'][0]['metadata']['degraded'])
+        self.assertEqual(server.search_results_cache, {})
+
+    def test_validation(self):
+        for payload in ({}, {'queries': []}, {'queries': ['apple']},
+                        {'queries': [{'query': 'apple'}] * (server.QUERY_BATCH_MAX_QUERIES + 1)}):
+            self.assertEqual(self.client.post('/query/batch', json=payload).status_code, 400, payload)
+
+
+if __name__ == '__main__':
+    unittest.main()
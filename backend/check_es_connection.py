@@ -26,7 +26,8 @@ import requests
 from dotenv import load_dotenv
 import logging
 import traceback
-from elasticsearch import Elasticsearch
+from es_database import EngineConfig
+from es_database.ClientFactory import create_client
 import urllib3
 import socket
 import argparse
@@ -153,43 +154,15 @@ def test_es_client(url, api_key=None):
     logger.info("\n=== Testing Elasticsearch client connection ===")
     
     try:
-        # Get the Elasticsearch version
         import elasticsearch
-        es_version = elasticsearch.__version__
-        es_major_version = int(es_version.split('.')[0])
-        logger.info(f"Using Elasticsearch client version: {es_version}")
+        logger.info(f"Using Elasticsearch client version: {elasticsearch.__versionstr__}")
         
-        # Configure the Elasticsearch client based on version
-        if es_major_version >= 8:
-            # For ES 8.x
-            if api_key:
-                es = Elasticsearch(
-                    url,
-                    api_key=api_key,
-                    verify_certs=False,  # For testing only
-                    request_timeout=10
-                )
-            else:
-                es = Elasticsearch(
-                    url,
-                    verify_certs=False,  # For testing only
-                    request_timeout=10
-                )
-        else:
-            # For ES 7.x and earlier
-            if api_key:
-                es = Elasticsearch(
-                    [url],
-                    api_key=api_key,
-                    verify_certs=False,  # For testing only
-                    request_timeout=10
-                )
-            else:
-                es = Elasticsearch(
-                    [url],
-                    verify_certs=False,  # For testing only
-                    request_timeout=10
-                )
+        # Use the application's client settings (pool, timeouts, retries) so the
+        # check exercises the same configuration as the backend
+        config = EngineConfig()
+        config.elasticsearch_url = url
+        config.api_key = api_key
+        es = create_client(config, verify_certs=False)  # For testing only
         
         # Check if the cluster is responding
         info = es.info()
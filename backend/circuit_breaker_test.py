@@ -0,0 +1,150 @@
+import unittest
+from unittest.mock import patch
+
+from elasticsearch import ConnectionError as ESConnectionError, ConnectionTimeout, TransportError
+
+from utils.circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, is_backend_failure
+)
+
+
+class TestIsBackendFailure(unittest.TestCase):
+    def test_connection_errors_and_timeouts_count(self):
+        self.assertTrue(is_backend_failure(ESConnectionError('N/A', 'refused', None)))
+        self.assertTrue(is_backend_failure(ConnectionTimeout('TIMEOUT', 'timed out', None)))
+        self.assertTrue(is_backend_failure(TimeoutError()))
+        self.assertTrue(is_backend_failure(ConnectionRefusedError()))
+
+    def test_overload_and_server_errors_count(self):
+        for status in (429, 500, 502, 503):
+            self.assertTrue(is_backend_failure(TransportError(status, 'error', {})), status)
+
+    def test_client_errors_do_not_count(self):
+        for status in (400, 404, 409):
+            self.assertFalse(is_backend_failure(TransportError(status, 'error', {})), status)
+        self.assertFalse(is_backend_failure(ValueError("bad input")))
+        self.assertFalse(is_backend_failure(KeyError('hits')))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = 1000.0
+        patcher = patch('utils.circuit_breaker.time.monotonic', side_effect=lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(
+            'test', budget_ms=100, failure_rate=0.5, slow_call_rate=0.5,
+            window_size=4, min_calls=4, open_seconds=30, half_open_calls=2
+        )
+
+    def record(self, count, duration_ms=10, failed=False):
+        for _ in range(count):
+            self.breaker.before_call()
+            self.breaker.after_call(duration_ms, failed)
+
+    def open_breaker(self):
+        self.record(4, failed=True)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_stays_closed_below_min_calls(self):
+        self.record(3, failed=True)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_opens_on_failure_rate(self):
+        self.record(2)
+        self.record(2, failed=True)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertIn('failed', self.breaker.last_reason)
+
+    def test_opens_on_slow_call_rate(self):
+        self.record(2)
+        self.record(2, duration_ms=500)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertIn('100ms', self.breaker.last_reason)
+
+    def test_stays_closed_when_healthy(self):
+        self.record(10)
+        self.record(1, failed=True)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_open_circuit_rejects_with_retry_after(self):
+        self.open_breaker()
+        self.clock += 10
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.breaker.before_call()
+        self.assertAlmostEqual(raised.exception.retry_after, 20)
+        self.assertEqual(self.breaker.rejected, 1)
+
+    def test_half_open_after_cool_down_limits_probes(self):
+        self.open_breaker()
+        self.clock += 31
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+    def test_successful_probes_close(self):
+        self.open_breaker()
+        self.clock += 31
+        self.record(2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(len(self.breaker.window), 0)
+
+    def test_failed_probe_reopens(self):
+        self.open_breaker()
+        self.clock += 31
+        self.record(1)
+        self.record(1, failed=True)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.last_reason, 'probe failed')
+
+    def test_slow_probe_reopens(self):
+        self.open_breaker()
+        self.clock += 31
+        self.record(1, duration_ms=500)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_status(self):
+        self.record(2)
+        self.record(2, failed=True)
+        status = self.breaker.status()
+        self.assertEqual(status['state'], OPEN)
+        self.assertEqual(status['failure_rate'], 0.5)
+        self.assertEqual(status['retry_after_seconds'], 30.0)
+
+
+class TestCircuitBreakerRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = CircuitBreakerRegistry({'search': 100, 'write': 500})
+
+    def test_budget_per_category(self):
+        self.assertEqual(self.registry.get('search').budget_ms, 100)
+        # unknown categories get the most lenient budget
+        self.assertEqual(self.registry.get('analytics').budget_ms, 500)
+        self.assertIs(self.registry.get('search'), self.registry.get('search'))
+
+    def test_guard_records_backend_failures_only(self):
+        with self.assertRaises(TransportError):
+            with self.registry.guard('search'):
+                raise TransportError(503, 'unavailable', {})
+        with self.assertRaises(ValueError):
+            with self.registry.guard('search'):
+                raise ValueError("bad input")
+        self.assertEqual(list(self.registry.get('search').window), [(True, False), (False, False)])
+
+    def test_nested_guards_count_once(self):
+        with self.registry.guard('search'):
+            with self.registry.guard('write'):
+                pass
+        self.assertEqual(len(self.registry.get('search').window), 1)
+        self.assertNotIn('write', self.registry.breakers)
+
+    def test_none_category_is_not_guarded(self):
+        with self.registry.guard(None):
+            pass
+        self.assertEqual(self.registry.breakers, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import patch
+
+from elasticsearch import ConnectionError as ESConnectionError, ConnectionTimeout, TransportError
+
+from es_database.ClientFactory import _RetryPolicy, is_read_request, operation_timeout
+from es_database.EngineConfig import EngineConfig
+
+
+class TestOperationTimeout(unittest.TestCase):
+    def setUp(self):
+        self.config = EngineConfig()
+        self.config.request_timeout = 1
+        self.config.search_timeout = 2
+        self.config.aggregation_timeout = 3
+        self.config.bulk_timeout = 4
+
+    def test_bulk(self):
+        self.assertEqual(operation_timeout(self.config, 'POST', '/_bulk', 'a\nb\n'), 4)
+        self.assertEqual(operation_timeout(self.config, 'POST', '/news/_bulk?refresh=true', 'a\n'), 4)
+
+    def test_search(self):
+        self.assertEqual(operation_timeout(self.config, 'POST', '/news/_search', {'query': {}}), 2)
+        self.assertEqual(operation_timeout(self.config, 'GET', '/news/_doc/1', None), 2)
+        self.assertEqual(operation_timeout(self.config, 'POST', '/news/_count', None), 2)
+
+    def test_aggregations(self):
+        self.assertEqual(operation_timeout(self.config, 'POST', '/news/_search', {'aggs': {}}), 3)
+        self.assertEqual(operation_timeout(self.config, 'POST', '/news/_search', {'aggregations': {}}), 3)
+
+    def test_other_requests(self):
+        self.assertEqual(operation_timeout(self.config, 'PUT', '/news/_doc/1', {'title': 'x'}), 1)
+        self.assertEqual(operation_timeout(self.config, 'PUT', '/news', {'mappings': {}}), 1)
+
+    def test_is_read_request(self):
+        self.assertTrue(is_read_request('POST', '/news/_mget'))
+        self.assertTrue(is_read_request('HEAD', '/news/_doc/1'))
+        self.assertFalse(is_read_request('DELETE', '/news/_doc/1'))
+
+
+class TestRetryDelay(unittest.TestCase):
+    def setUp(self):
+        self.config = EngineConfig()
+        self.config.max_retries = 3
+        self.config.retry_backoff = 0.1
+        self.config.retry_max_backoff = 1
+        self.config.retry_on_timeout = True
+        self.config.retry_reads_on_timeout = False
+        self.config.read_retry_deadline = 1.5
+        self.policy = _RetryPolicy()
+        self.policy._setup(self.config, 'test')
+        patcher = patch('es_database.ClientFactory.time.monotonic', return_value=100.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def delay(self, error, attempt=0, method='POST', url='/news/_search', started=100.0):
+        return self.policy._retry_delay(error, attempt, method, url, started)
+
+    def test_retries_overload_with_jittered_backoff(self):
+        for attempt in range(3):
+            delay = self.delay(TransportError(429, 'rejected', {}), attempt)
+            self.assertGreaterEqual(delay, 0.05 * 2 ** attempt)
+            self.assertLessEqual(delay, 0.1 * 2 ** attempt)
+        self.assertEqual(self.policy.retries, 3)
+
+    def test_gives_up_after_max_retries(self):
+        self.assertIsNone(self.delay(TransportError(503, 'unavailable', {}), attempt=3))
+
+    def test_client_errors_are_not_retried(self):
+        self.assertIsNone(self.delay(TransportError(400, 'bad request', {})))
+
+    def test_timeouts_retry_writes_only(self):
+        timeout = ConnectionTimeout('TIMEOUT', 'timed out', None)
+        self.assertIsNone(self.delay(timeout))
+        self.assertIsNotNone(self.delay(timeout, method='PUT', url='/news/_doc/1'))
+        self.config.retry_reads_on_timeout = True
+        self.assertIsNotNone(self.delay(timeout))
+
+    def test_reads_stop_at_deadline(self):
+        error = ESConnectionError('N/A', 'refused', None)
+        self.assertIsNotNone(self.delay(error, started=99.0))
+        self.assertIsNone(self.delay(error, started=98.4))
+        # writes are not bound by the read deadline
+        self.assertIsNotNone(self.delay(error, method='PUT', url='/news/_doc/1', started=90.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
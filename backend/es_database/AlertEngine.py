@@ -0,0 +1,524 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlparse
+import ipaddress
+import logging
+import queue
+import re
+import socket
+import threading
+import time
+import uuid
+import requests
+from elasticsearch import helpers
+from .EngineConfig import EngineConfig
+
+logger = logging.getLogger(__name__)
+
+# Filter keys accepted by saved queries, matching Engine.search_news filters
+FILTER_FIELDS = ("companies.ticker", "categories", "sentiment", "regions", "source")
+
+# Order in which fields are tried as the inverted-index anchor of a query,
+# most selective first; sentiment has only a handful of values
+ANCHOR_PRIORITY = ("companies.ticker", "source", "categories", "regions", "text", "sentiment")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> Set[str]:
+    """Lowercase alphanumeric tokens of a text."""
+    return set(TOKEN_PATTERN.findall(text.lower())) if text else set()
+
+
+def _as_values(value: Any) -> Set[str]:
+    """Normalize a filter or article field to a set of lowercase strings."""
+    if value is None:
+        return set()
+    if not isinstance(value, (list, tuple, set)):
+        value = [value]
+    return {str(item).strip().lower() for item in value if item is not None and str(item).strip()}
+
+
+def validate_webhook_url(url: str, allowed_hosts: Sequence[str] = ()) -> str:
+    """
+    Check that the server may post alert matches to a webhook URL.
+
+    Webhook URLs are supplied by API clients, so they must not point the server
+    at itself, the internal network or a cloud metadata endpoint: every address
+    the host resolves to has to be public. With allowed_hosts
+    (ALERTS_WEBHOOK_ALLOWED_HOSTS) set only those hosts are accepted, and they
+    are trusted wherever they resolve to.
+
+    Args:
+        url: Webhook URL
+        allowed_hosts: Lowercase host names webhooks are restricted to
+
+    Returns:
+        str: The validated URL
+
+    Raises:
+        ValueError: If the URL must not be called
+    """
+    parsed = urlparse(str(url))
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        raise ValueError("webhook_url must be an http(s) URL")
+
+    host = parsed.hostname.lower()
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise ValueError(f"webhook_url host {host} is not allowed")
+        return url
+
+    try:
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, ValueError):
+        raise ValueError(f"webhook_url host {host} cannot be resolved")
+
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split('%')[0])
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError("webhook_url must resolve to a public address")
+    return url
+
+
+class IndexSink:
+    """
+    Alert matches stored in an index, drained by API clients.
+
+    Articles are matched in the ingesting process while matches are drained
+    by whichever API worker serves the request, so they are kept in
+    Elasticsearch rather than in memory. A match ID combines the saved query
+    and article IDs, so a match is stored once however often the article is
+    written.
+    """
+
+    def __init__(self, es, index_name: str, retention_days: int = 7):
+        self.es = es
+        self.index_name = index_name
+        self.retention_days = retention_days
+        self.delivered = 0
+        self.failed = 0
+        self._pruned_at = 0.0
+
+    def ensure_index(self, number_of_replicas: int = 1) -> None:
+        """Create the match index if it does not exist."""
+        if self.es.indices.exists(index=self.index_name):
+            return
+        self.es.indices.create(index=self.index_name, body={
+            "mappings": {
+                "properties": {
+                    "query_id": {"type": "keyword"},
+                    "query_name": {"type": "keyword"},
+                    "article_id": {"type": "keyword"},
+                    "headline": {"type": "text", "index": False},
+                    "source": {"type": "keyword"},
+                    "sentiment": {"type": "keyword"},
+                    "published_at": {"type": "date"},
+                    "matched_at": {"type": "date"}
+                }
+            },
+            "settings": {"number_of_shards": 1, "number_of_replicas": number_of_replicas}
+        })
+
+    def deliver(self, match: Dict) -> None:
+        """Store a match; failures are logged and never fail the ingestion."""
+        try:
+            self.es.index(index=self.index_name, id=f"{match['query_id']}-{match['article_id']}", body=match)
+            self.delivered += 1
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Failed to store alert match for query {match['query_id']}: {str(e)}")
+        self._maybe_prune()
+
+    def _maybe_prune(self) -> None:
+        """Delete undrained matches older than the retention period, at most hourly."""
+        if time.time() - self._pruned_at < 3600:
+            return
+        self._pruned_at = time.time()
+        try:
+            self.es.delete_by_query(
+                index=self.index_name,
+                body={"query": {"range": {"matched_at": {"lt": f"now-{self.retention_days}d"}}}},
+                conflicts='proceed',
+                wait_for_completion=False
+            )
+        except Exception as e:
+            logger.warning(f"Failed to prune alert matches: {str(e)}")
+
+    def drain(self, query_id: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """
+        Remove and return pending matches.
+
+        Args:
+            query_id: Only drain matches of this saved query
+            limit: Maximum number of matches to return
+
+        Returns:
+            List[Dict]: Matches in match order
+        """
+        query = {"term": {"query_id": query_id}} if query_id else {"match_all": {}}
+        result = self.es.search(
+            index=self.index_name,
+            body={"query": query, "sort": [{"matched_at": "asc"}], "size": limit}
+        )
+        hits = result['hits']['hits']
+        if not hits:
+            return []
+
+        response = self.es.bulk(body=[
+            {"delete": {"_index": self.index_name, "_id": hit['_id']}} for hit in hits
+        ])
+        # Workers draining concurrently see the same hits; a match is returned
+        # only by the request whose delete removed it
+        return [
+            hit['_source'] for hit, item in zip(hits, response['items'])
+            if item['delete'].get('result') == 'deleted'
+        ]
+
+    def pending(self) -> int:
+        """Number of matches waiting to be drained."""
+        return self.es.count(index=self.index_name)['count']
+
+
+class WebhookSink:
+    """
+    Posts alert matches to webhook URLs from a background thread.
+
+    Ingestion only enqueues; a full queue drops the match instead of
+    blocking the indexing path.
+    """
+
+    def __init__(self, timeout: float = 5.0, maxsize: int = 1000, allowed_hosts: Sequence[str] = ()):
+        self.timeout = timeout
+        self.allowed_hosts = tuple(allowed_hosts)
+        self.pending: queue.Queue = queue.Queue(maxsize=max(int(maxsize), 1))
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def deliver(self, match: Dict, url: str) -> None:
+        """Queue a match for delivery to a webhook URL."""
+        self._ensure_worker()
+        try:
+            self.pending.put_nowait((url, match))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Alert webhook queue full, dropping match for query {match['query_id']}")
+
+    def _ensure_worker(self) -> None:
+        """Start the delivery thread on first use (and after a fork)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="alert-webhooks", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            url, match = self.pending.get()
+            try:
+                # Checked again at delivery: the host may resolve elsewhere by
+                # now, and queries saved before the check existed are in the index
+                validate_webhook_url(url, self.allowed_hosts)
+                response = requests.post(url, json=match, timeout=self.timeout, allow_redirects=False)
+                response.raise_for_status()
+                self.delivered += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Alert webhook delivery to {url} failed: {str(e)}")
+            finally:
+                self.pending.task_done()
+
+
+class AlertEngine:
+    """
+    Saved queries matched against every newly ingested article.
+
+    Queries are persisted in a companion index and kept in memory behind an
+    inverted index: each query is registered under the values of its most
+    selective field (a ticker, source, category, region, query token or
+    sentiment), so an article is only checked against the queries sharing
+    one of its values. Matching cost grows with new articles, not with the
+    number of saved queries times polling clients.
+
+    Semantics follow Engine.search_news: every filter must match, list
+    filters match any of their values, and every token of the query text
+    must occur in the headline, summary, content or company names.
+    """
+
+    def __init__(self, es, config: EngineConfig):
+        self.es = es
+        self.config = config
+        self.index_name = config.alerts_index
+        self.queries: Dict[str, Dict] = {}
+        self.postings: Dict[Tuple[str, str], Set[str]] = {}
+        self.match_sink = IndexSink(es, config.alerts_matches_index, config.alerts_match_retention_days)
+        self.webhook_sink = WebhookSink(
+            config.alerts_webhook_timeout, config.alerts_queue_size, config.alerts_webhook_allowed_hosts
+        )
+        self.matched = 0
+        self._loaded_at = 0.0
+        self._lock = threading.RLock()
+
+    def ensure_index(self) -> None:
+        """Create the saved-query and match indices if they do not exist."""
+        replicas = self.config.index_settings.get("number_of_replicas", 1)
+        self.match_sink.ensure_index(replicas)
+        if self.es.indices.exists(index=self.index_name):
+            return
+        self.es.indices.create(index=self.index_name, body={
+            "mappings": {
+                "properties": {
+                    "name": {"type": "keyword"},
+                    "query_text": {"type": "text"},
+                    "filters": {"type": "object", "enabled": False},
+                    "webhook_url": {"type": "keyword", "index": False},
+                    "created_at": {"type": "date"}
+                }
+            },
+            "settings": {
+                "number_of_shards": 1,
+                "number_of_replicas": replicas
+            }
+        })
+
+    def load(self) -> int:
+        """
+        Reload all saved queries from the alerts index.
+
+        Returns:
+            int: Number of saved queries loaded
+        """
+        queries = {}
+        for hit in helpers.scan(self.es, index=self.index_name, query={"query": {"match_all": {}}}):
+            queries[hit["_id"]] = dict(hit["_source"], id=hit["_id"])
+
+        postings: Dict[Tuple[str, str], Set[str]] = {}
+        for query_id, saved in queries.items():
+            for key in self._anchor_keys(saved):
+                postings.setdefault(key, set()).add(query_id)
+
+        with self._lock:
+            self.queries = queries
+            self.postings = postings
+            self._loaded_at = time.time()
+        return len(queries)
+
+    def _maybe_reload(self) -> None:
+        """Pick up queries saved by other workers once the cache is stale."""
+        if time.time() - self._loaded_at < self.config.alerts_refresh_seconds:
+            return
+        try:
+            self.load()
+        except Exception as e:
+            self._loaded_at = time.time()
+            logger.warning(f"Failed to reload saved alert queries: {str(e)}")
+
+    def normalize_query(self, query: Dict) -> Dict:
+        """
+        Validate a saved query definition.
+
+        Args:
+            query: Dictionary with optional name, query_text, filters and webhook_url
+
+        Returns:
+            Dict: Normalized saved query
+        """
+        filters = query.get('filters') or {}
+        if not isinstance(filters, dict):
+            raise ValueError("filters must be an object")
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported alert filters: {', '.join(sorted(unknown))}")
+
+        query_text = (query.get('query_text') or '').strip()
+        normalized_filters = {
+            field: sorted(_as_values(value)) for field, value in filters.items() if _as_values(value)
+        }
+        if not query_text and not normalized_filters:
+            raise ValueError("A saved query needs query_text or at least one filter")
+
+        webhook_url = query.get('webhook_url')
+        if webhook_url:
+            validate_webhook_url(webhook_url, self.config.alerts_webhook_allowed_hosts)
+
+        return {
+            'name': query.get('name') or query_text or 'alert',
+            'query_text': query_text,
+            'filters': normalized_filters,
+            'webhook_url': webhook_url,
+            'created_at': datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def _anchor_keys(query: Dict) -> List[Tuple[str, str]]:
+        """Inverted-index keys of a query: all values of its most selective field."""
+        filters = query.get('filters', {})
+        tokens = tokenize(query.get('query_text'))
+        for field in ANCHOR_PRIORITY:
+            if field == 'text':
+                if tokens:
+                    # longer tokens tend to be rarer
+                    return [('text', max(tokens, key=lambda token: (len(token), token)))]
+            elif filters.get(field):
+                return [(field, value) for value in filters[field]]
+        return []
+
+    def add_query(self, query: Dict, query_id: Optional[str] = None) -> Dict:
+        """
+        Save a query and start matching it against ingested articles.
+
+        Args:
+            query: Saved query definition
+            query_id: Optional custom ID
+
+        Returns:
+            Dict: Stored query including its ID
+        """
+        saved = self.normalize_query(query)
+        query_id = query_id or uuid.uuid4().hex
+        self.es.index(index=self.index_name, id=query_id, body=saved, refresh='wait_for')
+
+        saved['id'] = query_id
+        with self._lock:
+            self._remove_postings(query_id)
+            self.queries[query_id] = saved
+            for key in self._anchor_keys(saved):
+                self.postings.setdefault(key, set()).add(query_id)
+        return saved
+
+    def remove_query(self, query_id: str) -> bool:
+        """
+        Delete a saved query.
+
+        Returns:
+            bool: Whether the query existed
+        """
+        result = self.es.delete(index=self.index_name, id=query_id, refresh='wait_for', ignore=[404])
+        with self._lock:
+            existed = self._remove_postings(query_id)
+            self.queries.pop(query_id, None)
+        return existed or result.get('result') == 'deleted'
+
+    def _remove_postings(self, query_id: str) -> bool:
+        saved = self.queries.get(query_id)
+        if saved is None:
+            return False
+        for key in self._anchor_keys(saved):
+            ids = self.postings.get(key)
+            if ids is not None:
+                ids.discard(query_id)
+                if not ids:
+                    del self.postings[key]
+        return True
+
+    def list_queries(self) -> List[Dict]:
+        """List all saved queries."""
+        self._maybe_reload()
+        with self._lock:
+            return sorted(self.queries.values(), key=lambda saved: saved.get('created_at', ''))
+
+    @staticmethod
+    def article_values(article: Dict) -> Dict[str, Set[str]]:
+        """Normalized values of an article for every matchable field."""
+        companies = article.get('companies') or []
+        text = ' '.join(
+            str(part) for part in (
+                [article.get('headline'), article.get('summary'), article.get('content')]
+                + [company.get('name') for company in companies if isinstance(company, dict)]
+            ) if part
+        )
+        return {
+            'companies.ticker': _as_values(
+                [company.get('ticker') for company in companies if isinstance(company, dict)]
+            ),
+            'categories': _as_values(article.get('categories')),
+            'sentiment': _as_values(article.get('sentiment')),
+            'regions': _as_values(article.get('regions')),
+            'source': _as_values(article.get('source')),
+            'text': tokenize(text)
+        }
+
+    @staticmethod
+    def _matches(query: Dict, values: Dict[str, Set[str]]) -> bool:
+        for field, accepted in query['filters'].items():
+            if values[field].isdisjoint(accepted):
+                return False
+        return tokenize(query['query_text']) <= values['text']
+
+    def match(self, article: Dict) -> List[Dict]:
+        """
+        Find the saved queries matching an article.
+
+        Args:
+            article: Article dictionary
+
+        Returns:
+            List[Dict]: Matching saved queries
+        """
+        self._maybe_reload()
+        values = self.article_values(article)
+        with self._lock:
+            candidates: Set[str] = set()
+            for field, field_values in values.items():
+                for value in field_values:
+                    candidates.update(self.postings.get((field, value), ()))
+            return [
+                self.queries[query_id] for query_id in candidates
+                if self._matches(self.queries[query_id], values)
+            ]
+
+    def record_article(self, article_id: str, article: Dict) -> None:
+        """Ingest listener: deliver a match for every saved query the article satisfies."""
+        if not self.queries and time.time() - self._loaded_at < self.config.alerts_refresh_seconds:
+            return
+
+        published_at = article.get('published_at')
+        for saved in self.match(article):
+            match = {
+                'query_id': saved['id'],
+                'query_name': saved['name'],
+                'article_id': article_id,
+                'headline': article.get('headline'),
+                'source': article.get('source'),
+                'sentiment': article.get('sentiment'),
+                'published_at': published_at.isoformat() if isinstance(published_at, datetime) else published_at,
+                'matched_at': datetime.now().isoformat()
+            }
+            self.matched += 1
+            self.match_sink.deliver(match)
+            if saved.get('webhook_url'):
+                self.webhook_sink.deliver(match, saved['webhook_url'])
+
+    def drain(self, query_id: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Remove and return pending matches from the match index."""
+        return self.match_sink.drain(query_id, limit)
+
+    def pending(self) -> Optional[int]:
+        """Number of undrained matches, or None if the match index is unavailable."""
+        try:
+            return self.match_sink.pending()
+        except Exception as e:
+            logger.warning(f"Failed to count pending alert matches: {str(e)}")
+            return None
+
+    def get_stats(self) -> Dict:
+        """
+        Counters describing saved queries and match delivery.
+
+        Match and webhook counters are per process and only move in the
+        process ingesting articles; pending is read from the match index.
+        """
+        return {
+            'saved_queries': len(self.queries),
+            'index_keys': len(self.postings),
+            'matched': self.matched,
+            'pending': self.pending(),
+            'matches_stored': self.match_sink.delivered,
+            'matches_failed': self.match_sink.failed,
+            'webhooks_delivered': self.webhook_sink.delivered,
+            'webhooks_failed': self.webhook_sink.failed,
+            'webhooks_dropped': self.webhook_sink.dropped
+        }
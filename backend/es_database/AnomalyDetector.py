@@ -0,0 +1,198 @@
+from typing import Dict, Optional
+import numpy as np
+
+MS_PER_HOUR = 3600 * 1000
+MS_PER_DAY = 24 * MS_PER_HOUR
+
+# 1970-01-01 was a Thursday; shifts epoch days so that Monday == 0
+EPOCH_WEEKDAY_OFFSET = 3
+
+# Largest exponent used by the chunked EWMA before rescaling
+EWMA_MAX_EXPONENT = 250.0
+
+
+class AnomalyDetector:
+    """
+    Vectorized volume anomaly detection over evenly spaced time buckets.
+
+    Counts are optionally de-seasonalized with hour-of-day and weekday
+    baselines, then scored against a trailing rolling window or an
+    exponentially weighted moving average. Every step is a NumPy array
+    operation over the whole series.
+    """
+
+    def __init__(
+        self,
+        window: int = 24,
+        min_periods: int = 6,
+        seasonality: bool = True,
+        ewma_alpha: Optional[float] = None
+    ) -> None:
+        """
+        Args:
+            window: Number of preceding buckets in the rolling baseline
+            min_periods: Minimum preceding buckets before a bucket is scored
+            seasonality: Whether to remove hour-of-day and weekday patterns
+            ewma_alpha: Smoothing factor; uses an EWMA baseline instead of the rolling window
+        """
+        if ewma_alpha is not None and not 0 < ewma_alpha <= 1:
+            raise ValueError("ewma_alpha must be in (0, 1]")
+        self.window = max(int(window), 1)
+        self.min_periods = max(int(min_periods), 1)
+        self.seasonality = seasonality
+        self.ewma_alpha = ewma_alpha
+
+    @property
+    def method(self) -> str:
+        """Short description of the scoring method."""
+        base = f"ewma(alpha={self.ewma_alpha})" if self.ewma_alpha else f"rolling(window={self.window})"
+        return f"seasonal+{base}" if self.seasonality else base
+
+    def seasonal_baseline(self, values: np.ndarray, timestamps_ms: np.ndarray) -> np.ndarray:
+        """
+        Expected value of every bucket from hour-of-day and weekday averages.
+
+        Each pattern is only applied once the series covers it at least twice,
+        otherwise the baseline would simply memorize the series.
+
+        Args:
+            values: Bucket counts
+            timestamps_ms: Bucket start times in epoch milliseconds
+
+        Returns:
+            np.ndarray: Seasonal expected values
+        """
+        overall = values.mean() if values.size else 0.0
+        expected = np.full(values.shape, overall, dtype=float)
+        if overall <= 0:
+            return expected
+
+        span_ms = timestamps_ms[-1] - timestamps_ms[0] if values.size else 0
+        epoch_hours = timestamps_ms // MS_PER_HOUR
+        groupings = []
+        if span_ms >= 2 * MS_PER_DAY:
+            groupings.append((epoch_hours % 24, 24))
+        if span_ms >= 14 * MS_PER_DAY:
+            groupings.append(((epoch_hours // 24 + EPOCH_WEEKDAY_OFFSET) % 7, 7))
+
+        for groups, size in groupings:
+            sums = np.bincount(groups, weights=values, minlength=size)
+            counts = np.bincount(groups, minlength=size)
+            factors = np.divide(sums, counts * overall, out=np.ones(size), where=counts > 0)
+            expected *= factors[groups]
+        return expected
+
+    def rolling_baseline(self, values: np.ndarray):
+        """
+        Mean and standard deviation of the trailing window preceding each bucket.
+
+        Returns:
+            Tuple of (mean, std, number of preceding buckets) arrays
+        """
+        n = values.size
+        cumsum = np.concatenate(([0.0], np.cumsum(values)))
+        cumsum_sq = np.concatenate(([0.0], np.cumsum(values * values)))
+
+        index = np.arange(n)
+        start = np.maximum(index - self.window, 0)
+        periods = index - start
+
+        total = cumsum[index] - cumsum[start]
+        total_sq = cumsum_sq[index] - cumsum_sq[start]
+        safe_periods = np.maximum(periods, 1)
+        mean = total / safe_periods
+        variance = np.maximum(total_sq / safe_periods - mean * mean, 0.0)
+        return mean, np.sqrt(variance), periods
+
+    @staticmethod
+    def ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+        """
+        Exponentially weighted moving average (adjust=False) without a Python loop.
+
+        The closed form scales by (1 - alpha) ** -i, so the series is processed
+        in chunks short enough to stay within floating point range.
+        """
+        n = values.size
+        result = np.empty(n, dtype=float)
+        if n == 0:
+            return result
+
+        decay = 1.0 - alpha
+        if decay == 0.0:
+            result[:] = values
+            return result
+
+        chunk = max(int(EWMA_MAX_EXPONENT / -np.log10(decay)), 1)
+        previous = values[0]
+        for begin in range(0, n, chunk):
+            block = values[begin:begin + chunk]
+            powers = decay ** np.arange(block.size)
+            scaled = np.cumsum(alpha * block / powers)
+            result[begin:begin + block.size] = powers * (decay * previous + scaled)
+            previous = result[begin + block.size - 1]
+        return result
+
+    def ewma_baseline(self, values: np.ndarray):
+        """
+        EWMA mean and standard deviation known before each bucket.
+
+        Returns:
+            Tuple of (mean, std, number of preceding buckets) arrays
+        """
+        smoothed = self.ewm(values, self.ewma_alpha)
+        mean = np.concatenate(([values[0] if values.size else 0.0], smoothed[:-1]))
+        residual_sq = (values - mean) ** 2
+        variance = np.concatenate(([0.0], self.ewm(residual_sq, self.ewma_alpha)[:-1]))
+        return mean, np.sqrt(variance), np.arange(values.size)
+
+    def score(self, counts, timestamps_ms) -> Dict[str, np.ndarray]:
+        """
+        Compute z-scores of every bucket.
+
+        The standard deviation is floored at Poisson noise (sqrt of the mean),
+        so a single article after a flat period is not reported as a spike.
+
+        Args:
+            counts: Bucket counts
+            timestamps_ms: Bucket start times in epoch milliseconds
+
+        Returns:
+            Dict with 'z_scores' and 'expected' arrays
+        """
+        values = np.asarray(counts, dtype=float)
+        timestamps = np.asarray(timestamps_ms, dtype=np.int64)
+        if values.size == 0:
+            return {"z_scores": values, "expected": values}
+
+        seasonal_offset = np.zeros(values.shape)
+        if self.seasonality:
+            seasonal_offset = self.seasonal_baseline(values, timestamps) - values.mean()
+        adjusted = values - seasonal_offset
+
+        if self.ewma_alpha:
+            mean, std, periods = self.ewma_baseline(adjusted)
+        else:
+            mean, std, periods = self.rolling_baseline(adjusted)
+
+        std = np.maximum(std, np.sqrt(np.maximum(mean, 1.0)))
+        z_scores = np.where(periods >= self.min_periods, (adjusted - mean) / std, 0.0)
+        return {
+            "z_scores": z_scores,
+            "expected": np.maximum(mean + seasonal_offset, 0.0)
+        }
+
+    def detect(self, counts, timestamps_ms, threshold: float = 2.0) -> Dict[str, np.ndarray]:
+        """
+        Find buckets whose z-score exceeds a threshold.
+
+        Args:
+            counts: Bucket counts
+            timestamps_ms: Bucket start times in epoch milliseconds
+            threshold: Minimum z-score of a spike
+
+        Returns:
+            Dict with 'spike_indices', 'z_scores' and 'expected' arrays
+        """
+        scores = self.score(counts, timestamps_ms)
+        scores["spike_indices"] = np.flatnonzero(scores["z_scores"] > threshold)
+        return scores
@@ -0,0 +1,242 @@
+from contextlib import nullcontext
+from functools import wraps
+from typing import Dict, List, Optional, Any
+import asyncio
+import logging
+import time
+from elasticsearch import NotFoundError
+from .EngineConfig import EngineConfig
+from .StorageManager import StorageManager
+from .ClientFactory import create_async_client
+from .Engine import _guard, _search_news_body, _similarity_query, engine_call_duration_seconds, tracer
+
+logger = logging.getLogger(__name__)
+
+def _instrumented(method):
+    """Record the latency, outcome and trace span of an AsyncEngine coroutine behind its circuit breaker."""
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        outcome = 'success'
+        span_context = tracer.span(f"AsyncEngine.{method.__name__}") if tracer is not None else nullcontext()
+        with span_context as span:
+            try:
+                with _guard(method.__name__):
+                    return await method(self, *args, **kwargs)
+            except Exception:
+                outcome = 'error'
+                raise
+            finally:
+                if span is not None:
+                    span.set_attribute('es.took_ms', tracer.children_took_ms(span))
+                if engine_call_duration_seconds is not None:
+                    engine_call_duration_seconds.labels(
+                        method=method.__name__, outcome=outcome
+                    ).observe(time.perf_counter() - start)
+    return wrapper
+
+class AsyncEngine:
+    """
+    Async counterpart of Engine's read path.
+
+    Searches go through an AsyncElasticsearch client (see ClientFactory) whose
+    aiohttp pool keeps up to config.async_max_connections connections open, so
+    one event loop can have that many queries in flight. Request bodies are
+    built by the same helpers as Engine, so both modes send identical queries.
+    Writes, index management and analytics stay on the synchronous Engine.
+    """
+
+    def __init__(self, config: Optional[EngineConfig] = None, storage: Optional[StorageManager] = None) -> None:
+        """
+        Initialize the async client.
+
+        Args:
+            config: Engine configuration (read from the environment if omitted)
+            storage: Storage manager of a synchronous Engine, reused to pick
+                the partitioned indices covering a time range
+        """
+        self.config = config or EngineConfig()
+        self.storage = storage
+        self.index_name = self.config.index_name
+        # no connection is made until the first request, inside the running loop
+        self.es = create_async_client(self.config)
+        if tracer is not None:
+            tracer.instrument_elasticsearch(self.es)
+
+    @property
+    def read_index(self) -> str:
+        """Index or alias covering every stored article."""
+        return self.config.read_alias if self.config.partitioned else self.index_name
+
+    async def _search_index(self, start: Optional[str] = None, end: Optional[str] = None) -> str:
+        """
+        Get the index expression covering a published_at range.
+
+        The index bounds are cached by the synchronous StorageManager; a
+        refresh is a blocking Elasticsearch call, so it runs in the default
+        executor instead of on the event loop.
+        """
+        if self.storage is None or not self.config.partitioned or not (start or end):
+            return self.read_index
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.storage.get_search_index, start, end)
+
+    async def close(self) -> None:
+        """Close the client's connection pool."""
+        await self.es.close()
+
+    @_instrumented
+    async def get_article_by_id(self, article_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve an article by its ID.
+
+        Args:
+            article_id: ID of the article to retrieve
+
+        Returns:
+            Optional[Dict]: Article data if found, None otherwise
+        """
+        if self.config.partitioned:
+            # GET by ID cannot target an alias spanning several indices
+            result = await self.es.search(
+                index=self.read_index,
+                body={"query": {"ids": {"values": [article_id]}}, "size": 1}
+            )
+            hits = result['hits']['hits']
+            return hits[0]['_source'] if hits else None
+
+        try:
+            result = await self.es.get(index=self.index_name, id=article_id)
+        except NotFoundError:
+            return None
+        return result['_source']
+
+    @_instrumented
+    async def search_by_id(
+        self,
+        article_id: str,
+        k: int = 5,
+        min_score: float = 0.7,
+        additional_filters: Optional[Dict] = None,
+        exclude_self: bool = True
+    ) -> Dict:
+        """
+        Search for similar articles using the embeddings of an article identified by ID.
+
+        Args:
+            article_id: ID of the reference article
+            k: Number of similar articles to return
+            min_score: Minimum similarity score threshold
+            additional_filters: Optional additional query filters
+            exclude_self: Whether to exclude the reference article from results
+
+        Returns:
+            Dict: Search results with similar articles
+        """
+        reference_article = await self.get_article_by_id(article_id)
+        if not reference_article:
+            raise ValueError(f"Article with ID {article_id} not found")
+
+        embeddings = reference_article.get('embeddings')
+        if not embeddings:
+            raise ValueError(f"Article with ID {article_id} has no embeddings")
+
+        query = _similarity_query(
+            embeddings,
+            size=k + (1 if exclude_self else 0),
+            min_score=min_score,
+            additional_filters=additional_filters,
+            exclude_id=article_id if exclude_self else None
+        )
+        return await self.es.search(index=self.read_index, body=query)
+
+    @_instrumented
+    async def search_by_vector(
+        self,
+        embedding_vector: List[float],
+        k: int = 5,
+        min_score: float = 0.7,
+        additional_filters: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Search for articles similar to a given embedding vector.
+
+        Args:
+            embedding_vector: Query embedding vector
+            k: Number of similar articles to return
+            min_score: Minimum similarity score threshold
+            additional_filters: Optional additional query filters
+
+        Returns:
+            Dict containing search results
+        """
+        if hasattr(embedding_vector, 'tolist'):
+            embedding_vector = embedding_vector.tolist()
+        if len(embedding_vector) != self.config.embedding_dimensions:
+            raise ValueError(
+                f"Query vector must have {self.config.embedding_dimensions} dimensions"
+            )
+
+        query = _similarity_query(embedding_vector, k, min_score, additional_filters)
+        return await self.es.search(index=self.read_index, body=query)
+
+    @_instrumented
+    async def bulk_search_by_ids(
+        self,
+        article_ids: List[str],
+        k: int = 5,
+        min_score: float = 0.7,
+        additional_filters: Optional[Dict] = None
+    ) -> Dict[str, Dict]:
+        """
+        Perform similarity search for multiple articles by their IDs, concurrently.
+
+        Args:
+            article_ids: List of article IDs to search for
+            k: Number of similar articles to return per query
+            min_score: Minimum similarity score threshold
+            additional_filters: Optional additional query filters
+
+        Returns:
+            Dict[str, Dict]: Dictionary mapping article IDs to their search results
+        """
+        async def search(article_id: str) -> Dict:
+            try:
+                return await self.search_by_id(
+                    article_id,
+                    k=k,
+                    min_score=min_score,
+                    additional_filters=additional_filters
+                )
+            except ValueError as e:
+                return {"error": str(e)}
+
+        results = await asyncio.gather(*(search(article_id) for article_id in article_ids))
+        return dict(zip(article_ids, results))
+
+    @_instrumented
+    async def search_news(
+        self,
+        query_text: Optional[str] = None,
+        filters: Optional[Dict] = None,
+        time_range: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Full-text news search with filters and an optional published_at range.
+
+        Args:
+            query_text: Text matched against headline, summary, content and company names
+            filters: Filters keyed by field (companies.ticker, categories, sentiment, regions, source)
+            time_range: Dict with optional 'start' and 'end' bounds
+
+        Returns:
+            Dict: Elasticsearch search response
+        """
+        search_index = (
+            await self._search_index(time_range.get('start'), time_range.get('end'))
+            if time_range else self.read_index
+        )
+        return await self.es.search(
+            index=search_index,
+            body=_search_news_body(query_text, filters, time_range)
+        )
@@ -0,0 +1,307 @@
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from elasticsearch import Elasticsearch, Transport, TransportError, ConnectionError, ConnectionTimeout
+from elasticsearch.connection import Urllib3HttpConnection
+from .EngineConfig import EngineConfig
+
+try:
+    from elasticsearch import AsyncElasticsearch, AsyncTransport
+except ImportError:  # the async client needs aiohttp
+    AsyncElasticsearch = AsyncTransport = None
+
+logger = logging.getLogger(__name__)
+
+# Metrics are optional so the engine can be used outside the backend service
+try:
+    from utils.metrics import es_requests_in_flight, es_pool_max_connections, es_request_retries_total
+except ImportError:
+    es_requests_in_flight = es_pool_max_connections = es_request_retries_total = None
+
+# Responses retried with backoff: rejected (429) or temporarily unavailable (502-504)
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Endpoints that read documents and get the search timeout
+READ_ENDPOINTS = ('/_search', '/_msearch', '/_count', '/_mget', '/_search/scroll')
+
+
+def is_read_request(method: str, url: str) -> bool:
+    """Whether a request only reads documents (searches, counts and document gets)."""
+    path = url.split('?', 1)[0]
+    return path.endswith(READ_ENDPOINTS) or (method in ('GET', 'HEAD') and '/_doc/' in path)
+
+
+def operation_timeout(config: EngineConfig, method: str, url: str, body: Any) -> float:
+    """
+    Get the request timeout of an operation.
+
+    Bulk writes get the bulk timeout, searches with aggregations the
+    aggregation timeout, other reads the search timeout and everything else
+    (index management, single writes) the default request timeout.
+
+    Args:
+        config: Engine configuration holding the timeouts
+        method: HTTP method
+        url: Request path
+        body: Request body before serialization
+
+    Returns:
+        float: Timeout in seconds
+    """
+    if url.split('?', 1)[0].endswith('/_bulk'):
+        return config.bulk_timeout
+    if is_read_request(method, url):
+        if isinstance(body, dict) and ('aggs' in body or 'aggregations' in body):
+            return config.aggregation_timeout
+        return config.search_timeout
+    return config.request_timeout
+
+
+class BulkCompressingConnection(Urllib3HttpConnection):
+    """Urllib3 connection that gzips the bodies of bulk requests."""
+
+    def perform_request(self, method, url, params=None, body=None, timeout=None, ignore=(), headers=None):
+        if body and not self.http_compress and url.endswith('/_bulk'):
+            body = self._gzip_compress(body)
+            headers = {**(headers or {}), 'content-encoding': 'gzip'}
+        return super().perform_request(method, url, params, body, timeout=timeout, ignore=ignore, headers=headers)
+
+
+class _RetryPolicy:
+    """Per-operation timeouts and jittered backoff shared by the sync and async transports."""
+
+    def _setup(self, config: EngineConfig, label: str) -> None:
+        self.config = config
+        self.label = label
+        self.in_flight = 0
+        self.retries = 0
+        self._counts_lock = threading.Lock()
+        if es_pool_max_connections is not None:
+            es_pool_max_connections.labels(client=label).set(
+                config.async_max_connections if label == 'async' else config.max_connections
+            )
+
+    def _params(self, method: str, url: str, params: Optional[Dict], body: Any) -> Dict:
+        params = dict(params or {})
+        params.setdefault('request_timeout', operation_timeout(self.config, method, url, body))
+        return params
+
+    def _retry_reason(self, error: TransportError, read: bool) -> Optional[str]:
+        """Why a failed request is retried, or None if it is not."""
+        if isinstance(error, ConnectionTimeout):
+            retry = self.config.retry_reads_on_timeout if read else self.config.retry_on_timeout
+            return 'timeout' if retry else None
+        if isinstance(error, ConnectionError):
+            return 'connection'
+        if error.status_code in RETRY_STATUSES:
+            return str(error.status_code)
+        return None
+
+    def _retry_delay(self, error: TransportError, attempt: int, method: str, url: str,
+                     started: float) -> Optional[float]:
+        """
+        Backoff before the next attempt of a failed request, or None to give up.
+
+        Reads are not retried past config.read_retry_deadline seconds after the
+        first attempt started: a request handler waiting on a search is better
+        served by a fast failure (and the circuit breaker) than by a late result.
+        """
+        if attempt == self.config.max_retries:
+            return None
+        read = is_read_request(method, url)
+        reason = self._retry_reason(error, read)
+        if reason is None:
+            return None
+        # jitter keeps the workers of one host from retrying in lockstep
+        delay = min(self.config.retry_backoff * (2 ** attempt), self.config.retry_max_backoff)
+        delay *= random.uniform(0.5, 1.0)
+        if read and time.monotonic() - started + delay > self.config.read_retry_deadline:
+            return None
+        with self._counts_lock:
+            self.retries += 1
+        if es_request_retries_total is not None:
+            es_request_retries_total.labels(client=self.label, reason=reason).inc()
+        logger.warning(f"Elasticsearch {method} {url} failed ({reason}), retrying in {delay:.2f}s")
+        return delay
+
+    def _track(self, amount: int) -> None:
+        with self._counts_lock:
+            self.in_flight += amount
+        if es_requests_in_flight is not None:
+            es_requests_in_flight.labels(client=self.label).inc(amount)
+
+
+class ManagedTransport(_RetryPolicy, Transport):
+    """
+    Transport applying per-operation timeouts and retrying with jittered backoff.
+
+    The library's own retries are disabled: it retries immediately, which
+    only adds load to a cluster that is rejecting requests.
+    """
+
+    def __init__(self, hosts, config: EngineConfig, label: str = 'sync', **kwargs):
+        super().__init__(hosts, max_retries=0, **kwargs)
+        self._setup(config, label)
+
+    def perform_request(self, method, url, headers=None, params=None, body=None):
+        params = self._params(method, url, params, body)
+        self._track(1)
+        started = time.monotonic()
+        try:
+            for attempt in range(self.config.max_retries + 1):
+                try:
+                    return super().perform_request(method, url, headers=headers, params=dict(params), body=body)
+                except TransportError as e:
+                    delay = self._retry_delay(e, attempt, method, url, started)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+        finally:
+            self._track(-1)
+
+
+if AsyncTransport is not None:
+    class ManagedAsyncTransport(_RetryPolicy, AsyncTransport):
+        """Async counterpart of ManagedTransport for AsyncElasticsearch."""
+
+        def __init__(self, hosts, config: EngineConfig, label: str = 'async', **kwargs):
+            super().__init__(hosts, max_retries=0, **kwargs)
+            self._setup(config, label)
+
+        async def perform_request(self, method, url, headers=None, params=None, body=None):
+            params = self._params(method, url, params, body)
+            self._track(1)
+            started = time.monotonic()
+            try:
+                for attempt in range(self.config.max_retries + 1):
+                    try:
+                        return await super().perform_request(
+                            method, url, headers=headers, params=dict(params), body=body
+                        )
+                    except TransportError as e:
+                        delay = self._retry_delay(e, attempt, method, url, started)
+                        if delay is None:
+                            raise
+                        await asyncio.sleep(delay)
+            finally:
+                self._track(-1)
+
+
+def _client_options(config: EngineConfig) -> Dict:
+    options = {
+        'api_key': config.api_key,
+        'timeout': config.request_timeout
+    }
+    if config.sniff:
+        options.update({
+            'sniff_on_start': True,
+            'sniff_on_connection_fail': True,
+            'sniffer_timeout': config.sniff_interval
+        })
+    return options
+
+
+def create_client(config: Optional[EngineConfig] = None, **overrides) -> Elasticsearch:
+    """
+    Create an Elasticsearch client with the managed pool, timeouts and retries.
+
+    Args:
+        config: Engine configuration (read from the environment if omitted)
+        **overrides: Client options replacing the configured ones (e.g. verify_certs)
+
+    Returns:
+        Elasticsearch: New client with its own connection pool
+    """
+    config = config or EngineConfig()
+    options = _client_options(config)
+    options.update({
+        'transport_class': ManagedTransport,
+        'connection_class': BulkCompressingConnection if config.compress_bulk else Urllib3HttpConnection,
+        'config': config,
+        'maxsize': config.max_connections
+    })
+    options.update(overrides)
+    return Elasticsearch(config.elasticsearch_url, **options)
+
+
+def create_async_client(config: Optional[EngineConfig] = None, **overrides):
+    """
+    Create an AsyncElasticsearch client with the managed timeouts and retries.
+
+    Raises:
+        ImportError: If aiohttp is not installed
+    """
+    if AsyncTransport is None:
+        raise ImportError("The async Elasticsearch client requires aiohttp: pip install 'elasticsearch[async]'")
+    config = config or EngineConfig()
+    options = _client_options(config)
+    options.update({
+        'transport_class': ManagedAsyncTransport,
+        'config': config,
+        'maxsize': config.async_max_connections
+    })
+    options.update(overrides)
+    return AsyncElasticsearch(config.elasticsearch_url, **options)
+
+
+# Shared clients by (pid, url, api key); a forked worker creates its own
+_clients: Dict[Tuple[int, Optional[str], Optional[str]], Elasticsearch] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(config: Optional[EngineConfig] = None) -> Elasticsearch:
+    """
+    Get the process-wide client for a cluster, creating it on first use.
+
+    Args:
+        config: Engine configuration (read from the environment if omitted)
+
+    Returns:
+        Elasticsearch: Client shared by every caller in this process
+    """
+    config = config or EngineConfig()
+    key = (os.getpid(), config.elasticsearch_url, config.api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = create_client(config)
+        return client
+
+
+def pool_stats(client) -> Dict:
+    """
+    Get the utilization of a client's connection pools.
+
+    Args:
+        client: Client created by this module
+
+    Returns:
+        Dict with in-flight requests, retries and per-node pool usage
+    """
+    transport = client.transport
+    nodes = []
+    for connection in transport.connection_pool.connections:
+        pool = getattr(connection, 'pool', None)
+        if pool is None or not hasattr(pool, 'pool'):
+            # aiohttp connections keep no countable pool
+            nodes.append({'host': connection.host})
+            continue
+        available = pool.pool.qsize()
+        nodes.append({
+            'host': connection.host,
+            'max_connections': pool.pool.maxsize,
+            'in_use': pool.pool.maxsize - available,
+            'idle': sum(1 for conn in list(pool.pool.queue) if conn is not None),
+            'connections_opened': pool.num_connections,
+            'requests': pool.num_requests
+        })
+    return {
+        'client': getattr(transport, 'label', None),
+        'in_flight': getattr(transport, 'in_flight', None),
+        'retries': getattr(transport, 'retries', None),
+        'nodes': nodes
+    }
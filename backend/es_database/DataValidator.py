@@ -1,4 +1,3 @@
-import yfinance as yf
 from typing import Dict
 
 class DataValidator:
@@ -11,6 +10,8 @@ class DataValidator:
     def validate_company_data(company: Dict) -> bool:
         try:
             if 'ticker' in company:
+                # yfinance pulls in pandas; import it only when a ticker is validated
+                import yfinance as yf
                 stock = yf.Ticker(company['ticker'])
                 return bool(stock.info)
             return False
@@ -1,10 +1,204 @@
 from datetime import datetime
-from typing import Dict, List, Optional, Union, Any
+from contextlib import nullcontext
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Union, Any
 import numpy as np
 import hashlib
+import logging
+import time
+from elasticsearch import NotFoundError
 from .EngineConfig import EngineConfig
-from .StorageManager import StorageManager
+from .StorageManager import StorageManager, parse_date_bound
 from .DataValidator import DataValidator
+from .AnomalyDetector import AnomalyDetector
+from .AlertEngine import AlertEngine
+from .RollupStore import (
+    RollupStore, average_sentiment, bucket_key_as_string, empty_record,
+    merge_records, top_terms, SENTIMENT_BINS
+)
+
+logger = logging.getLogger(__name__)
+
+# Metrics and tracing are optional so the engine can be used outside the backend service
+try:
+    from utils.metrics import engine_call_duration_seconds
+except ImportError:
+    engine_call_duration_seconds = None
+try:
+    from utils.tracing import tracer
+except ImportError:
+    tracer = None
+try:
+    from utils.circuit_breaker import circuit_breakers
+except ImportError:
+    circuit_breakers = None
+
+# Circuit breaker category of each method; unlisted methods are 'analytics'.
+# Methods that only fan out to other instrumented methods are left unguarded
+# so each underlying call is counted on its own.
+OPERATION_CATEGORIES = {
+    'get_article_by_id': 'search',
+    'get_article_document': 'search',
+    'get_articles_by_ids': 'search',
+    'get_articles_updated_since': 'search',
+    'search_by_id': 'search',
+    'search_by_vector': 'search',
+    'search_news': 'search',
+    'search_news_batch': 'search',
+    'add_article': 'write',
+    'batch_add_articles': None,
+    'bulk_search_by_ids': None
+}
+
+def _guard(name: str):
+    """Circuit breaker guard of an Engine method, or a no-op without the backend service."""
+    if circuit_breakers is None:
+        return nullcontext()
+    return circuit_breakers.guard(OPERATION_CATEGORIES.get(name, 'analytics'))
+
+def _instrumented(method):
+    """Record the latency, outcome and trace span of an Engine method behind its circuit breaker."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        outcome = 'success'
+        span_context = tracer.span(f"Engine.{method.__name__}") if tracer is not None else nullcontext()
+        with span_context as span:
+            try:
+                with _guard(method.__name__):
+                    return method(self, *args, **kwargs)
+            except Exception:
+                outcome = 'error'
+                raise
+            finally:
+                if span is not None:
+                    # server-side search time next to the span's wall time
+                    span.set_attribute('es.took_ms', tracer.children_took_ms(span))
+                if engine_call_duration_seconds is not None:
+                    engine_call_duration_seconds.labels(
+                        method=method.__name__, outcome=outcome
+                    ).observe(time.perf_counter() - start)
+    return wrapper
+
+def _search_news_body(
+    query_text: Optional[str] = None,
+    filters: Optional[Dict] = None,
+    time_range: Optional[Dict] = None
+) -> Dict:
+    """Build the search_news request body (shared by Engine and AsyncEngine)."""
+    must_conditions = []
+    filter_conditions = []
+    
+    if query_text:
+        must_conditions.append({
+            "multi_match": {
+                "query": query_text,
+                "fields": [
+                    "headline^3",
+                    "summary^2",
+                    "content",
+                    "companies.name"
+                ],
+                "fuzziness": "AUTO"
+            }
+        })
+    
+    if filters:
+        if 'companies.ticker' in filters:
+            filter_conditions.append({
+                "nested": {
+                    "path": "companies",
+                    "query": {
+                        "terms": {
+                            "companies.ticker": filters['companies.ticker']
+                        }
+                    }
+                }
+            })
+        if 'categories' in filters:
+            filter_conditions.append({
+                "terms": {"categories": filters['categories']}
+            })
+        if 'sentiment' in filters:
+            filter_conditions.append({
+                "term": {"sentiment": filters['sentiment']}
+            })
+        if 'regions' in filters:
+            filter_conditions.append({
+                "terms": {"regions": filters['regions']}
+            })
+        if 'source' in filters:
+            if isinstance(filters['source'], list):
+                filter_conditions.append({
+                    "terms": {"source": filters['source']}
+                })
+            else:
+                filter_conditions.append({
+                    "term": {"source": filters['source']}
+                })
+
+    if time_range:
+        filter_conditions.append({
+            "range": {
+                "published_at": {
+                    "gte": time_range.get('start'),
+                    "lte": time_range.get('end')
+                }
+            }
+        })
+    
+    return {
+        "query": {
+            "bool": {
+                "must": must_conditions,
+                "filter": filter_conditions
+            }
+        },
+        "highlight": {
+            "fields": {
+                "headline": {},
+                "summary": {},
+                "content": {}
+            }
+        },
+        "sort": [
+            {"_score": {"order": "desc"}},
+            {"published_at": {"order": "desc"}}
+        ]
+    }
+
+def _similarity_query(
+    query_vector: List[float],
+    size: int,
+    min_score: float,
+    additional_filters: Optional[Dict] = None,
+    exclude_id: Optional[str] = None
+) -> Dict:
+    """Build a cosine-similarity search over the embeddings field."""
+    query = {
+        "query": {
+            "script_score": {
+                "query": {"match_all": {}},
+                "script": {
+                    "source": "cosineSimilarity(params.query_vector, 'embeddings') + 1.0",
+                    "params": {"query_vector": query_vector}
+                }
+            }
+        },
+        "min_score": min_score,
+        "size": size
+    }
+
+    if additional_filters or exclude_id:
+        bool_query = {"bool": {}}
+        if additional_filters:
+            bool_query["bool"]["must"] = [additional_filters]
+        if exclude_id:
+            bool_query["bool"]["must_not"] = [{"term": {"_id": exclude_id}}]
+        query["query"]["script_score"]["query"] = bool_query
+
+    return query
+
 
 class Engine:
     def __init__(self) -> None:
@@ -14,10 +208,74 @@ class Engine:
         self.storage = StorageManager(self.config)
         self.es = self.storage.es
         self.index_name = self.storage.index_name
+        if tracer is not None:
+            tracer.instrument_elasticsearch(self.es)
+        
+        # create the index (or index template and aliases) if missing
+        self.storage.ensure_index()
+        
+        # callbacks invoked with (article_id, article) after every indexed article
+        self.ingest_listeners: List[Callable[[str, Dict], None]] = []
+        
+        self.rollups: Optional[RollupStore] = None
+        if self.config.enable_rollups:
+            self.rollups = RollupStore(self.es, self.config)
+            self.rollups.ensure_index()
+            self.add_ingest_listener(self.rollups.record_article)
+        
+        self.alerts: Optional[AlertEngine] = None
+        if self.config.enable_alerts:
+            self.alerts = AlertEngine(self.es, self.config)
+            try:
+                self.alerts.ensure_index()
+                self.alerts.load()
+            except Exception as e:
+                logger.warning(f"Failed to load saved alert queries: {str(e)}")
+            self.add_ingest_listener(self.alerts.record_article)
+
+    def add_ingest_listener(self, listener: Callable[[str, Dict], None]) -> None:
+        """
+        Register a callback invoked for every newly indexed article.
+        
+        Listeners are not called when add_article overwrites an article that
+        was already stored.
         
-        # delete index if already existing
-        if self.index_name not in self.es.indices.get(index='*'):
-            self.storage.create_index()
+        Args:
+            listener: Callable receiving the article ID and article dictionary
+        """
+        self.ingest_listeners.append(listener)
+
+    def _notify_ingest(self, article_id: str, article: Dict) -> None:
+        """Pass a newly indexed article to the ingest listeners."""
+        for listener in self.ingest_listeners:
+            try:
+                listener(article_id, article)
+            except Exception as e:
+                # A failing listener must never fail the ingestion itself
+                logger.error(f"Ingest listener {getattr(listener, '__name__', listener)} failed: {str(e)}")
+
+    def rollups_ready(self) -> bool:
+        """Whether analytics can read rollup buckets instead of aggregating raw articles."""
+        if self.rollups is None:
+            return False
+        try:
+            return self.rollups.is_built()
+        except Exception as e:
+            logger.warning(f"Failed to check rollup status, aggregating raw articles: {str(e)}")
+            return False
+
+    def _search_index(self, start: Optional[str] = None, end: Optional[str] = None) -> str:
+        """
+        Get the index expression covering a published_at range.
+        
+        Args:
+            start: Lower published_at bound (date math or ISO date)
+            end: Upper published_at bound (date math or ISO date)
+            
+        Returns:
+            str: Index names or alias to search
+        """
+        return self.storage.get_search_index(start, end)
 
     def _generate_article_id(self, article: Dict) -> str:
         """
@@ -57,6 +315,7 @@ class Engine:
             
         return all(isinstance(x, (int, float)) for x in embeddings)
 
+    @_instrumented
     def add_article(
         self,
         article: Dict,
@@ -96,13 +355,19 @@ class Engine:
 
         article_id = custom_id if custom_id else self._generate_article_id(article)
         
-        self.es.index(
-            index=self.index_name,
+        result = self.es.index(
+            index=self.storage.get_article_index(article_id),
             id=article_id,
             body=article
         )
+        self.storage.maybe_rollover()
+        # Articles are re-ingested on every loader run; an overwrite
+        # ('updated') must not be counted or matched again
+        if result.get('result') == 'created':
+            self._notify_ingest(article_id, article)
         return article_id
 
+    @_instrumented
     def get_article_by_id(self, article_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve an article by its ID.
@@ -114,14 +379,117 @@ class Engine:
             Optional[Dict]: Article data if found, None otherwise
         """
         try:
-            result = self.es.get(
+            document = self.get_article_document(article_id)
+            return document['_source'] if document else None
+        except:
+            return None
+
+    @_instrumented
+    def get_article_document(self, article_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve an article with its document metadata.
+        
+        Args:
+            article_id: ID of the article to retrieve
+            
+        Returns:
+            Optional[Dict]: Document with _index, _id, _version and _source if found, None otherwise
+        """
+        if self.config.partitioned:
+            # GET by ID cannot target an alias spanning several indices
+            result = self.es.search(
+                index=self.storage.read_index,
+                body={"query": {"ids": {"values": [article_id]}}, "size": 1, "version": True}
+            )
+            hits = result['hits']['hits']
+            return hits[0] if hits else None
+        
+        try:
+            return self.es.get(
                 index=self.index_name,
                 id=article_id
             )
-            return result['_source']
-        except:
+        except NotFoundError:
             return None
 
+    @_instrumented
+    def get_articles_by_ids(
+        self,
+        article_ids: List[str],
+        source_includes: Optional[List[str]] = None,
+        source_excludes: Optional[List[str]] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Retrieve several articles with their document metadata in one request.
+        
+        Args:
+            article_ids: IDs of the articles to retrieve
+            source_includes: Optional _source fields to return
+            source_excludes: Optional _source fields to leave out
+            
+        Returns:
+            List[Optional[Dict]]: Document with _index, _id, _version and _source
+                for each ID, in the order of article_ids (None if not found)
+        """
+        if not article_ids:
+            return []
+        
+        source_params = {}
+        if source_includes:
+            source_params['_source_includes'] = source_includes
+        if source_excludes:
+            source_params['_source_excludes'] = source_excludes
+        
+        if self.config.partitioned:
+            # mget cannot target an alias spanning several indices
+            unique_ids = list(dict.fromkeys(article_ids))
+            result = self.es.search(
+                index=self.storage.read_index,
+                body={"query": {"ids": {"values": unique_ids}}, "size": len(unique_ids), "version": True},
+                **source_params
+            )
+            documents = {hit['_id']: hit for hit in result['hits']['hits']}
+            return [documents.get(article_id) for article_id in article_ids]
+        
+        result = self.es.mget(
+            index=self.index_name,
+            body={"ids": article_ids},
+            **source_params
+        )
+        return [document if document.get('found') else None for document in result['docs']]
+
+    @_instrumented
+    def get_articles_updated_since(
+        self,
+        since_millis: int,
+        size: int = 500,
+        source_includes: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve the articles written at or after a time, oldest first.
+        
+        Args:
+            since_millis: Lower updated_at bound in epoch milliseconds
+            size: Maximum number of articles to return
+            source_includes: Optional _source fields to return
+            
+        Returns:
+            List[Dict]: Hits with _id, _version, _source and the updated_at sort value
+        """
+        params = {'_source_includes': source_includes} if source_includes else {}
+        result = self.es.search(
+            index=self.storage.read_index,
+            body={
+                "query": {"range": {"updated_at": {"gte": since_millis, "format": "epoch_millis"}}},
+                "sort": [{"updated_at": "asc"}],
+                "size": size,
+                "version": True
+            },
+            **params
+        )
+        return result['hits']['hits']
+
+    @_instrumented
     def search_by_id(
         self,
         article_id: str,
@@ -151,35 +519,16 @@ class Engine:
         if not embeddings:
             raise ValueError(f"Article with ID {article_id} has no embeddings")
 
-        query = {
-            "query": {
-                "script_score": {
-                    "query": {"match_all": {}},
-                    "script": {
-                        "source": "cosineSimilarity(params.query_vector, 'embeddings') + 1.0",
-                        "params": {"query_vector": embeddings}
-                    }
-                }
-            },
-            "min_score": min_score,
-            "size": k + (1 if exclude_self else 0)
-        }
-
-        if additional_filters or exclude_self:
-            must_not = []
-            if exclude_self:
-                must_not.append({"term": {"_id": article_id}})
-                
-            bool_query = {"bool": {}}
-            if additional_filters:
-                bool_query["bool"]["must"] = [additional_filters]
-            if must_not:
-                bool_query["bool"]["must_not"] = must_not
-                
-            query["query"]["script_score"]["query"] = bool_query
-
-        return self.es.search(index=self.index_name, body=query)
+        query = _similarity_query(
+            embeddings,
+            size=k + (1 if exclude_self else 0),
+            min_score=min_score,
+            additional_filters=additional_filters,
+            exclude_id=article_id if exclude_self else None
+        )
+        return self.es.search(index=self.storage.read_index, body=query)
 
+    @_instrumented
     def search_by_vector(
         self,
         embedding_vector: Union[List[float], np.ndarray],
@@ -207,32 +556,11 @@ class Engine:
         if isinstance(embedding_vector, np.ndarray):
             embedding_vector = embedding_vector.tolist()
 
-        query = {
-            "query": {
-                "script_score": {
-                    "query": {"match_all": {}},
-                    "script": {
-                        "source": "cosineSimilarity(params.query_vector, 'embeddings') + 1.0",
-                        "params": {"query_vector": embedding_vector}
-                    }
-                }
-            },
-            "min_score": min_score,
-            "size": k
-        }
+        query = _similarity_query(embedding_vector, k, min_score, additional_filters)
         
-        if additional_filters:
-            query["query"]["script_score"]["query"] = {
-                "bool": {
-                    "must": [
-                        {"match_all": {}},
-                        additional_filters
-                    ]
-                }
-            }
-        
-        return self.es.search(index=self.index_name, body=query)
+        return self.es.search(index=self.storage.read_index, body=query)
 
+    @_instrumented
     def batch_add_articles(
         self,
         articles: List[Dict],
@@ -265,6 +593,7 @@ class Engine:
 
         return article_ids
 
+    @_instrumented
     def bulk_search_by_ids(
         self,
         article_ids: List[str],
@@ -298,96 +627,52 @@ class Engine:
                 
         return results
 
+    @_instrumented
     def search_news(
         self,
         query_text: Optional[str] = None,
         filters: Optional[Dict] = None,
         time_range: Optional[Dict] = None
     ) -> Dict:
-        must_conditions = []
-        filter_conditions = []
-        
-        if query_text:
-            must_conditions.append({
-                "multi_match": {
-                    "query": query_text,
-                    "fields": [
-                        "headline^3",
-                        "summary^2",
-                        "content",
-                        "companies.name"
-                    ],
-                    "fuzziness": "AUTO"
-                }
-            })
-        
-        if filters:
-            if 'companies.ticker' in filters:
-                filter_conditions.append({
-                    "nested": {
-                        "path": "companies",
-                        "query": {
-                            "terms": {
-                                "companies.ticker": filters['companies.ticker']
-                            }
-                        }
-                    }
-                })
-            if 'categories' in filters:
-                filter_conditions.append({
-                    "terms": {"categories": filters['categories']}
-                })
-            if 'sentiment' in filters:
-                filter_conditions.append({
-                    "term": {"sentiment": filters['sentiment']}
-                })
-            if 'regions' in filters:
-                filter_conditions.append({
-                    "terms": {"regions": filters['regions']}
-                })
-            if 'source' in filters:
-                if isinstance(filters['source'], list):
-                    filter_conditions.append({
-                        "terms": {"source": filters['source']}
-                    })
-                else:
-                    filter_conditions.append({
-                        "term": {"source": filters['source']}
-                    })
-
-        if time_range:
-            filter_conditions.append({
-                "range": {
-                    "published_at": {
-                        "gte": time_range.get('start'),
-                        "lte": time_range.get('end')
-                    }
-                }
-            })
+        search_index = (
+            self._search_index(time_range.get('start'), time_range.get('end'))
+            if time_range else self.storage.read_index
+        )
         
         return self.es.search(
-            index=self.index_name,
-            body={
-                "query": {
-                    "bool": {
-                        "must": must_conditions,
-                        "filter": filter_conditions
-                    }
-                },
-                "highlight": {
-                    "fields": {
-                        "headline": {},
-                        "summary": {},
-                        "content": {}
-                    }
-                },
-                "sort": [
-                    {"_score": {"order": "desc"}},
-                    {"published_at": {"order": "desc"}}
-                ]
-            }
+            index=search_index,
+            body=_search_news_body(query_text, filters, time_range)
         )
 
+    @_instrumented
+    def search_news_batch(self, queries: List[Dict]) -> List[Dict]:
+        """
+        Run several news searches in one _msearch request.
+        
+        Args:
+            queries: Dicts with optional 'query_text', 'filters' and 'time_range'
+                keys (the arguments of search_news)
+            
+        Returns:
+            List[Dict]: Elasticsearch search response for each query, in order;
+                a failed search has an 'error' key instead of hits
+        """
+        if not queries:
+            return []
+        
+        body = []
+        for query in queries:
+            time_range = query.get('time_range')
+            search_index = (
+                self._search_index(time_range.get('start'), time_range.get('end'))
+                if time_range else self.storage.read_index
+            )
+            body.append({"index": search_index})
+            body.append(_search_news_body(query.get('query_text'), query.get('filters'), time_range))
+        
+        return self.es.msearch(body=body)['responses']
+
+    @_instrumented
     def get_trending_topics(self, timeframe: str = "1d") -> Dict:
         """
         Get trending financial topics within specified timeframe.
@@ -422,8 +707,12 @@ class Engine:
             }
         }
         
-        return self.es.search(index=self.index_name, body=query)
+        return self.es.search(
+            index=self._search_index(intervals.get(timeframe, "now-1d/d")),
+            body=query
+        )
 
+    @_instrumented
     def get_sentiment_trends(self, ticker: str, time_range: str = '30d') -> List[Dict]:
         """
         Analyze sentiment trends for a specific company over time.
@@ -435,6 +724,12 @@ class Engine:
         Returns:
             List of dictionaries containing sentiment trends over time
         """
+        if self.rollups_ready():
+            try:
+                return self._sentiment_trends_from_rollups(ticker, time_range)
+            except Exception as e:
+                logger.warning(f"Rollup read failed, aggregating raw articles: {str(e)}")
+        
         query = {
             "bool": {
                 "must": [
@@ -459,12 +754,13 @@ class Engine:
         }
         
         result = self.es.search(
-            index=self.index_name,
+            index=self._search_index(f"now-{time_range}"),
             body={"query": query, "size": 0, "aggs": aggs}
         )
         
         return result['aggregations']['sentiment_over_time']['buckets']
 
+    @_instrumented
     def get_source_distribution(self, timeframe: str = '7d', min_articles: int = 5) -> Dict:
         """
         Analyze distribution of news articles across different sources.
@@ -512,21 +808,43 @@ class Engine:
         }
         
         return self.es.search(
-            index=self.index_name,
+            index=self._search_index(f"now-{timeframe}"),
             body={"query": query, "size": 0, "aggs": aggs}
         )
 
-    def get_volume_spikes(self, threshold: float = 2.0, timeframe: str = '30d') -> Dict:
+    @_instrumented
+    def get_volume_spikes(
+        self,
+        threshold: float = 2.0,
+        timeframe: str = '30d',
+        window: int = 24,
+        seasonality: bool = True,
+        ewma_alpha: Optional[float] = None
+    ) -> Dict:
         """
         Identify periods of unusually high news volume.
         
+        Hourly volumes are scored in one vectorized pass; the category and
+        company breakdown is only fetched for the hours flagged as spikes.
+        
         Args:
-            threshold: Multiple of average volume to consider as spike
+            threshold: Z-score above which an hour is considered a spike
             timeframe: Time period to analyze
+            window: Number of preceding hours in the rolling baseline
+            seasonality: Whether to remove hour-of-day and weekday patterns
+            ewma_alpha: Optional EWMA smoothing factor replacing the rolling window
             
         Returns:
             Dict containing volume analysis and spike information
         """
+        detector = AnomalyDetector(window=window, seasonality=seasonality, ewma_alpha=ewma_alpha)
+        
+        if self.rollups_ready():
+            try:
+                return self._volume_spikes_from_rollups(detector, threshold, timeframe)
+            except Exception as e:
+                logger.warning(f"Rollup read failed, aggregating raw articles: {str(e)}")
+        
         query = {
             "bool": {
                 "must": [
@@ -541,44 +859,117 @@ class Engine:
             "hourly_volume": {
                 "date_histogram": {
                     "field": "published_at",
-                    "calendar_interval": "hour"
-                },
-                "aggs": {
-                    "categories": {
-                        "terms": {"field": "categories", "size": 5}
-                    },
-                    "companies": {
-                        "terms": {"field": "companies.ticker", "size": 5}
-                    }
+                    "calendar_interval": "hour",
+                    "min_doc_count": 0
                 }
             }
         }
         
+        search_index = self._search_index(f"now-{timeframe}")
         result = self.es.search(
-            index=self.index_name,
+            index=search_index,
             body={"query": query, "size": 0, "aggs": aggs}
         )
         
-        volumes = [bucket['doc_count'] for bucket in result['aggregations']['hourly_volume']['buckets']]
-        avg_volume = sum(volumes) / len(volumes)
+        buckets = result['aggregations']['hourly_volume']['buckets']
+        timestamps = np.array([bucket['key'] for bucket in buckets], dtype=np.int64)
+        volumes = np.array([bucket['doc_count'] for bucket in buckets], dtype=float)
+        detection = detector.detect(volumes, timestamps, threshold)
         
-        spikes = [
-            {
-                'timestamp': bucket['key_as_string'],
-                'volume': bucket['doc_count'],
+        breakdown = self._spike_breakdown(search_index, timestamps[detection['spike_indices']])
+        return self._format_volume_spikes(detector, threshold, timestamps, volumes, detection, breakdown)
+
+    def _spike_breakdown(self, search_index: str, spike_timestamps: np.ndarray) -> Dict[int, Dict]:
+        """
+        Fetch top categories and companies for the given hourly buckets only.
+        
+        Args:
+            search_index: Index expression to search
+            spike_timestamps: Bucket start times in epoch milliseconds
+            
+        Returns:
+            Dict mapping bucket start times to their categories and companies
+        """
+        if len(spike_timestamps) == 0:
+            return {}
+        
+        hour_ms = 3600 * 1000
+        spike_filters = {
+            str(int(timestamp)): {
+                "range": {
+                    "published_at": {
+                        "gte": int(timestamp),
+                        "lt": int(timestamp) + hour_ms,
+                        "format": "epoch_millis"
+                    }
+                }
+            }
+            for timestamp in spike_timestamps
+        }
+        
+        result = self.es.search(
+            index=search_index,
+            body={
+                "size": 0,
+                "query": {"bool": {"should": list(spike_filters.values()), "minimum_should_match": 1}},
+                "aggs": {
+                    "spikes": {
+                        "filters": {"filters": spike_filters},
+                        "aggs": {
+                            "categories": {
+                                "terms": {"field": "categories", "size": 5}
+                            },
+                            "companies": {
+                                "nested": {"path": "companies"},
+                                "aggs": {
+                                    "tickers": {"terms": {"field": "companies.ticker", "size": 5}}
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        )
+        
+        return {
+            int(key): {
                 'categories': [cat['key'] for cat in bucket['categories']['buckets']],
-                'companies': [comp['key'] for comp in bucket['companies']['buckets']]
+                'companies': [comp['key'] for comp in bucket['companies']['tickers']['buckets']]
             }
-            for bucket in result['aggregations']['hourly_volume']['buckets']
-            if bucket['doc_count'] > avg_volume * threshold
-        ]
+            for key, bucket in result['aggregations']['spikes']['buckets'].items()
+        }
+
+    def _format_volume_spikes(
+        self,
+        detector: AnomalyDetector,
+        threshold: float,
+        timestamps: np.ndarray,
+        volumes: np.ndarray,
+        detection: Dict[str, np.ndarray],
+        breakdown: Dict[int, Dict]
+    ) -> Dict:
+        """Build the volume spike response from detection results."""
+        spikes = []
+        for index in detection['spike_indices']:
+            timestamp = int(timestamps[index])
+            details = breakdown.get(timestamp, {})
+            spikes.append({
+                'timestamp': bucket_key_as_string(timestamp),
+                'volume': int(volumes[index]),
+                'expected_volume': round(float(detection['expected'][index]), 2),
+                'z_score': round(float(detection['z_scores'][index]), 2),
+                'categories': details.get('categories', []),
+                'companies': details.get('companies', [])
+            })
         
         return {
-            'average_volume': avg_volume,
+            'average_volume': float(volumes.mean()) if volumes.size else 0,
             'threshold': threshold,
+            'method': detector.method,
             'spikes': spikes
         }
 
+    @_instrumented
     def get_correlation_matrix(self, tickers: List[str], timeframe: str = '30d') -> Dict:
         """
         Generate a correlation matrix between companies based on news co-occurrence.
@@ -591,6 +982,7 @@ class Engine:
             Dict containing correlation matrix
         """
         correlations = {}
+        search_index = self._search_index(f"now-{timeframe}")
         
         for ticker1 in tickers:
             correlations[ticker1] = {}
@@ -611,12 +1003,12 @@ class Engine:
                     }
                     
                     joint_count = self.es.count(
-                        index=self.index_name,
+                        index=search_index,
                         body={"query": query}
                     )['count']
                     
                     count1 = self.es.count(
-                        index=self.index_name,
+                        index=search_index,
                         body={
                             "query": {
                                 "bool": {
@@ -630,7 +1022,7 @@ class Engine:
                     )['count']
                     
                     count2 = self.es.count(
-                        index=self.index_name,
+                        index=search_index,
                         body={
                             "query": {
                                 "bool": {
@@ -655,6 +1047,7 @@ class Engine:
         
         return correlations
 
+    @_instrumented
     def get_category_evolution(
         self,
         category: str,
@@ -672,6 +1065,12 @@ class Engine:
         Returns:
             Dict containing category evolution analysis
         """
+        if self.rollups_ready() and self.rollups.supports(interval):
+            try:
+                return self._category_evolution_from_rollups(category, timeframe, interval)
+            except Exception as e:
+                logger.warning(f"Rollup read failed, aggregating raw articles: {str(e)}")
+        
         query = {
             "bool": {
                 "must": [
@@ -706,10 +1105,11 @@ class Engine:
         }
         
         return self.es.search(
-            index=self.index_name,
+            index=self._search_index(f"now-{timeframe}"),
             body={"query": query, "size": 0, "aggs": aggs}
         )
 
+    @_instrumented
     def get_stock_price_mentions(self, ticker: str, timeframe: str = '30d') -> Dict:
         """
         Find news articles mentioning specific stock price levels.
@@ -732,7 +1132,7 @@ class Engine:
         }
         
         return self.es.search(
-            index=self.index_name,
+            index=self._search_index(f"now-{timeframe}"),
             body={
                 "query": query,
                 "sort": [{"published_at": "desc"}],
@@ -747,6 +1147,7 @@ class Engine:
             }
         )
 
+    @_instrumented
     def get_stock_momentum_signals(
         self,
         ticker: str,
@@ -764,6 +1165,12 @@ class Engine:
         Returns:
             Dict containing momentum signal analysis
         """
+        if self.rollups_ready():
+            try:
+                return self._momentum_signals_from_rollups(ticker, timeframe, sentiment_threshold)
+            except Exception as e:
+                logger.warning(f"Rollup read failed, aggregating raw articles: {str(e)}")
+        
         query = {
             "bool": {
                 "must": [
@@ -793,10 +1200,11 @@ class Engine:
         }
         
         return self.es.search(
-            index=self.index_name,
+            index=self._search_index(f"now-{timeframe}"),
             body={"query": query, "size": 0, "aggs": aggs}
         )
 
+    @_instrumented
     def get_regional_activity(
         self,
         timeframe: str = '7d',
@@ -812,6 +1220,12 @@ class Engine:
         Returns:
             Dict containing regional activity analysis
         """
+        if self.rollups_ready():
+            try:
+                return self._regional_activity_from_rollups(timeframe, include_categories)
+            except Exception as e:
+                logger.warning(f"Rollup read failed, aggregating raw articles: {str(e)}")
+        
         query = {
             "bool": {
                 "must": [
@@ -845,10 +1259,11 @@ class Engine:
         }
         
         return self.es.search(
-            index=self.index_name,
+            index=self._search_index(f"now-{timeframe}"),
             body={"query": query, "size": 0, "aggs": aggs}
         )
 
+    @_instrumented
     def get_earnings_coverage(self, ticker: str, quarters: int = 4) -> Dict:
         """
         Retrieve and analyze earnings-related news coverage.
@@ -891,7 +1306,7 @@ class Engine:
         }
         
         return self.es.search(
-            index=self.index_name,
+            index=self._search_index(f"now-{quarters * 90}d"),
             body={
                 "query": query,
                 "size": 20,
@@ -900,6 +1315,7 @@ class Engine:
             }
         )
 
+    @_instrumented
     def get_institutional_activity(self, ticker: str, timeframe: str = '90d') -> Dict:
         """
         Track news mentions of institutional investor activity.
@@ -957,7 +1373,7 @@ class Engine:
         }
         
         return self.es.search(
-            index=self.index_name,
+            index=self._search_index(f"now-{timeframe}"),
             body={
                 "query": query,
                 "size": 50,
@@ -966,6 +1382,7 @@ class Engine:
             }
         )
 
+    @_instrumented
     def get_stock_volatility_news(
         self,
         ticker: str,
@@ -1018,7 +1435,7 @@ class Engine:
         }
         
         return self.es.search(
-            index=self.index_name,
+            index=self._search_index(f"now-{timeframe}"),
             body={
                 "query": query,
                 "size": 50,
@@ -1028,4 +1445,152 @@ class Engine:
                 ],
                 "aggs": aggs
             }
-        )
\ No newline at end of file
+        )
+
+    def _rollup_start(self, timeframe: str) -> datetime:
+        """Resolve a relative timeframe such as '30d' to the start of the range."""
+        start = parse_date_bound(f"now-{timeframe}")
+        if start is None:
+            raise ValueError(f"Unsupported timeframe for rollups: {timeframe}")
+        return start
+
+    @staticmethod
+    def _rollup_response(total: int, aggregations: Dict) -> Dict:
+        """Wrap rollup aggregations in the shape of a search response."""
+        return {
+            "took": 0,
+            "timed_out": False,
+            "hits": {
+                "total": {"value": total, "relation": "eq"},
+                "max_score": None,
+                "hits": []
+            },
+            "aggregations": aggregations,
+            "rollup": True
+        }
+
+    def _sentiment_trends_from_rollups(self, ticker: str, time_range: str) -> List[Dict]:
+        """Daily sentiment trend of a ticker read from rollup buckets."""
+        series = self.rollups.get_series("ticker", ticker.upper(), "day", self._rollup_start(time_range))
+        
+        return [
+            {
+                "key_as_string": bucket_key_as_string(bucket),
+                "key": bucket,
+                "doc_count": record["count"],
+                "avg_sentiment": {"value": average_sentiment(record)},
+                "article_count": {"value": record["count"]}
+            }
+            for bucket, record in RollupStore.fill_gaps(series, "day")
+        ]
+
+    def _volume_spikes_from_rollups(
+        self,
+        detector: AnomalyDetector,
+        threshold: float,
+        timeframe: str
+    ) -> Dict:
+        """Hourly volume spikes computed from the global rollup buckets."""
+        series = RollupStore.fill_gaps(
+            self.rollups.get_series("all", "all", "hour", self._rollup_start(timeframe)),
+            "hour"
+        )
+        
+        timestamps = np.array([bucket for bucket, _ in series], dtype=np.int64)
+        volumes = np.array([record["count"] for _, record in series], dtype=float)
+        detection = detector.detect(volumes, timestamps, threshold)
+        
+        breakdown = {}
+        for index in detection['spike_indices']:
+            bucket, record = series[index]
+            breakdown[bucket] = {
+                'categories': [term['key'] for term in top_terms(record, "categories")],
+                'companies': [term['key'] for term in top_terms(record, "tickers")]
+            }
+        return self._format_volume_spikes(detector, threshold, timestamps, volumes, detection, breakdown)
+
+    def _category_evolution_from_rollups(self, category: str, timeframe: str, interval: str) -> Dict:
+        """Category timeline read from rollup buckets."""
+        series = RollupStore.fill_gaps(
+            self.rollups.get_series("category", category, interval, self._rollup_start(timeframe)),
+            interval
+        )
+        
+        buckets = [
+            {
+                "key_as_string": bucket_key_as_string(bucket),
+                "key": bucket,
+                "doc_count": record["count"],
+                "top_companies": {"buckets": top_terms(record, "tickers")},
+                "related_categories": {"buckets": top_terms(record, "categories", exclude=[category])},
+                "avg_sentiment": {"value": average_sentiment(record)}
+            }
+            for bucket, record in series
+        ]
+        total = sum(record["count"] for _, record in series)
+        return self._rollup_response(total, {"timeline": {"buckets": buckets}})
+
+    def _momentum_signals_from_rollups(
+        self,
+        ticker: str,
+        timeframe: str,
+        sentiment_threshold: float
+    ) -> Dict:
+        """
+        Hourly momentum signals of a ticker read from rollup buckets.
+        
+        Strong signals are counted from the |sentiment_score| histogram, so the
+        threshold is applied at the resolution of its bins (0.1).
+        """
+        series = RollupStore.fill_gaps(
+            self.rollups.get_series("ticker", ticker.upper(), "hour", self._rollup_start(timeframe)),
+            "hour"
+        )
+        first_strong_bin = min(SENTIMENT_BINS, max(0, int(round(sentiment_threshold * SENTIMENT_BINS))))
+        
+        buckets = [
+            {
+                "key_as_string": bucket_key_as_string(bucket),
+                "key": bucket,
+                "doc_count": record["count"],
+                "avg_sentiment": {"value": average_sentiment(record)},
+                "strong_signals": {"doc_count": sum(record["abs_sentiment_hist"][first_strong_bin:])}
+            }
+            for bucket, record in series
+        ]
+        total = sum(record["count"] for _, record in series)
+        return self._rollup_response(total, {"hourly_signals": {"buckets": buckets}})
+
+    def _regional_activity_from_rollups(self, timeframe: str, include_categories: bool) -> Dict:
+        """Regional activity read from daily rollup buckets."""
+        start = self._rollup_start(timeframe)
+        grouped = self.rollups.get_grouped_series("region", "day", start)
+        
+        regions = []
+        for region, series in grouped.items():
+            totals = empty_record()
+            for _, record in series:
+                merge_records(totals, record)
+            
+            region_bucket = {
+                "key": region,
+                "doc_count": totals["count"],
+                "daily_volume": {
+                    "buckets": [
+                        {
+                            "key_as_string": bucket_key_as_string(bucket),
+                            "key": bucket,
+                            "doc_count": record["count"]
+                        }
+                        for bucket, record in RollupStore.fill_gaps(series, "day")
+                    ]
+                },
+                "avg_sentiment": {"value": average_sentiment(totals)}
+            }
+            if include_categories:
+                region_bucket["categories"] = {"buckets": top_terms(totals, "categories")}
+            regions.append(region_bucket)
+        
+        regions.sort(key=lambda bucket: (-bucket["doc_count"], bucket["key"]))
+        total = sum(record["count"] for _, record in self.rollups.get_series("all", "all", "day", start))
+        return self._rollup_response(total, {"regions": {"buckets": regions[:20]}})
@@ -1,7 +1,15 @@
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import os
 from dotenv import load_dotenv
 
+# Supported index partitioning periods: date math used to name new indices
+# and the default maximum age before the write index is rolled over
+PARTITION_PERIODS: Dict[str, Dict[str, str]] = {
+    "daily": {"date_math": "now/d{yyyy.MM.dd}", "max_age": "1d"},
+    "weekly": {"date_math": "now/w{yyyy.MM.dd}", "max_age": "7d"},
+    "monthly": {"date_math": "now/M{yyyy.MM.dd}", "max_age": "30d"}
+}
+
 class EngineConfig:
     def __init__(self):
         # Load environment variables from .env file
@@ -11,9 +19,69 @@ class EngineConfig:
         self.api_key: Optional[str] = os.getenv('ELASTICSEARCH_API_KEY')
         self.elasticsearch_url: str = os.getenv('ELASTICSEARCH_URL')
         self.index_name: str = os.getenv('ELASTICSEARCH_INDEX', 'financial_news')
+        self.embedding_dimensions: int = int(os.getenv('EMBEDDING_DIMENSIONS', '768'))
+        # Client connection pool: one connection per request thread of a worker plus
+        # headroom for the background threads (engine init, alerts, rollover checks)
+        worker_threads = int(os.getenv('GUNICORN_THREADS', '8'))
+        self.max_connections: int = int(os.getenv('ES_MAX_CONNECTIONS', str(worker_threads + 4)))
+        # Connections kept open by the async client (ASGI mode); bounds in-flight queries per process
+        self.async_max_connections: int = int(os.getenv('ES_ASYNC_MAX_CONNECTIONS', '100'))
+        
+        # Per-operation request timeouts in seconds (see ClientFactory.operation_timeout)
+        self.request_timeout: float = float(os.getenv('ES_REQUEST_TIMEOUT', '10'))
+        self.search_timeout: float = float(os.getenv('ES_SEARCH_TIMEOUT', '10'))
+        self.aggregation_timeout: float = float(os.getenv('ES_AGGREGATION_TIMEOUT', '30'))
+        self.bulk_timeout: float = float(os.getenv('ES_BULK_TIMEOUT', '60'))
+        
+        # Retries of 429/502/503/504 responses and failed connections, with jittered exponential backoff
+        self.max_retries: int = int(os.getenv('ES_MAX_RETRIES', '2'))
+        self.retry_backoff: float = float(os.getenv('ES_RETRY_BACKOFF_SECONDS', '0.5'))
+        self.retry_max_backoff: float = float(os.getenv('ES_RETRY_MAX_BACKOFF_SECONDS', '10'))
+        # Timeouts of writes are retried; timeouts of reads already used up the request's budget
+        self.retry_on_timeout: bool = os.getenv('ES_RETRY_ON_TIMEOUT', 'true').lower() == 'true'
+        self.retry_reads_on_timeout: bool = os.getenv('ES_RETRY_READS_ON_TIMEOUT', 'false').lower() == 'true'
+        # Seconds after which a failed read is no longer retried, below CIRCUIT_SEARCH_BUDGET_MS
+        self.read_retry_deadline: float = float(os.getenv('ES_READ_RETRY_DEADLINE_SECONDS', '1.5'))
+        
+        # Gzip bulk request bodies
+        self.compress_bulk: bool = os.getenv('ES_COMPRESS_BULK', 'true').lower() == 'true'
+        # Node sniffing; off by default because hosted clusters publish addresses
+        # that are not reachable from outside
+        self.sniff: bool = os.getenv('ES_SNIFF', 'false').lower() == 'true'
+        self.sniff_interval: float = float(os.getenv('ES_SNIFF_INTERVAL_SECONDS', '60'))
         
         self.index_settings: Dict = self._get_default_settings()
 
+        # Time-partitioned indices ('none', 'daily', 'weekly' or 'monthly')
+        self.index_partitioning: str = os.getenv('ES_INDEX_PARTITIONING', 'none').lower()
+        self.write_alias: str = os.getenv('ES_WRITE_ALIAS', f"{self.index_name}-write")
+        self.read_alias: str = os.getenv('ES_READ_ALIAS', f"{self.index_name}-read")
+        self.rollover_conditions: Dict = self._get_rollover_conditions()
+        self.rollover_check_seconds: int = int(os.getenv('ES_ROLLOVER_CHECK_SECONDS', '300'))
+        self.alias_cache_seconds: int = int(os.getenv('ES_ALIAS_CACHE_SECONDS', '60'))
+
+        # Pre-aggregated analytics buckets maintained at ingest time
+        self.enable_rollups: bool = os.getenv('ENABLE_ROLLUPS', 'false').lower() == 'true'
+        self.rollup_index: str = os.getenv('ES_ROLLUP_INDEX', f"{self.index_name}_rollups")
+
+        # Saved-query alerts matched against every ingested article
+        self.enable_alerts: bool = os.getenv('ENABLE_ALERTS', 'false').lower() == 'true'
+        self.alerts_index: str = os.getenv('ES_ALERTS_INDEX', f"{self.index_name}_alerts")
+        self.alerts_matches_index: str = os.getenv('ES_ALERT_MATCHES_INDEX', f"{self.index_name}_alert_matches")
+        self.alerts_match_retention_days: int = int(os.getenv('ALERTS_MATCH_RETENTION_DAYS', '7'))
+        self.alerts_refresh_seconds: int = int(os.getenv('ALERTS_REFRESH_SECONDS', '30'))
+        self.alerts_queue_size: int = int(os.getenv('ALERTS_QUEUE_SIZE', '1000'))
+        self.alerts_webhook_timeout: float = float(os.getenv('ALERTS_WEBHOOK_TIMEOUT', '5'))
+        # Comma separated hosts webhooks are restricted to; empty allows any public host
+        self.alerts_webhook_allowed_hosts: Tuple[str, ...] = tuple(
+            host.strip().lower() for host in os.getenv('ALERTS_WEBHOOK_ALLOWED_HOSTS', '').split(',') if host.strip()
+        )
+
+    @property
+    def partitioned(self) -> bool:
+        """Whether articles are stored in time-partitioned indices behind aliases."""
+        return self.index_partitioning in PARTITION_PERIODS
+
     def validate_config(self) -> None:
         """Validate that all required configuration values are present."""
         if not self.api_key:
@@ -22,6 +90,22 @@ class EngineConfig:
             raise ValueError("ELASTICSEARCH_URL environment variable is required")
         if not self.index_name:
             raise ValueError("ELASTICSEARCH_INDEX environment variable is required")
+        if self.index_partitioning != 'none' and not self.partitioned:
+            raise ValueError(
+                f"ES_INDEX_PARTITIONING must be one of: none, {', '.join(PARTITION_PERIODS)}"
+            )
+
+    def _get_rollover_conditions(self) -> Dict:
+        """Get rollover conditions for the write alias of partitioned indices."""
+        period = PARTITION_PERIODS.get(self.index_partitioning, PARTITION_PERIODS['daily'])
+        conditions = {
+            "max_age": os.getenv('ES_ROLLOVER_MAX_AGE', period['max_age']),
+            "max_size": os.getenv('ES_ROLLOVER_MAX_SIZE', '25gb')
+        }
+        max_docs = os.getenv('ES_ROLLOVER_MAX_DOCS')
+        if max_docs:
+            conditions["max_docs"] = int(max_docs)
+        return conditions
 
     def _get_default_settings(self) -> Dict:
         """Get default Elasticsearch index settings."""
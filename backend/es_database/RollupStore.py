@@ -0,0 +1,515 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Any
+import hashlib
+import time
+from elasticsearch import helpers
+from .EngineConfig import EngineConfig
+
+# Rollup intervals and their bucket lengths
+ROLLUP_INTERVALS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1)
+}
+
+# Aliases accepted by the analytics methods for each rollup interval
+INTERVAL_ALIASES = {
+    "hour": "hour", "1h": "hour",
+    "day": "day", "1d": "day"
+}
+
+# Dimensions a rollup bucket can be keyed on ("all" covers every article)
+ROLLUP_DIMENSIONS = ("all", "ticker", "category", "source", "region")
+
+# Raw article fields backing each dimension, used for the partial bucket
+DIMENSION_FIELDS = {
+    "ticker": "companies.ticker",
+    "category": "categories",
+    "source": "source",
+    "region": "regions"
+}
+
+# Number of |sentiment_score| histogram bins over [0, 1]
+SENTIMENT_BINS = 10
+
+# Number of top terms requested per field for the partial bucket
+TOP_TERMS = 50
+
+# Number of rollup documents read per search page
+BUCKET_PAGE_SIZE = 5000
+
+# ID of the document recording that the buckets were built from the raw articles
+STATUS_DOC_ID = "rollup-status"
+
+# Seconds a process caches whether the buckets are built
+STATUS_CHECK_SECONDS = 60
+
+UPDATE_SCRIPT = """
+ctx._source.count += params.count;
+ctx._source.sentiment_count += params.sentiment_count;
+ctx._source.sentiment_sum += params.sentiment_sum;
+ctx._source.sentiment_sum_sq += params.sentiment_sum_sq;
+for (int i = 0; i < params.abs_sentiment_hist.length; i++) {
+    ctx._source.abs_sentiment_hist[i] += params.abs_sentiment_hist[i];
+}
+for (entry in params.terms.entrySet()) {
+    if (!ctx._source.terms.containsKey(entry.getKey())) {
+        ctx._source.terms[entry.getKey()] = new HashMap();
+    }
+    def counts = ctx._source.terms[entry.getKey()];
+    for (term in entry.getValue().entrySet()) {
+        counts[term.getKey()] = counts.getOrDefault(term.getKey(), 0) + term.getValue();
+    }
+}
+"""
+
+
+def empty_record() -> Dict[str, Any]:
+    """Create an empty rollup record."""
+    return {
+        "count": 0,
+        "sentiment_count": 0,
+        "sentiment_sum": 0.0,
+        "sentiment_sum_sq": 0.0,
+        "abs_sentiment_hist": [0] * SENTIMENT_BINS,
+        "terms": {"tickers": {}, "categories": {}, "sources": {}, "regions": {}}
+    }
+
+
+def merge_records(target: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the counters and term counts of one rollup record to another."""
+    for field in ("count", "sentiment_count", "sentiment_sum", "sentiment_sum_sq"):
+        target[field] += other.get(field, 0)
+    for i, value in enumerate(other.get("abs_sentiment_hist", [])[:SENTIMENT_BINS]):
+        target["abs_sentiment_hist"][i] += value
+    for field, counts in other.get("terms", {}).items():
+        target_counts = target["terms"].setdefault(field, {})
+        for term, count in counts.items():
+            target_counts[term] = target_counts.get(term, 0) + count
+    return target
+
+
+def top_terms(record: Dict[str, Any], field: str, size: int = 5,
+              exclude: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Get the most frequent terms of a record as terms aggregation buckets."""
+    exclude = set(exclude or [])
+    counts = record["terms"].get(field, {})
+    ranked = sorted(
+        ((term, count) for term, count in counts.items() if term not in exclude),
+        key=lambda item: (-item[1], item[0])
+    )
+    return [{"key": term, "doc_count": count} for term, count in ranked[:size]]
+
+
+def average_sentiment(record: Dict[str, Any]) -> Optional[float]:
+    """Get the average sentiment score of a record."""
+    if not record["sentiment_count"]:
+        return None
+    return record["sentiment_sum"] / record["sentiment_count"]
+
+
+def bucket_key_as_string(bucket_ms: int) -> str:
+    """Format a bucket key the way Elasticsearch date histograms do."""
+    return datetime.utcfromtimestamp(bucket_ms / 1000.0).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+class RollupStore:
+    """
+    Pre-aggregated hourly and daily article buckets.
+
+    Every ingested article increments one bucket per interval for each ticker,
+    category, source and region it mentions, plus a global "all" bucket. The
+    analytics methods read completed buckets from the rollup index and only
+    aggregate raw articles for the current, still filling, bucket.
+
+    Buckets only cover articles indexed while rollups were enabled, so they
+    are not read until rebuild() has built them from the raw articles once.
+    """
+
+    def __init__(self, es, config: EngineConfig):
+        self.es = es
+        self.config = config
+        self.index_name = config.rollup_index
+        self.raw_index = config.read_alias if config.partitioned else config.index_name
+        self._built = False
+        self._built_checked_at = 0.0
+
+    def ensure_index(self) -> None:
+        """Create the rollup index if it does not exist."""
+        if self.es.indices.exists(index=self.index_name):
+            return
+        self.es.indices.create(index=self.index_name, body={
+            "mappings": {
+                "properties": {
+                    "interval": {"type": "keyword"},
+                    "dimension": {"type": "keyword"},
+                    "value": {"type": "keyword"},
+                    "bucket": {"type": "date", "format": "epoch_millis"},
+                    "count": {"type": "long"},
+                    "sentiment_count": {"type": "long"},
+                    "sentiment_sum": {"type": "double"},
+                    "sentiment_sum_sq": {"type": "double"},
+                    "abs_sentiment_hist": {"type": "long"},
+                    "terms": {"type": "object", "enabled": False}
+                }
+            },
+            "settings": {
+                "number_of_shards": 1,
+                "number_of_replicas": self.config.index_settings.get("number_of_replicas", 1)
+            }
+        })
+
+    @staticmethod
+    def supports(interval: str) -> bool:
+        """Whether buckets are kept for an analytics interval."""
+        return interval in INTERVAL_ALIASES
+
+    @staticmethod
+    def bucket_start(timestamp: datetime, interval: str) -> datetime:
+        """Get the start of the bucket containing a timestamp."""
+        if INTERVAL_ALIASES[interval] == "hour":
+            return timestamp.replace(minute=0, second=0, microsecond=0)
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def _to_millis(timestamp: datetime) -> int:
+        return int((timestamp - datetime(1970, 1, 1)).total_seconds() * 1000)
+
+    @staticmethod
+    def _parse_published_at(value: Any) -> Optional[datetime]:
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None) if value.tzinfo is None else \
+                (value - value.utcoffset()).replace(tzinfo=None)
+        if isinstance(value, str):
+            try:
+                parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                return None
+            if parsed.tzinfo is not None:
+                parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+            return parsed
+        return None
+
+    @staticmethod
+    def article_record(article: Dict) -> Dict[str, Any]:
+        """Build the rollup contribution of a single article."""
+        record = empty_record()
+        record["count"] = 1
+
+        score = article.get("sentiment_score")
+        if isinstance(score, (int, float)):
+            record["sentiment_count"] = 1
+            record["sentiment_sum"] = float(score)
+            record["sentiment_sum_sq"] = float(score) ** 2
+            record["abs_sentiment_hist"][min(int(abs(score) * SENTIMENT_BINS), SENTIMENT_BINS - 1)] = 1
+
+        terms = record["terms"]
+        for company in article.get("companies") or []:
+            ticker = company.get("ticker") if isinstance(company, dict) else None
+            if ticker:
+                terms["tickers"][ticker] = 1
+        for category in article.get("categories") or []:
+            terms["categories"][category] = 1
+        for region in article.get("regions") or []:
+            terms["regions"][region] = 1
+        if article.get("source"):
+            terms["sources"][article["source"]] = 1
+        return record
+
+    @staticmethod
+    def article_dimensions(article: Dict) -> List[Tuple[str, str]]:
+        """Get the (dimension, value) pairs an article contributes to."""
+        record_terms = RollupStore.article_record(article)["terms"]
+        dimensions = [("all", "all")]
+        dimensions.extend(("ticker", ticker) for ticker in record_terms["tickers"])
+        dimensions.extend(("category", category) for category in record_terms["categories"])
+        dimensions.extend(("source", source) for source in record_terms["sources"])
+        dimensions.extend(("region", region) for region in record_terms["regions"])
+        return dimensions
+
+    def _doc_id(self, interval: str, dimension: str, value: str, bucket_ms: int) -> str:
+        key = f"{interval}|{dimension}|{value}|{bucket_ms}"
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    def _collect(self, articles: List[Dict]) -> Dict[Tuple[str, str, str, int], Dict[str, Any]]:
+        """Combine the contributions of several articles per rollup bucket."""
+        updates: Dict[Tuple[str, str, str, int], Dict[str, Any]] = {}
+        for article in articles:
+            published_at = self._parse_published_at(article.get("published_at"))
+            if published_at is None:
+                continue
+            record = self.article_record(article)
+            for interval in ROLLUP_INTERVALS:
+                bucket_ms = self._to_millis(self.bucket_start(published_at, interval))
+                for dimension, value in self.article_dimensions(article):
+                    key = (interval, dimension, value, bucket_ms)
+                    merge_records(updates.setdefault(key, empty_record()), record)
+        return updates
+
+    def record_articles(self, articles: List[Dict]) -> int:
+        """
+        Incrementally add articles to their rollup buckets.
+
+        Args:
+            articles: Article dictionaries as they were indexed
+
+        Returns:
+            int: Number of rollup buckets updated
+        """
+        updates = self._collect(articles)
+        if not updates:
+            return 0
+
+        actions = []
+        for (interval, dimension, value, bucket_ms), record in updates.items():
+            actions.append({
+                "_op_type": "update",
+                "_index": self.index_name,
+                "_id": self._doc_id(interval, dimension, value, bucket_ms),
+                "retry_on_conflict": 5,
+                "script": {"source": UPDATE_SCRIPT, "lang": "painless", "params": record},
+                "upsert": {
+                    "interval": interval,
+                    "dimension": dimension,
+                    "value": value,
+                    "bucket": bucket_ms,
+                    **record
+                }
+            })
+        success, _ = helpers.bulk(self.es, actions)
+        return success
+
+    def record_article(self, article_id: str, article: Dict) -> None:
+        """Ingest listener adding a single article to its rollup buckets."""
+        self.record_articles([article])
+
+    def is_built(self) -> bool:
+        """Whether the buckets were built from the raw articles and can be read."""
+        if time.time() - self._built_checked_at < STATUS_CHECK_SECONDS:
+            return self._built
+        self._built = bool(self.es.exists(index=self.index_name, id=STATUS_DOC_ID))
+        self._built_checked_at = time.time()
+        return self._built
+
+    def rebuild(self, start: Optional[datetime] = None, batch_size: int = 500) -> int:
+        """
+        Rebuild rollup buckets from the raw articles.
+
+        Readers fall back to the raw articles until the rebuild completes and
+        marks the buckets as built.
+
+        Args:
+            start: Only rebuild buckets from this time on (default: everything)
+            batch_size: Number of articles aggregated per bulk request
+
+        Returns:
+            int: Number of articles processed
+        """
+        self.es.delete(index=self.index_name, id=STATUS_DOC_ID, ignore=[404])
+        self._built = False
+        query: Dict[str, Any] = {"match_all": {}}
+        if start is not None:
+            start = self.bucket_start(start, "day")
+            query = {"range": {"published_at": {"gte": self._to_millis(start), "format": "epoch_millis"}}}
+            self.es.delete_by_query(
+                index=self.index_name,
+                body={"query": {"range": {"bucket": {"gte": self._to_millis(start)}}}}
+            )
+        else:
+            self.es.delete_by_query(index=self.index_name, body={"query": {"match_all": {}}})
+
+        processed = 0
+        batch = []
+        for hit in helpers.scan(self.es, index=self.raw_index, query={"query": query}):
+            batch.append(hit["_source"])
+            if len(batch) >= batch_size:
+                self.record_articles(batch)
+                processed += len(batch)
+                batch = []
+        if batch:
+            self.record_articles(batch)
+            processed += len(batch)
+
+        self.es.index(index=self.index_name, id=STATUS_DOC_ID, body={
+            "dimension": "status",
+            "bucket": self._to_millis(datetime.utcnow()),
+            "count": processed
+        }, refresh=True)
+        self._built = True
+        self._built_checked_at = time.time()
+        return processed
+
+    def _load_buckets(self, dimension: str, value: Optional[str], interval: str,
+                      start_ms: int, end_ms: int) -> List[Dict[str, Any]]:
+        """Load completed rollup documents for [start_ms, end_ms)."""
+        filters = [
+            {"term": {"interval": interval}},
+            {"term": {"dimension": dimension}},
+            {"range": {"bucket": {"gte": start_ms, "lt": end_ms}}}
+        ]
+        if value is not None:
+            filters.append({"term": {"value": value}})
+
+        # Grouped and long hourly ranges span many pages
+        docs: List[Dict[str, Any]] = []
+        search_after = None
+        while True:
+            body: Dict[str, Any] = {
+                "query": {"bool": {"filter": filters}},
+                "sort": [{"bucket": {"order": "asc"}}, {"value": {"order": "asc"}}],
+                "size": BUCKET_PAGE_SIZE
+            }
+            if search_after is not None:
+                body["search_after"] = search_after
+            hits = self.es.search(index=self.index_name, body=body)["hits"]["hits"]
+            docs.extend(hit["_source"] for hit in hits)
+            if len(hits) < BUCKET_PAGE_SIZE:
+                return docs
+            search_after = hits[-1]["sort"]
+
+    def _dimension_filter(self, dimension: str, value: str) -> Dict:
+        if dimension == "ticker":
+            return {
+                "nested": {
+                    "path": "companies",
+                    "query": {"term": {"companies.ticker": value}}
+                }
+            }
+        return {"term": {DIMENSION_FIELDS[dimension]: value}}
+
+    def _load_partial(self, dimension: str, value: Optional[str],
+                      start_ms: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate raw articles of the current bucket into rollup records.
+
+        Returns:
+            Dict mapping dimension values to records
+        """
+        filters = [{"range": {"published_at": {"gte": start_ms, "format": "epoch_millis"}}}]
+        if value is not None and dimension != "all":
+            filters.append(self._dimension_filter(dimension, value))
+
+        record_aggs = {
+            "sentiment": {"extended_stats": {"field": "sentiment_score"}},
+            "abs_sentiment": {
+                "range": {
+                    "script": {
+                        "source": "doc['sentiment_score'].size() == 0 ? -1 : "
+                                  "Math.min(Math.abs(doc['sentiment_score'].value), 0.999)"
+                    },
+                    "ranges": [
+                        {"from": i / SENTIMENT_BINS, "to": (i + 1) / SENTIMENT_BINS}
+                        for i in range(SENTIMENT_BINS)
+                    ]
+                }
+            },
+            "categories": {"terms": {"field": "categories", "size": TOP_TERMS}},
+            "sources": {"terms": {"field": "source", "size": TOP_TERMS}},
+            "regions": {"terms": {"field": "regions", "size": TOP_TERMS}},
+            "companies": {
+                "nested": {"path": "companies"},
+                "aggs": {"tickers": {"terms": {"field": "companies.ticker", "size": TOP_TERMS}}}
+            }
+        }
+
+        if value is None:
+            aggs = {
+                "groups": {
+                    "terms": {"field": DIMENSION_FIELDS[dimension], "size": TOP_TERMS},
+                    "aggs": record_aggs
+                }
+            }
+        else:
+            aggs = record_aggs
+
+        result = self.es.search(
+            index=self.raw_index,
+            body={"query": {"bool": {"filter": filters}}, "size": 0, "aggs": aggs}
+        )
+        aggregations = result.get("aggregations", {})
+
+        if value is None:
+            return {
+                bucket["key"]: self._aggs_to_record(bucket, bucket["doc_count"])
+                for bucket in aggregations.get("groups", {}).get("buckets", [])
+            }
+
+        total = result["hits"]["total"]
+        count = total["value"] if isinstance(total, dict) else total
+        return {value: self._aggs_to_record(aggregations, count)} if count else {}
+
+    @staticmethod
+    def _aggs_to_record(aggs: Dict, count: int) -> Dict[str, Any]:
+        record = empty_record()
+        record["count"] = count
+
+        sentiment = aggs.get("sentiment", {})
+        record["sentiment_count"] = sentiment.get("count") or 0
+        record["sentiment_sum"] = sentiment.get("sum") or 0.0
+        record["sentiment_sum_sq"] = sentiment.get("sum_of_squares") or 0.0
+
+        for i, bucket in enumerate(aggs.get("abs_sentiment", {}).get("buckets", [])[:SENTIMENT_BINS]):
+            record["abs_sentiment_hist"][i] = bucket["doc_count"]
+
+        for field in ("categories", "sources", "regions"):
+            record["terms"][field] = {
+                bucket["key"]: bucket["doc_count"]
+                for bucket in aggs.get(field, {}).get("buckets", [])
+            }
+        record["terms"]["tickers"] = {
+            bucket["key"]: bucket["doc_count"]
+            for bucket in aggs.get("companies", {}).get("tickers", {}).get("buckets", [])
+        }
+        return record
+
+    def get_series(self, dimension: str, value: str, interval: str,
+                   start: datetime, now: Optional[datetime] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Get rollup records of one dimension value from start until now.
+
+        Completed buckets come from the rollup index; the current bucket is
+        aggregated from raw articles.
+
+        Args:
+            dimension: Rollup dimension ("all", "ticker", "category", ...)
+            value: Dimension value (e.g. a ticker symbol)
+            interval: "hour" or "day" (or "1h"/"1d")
+            start: Start of the analyzed time range
+            now: Reference time (defaults to the current UTC time)
+
+        Returns:
+            List of (bucket start in epoch millis, record) tuples in time order
+        """
+        return self.get_grouped_series(dimension, interval, start, now, value=value).get(value, [])
+
+    def get_grouped_series(self, dimension: str, interval: str, start: datetime,
+                           now: Optional[datetime] = None,
+                           value: Optional[str] = None) -> Dict[str, List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Get rollup records for every value of a dimension from start until now.
+
+        Returns:
+            Dict mapping dimension values to (bucket, record) tuples in time order
+        """
+        interval = INTERVAL_ALIASES[interval]
+        now = now or datetime.utcnow()
+        start_ms = self._to_millis(self.bucket_start(start, interval))
+        current_ms = self._to_millis(self.bucket_start(now, interval))
+
+        series: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        for doc in self._load_buckets(dimension, value, interval, start_ms, current_ms):
+            record = merge_records(empty_record(), doc)
+            series.setdefault(doc["value"], []).append((int(doc["bucket"]), record))
+
+        for key, record in self._load_partial(dimension, value, current_ms).items():
+            series.setdefault(key, []).append((current_ms, record))
+        return series
+
+    @staticmethod
+    def fill_gaps(series: List[Tuple[int, Dict[str, Any]]], interval: str) -> List[Tuple[int, Dict[str, Any]]]:
+        """Insert empty buckets between the first and last bucket of a series."""
+        if not series:
+            return []
+        step = int(ROLLUP_INTERVALS[INTERVAL_ALIASES[interval]].total_seconds() * 1000)
+        by_bucket = dict(series)
+        first, last = series[0][0], series[-1][0]
+        return [(bucket, by_bucket.get(bucket, empty_record())) for bucket in range(first, last + step, step)]
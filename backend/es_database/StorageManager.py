@@ -1,13 +1,129 @@
-from .EngineConfig import EngineConfig
-from elasticsearch import Elasticsearch
-from typing import Dict, Optional, List, Union
+from .EngineConfig import EngineConfig, PARTITION_PERIODS
+from .ClientFactory import get_client
+from typing import Dict, Optional, List, Union, Tuple
+from datetime import datetime, timedelta, timezone
 import numpy as np
+import re
+import threading
+import time
+
+# Matches ES date math such as "now", "now-30d", "now-1d/d" or "now-1M/M"
+DATE_MATH_PATTERN = re.compile(r'^now(?:([+-])(\d+)([yMwdhHms]))?(?:/([yMwdhHms]))?$')
+
+# Conservative unit lengths of date math offsets used when routing queries to
+# partitioned indices (months and years are calendar based in Elasticsearch)
+DATE_MATH_UNITS = {
+    'y': timedelta(days=366),
+    'M': timedelta(days=31),
+    'w': timedelta(weeks=1),
+    'd': timedelta(days=1),
+    'h': timedelta(hours=1),
+    'H': timedelta(hours=1),
+    'm': timedelta(minutes=1),
+    's': timedelta(seconds=1)
+}
+
+
+def _round_date(value: datetime, unit: str, round_up: bool) -> datetime:
+    """Round a time down to the start of its unit, or up to the last millisecond of it."""
+    if unit == 'y':
+        start = value.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        next_start = start.replace(year=start.year + 1)
+    elif unit == 'M':
+        start = value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        next_start = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    elif unit == 'w':
+        start = value.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=value.weekday())
+        next_start = start + timedelta(weeks=1)
+    elif unit == 'd':
+        start = value.replace(hour=0, minute=0, second=0, microsecond=0)
+        next_start = start + timedelta(days=1)
+    elif unit in ('h', 'H'):
+        start = value.replace(minute=0, second=0, microsecond=0)
+        next_start = start + timedelta(hours=1)
+    elif unit == 'm':
+        start = value.replace(second=0, microsecond=0)
+        next_start = start + timedelta(minutes=1)
+    else:
+        start = value.replace(microsecond=0)
+        next_start = start + timedelta(seconds=1)
+    return next_start - timedelta(milliseconds=1) if round_up else start
+
+
+def parse_date_bound(value: Optional[str], now: Optional[datetime] = None,
+                     round_up: bool = False) -> Optional[datetime]:
+    """
+    Resolve an ES date-math expression or ISO date to a naive UTC datetime.
+    
+    Rounding follows Elasticsearch range queries: lower bounds ("gte")
+    round down to the start of the unit and upper bounds ("lte") round up to
+    its last millisecond, so "now/d" as an upper bound covers the whole day.
+    
+    Args:
+        value: Date math ("now-7d/d") or ISO formatted date
+        now: Reference time (defaults to the current UTC time)
+        round_up: Resolve an upper bound instead of a lower bound
+        
+    Returns:
+        Optional[datetime]: Resolved time, or None if it cannot be parsed
+    """
+    if not value:
+        return None
+    now = now or datetime.utcnow()
+    
+    match = DATE_MATH_PATTERN.match(str(value).strip())
+    if match:
+        sign, amount, unit, rounding = match.groups()
+        result = now
+        if amount:
+            delta = DATE_MATH_UNITS[unit] * int(amount)
+            result = result - delta if sign == '-' else result + delta
+        if rounding:
+            result = _round_date(result, rounding, round_up)
+        return result
+    
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 
 class StorageManager:
     def __init__(self, config: EngineConfig):
         self.config = config
-        self.es = Elasticsearch(config.elasticsearch_url, api_key=config.api_key)
+        self.es = get_client(config)
         self.index_name = config.index_name
+        
+        # Cached published_at bounds of the indices behind the read alias
+        self._index_bounds: Dict[str, Tuple[Optional[datetime], Optional[datetime]]] = {}
+        self._write_index: Optional[str] = None
+        self._bounds_loaded_at = 0.0
+        self._last_rollover_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def write_index(self) -> str:
+        """Index or alias that new articles are written to."""
+        return self.config.write_alias if self.config.partitioned else self.index_name
+
+    @property
+    def read_index(self) -> str:
+        """Index or alias covering every stored article."""
+        return self.config.read_alias if self.config.partitioned else self.index_name
+
+    def ensure_index(self) -> None:
+        """Create the index, or the partitioned index layout, if missing."""
+        if not self.config.partitioned:
+            if self.index_name not in self.es.indices.get(index='*'):
+                self.create_index()
+            return
+        
+        self.create_index_template()
+        if not self.es.indices.exists_alias(name=self.config.write_alias):
+            self.bootstrap_write_index()
 
     def create_index(self) -> None:
         mappings = self._get_index_mappings()
@@ -16,6 +132,205 @@ class StorageManager:
             "settings": self.config.index_settings
         })
 
+    def create_index_template(self) -> None:
+        """
+        Install the index template applied to every partitioned index.
+        
+        The template carries the article mappings and analyzers and adds each
+        new index to the read alias, so rolled over indices are searchable
+        without any alias bookkeeping.
+        """
+        self.es.indices.put_index_template(
+            name=f"{self.index_name}-template",
+            body={
+                "index_patterns": [f"{self.index_name}-*"],
+                "template": {
+                    "mappings": self._get_index_mappings(),
+                    "settings": self.config.index_settings,
+                    "aliases": {self.config.read_alias: {}}
+                },
+                "priority": 100
+            }
+        )
+
+    def bootstrap_write_index(self) -> None:
+        """Create the first time-based index behind the write alias."""
+        period = PARTITION_PERIODS[self.config.index_partitioning]
+        self.es.indices.create(
+            index=f"<{self.index_name}-{{{period['date_math']}}}-000001>",
+            body={"aliases": {self.config.write_alias: {"is_write_index": True}}}
+        )
+        
+        # Keep articles from the monolithic index searchable through the read alias
+        if self.es.indices.exists(index=self.index_name):
+            self.es.indices.update_aliases(body={
+                "actions": [{"add": {"index": self.index_name, "alias": self.config.read_alias}}]
+            })
+        self._invalidate_index_bounds()
+
+    def rollover(self, dry_run: bool = False) -> Dict:
+        """
+        Roll the write alias over to a new index if any condition is met.
+        
+        Args:
+            dry_run: Only report whether the conditions are met
+            
+        Returns:
+            Dict: Elasticsearch rollover response
+        """
+        result = self.es.indices.rollover(
+            alias=self.config.write_alias,
+            body={"conditions": self.config.rollover_conditions},
+            params={"dry_run": "true"} if dry_run else None
+        )
+        if result.get('rolled_over'):
+            self._invalidate_index_bounds()
+        return result
+
+    def get_article_index(self, article_id: str) -> str:
+        """
+        Get the index an article is written to.
+        
+        Partitioned storage writes new articles through the write alias, but
+        article IDs are deterministic and articles are re-ingested routinely:
+        an article that is already stored is updated in the partition holding
+        it, so re-ingesting it after a rollover leaves no duplicate behind the
+        read alias.
+        
+        Args:
+            article_id: ID of the article about to be written
+            
+        Returns:
+            str: Concrete index holding the article, or the write index or alias
+        """
+        if not self.config.partitioned:
+            return self.index_name
+        
+        # A realtime get also finds articles indexed since the last refresh,
+        # which a search would miss and write a second time
+        bounds, _ = self._get_index_bounds()
+        if not bounds:
+            return self.write_index
+        result = self.es.mget(body={"docs": [
+            {"_index": index, "_id": article_id, "_source": False} for index in sorted(bounds, reverse=True)
+        ]})
+        for doc in result['docs']:
+            if doc.get('found'):
+                return doc['_index']
+        return self.write_index
+
+    def maybe_rollover(self) -> Optional[Dict]:
+        """Check the rollover conditions at most once per configured interval."""
+        if not self.config.partitioned:
+            return None
+        
+        now = time.time()
+        with self._lock:
+            if now - self._last_rollover_check < self.config.rollover_check_seconds:
+                return None
+            self._last_rollover_check = now
+        return self.rollover()
+
+    def get_search_index(self, start: Optional[str] = None, end: Optional[str] = None) -> str:
+        """
+        Get the index expression to search for a published_at range.
+        
+        For partitioned storage only the indices whose articles can fall in
+        the requested range are returned; otherwise the read index is used.
+        
+        Args:
+            start: Lower published_at bound (date math or ISO date)
+            end: Upper published_at bound (date math or ISO date)
+            
+        Returns:
+            str: Comma separated index names or the read alias
+        """
+        if not self.config.partitioned or not (start or end):
+            return self.read_index
+        
+        now = datetime.utcnow()
+        start_time = parse_date_bound(start, now)
+        end_time = parse_date_bound(end, now, round_up=True)
+        if start_time is None and end_time is None:
+            return self.read_index
+        
+        try:
+            bounds, write_index = self._get_index_bounds()
+        except Exception:
+            return self.read_index
+        
+        indices = []
+        for index, (index_min, index_max) in sorted(bounds.items()):
+            if index == write_index or index_min is None or index_max is None:
+                # The write index is still growing and empty indices are cheap
+                indices.append(index)
+            elif (start_time is None or index_max >= start_time) and \
+                    (end_time is None or index_min <= end_time):
+                indices.append(index)
+        
+        return ",".join(indices) if indices else self.read_index
+
+    def _get_index_bounds(self) -> Tuple[Dict[str, Tuple[Optional[datetime], Optional[datetime]]], Optional[str]]:
+        """Load the published_at range of every index behind the read alias."""
+        with self._lock:
+            if self._index_bounds and time.time() - self._bounds_loaded_at < self.config.alias_cache_seconds:
+                return self._index_bounds, self._write_index
+        
+        aliases = self.es.indices.get_alias(name=self.config.read_alias)
+        write_aliases = self.es.indices.get_alias(name=self.config.write_alias)
+        write_index = next(
+            (index for index, data in write_aliases.items()
+             if data['aliases'][self.config.write_alias].get('is_write_index', True)),
+            None
+        )
+        
+        with self._lock:
+            known = dict(self._index_bounds)
+        missing = [index for index in aliases if index not in known or index == write_index]
+        
+        if missing:
+            # One aggregation resolves the bounds of every index not seen yet;
+            # sealed indices never change so their bounds are cached for good
+            result = self.es.search(
+                index=",".join(missing),
+                body={
+                    "size": 0,
+                    "aggs": {
+                        "per_index": {
+                            "terms": {"field": "_index", "size": max(len(missing), 10)},
+                            "aggs": {
+                                "min_published": {"min": {"field": "published_at"}},
+                                "max_published": {"max": {"field": "published_at"}}
+                            }
+                        }
+                    }
+                }
+            )
+            for index in missing:
+                known[index] = (None, None)
+            for bucket in result['aggregations']['per_index']['buckets']:
+                known[bucket['key']] = (
+                    self._epoch_millis_to_datetime(bucket['min_published'].get('value')),
+                    self._epoch_millis_to_datetime(bucket['max_published'].get('value'))
+                )
+        
+        bounds = {index: known[index] for index in aliases}
+        with self._lock:
+            self._index_bounds = bounds
+            self._write_index = write_index
+            self._bounds_loaded_at = time.time()
+        return bounds, write_index
+
+    def _invalidate_index_bounds(self) -> None:
+        with self._lock:
+            self._bounds_loaded_at = 0.0
+
+    @staticmethod
+    def _epoch_millis_to_datetime(value: Optional[float]) -> Optional[datetime]:
+        if value is None:
+            return None
+        return datetime.utcfromtimestamp(value / 1000.0)
+
     def _get_index_mappings(self) -> Dict:
         base_mappings = {
             "properties": {
@@ -0,0 +1,64 @@
+"""
+Gunicorn configuration for the managed server mode.
+
+The app is imported once in the master (preload_app) and warmed up before
+the workers fork, so imported modules and read-only data are shared
+copy-on-write. Per-worker state (the Elasticsearch client, connection pools
+and background threads) is created after the fork.
+
+It is deliberately not named gunicorn.conf.py, which gunicorn loads from the
+working directory by default: the plain gunicorn and uvicorn-worker commands
+must not pick up preloading or the deferred engine start by accident.
+
+Usage: gunicorn --config gunicorn_managed.conf.py app:app
+"""
+
+import gc
+import os
+
+# Workers attach the Elasticsearch engine themselves in post_fork
+os.environ.setdefault('BACKEND_DEFER_ENGINE_INIT', 'true')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+# threaded workers so long-lived /stream connections do not block requests
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+timeout = 120
+preload_app = True
+
+
+def on_starting(server):
+    """Drop the metric files of earlier runs before any worker writes new ones."""
+    from utils.metrics import clear_multiproc_dir
+    removed = clear_multiproc_dir()
+    if removed:
+        server.log.info(f"Removed {removed} stale metric files from PROMETHEUS_MULTIPROC_DIR")
+
+
+def when_ready(server):
+    """Warm up the master and freeze its heap before the first fork."""
+    try:
+        import backend
+        stats = backend.warmup()
+        server.log.info(f"Warmup finished in {stats['elapsed_ms']:.0f}ms ({stats['modules_loaded']} modules)")
+    except ImportError as e:
+        server.log.warning(f"Skipping warmup, backend not importable: {e}")
+    # Move everything allocated so far out of the collector's reach, so
+    # collections in the workers do not write to (and copy) the shared pages
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Build per-worker state."""
+    try:
+        import backend
+        backend.backend.start()
+    except ImportError:
+        pass
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that exited."""
+    from utils.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -0,0 +1,98 @@
+import importlib
+import unittest
+from unittest.mock import patch
+
+# Collected by pytest as part of the backend package, the Flask module is backend.backend
+server = importlib.import_module(f"{__package__}.backend" if __package__ else 'backend')
+
+
+class FakeEngine:
+    def __init__(self, documents=None, hits=None, error=None):
+        self.documents = documents or {}
+        self.hits = hits or []
+        self.error = error
+        self.searches = 0
+
+    def search_news(self, query_text, filters=None, time_range=None):
+        self.searches += 1
+        if self.error is not None:
+            raise self.error
+        return {'hits': {'hits': self.hits}}
+
+    def get_article_document(self, article_id):
+        return self.documents.get(article_id)
+
+
+class HttpCachingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = FakeEngine(
+            documents={'a': {'_index': 'news-2024.05', '_id': 'a', '_version': 1, '_source': {'headline': 'A'}}},
+            hits=[{'_id': 'a', '_source': {'headline': 'A'}}]
+        )
+        backend = server.BackEnd(start=False)
+        backend.engine = self.engine
+        patcher = patch.object(server, 'backend', backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = server.app.test_client()
+        self.clear_cache()
+        self.addCleanup(self.clear_cache)
+
+    @staticmethod
+    def clear_cache():
+        with server.search_results_cache_lock:
+            server.search_results_cache.clear()
+
+
+class TestQueryCaching(HttpCachingTestCase):
+    def test_etag_and_not_modified(self):
+        response = self.client.get('/query?query=apple')
+        etag = response.headers['ETag']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(response.headers['Cache-Control'], f"public, max-age={server.CACHE_TTL_SECONDS}")
+
+        response = self.client.get('/query?query=apple', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['X-Cache'], 'HIT')
+        self.assertEqual(response.get_data(), b'')
+        self.assertEqual(self.engine.searches, 1)
+
+    def test_bypass_cache_must_revalidate(self):
+        response = self.client.get('/query?query=apple&bypass_cache=true')
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+
+    def test_failed_search_not_cached(self):
+        self.engine.error = RuntimeError('search failed')
+
+        response = self.client.get('/query?query=apple')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'no-store')
+        self.assertNotIn('ETag', response.headers)
+        with server.search_results_cache_lock:
+            self.assertEqual(len(server.search_results_cache), 0)
+
+
+class TestArticleCaching(HttpCachingTestCase):
+    def test_etag_follows_document_version(self):
+        response = self.client.get('/article/a')
+        etag = response.headers['ETag']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'headline': 'A'})
+        self.assertEqual(response.headers['Cache-Control'], f"public, max-age={server.ARTICLE_CACHE_MAX_AGE_SECONDS}")
+        self.assertEqual(self.client.get('/article/a', headers={'If-None-Match': etag}).status_code, 304)
+
+        self.engine.documents['a']['_version'] = 2
+        response = self.client.get('/article/a', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_missing_article(self):
+        self.assertEqual(self.client.get('/article/missing').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from utils.log_tail import parse_time_bound, read_lines_reverse, tail_log
+
+
+def entry(minute, level='INFO', request_id=None, message='message'):
+    return json.dumps({
+        'timestamp': f"2024-05-01T12:{minute:02d}:00",
+        'level': level,
+        'message': message,
+        'request_id': request_id
+    })
+
+
+class TestTailLog(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'app.log')
+
+    def write(self, path, lines):
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def minutes(self, entries):
+        return [int(e['timestamp'][14:16]) for e in entries]
+
+    def test_read_lines_reverse_across_blocks(self):
+        lines = [f"line {i} " + 'x' * (i % 7) for i in range(200)]
+        self.write(self.path, lines)
+        self.assertEqual(list(read_lines_reverse(self.path, block_size=16)), lines[::-1])
+
+    def test_last_entries_in_chronological_order(self):
+        self.write(self.path, [entry(m) for m in range(10)])
+        self.assertEqual(self.minutes(tail_log(self.path, count=3)), [7, 8, 9])
+
+    def test_follows_rotated_files(self):
+        self.write(f"{self.path}.2", [entry(m) for m in range(0, 3)])
+        self.write(f"{self.path}.1", [entry(m) for m in range(3, 6)])
+        self.write(self.path, [entry(m) for m in range(6, 8)])
+        self.assertEqual(self.minutes(tail_log(self.path, count=5)), [3, 4, 5, 6, 7])
+        self.assertEqual(self.minutes(tail_log(self.path, count=5, follow_rotated=False)), [6, 7])
+
+    def test_level_filter(self):
+        self.write(self.path, [entry(0, 'ERROR'), entry(1, 'DEBUG'), entry(2, 'WARNING'), entry(3, 'INFO')])
+        self.assertEqual(self.minutes(tail_log(self.path, min_level='warning')), [0, 2])
+        with self.assertRaises(ValueError):
+            tail_log(self.path, min_level='loud')
+
+    def test_time_window(self):
+        self.write(self.path, [entry(m) for m in range(10)])
+        entries = tail_log(self.path, since='2024-05-01T12:03:00', until='2024-05-01T12:05:00')
+        self.assertEqual(self.minutes(entries), [3, 4, 5])
+
+    def test_since_stops_before_older_rotated_files(self):
+        self.write(f"{self.path}.1", [entry(m) for m in range(5)])
+        self.write(self.path, [entry(m) for m in range(5, 10)])
+        entries = tail_log(self.path, since='2024-05-01T12:07:00', max_scan=4)
+        self.assertEqual(self.minutes(entries), [7, 8, 9])
+
+    def test_request_id_filter(self):
+        self.write(self.path, [entry(0, request_id='a'), entry(1, request_id='b'), entry(2, request_id='a')])
+        self.assertEqual(self.minutes(tail_log(self.path, request_id='a')), [0, 2])
+
+    def test_text_lines(self):
+        self.write(self.path, ['plain text line', entry(1)])
+        entries = tail_log(self.path)
+        self.assertEqual(entries[0]['raw'], 'plain text line')
+        self.assertEqual(len(entries), 2)
+
+    def test_missing_file(self):
+        self.assertEqual(tail_log(os.path.join(self.directory, 'missing.log')), [])
+
+
+class TestParseTimeBound(unittest.TestCase):
+    def test_relative(self):
+        now = datetime(2024, 5, 1, 12, 0, 0)
+        self.assertEqual(parse_time_bound('15m', now), '2024-05-01T11:45:00')
+        self.assertEqual(parse_time_bound('1d', now), '2024-04-30T12:00:00')
+
+    def test_iso(self):
+        self.assertEqual(parse_time_bound('2024-05-01T10:00:00Z'), '2024-05-01T10:00:00')
+        self.assertIsNone(parse_time_bound(None))
+        with self.assertRaises(ValueError):
+            parse_time_bound('yesterday')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import logging
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+from utils.logger import BoundedQueueHandler, DuplicateFilter, LogListener
+
+
+def make_record(message, level=logging.INFO, *args, created=None):
+    record = logging.LogRecord('test', level, __file__, 1, message, args, None)
+    if created is not None:
+        record.created = created
+    return record
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestBoundedQueueHandler(unittest.TestCase):
+    def messages(self, log_queue):
+        messages = []
+        while not log_queue.empty():
+            messages.append(log_queue.get_nowait().msg)
+        return messages
+
+    def test_drop_new(self):
+        log_queue = queue.Queue(maxsize=2)
+        handler = BoundedQueueHandler(log_queue, overflow='drop_new')
+        for i in range(4):
+            handler.handle(make_record(f"message {i}"))
+        self.assertEqual(self.messages(log_queue), ['message 0', 'message 1'])
+        self.assertEqual(handler.dropped, 2)
+
+    def test_drop_oldest(self):
+        log_queue = queue.Queue(maxsize=2)
+        handler = BoundedQueueHandler(log_queue, overflow='drop_oldest')
+        for i in range(4):
+            handler.handle(make_record(f"message {i}"))
+        self.assertEqual(self.messages(log_queue), ['message 2', 'message 3'])
+        self.assertEqual(handler.dropped, 2)
+
+    def test_block_waits_for_the_writer(self):
+        log_queue = queue.Queue(maxsize=1)
+        handler = BoundedQueueHandler(log_queue, overflow='block')
+        handler.handle(make_record("first"))
+        writer = threading.Timer(0.05, lambda: log_queue.get_nowait())
+        writer.start()
+        handler.handle(make_record("second"))
+        writer.join()
+        self.assertEqual(self.messages(log_queue), ['second'])
+        self.assertEqual(handler.dropped, 0)
+
+    def test_message_is_resolved_on_the_calling_thread(self):
+        log_queue = queue.Queue()
+        handler = BoundedQueueHandler(log_queue)
+        values = ['before']
+        handler.handle(make_record("value %s", logging.INFO, values))
+        values[0] = 'after'
+        record = log_queue.get_nowait()
+        self.assertEqual(record.msg, "value ['before']")
+        self.assertIsNone(record.args)
+        self.assertTrue(hasattr(record, 'request_id'))
+
+
+class TestLogListener(unittest.TestCase):
+    def test_records_reach_handlers_by_level(self):
+        log_queue = queue.Queue()
+        info, error = RecordingHandler(logging.INFO), RecordingHandler(logging.ERROR)
+        listener = LogListener(log_queue, info, error)
+        listener.start()
+        handler = BoundedQueueHandler(log_queue)
+        handler.handle(make_record("informational"))
+        handler.handle(make_record("broken", logging.ERROR))
+        listener.stop()
+        self.assertEqual([record.msg for record in info.records], ['informational', 'broken'])
+        self.assertEqual([record.msg for record in error.records], ['broken'])
+
+
+
+class TestDuplicateFilter(unittest.TestCase):
+    def passes(self, duplicate_filter, message, created, level=logging.INFO):
+        record = make_record(message, level, created=created)
+        return duplicate_filter.filter(record), record
+
+    def test_suppresses_duplicates_within_the_window(self):
+        duplicate_filter = DuplicateFilter(max_duplicates=2, window_seconds=60)
+        results = [self.passes(duplicate_filter, "same", 1000 + i)[0] for i in range(4)]
+        self.assertEqual(results, [True, True, False, False])
+        self.assertTrue(self.passes(duplicate_filter, "other", 1004)[0])
+        self.assertFalse(self.passes(duplicate_filter, "same", 1004, logging.INFO)[0])
+        # the same text at another level is a different message
+        self.assertTrue(self.passes(duplicate_filter, "same", 1004, logging.ERROR)[0])
+        self.assertEqual(duplicate_filter.get_stats()['suppressed_total'], 3)
+
+    def test_next_window_reports_suppressed_count(self):
+        duplicate_filter = DuplicateFilter(max_duplicates=1, window_seconds=60)
+        for i in range(3):
+            self.passes(duplicate_filter, "same", 1000 + i)
+        passed, record = self.passes(duplicate_filter, "same", 1061)
+        self.assertTrue(passed)
+        self.assertIn("suppressed 2 duplicates", record.getMessage())
+
+    def test_every_hundredth_duplicate_passes_as_summary(self):
+        duplicate_filter = DuplicateFilter(max_duplicates=1, window_seconds=60)
+        results = [self.passes(duplicate_filter, "same", 1000) for _ in range(102)]
+        self.assertEqual([i for i, (passed, _) in enumerate(results) if passed], [0, 100])
+        self.assertEqual(results[100][1].getMessage(), "Previous message repeated 100 times: same")
+
+    def test_memory_is_bounded(self):
+        duplicate_filter = DuplicateFilter(max_duplicates=1, window_seconds=60, max_entries=10)
+        for i in range(1000):
+            self.passes(duplicate_filter, f"message {i}", 1000)
+        self.assertEqual(len(duplicate_filter.entries), 10)
+        # the most recently seen messages are kept
+        self.assertFalse(self.passes(duplicate_filter, "message 999", 1001)[0])
+        self.assertTrue(self.passes(duplicate_filter, "message 0", 1001)[0])
+
+    def test_exceptions_are_fingerprinted_by_type_and_location(self):
+        def record_for(error):
+            try:
+                raise error
+            except Exception:
+                record = make_record("failed", logging.ERROR)
+                record.exc_info = sys.exc_info()
+                return record
+
+        first, second = record_for(ValueError("a")), record_for(ValueError("b"))
+        self.assertEqual(DuplicateFilter.fingerprint(first), DuplicateFilter.fingerprint(second))
+        self.assertNotEqual(DuplicateFilter.fingerprint(first), DuplicateFilter.fingerprint(record_for(KeyError("a"))))
+
+
+
+class TestInitLogging(unittest.TestCase):
+    def run_python(self, code, log_dir):
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)),
+            env={**os.environ, 'LOG_DIR': log_dir, 'LOG_LEVEL': 'INFO'}, capture_output=True, text=True, timeout=60
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        # the console handler shares stdout with the results
+        return [line.split()[1:] for line in result.stdout.splitlines() if line.startswith('RESULT ')]
+
+    def test_import_configures_nothing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log_dir = os.path.join(tmp, 'logs')
+            output = self.run_python(
+                "import logging, os\n"
+                "import utils.logger as logger\n"
+                "print('RESULT', len(logging.getLogger().handlers), logger.log_listener._thread is None, "
+                "os.path.exists(logger.LOG_DIR))\n",
+                log_dir
+            )
+        self.assertEqual(output, [['0', 'True', 'False']])
+
+    def test_init_logging_installs_queue_handler(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log_dir = os.path.join(tmp, 'logs')
+            output = self.run_python(
+                "import logging, os\n"
+                "import utils.logger as logger\n"
+                "logger.init_logging()\n"
+                "logger.init_logging()\n"
+                "root = logging.getLogger()\n"
+                "print('RESULT', root.handlers == [logger.queue_handler], logger.log_listener._thread.is_alive(), "
+                "os.path.isdir(logger.LOG_DIR))\n"
+                "logger.stop_log_listener()\n"
+                "print('RESULT', open(os.path.join(logger.LOG_DIR, 'backend.log')).read().count('Logger initialized'))\n",
+                log_dir
+            )
+        self.assertEqual(output, [['True', 'True', 'True'], ['1']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import importlib
+import importlib.util
+import os
+import sys
+import types
+import unittest
+from unittest.mock import MagicMock, patch
+
+import run_app
+
+# Collected by pytest as part of the backend package, the Flask module is backend.backend
+server = importlib.import_module(f"{__package__}.backend" if __package__ else 'backend')
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn_managed.conf.py')
+
+
+def load_config():
+    spec = importlib.util.spec_from_file_location('gunicorn_managed_conf', CONFIG_PATH)
+    config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config)
+    return config
+
+
+class TestRunApp(unittest.TestCase):
+    def command(self, **kwargs):
+        with patch.object(run_app.subprocess, 'run') as run:
+            self.assertTrue(run_app.run_app(**kwargs))
+        return run.call_args[0][0]
+
+    def test_managed_passes_config(self):
+        cmd = self.command(managed=True, workers=4)
+
+        self.assertEqual(cmd[1:3], ['-m', 'gunicorn'])
+        self.assertEqual(cmd[cmd.index('--config') + 1], 'gunicorn_managed.conf.py')
+        self.assertEqual(cmd[cmd.index('--workers') + 1], '4')
+        self.assertEqual(cmd[-1], 'app:app')
+
+    def test_plain_gunicorn_without_config(self):
+        cmd = self.command(use_gunicorn=True)
+
+        self.assertNotIn('--config', cmd)
+        self.assertEqual(cmd[-1], 'app:app')
+
+
+class TestManagedConfig(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(os.environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.pop('BACKEND_DEFER_ENGINE_INIT', None)
+        self.config = load_config()
+        self.server = MagicMock()
+
+    def test_settings(self):
+        self.assertTrue(self.config.preload_app)
+        # workers start the engine themselves in post_fork
+        self.assertEqual(os.environ['BACKEND_DEFER_ENGINE_INIT'], 'true')
+
+    def fake_backend(self):
+        module = types.ModuleType('backend')
+        module.warmup = MagicMock(return_value={'elapsed_ms': 12.0, 'modules_loaded': 40})
+        module.backend = MagicMock()
+        return module
+
+    def test_when_ready_warms_up_and_freezes(self):
+        module = self.fake_backend()
+        with patch.dict(sys.modules, {'backend': module}), patch.object(self.config.gc, 'freeze') as freeze:
+            self.config.when_ready(self.server)
+
+        module.warmup.assert_called_once_with()
+        freeze.assert_called_once_with()
+
+    def test_post_fork_starts_engine(self):
+        module = self.fake_backend()
+        with patch.dict(sys.modules, {'backend': module}):
+            self.config.post_fork(self.server, MagicMock())
+
+        module.backend.start.assert_called_once_with()
+
+    def test_metric_hooks(self):
+        with patch('utils.metrics.clear_multiproc_dir', return_value=3) as clear:
+            self.config.on_starting(self.server)
+        clear.assert_called_once_with()
+        self.server.log.info.assert_called_once()
+
+        with patch('utils.metrics.mark_process_dead') as mark_dead:
+            self.config.child_exit(self.server, MagicMock(pid=4321))
+        mark_dead.assert_called_once_with(4321)
+
+
+class TestWarmup(unittest.TestCase):
+    def test_warmup_leaves_engine_unattached(self):
+        backend = server.BackEnd(start=False)
+        with patch.object(server, 'backend', backend):
+            stats = server.warmup()
+
+        self.assertIn('elapsed_ms', stats)
+        self.assertIn('es_database', sys.modules)
+        self.assertIsNone(backend.engine)
+        self.assertIsNone(backend._thread)
+
+
+if __name__ == '__main__':
+    unittest.main()
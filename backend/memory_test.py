@@ -0,0 +1,129 @@
+import sys
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+
+from utils import memory
+from utils.memory import StructureRegistry, TracemallocManager, deep_sizeof
+
+TOKEN = 'memory-token'
+
+
+class Slotted:
+    __slots__ = ('payload',)
+
+    def __init__(self, payload):
+        self.payload = payload
+
+
+class TestDeepSizeof(unittest.TestCase):
+    def test_follows_containers_and_slots(self):
+        payload = 'x' * 1000
+        result = deep_sizeof({'a': [payload], 'b': Slotted(payload)})
+
+        self.assertFalse(result['truncated'])
+        self.assertGreater(result['bytes'], sys.getsizeof(payload))
+        # the shared string is counted once
+        self.assertLess(result['bytes'], 2 * sys.getsizeof(payload))
+
+    def test_truncated(self):
+        result = deep_sizeof(list(range(1000, 2000)), max_objects=10)
+        self.assertTrue(result['truncated'])
+        self.assertEqual(result['objects'], 10)
+
+
+class TestStructureRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = StructureRegistry()
+        self.registry.register('cache', lambda: {'a': 1, 'b': 2}, lambda: {'hits': 3})
+
+    def test_report_counts_entries_without_walking(self):
+        report = self.registry.report()
+        self.assertEqual(report['cache'], {'type': 'dict', 'entries': 2, 'stats': {'hits': 3}})
+
+    def test_deep_report(self):
+        report = self.registry.report(deep=True)
+        self.assertGreater(report['cache']['bytes'], 0)
+        self.assertIn('measure_ms', report['cache'])
+
+    def test_failing_getter(self):
+        self.registry.register('broken', lambda: {}['missing'])
+        self.assertIn('error', self.registry.report()['broken'])
+
+
+class TestTracemallocManager(unittest.TestCase):
+    def setUp(self):
+        self.was_tracing = tracemalloc.is_tracing()
+        self.manager = TracemallocManager(max_snapshots=2)
+
+    def tearDown(self):
+        if not self.was_tracing:
+            self.manager.stop()
+
+    def test_snapshot_requires_tracing(self):
+        if self.was_tracing:
+            self.skipTest('tracemalloc is already tracing')
+        with self.assertRaises(RuntimeError):
+            self.manager.take_snapshot()
+
+    def test_snapshots_and_diff(self):
+        self.assertTrue(self.manager.start()['tracing'])
+        first = self.manager.take_snapshot()
+        retained = [bytearray(1024) for _ in range(200)]
+        second = self.manager.take_snapshot()
+
+        growth = self.manager.diff(first, second, limit=5)
+
+        self.assertTrue(any(row['file'] == __file__ and row['size_diff_bytes'] >= 200 * 1024 for row in growth))
+        self.assertEqual(len(retained), 200)
+
+        third = self.manager.take_snapshot()
+        self.assertEqual([entry['id'] for entry in self.manager.status()['snapshots']], [second, third])
+        with self.assertRaises(KeyError):
+            self.manager.top(first)
+
+
+class MemoryEndpointTestCase(unittest.TestCase):
+    token = TOKEN
+
+    def setUp(self):
+        for name, value in (('ENABLE_MEMORY_DIAGNOSTICS', True), ('MEMORY_DIAGNOSTICS_TOKEN', self.token),
+                            ('structure_registry', StructureRegistry())):
+            patcher = patch.object(memory, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.app = Flask(__name__)
+        memory.setup_memory_diagnostics(self.app)
+        self.client = self.app.test_client()
+
+
+class TestMemoryEndpoints(MemoryEndpointTestCase):
+    def test_token_required(self):
+        self.assertEqual(self.client.get('/debug/memory').status_code, 403)
+        self.assertEqual(self.client.get('/debug/memory', headers={'X-Memory-Token': 'wrong'}).status_code, 403)
+        self.assertEqual(self.client.post('/debug/memory/tracemalloc/start').status_code, 403)
+
+    def test_report_is_shallow_by_default(self):
+        response = self.client.get('/debug/memory', headers={'X-Memory-Token': TOKEN})
+
+        self.assertEqual(response.status_code, 200)
+        structures = response.get_json()['structures']
+        self.assertIn('performance_data', structures)
+        self.assertNotIn('bytes', structures['performance_data'])
+
+        deep = self.client.get('/debug/memory?deep=true', headers={'X-Memory-Token': TOKEN}).get_json()
+        self.assertIn('bytes', deep['structures']['performance_data'])
+
+
+class TestMemoryEndpointsWithoutToken(MemoryEndpointTestCase):
+    token = None
+
+    def test_endpoints_not_set_up(self):
+        self.assertEqual(self.client.get('/debug/memory', headers={'X-Memory-Token': 'x'}).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
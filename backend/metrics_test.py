@@ -0,0 +1,144 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+from prometheus_client import CollectorRegistry, Gauge
+
+from utils import metrics
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_python(code, **env):
+    """Run code in a fresh interpreter, so prometheus_client sees the given environment on import."""
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=BACKEND_DIR, env={**os.environ, **env},
+        capture_output=True, text=True, timeout=60
+    )
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return result.stdout
+
+
+class TestExposition(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+
+        @self.app.route('/items/<item_id>')
+        def item(item_id):
+            return item_id
+
+        metrics.setup_metrics(self.app)
+        self.client = self.app.test_client()
+
+    def sample(self, text, name, **labels):
+        prefix = name + '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '} '
+        for line in text.splitlines():
+            if line.startswith(prefix):
+                return float(line[len(prefix):])
+        return 0.0
+
+    def test_request_metrics_keyed_by_route(self):
+        labels = {'method': 'GET', 'route': '/items/<item_id>', 'status': '200'}
+        before = self.sample(self.client.get('/metrics').get_data(as_text=True), 'http_requests_total', **labels)
+
+        self.client.get('/items/1')
+        self.client.get('/items/2')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        text = response.get_data(as_text=True)
+        self.assertEqual(self.sample(text, 'http_requests_total', **labels), before + 2)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertNotIn('/items/1', text)
+
+    def test_non_finite_values(self):
+        registry = CollectorRegistry()
+        Gauge('test_nan', 'NaN gauge', registry=registry).set(float('nan'))
+        Gauge('test_negative_infinity', '-Inf gauge', registry=registry).set(float('-inf'))
+        Gauge('test_infinity', '+Inf gauge', registry=registry).set(float('inf'))
+
+        with patch.object(metrics, 'METRICS_MULTIPROC_DIR', None), patch.object(metrics, 'REGISTRY', registry):
+            text = metrics.generate_metrics().decode()
+
+        self.assertIn('test_nan NaN', text)
+        self.assertIn('test_negative_infinity -Inf', text)
+        self.assertIn('test_infinity +Inf', text)
+
+
+class TestMultiprocess(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.env = {'PROMETHEUS_MULTIPROC_DIR': self.tmp.name}
+
+    def test_scrape_aggregates_all_processes(self):
+        for source in ('reuters', 'reuters', 'cnbc'):
+            run_python(
+                "from utils.metrics import record_ingested_article, http_requests_in_progress\n"
+                f"record_ingested_article('id', {{'source': '{source}'}})\n"
+                "http_requests_in_progress.inc()\n",
+                **self.env
+            )
+
+        text = run_python(
+            "import sys\n"
+            "from utils.metrics import generate_metrics\n"
+            "sys.stdout.write(generate_metrics().decode())\n",
+            **self.env
+        )
+
+        self.assertIn('articles_ingested_total{source="reuters"} 2.0', text)
+        self.assertIn('articles_ingested_total{source="cnbc"} 1.0', text)
+        self.assertIn('http_requests_in_progress 3.0', text)
+
+    def test_dead_process_gauges_dropped(self):
+        pid = run_python(
+            "import os\n"
+            "from utils.metrics import record_ingested_article, http_requests_in_progress\n"
+            "record_ingested_article('id', {'source': 'reuters'})\n"
+            "http_requests_in_progress.inc()\n"
+            "print(os.getpid())\n",
+            **self.env
+        ).strip()
+
+        text = run_python(
+            "import sys\n"
+            "from utils.metrics import generate_metrics, mark_process_dead\n"
+            f"mark_process_dead({pid})\n"
+            "sys.stdout.write(generate_metrics().decode())\n",
+            **self.env
+        )
+
+        # counters of exited workers still count, their live gauges do not
+        self.assertIn('articles_ingested_total{source="reuters"} 1.0', text)
+        self.assertIn('http_requests_in_progress 0.0', text)
+
+    def test_clear_multiproc_dir_keeps_own_files(self):
+        for name in ('counter_1.db', 'gauge_livesum_2.db', 'histogram_3.db', 'notes.txt'):
+            open(os.path.join(self.tmp.name, name), 'w').close()
+
+        output = run_python(
+            "import os\n"
+            "from utils.metrics import clear_multiproc_dir\n"
+            "own = os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], f'counter_{os.getpid()}.db')\n"
+            "open(own, 'w').close()\n"
+            "print(clear_multiproc_dir(), os.getpid())\n",
+            **self.env
+        )
+
+        removed, pid = output.split()
+        self.assertEqual(removed, '3')
+        remaining = set(os.listdir(self.tmp.name))
+        self.assertIn(f'counter_{pid}.db', remaining)
+        self.assertIn('notes.txt', remaining)
+        self.assertFalse(remaining & {'counter_1.db', 'gauge_livesum_2.db', 'histogram_3.db'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from utils import network
+from utils.network import NetworkDiagnostics
+
+
+class FakeProbes:
+    """Stands in for ping, traceroute and the HTTP probe, recording the calls."""
+
+    def __init__(self, delays=None, fail=()):
+        self.delays = delays or {}
+        self.fail = fail
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def probe(self, name):
+        def run(target, timeout=None, **kwargs):
+            with self.lock:
+                self.calls.append((name, target, timeout))
+            time.sleep(self.delays.get(name, 0))
+            if name in self.fail:
+                raise RuntimeError('unreachable')
+            return {'success': True, 'probe': name}
+        return run
+
+
+class TestFullDiagnostics(unittest.TestCase):
+    def setUp(self):
+        self.diagnostics = NetworkDiagnostics()
+        self.diagnostics._local_ip = '10.0.0.1'
+
+    def install(self, probes):
+        self.diagnostics.ping_host = probes.probe('ping')
+        self.diagnostics.trace_route = probes.probe('traceroute')
+        self.diagnostics.test_connection = probes.probe('http')
+
+    def test_probes_per_target(self):
+        probes = FakeProbes()
+        self.install(probes)
+
+        results = self.diagnostics.run_full_diagnostics(['https://example.com/health', 'es.internal'])
+
+        self.assertEqual(set(results['tests']['https://example.com/health']), {'ping', 'traceroute', 'http'})
+        self.assertEqual(set(results['tests']['es.internal']), {'ping', 'traceroute'})
+        self.assertIn(('ping', 'example.com', network.NETWORK_DIAG_DEADLINE), probes.calls)
+        self.assertFalse(results['deadline_exceeded'])
+        self.assertFalse(results['cached'])
+        self.assertEqual(results['system_info']['local_ip'], '10.0.0.1')
+
+    def test_probes_run_concurrently(self):
+        self.install(FakeProbes(delays={'ping': 0.3, 'traceroute': 0.3, 'http': 0.3}))
+
+        start = time.time()
+        self.diagnostics.run_full_diagnostics(['https://a.example.com', 'https://b.example.com'])
+
+        self.assertLess(time.time() - start, 1.0)
+
+    def test_probe_failure_is_reported(self):
+        self.install(FakeProbes(fail=('traceroute',)))
+
+        results = self.diagnostics.run_full_diagnostics(['es.internal'])
+
+        self.assertEqual(results['tests']['es.internal']['traceroute'],
+                         {'success': False, 'error': 'traceroute failed: unreachable'})
+        self.assertTrue(results['tests']['es.internal']['ping']['success'])
+
+    def test_deadline(self):
+        self.install(FakeProbes(delays={'traceroute': 1.0}))
+
+        results = self.diagnostics.run_full_diagnostics(['es.internal'], deadline=0.2)
+
+        self.assertTrue(results['deadline_exceeded'])
+        self.assertTrue(results['tests']['es.internal']['ping']['success'])
+        self.assertEqual(results['tests']['es.internal']['traceroute']['error'], 'Deadline of 0.2s exceeded')
+
+    def test_deadline_cannot_be_extended(self):
+        probes = FakeProbes()
+        self.install(probes)
+
+        with patch.object(network, 'NETWORK_DIAG_DEADLINE', 5.0):
+            self.diagnostics.run_full_diagnostics(['es.internal'], deadline=600)
+
+        self.assertEqual({timeout for _, _, timeout in probes.calls}, {5.0})
+
+    def test_result_cache(self):
+        probes = FakeProbes()
+        self.install(probes)
+
+        first = self.diagnostics.run_full_diagnostics(['b.internal', 'a.internal'])
+        cached = self.diagnostics.run_full_diagnostics(['a.internal', 'b.internal'])
+
+        self.assertEqual(len(probes.calls), 4)
+        self.assertTrue(cached['cached'])
+        self.assertEqual(cached['tests'], first['tests'])
+
+        self.diagnostics.run_full_diagnostics(['a.internal', 'b.internal'], use_cache=False)
+        self.assertEqual(len(probes.calls), 8)
+
+    def test_cache_expiry(self):
+        probes = FakeProbes()
+        self.install(probes)
+
+        with patch.object(network, 'NETWORK_DIAG_CACHE_TTL', 0):
+            self.diagnostics.run_full_diagnostics(['a.internal'])
+            self.diagnostics.run_full_diagnostics(['a.internal'])
+
+        self.assertEqual(len(probes.calls), 4)
+
+    def test_streamed_events(self):
+        self.install(FakeProbes())
+
+        events = list(self.diagnostics.iter_full_diagnostics(['es.internal']))
+
+        self.assertEqual(events[0]['type'], 'start')
+        self.assertEqual(events[-1]['type'], 'end')
+        self.assertEqual(sorted(event['probe'] for event in events[1:-1]), ['ping', 'traceroute'])
+
+
+if __name__ == '__main__':
+    unittest.main()
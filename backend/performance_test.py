@@ -0,0 +1,94 @@
+import math
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+
+from utils.logger import setup_request_logging
+from utils.performance import (
+    HISTOGRAM_GROWTH, HISTOGRAM_MIN_MS, OVERFLOW_OPERATION, LatencyHistogram, PerformanceStore
+)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_bucket_bounds(self):
+        self.assertEqual(LatencyHistogram.bucket_index(0), 0)
+        self.assertEqual(LatencyHistogram.bucket_index(HISTOGRAM_MIN_MS), 0)
+        for index in (1, 10, 100, 200):
+            lower = HISTOGRAM_MIN_MS * HISTOGRAM_GROWTH ** index
+            self.assertEqual(LatencyHistogram.bucket_index(lower * 1.0001), index)
+            self.assertEqual(LatencyHistogram.bucket_index(lower * 0.9999), index - 1)
+
+    def test_bucket_value_within_relative_error(self):
+        for value in (0.05, 1.0, 12.5, 250.0, 9000.0):
+            estimate = LatencyHistogram.bucket_value(LatencyHistogram.bucket_index(value))
+            self.assertLess(abs(estimate - value) / value, HISTOGRAM_GROWTH - 1)
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 1001):
+            histogram.record(float(value))
+        p50, p90, p99 = histogram.percentiles((0.5, 0.9, 0.99))
+        for estimate, exact in ((p50, 500), (p90, 900), (p99, 990)):
+            self.assertLess(abs(estimate - exact) / exact, HISTOGRAM_GROWTH - 1)
+
+    def test_percentiles_clamped_to_observed_range(self):
+        histogram = LatencyHistogram()
+        histogram.record(7.0)
+        self.assertEqual(histogram.percentiles((0.0, 0.5, 1.0)), [7.0, 7.0, 7.0])
+
+    def test_empty_histogram(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.percentiles(), [0.0, 0.0, 0.0])
+        self.assertEqual(histogram.summary()['count'], 0)
+        self.assertEqual(histogram.summary()['min_ms'], 0.0)
+
+    def test_summary(self):
+        histogram = LatencyHistogram()
+        for value in (2.0, 4.0, 6.0):
+            histogram.record(value)
+        summary = histogram.summary()
+        self.assertEqual(summary['count'], 3)
+        self.assertEqual(summary['mean_ms'], 4.0)
+        self.assertEqual(summary['min_ms'], 2.0)
+        self.assertEqual(summary['max_ms'], 6.0)
+        self.assertTrue(math.isclose(summary['p50_ms'], 4.0, rel_tol=HISTOGRAM_GROWTH - 1))
+
+
+
+class TestPerformanceStore(unittest.TestCase):
+    def test_recent_samples_are_bounded(self):
+        store = PerformanceStore(buffer_size=3)
+        for i in range(5):
+            store.record('op', float(i), {'request_id': 'a' if i % 2 else 'b'})
+        self.assertEqual([sample['elapsed_ms'] for sample in store.recent()], [4.0, 3.0, 2.0])
+        self.assertEqual([sample['elapsed_ms'] for sample in store.recent(request_id='a')], [3.0])
+        self.assertEqual(store.summaries()['op']['count'], 5)
+
+    def test_operations_beyond_the_limit_share_a_histogram(self):
+        store = PerformanceStore(max_operations=3)
+        for i in range(10):
+            store.record(f"op {i}", 1.0)
+        store.record('op 1', 1.0)
+        self.assertEqual(sorted(store.histograms), ['op 0', 'op 1', 'op 2', OVERFLOW_OPERATION])
+        self.assertEqual(store.summaries()[OVERFLOW_OPERATION]['count'], 7)
+        self.assertEqual(store.summaries()['op 1']['count'], 2)
+
+
+class TestRequestPerformance(unittest.TestCase):
+    def test_requests_are_keyed_by_route(self):
+        app = Flask(__name__)
+        app.add_url_rule('/article/<article_id>', 'article', lambda article_id: article_id)
+        store = PerformanceStore()
+        with patch('utils.logger.performance_data', store), patch('utils.logger.ENABLE_REQUEST_LOGGING', True):
+            setup_request_logging(app)
+            client = app.test_client()
+            for path in ('/article/1', '/article/2', '/missing/1', '/missing/2'):
+                client.get(path)
+        self.assertEqual(sorted(store.histograms), ['GET /article/<article_id>', 'GET unmatched'])
+        self.assertEqual(store.summaries()['GET unmatched']['count'], 2)
+        self.assertEqual(store.recent(1)[0]['path'], '/missing/2')
+
+
+if __name__ == '__main__':
+    unittest.main()
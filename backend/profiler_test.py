@@ -0,0 +1,131 @@
+import threading
+import time
+import unittest
+from collections import Counter
+from unittest.mock import patch
+
+from flask import Flask
+
+from utils import profiler, tracing
+from utils.profiler import SamplingProfiler, profile_requested
+from utils.tracing import Tracer
+
+TOKEN = 'secret-token'
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestProfileRequested(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+
+    def requested(self, headers, token):
+        with patch.object(profiler, 'PROFILE_TOKEN', token), self.app.test_request_context(headers=headers):
+            return profile_requested()
+
+    def test_token_required(self):
+        self.assertTrue(self.requested({'X-Profile': TOKEN}, TOKEN))
+        self.assertFalse(self.requested({'X-Profile': 'wrong'}, TOKEN))
+        self.assertFalse(self.requested({}, TOKEN))
+
+    def test_refused_without_token(self):
+        self.assertFalse(self.requested({'X-Profile': '1'}, None))
+        self.assertFalse(self.requested({'X-Profile': '1'}, ''))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_other_threads(self):
+        worker = threading.Thread(target=busy_wait, args=(0.5,), name='busy-worker')
+        worker.start()
+        try:
+            result = SamplingProfiler().profile(0.2, rate=100)
+        finally:
+            worker.join()
+
+        self.assertGreater(result['samples'], 0)
+        self.assertTrue(any(
+            stack.startswith('busy-worker;') and 'busy_wait' in stack for stack in result['stacks']
+        ))
+        self.assertFalse(any(stack.startswith('sampling-profiler;') for stack in result['stacks']))
+
+    def test_one_run_at_a_time(self):
+        sampling = SamplingProfiler()
+        runner = threading.Thread(target=sampling.profile, args=(0.3,))
+        runner.start()
+        time.sleep(0.05)
+        try:
+            with self.assertRaises(RuntimeError):
+                sampling.profile(0.1)
+        finally:
+            runner.join()
+
+    def test_collapse(self):
+        stacks = Counter({'main;a;b': 2, 'main;a': 5})
+        self.assertEqual(SamplingProfiler.collapse(stacks), 'main;a 5\nmain;a;b 2\n')
+
+
+class ProfilingAppTestCase(unittest.TestCase):
+    token = TOKEN
+
+    def setUp(self):
+        for name, value in (('ENABLE_PROFILING', True), ('PROFILE_TOKEN', self.token)):
+            patcher = patch.object(profiler, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(tracing, 'tracer', Tracer())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.app = Flask(__name__)
+
+        @self.app.route('/work')
+        def work():
+            busy_wait(0.01)
+            return 'done'
+
+        tracing.setup_tracing(self.app)
+        profiler.setup_profiling(self.app)
+        self.client = self.app.test_client()
+
+
+class TestSetupProfiling(ProfilingAppTestCase):
+    def test_request_profile_attached_to_trace(self):
+        response = self.client.get('/work', headers={'X-Profile': TOKEN, 'X-Request-ID': 'req-1'})
+
+        self.assertEqual(response.headers['X-Profile-Trace'], 'req-1')
+        profile = tracing.tracer.get_trace('req-1')['profile']
+        self.assertTrue(any('busy_wait' in row['function'] for row in profile))
+
+    def test_request_without_token_not_profiled(self):
+        response = self.client.get('/work', headers={'X-Profile': 'wrong', 'X-Request-ID': 'req-1'})
+
+        self.assertNotIn('X-Profile-Trace', response.headers)
+        self.assertNotIn('profile', tracing.tracer.get_trace('req-1'))
+
+    def test_sampling_endpoint(self):
+        self.assertEqual(self.client.post('/debug/profile?seconds=0.05').status_code, 403)
+
+        response = self.client.post('/debug/profile?seconds=0.05&format=json', headers={'X-Profile': TOKEN})
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.get_json()['samples'], 0)
+
+        response = self.client.post('/debug/profile?seconds=abc', headers={'X-Profile': TOKEN})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestSetupProfilingWithoutToken(ProfilingAppTestCase):
+    token = None
+
+    def test_profiling_not_set_up(self):
+        response = self.client.get('/work', headers={'X-Profile': '1'})
+
+        self.assertNotIn('X-Profile-Trace', response.headers)
+        self.assertEqual(self.client.post('/debug/profile?seconds=0.05', headers={'X-Profile': '1'}).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
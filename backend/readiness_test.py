@@ -0,0 +1,128 @@
+import importlib
+import threading
+import unittest
+from unittest.mock import patch
+
+# Collected by pytest as part of the backend package, the Flask module is backend.backend
+server = importlib.import_module(f"{__package__}.backend" if __package__ else 'backend')
+
+
+class FlakyEngineBackEnd(server.BackEnd):
+    """BackEnd whose engine initialization fails a number of times before attaching a stand-in engine."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.release = threading.Event()
+        self.engine_instance = object()
+        super().__init__(start=False)
+
+    def _initialize_engine(self):
+        self.release.wait(5)
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError('Elasticsearch unreachable')
+        self.engine = self.engine_instance
+
+
+class ReadinessTestCase(unittest.TestCase):
+    def setUp(self):
+        for name, value in (('ENGINE_INIT_BACKOFF_SECONDS', 0.01), ('ENGINE_INIT_MAX_BACKOFF_SECONDS', 0.02)):
+            patcher = patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def make_backend(self, failures):
+        backend = FlakyEngineBackEnd(failures)
+        self.addCleanup(backend.release.set)
+        return backend
+
+
+class TestBackEndInitialization(ReadinessTestCase):
+    def test_not_started_until_asked(self):
+        backend = self.make_backend(0)
+
+        self.assertIsNone(backend._thread)
+        self.assertEqual(backend.get_status()['status'], 'initializing')
+        with self.assertRaises(server.EngineUnavailableError):
+            backend.require_engine()
+
+    def test_retries_until_attached(self):
+        backend = self.make_backend(2)
+        backend.start()
+        backend.release.set()
+
+        self.assertTrue(backend.wait_ready(5))
+        status = backend.get_status()
+        self.assertTrue(status['ready'])
+        self.assertEqual(status['status'], 'ready')
+        self.assertEqual(status['attempts'], 3)
+        self.assertIsNone(status['last_error'])
+        self.assertIs(backend.require_engine(), backend.engine_instance)
+
+    def test_degraded_while_failing(self):
+        backend = self.make_backend(1000)
+        backend.start()
+        backend.release.set()
+
+        for _ in range(100):
+            if backend.state['status'] == 'degraded':
+                break
+            backend.ready.wait(0.01)
+
+        self.assertEqual(backend.state['status'], 'degraded')
+        self.assertFalse(backend.wait_ready(0.05))
+        with self.assertRaisesRegex(server.EngineUnavailableError, 'degraded: Elasticsearch unreachable'):
+            backend.require_engine()
+        backend.failures = 0
+        self.assertTrue(backend.wait_ready(5))
+
+    def test_start_is_idempotent(self):
+        backend = self.make_backend(0)
+        backend.start()
+        thread = backend._thread
+        backend.start()
+
+        self.assertIs(backend._thread, thread)
+        backend.release.set()
+        self.assertTrue(backend.wait_ready(5))
+        backend.start()
+        self.assertIs(backend._thread, thread)
+
+
+class TestReadyEndpoint(ReadinessTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = self.make_backend(1)
+        patcher = patch.object(server, 'backend', self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = server.app.test_client()
+        with server.search_results_cache_lock:
+            server.search_results_cache.clear()
+
+    def test_ready_transition(self):
+        response = self.client.get('/ready')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['status'], 'initializing')
+
+        self.backend.start()
+        self.backend.release.set()
+        self.assertTrue(self.backend.wait_ready(5))
+
+        response = self.client.get('/ready')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['ready'])
+        self.assertEqual(response.get_json()['attempts'], 2)
+
+    def test_query_degraded_before_ready(self):
+        response = self.client.get('/query?query=apple&bypass_cache=true')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'no-store')
+        metadata = response.get_json()['metadata']
+        self.assertTrue(metadata['degraded'])
+        self.assertIn('initializing', metadata['fallback_reason'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import gzip
+import json
+import unittest
+from unittest.mock import patch
+
+from flask import Flask, jsonify
+
+from utils import responses
+from utils.responses import (
+    RESPONSE_COMPRESSION_MIN_BYTES, SUPPORTED_ENCODINGS, EncodedBody, dumps, is_not_modified, json_response,
+    negotiate_encoding, setup_response_compression
+)
+
+LARGE = RESPONSE_COMPRESSION_MIN_BYTES
+
+
+class TestNegotiateEncoding(unittest.TestCase):
+    def test_small_bodies_and_missing_header_are_not_compressed(self):
+        self.assertIsNone(negotiate_encoding('gzip', LARGE - 1))
+        self.assertIsNone(negotiate_encoding(None, LARGE))
+        self.assertIsNone(negotiate_encoding('', LARGE))
+
+    def test_gzip(self):
+        self.assertEqual(negotiate_encoding('gzip, deflate', LARGE), 'gzip')
+
+    @unittest.skipUnless('br' in SUPPORTED_ENCODINGS, "brotli is not installed")
+    def test_prefers_brotli_at_equal_weight(self):
+        self.assertEqual(negotiate_encoding('gzip, deflate, br', LARGE), 'br')
+        self.assertEqual(negotiate_encoding('br;q=0.5, gzip', LARGE), 'gzip')
+
+    def test_refused_codings(self):
+        self.assertIsNone(negotiate_encoding('gzip;q=0', LARGE))
+        self.assertIsNone(negotiate_encoding('identity', LARGE))
+        self.assertIsNone(negotiate_encoding('*;q=0', LARGE))
+
+    def test_wildcard(self):
+        self.assertEqual(negotiate_encoding('*', LARGE), SUPPORTED_ENCODINGS[0])
+        self.assertEqual(negotiate_encoding('*, br;q=0', LARGE), 'gzip')
+
+
+class TestIsNotModified(unittest.TestCase):
+    def test_matching_tags(self):
+        self.assertTrue(is_not_modified('"abc"', 'abc'))
+        self.assertTrue(is_not_modified('W/"abc"', 'abc'))
+        self.assertTrue(is_not_modified('"xyz", "abc"', 'abc'))
+        self.assertTrue(is_not_modified('*', 'abc'))
+
+    def test_non_matching_tags(self):
+        self.assertFalse(is_not_modified('"xyz"', 'abc'))
+        self.assertFalse(is_not_modified(None, 'abc'))
+        self.assertFalse(is_not_modified('', 'abc'))
+
+
+class TestEncodedBody(unittest.TestCase):
+    def test_dumps(self):
+        self.assertEqual(json.loads(dumps({'a': [1, 2], 1: 'x'})), {'a': [1, 2], '1': 'x'})
+        # beyond 64 bits orjson refuses; the standard library fallback handles it
+        self.assertEqual(json.loads(dumps({'big': 2 ** 70})), {'big': 2 ** 70})
+
+    def test_each_variant_compressed_once(self):
+        body = EncodedBody.from_payload({'headline': 'x' * LARGE})
+        with patch.object(responses, 'compress', wraps=responses.compress) as compress:
+            first = body.encode('gzip')
+            second = body.encode('gzip')
+
+        self.assertIs(first, second)
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(json.loads(gzip.decompress(first)), {'headline': 'x' * LARGE})
+        self.assertIs(body.encode(None), body.identity)
+
+
+class TestResponses(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        payload = {'headline': 'x' * LARGE}
+
+        @self.app.route('/encoded')
+        def encoded():
+            return json_response(payload)
+
+        @self.app.route('/plain')
+        def plain():
+            return jsonify(payload)
+
+        @self.app.route('/small')
+        def small():
+            return jsonify({'ok': True})
+
+        setup_response_compression(self.app)
+        self.client = self.app.test_client()
+
+    def test_negotiated_json_response(self):
+        response = self.client.get('/encoded', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.get_data())), {'headline': 'x' * LARGE})
+
+    def test_other_routes_compressed_after_request(self):
+        response = self.client.get('/plain', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+
+        response = self.client.get('/plain')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+
+    def test_small_response_untouched(self):
+        response = self.client.get('/small', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertNotIn('Vary', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
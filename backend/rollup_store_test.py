@@ -0,0 +1,155 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from es_database.Engine import Engine
+from es_database.EngineConfig import EngineConfig
+from es_database.RollupStore import STATUS_DOC_ID, RollupStore, empty_record
+
+HOUR_MS = 3600 * 1000
+
+
+def article(published_at, score=0.35, ticker='AAPL', **fields):
+    return dict({
+        'published_at': published_at,
+        'sentiment_score': score,
+        'companies': [{'name': 'Apple', 'ticker': ticker}],
+        'categories': ['earnings'],
+        'regions': ['US'],
+        'source': 'Reuters'
+    }, **fields)
+
+
+def millis(*args):
+    return RollupStore._to_millis(datetime(*args))
+
+
+class TestRollupAggregation(unittest.TestCase):
+    def setUp(self):
+        self.es = MagicMock()
+        self.store = RollupStore(self.es, EngineConfig())
+
+    def test_article_record(self):
+        record = RollupStore.article_record(article('2024-05-01T10:15:00', score=-0.35))
+        self.assertEqual(record['count'], 1)
+        self.assertEqual(record['sentiment_sum'], -0.35)
+        self.assertAlmostEqual(record['sentiment_sum_sq'], 0.1225)
+        self.assertEqual(record['abs_sentiment_hist'][3], 1)
+        self.assertEqual(record['terms']['tickers'], {'AAPL': 1})
+        self.assertEqual(record['terms']['sources'], {'Reuters': 1})
+
+    def test_articles_of_one_bucket_are_combined(self):
+        updates = self.store._collect([
+            article('2024-05-01T10:15:00', score=0.5),
+            article('2024-05-01T10:45:00+00:00', score=-0.1, ticker='MSFT'),
+            article('2024-05-01T11:05:00'),
+            article(None)
+        ])
+        hour = updates[('hour', 'all', 'all', millis(2024, 5, 1, 10))]
+        self.assertEqual(hour['count'], 2)
+        self.assertAlmostEqual(hour['sentiment_sum'], 0.4)
+        self.assertEqual(hour['terms']['tickers'], {'AAPL': 1, 'MSFT': 1})
+        self.assertEqual(updates[('day', 'all', 'all', millis(2024, 5, 1))]['count'], 3)
+        self.assertEqual(updates[('day', 'ticker', 'MSFT', millis(2024, 5, 1))]['count'], 1)
+        self.assertEqual(updates[('hour', 'region', 'US', millis(2024, 5, 1, 11))]['count'], 1)
+
+    def test_offsets_are_bucketed_in_utc(self):
+        updates = self.store._collect([article('2024-05-01T12:30:00+02:00')])
+        self.assertIn(('hour', 'all', 'all', millis(2024, 5, 1, 10)), updates)
+
+    def test_record_articles_upserts_each_bucket(self):
+        with patch('es_database.RollupStore.helpers.bulk', return_value=(10, [])) as bulk:
+            self.assertEqual(self.store.record_articles([article('2024-05-01T10:15:00')]), 10)
+        actions = bulk.call_args.args[1]
+        # all, ticker, category, source and region buckets for both intervals
+        self.assertEqual(len(actions), 10)
+        upserts = {(action['upsert']['interval'], action['upsert']['dimension']) for action in actions}
+        self.assertIn(('hour', 'ticker'), upserts)
+        self.assertEqual(len({action['_id'] for action in actions}), 10)
+
+    def test_fill_gaps(self):
+        record = dict(empty_record(), count=3)
+        filled = RollupStore.fill_gaps([(0, record), (3 * HOUR_MS, record)], 'hour')
+        self.assertEqual([bucket for bucket, _ in filled], [0, HOUR_MS, 2 * HOUR_MS, 3 * HOUR_MS])
+        self.assertEqual([r['count'] for _, r in filled], [3, 0, 0, 3])
+
+
+class TestRollupReads(unittest.TestCase):
+    def setUp(self):
+        self.es = MagicMock()
+        self.store = RollupStore(self.es, EngineConfig())
+
+    def bucket_doc(self, value, bucket_ms, count):
+        return {'_source': dict(empty_record(), value=value, bucket=bucket_ms, count=count),
+                'sort': [bucket_ms, value]}
+
+    @patch('es_database.RollupStore.BUCKET_PAGE_SIZE', 2)
+    def test_buckets_are_read_page_by_page(self):
+        pages = [
+            [self.bucket_doc('US', 0, 1), self.bucket_doc('EU', 0, 2)],
+            [self.bucket_doc('US', HOUR_MS, 3), self.bucket_doc('EU', HOUR_MS, 4)],
+            [self.bucket_doc('US', 2 * HOUR_MS, 5)]
+        ]
+        self.es.search.side_effect = [{'hits': {'hits': page}} for page in pages]
+        docs = self.store._load_buckets('region', None, 'hour', 0, 3 * HOUR_MS)
+        self.assertEqual([doc['count'] for doc in docs], [1, 2, 3, 4, 5])
+        bodies = [call.kwargs['body'] for call in self.es.search.call_args_list]
+        self.assertNotIn('search_after', bodies[0])
+        self.assertEqual(bodies[1]['search_after'], [0, 'EU'])
+        self.assertEqual(bodies[2]['search_after'], [HOUR_MS, 'EU'])
+
+    def test_grouped_series_adds_the_current_bucket(self):
+        now = datetime(2024, 5, 1, 12, 30)
+        current_ms = millis(2024, 5, 1, 12)
+        with patch.object(self.store, '_load_buckets', return_value=[
+            dict(empty_record(), value='US', bucket=current_ms - HOUR_MS, count=4),
+            dict(empty_record(), value='EU', bucket=current_ms - HOUR_MS, count=1)
+        ]), patch.object(self.store, '_load_partial', return_value={'US': dict(empty_record(), count=2)}):
+            series = self.store.get_grouped_series('region', '1h', datetime(2024, 5, 1, 11, 10), now)
+        self.assertEqual([(bucket, r['count']) for bucket, r in series['US']],
+                         [(current_ms - HOUR_MS, 4), (current_ms, 2)])
+        self.assertEqual(len(series['EU']), 1)
+
+
+class TestRollupStatus(unittest.TestCase):
+    def setUp(self):
+        self.es = MagicMock()
+        self.store = RollupStore(self.es, EngineConfig())
+
+    def test_not_built_until_rebuilt(self):
+        self.es.exists.return_value = False
+        self.assertFalse(self.store.is_built())
+        # the status is cached
+        self.store.is_built()
+        self.assertEqual(self.es.exists.call_count, 1)
+
+    def test_rebuild_marks_buckets_built(self):
+        self.es.exists.return_value = False
+        hits = [{'_source': article('2024-05-01T10:15:00')} for _ in range(3)]
+        with patch('es_database.RollupStore.helpers.scan', return_value=iter(hits)), \
+                patch('es_database.RollupStore.helpers.bulk', return_value=(10, [])) as bulk:
+            self.assertEqual(self.store.rebuild(batch_size=2), 3)
+        self.assertEqual(bulk.call_count, 2)
+        self.es.delete.assert_called_once_with(index=self.store.index_name, id=STATUS_DOC_ID, ignore=[404])
+        self.assertEqual(self.es.index.call_args.kwargs['id'], STATUS_DOC_ID)
+        self.assertTrue(self.store.is_built())
+        self.es.exists.assert_not_called()
+
+    def test_engine_aggregates_raw_articles_until_built(self):
+        engine = Engine.__new__(Engine)
+        engine.rollups = None
+        self.assertFalse(engine.rollups_ready())
+        engine.rollups = self.store
+        self.es.exists.return_value = False
+        self.assertFalse(engine.rollups_ready())
+        self.store._built_checked_at = 0.0
+        self.es.exists.side_effect = Exception("unavailable")
+        self.assertFalse(engine.rollups_ready())
+        self.store._built_checked_at = 0.0
+        self.es.exists.side_effect = None
+        self.es.exists.return_value = True
+        self.assertTrue(engine.rollups_ready())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -66,18 +66,39 @@ def populate_environment():
         
         return True
 
-def run_app(use_gunicorn=False, host="0.0.0.0", port=5000, workers=1):
+def run_app(use_gunicorn=False, host="0.0.0.0", port=5000, workers=1, managed=False, use_asgi=False):
     """Run the application"""
-    logger.info(f"Starting application (gunicorn={use_gunicorn})")
+    logger.info(f"Starting application (gunicorn={use_gunicorn}, managed={managed}, asgi={use_asgi})")
     
-    if use_gunicorn:
+    if use_asgi:
+        # async serving mode: /query on the event loop, other routes on a thread pool
+        cmd = [
+            sys.executable, "-m", "uvicorn", "asgi:app",
+            "--host", host,
+            "--port", str(port),
+            "--workers", str(workers)
+        ]
+        logger.info(f"Running command: {' '.join(cmd)}")
+        try:
+            subprocess.run(cmd, check=True)
+            return True
+        except (subprocess.SubprocessError, FileNotFoundError) as e:
+            logger.error(f"Failed to run with uvicorn: {e}")
+            return False
+    
+    if use_gunicorn or managed:
         # Check if gunicorn is available
         try:
             # Run gunicorn
-            cmd = [
-                sys.executable, "-m", "gunicorn",
+            cmd = [sys.executable, "-m", "gunicorn"]
+            if managed:
+                # preload and warm up in the master, build per-worker state after fork
+                cmd += ["--config", "gunicorn_managed.conf.py"]
+            cmd += [
                 "--bind", f"{host}:{port}",
                 "--workers", str(workers),
+                # threaded workers so long-lived /stream connections do not block requests
+                "--threads", os.getenv('GUNICORN_THREADS', '8'),
                 "--timeout", "120",
                 "--log-level", "debug",
                 "app:app"
@@ -111,6 +132,10 @@ def main():
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind to")
     parser.add_argument("--port", type=int, default=5000, help="Port to bind to")
     parser.add_argument("--workers", type=int, default=1, help="Number of gunicorn workers")
+    parser.add_argument("--managed", action="store_true",
+                        help="Run gunicorn with preloading and post-fork hooks (gunicorn_managed.conf.py)")
+    parser.add_argument("--asgi", action="store_true",
+                        help="Run the ASGI app (asgi.py) with uvicorn and the async Elasticsearch client")
     args = parser.parse_args()
     
     # Ensure required directories
@@ -124,7 +149,9 @@ def main():
         use_gunicorn=args.gunicorn,
         host=args.host,
         port=args.port,
-        workers=args.workers
+        workers=args.workers,
+        managed=args.managed,
+        use_asgi=args.asgi
     )
 
 if __name__ == "__main__":
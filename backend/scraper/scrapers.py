@@ -6,16 +6,25 @@ import os
 import feedparser
 from urllib.parse import urljoin
 import datetime
+from functools import lru_cache
 
-with open("data/sources.json") as f:
-    NEWS_SOURCES = json.load(f)
+# Metrics are optional: the scrapers also run outside the backend service
+try:
+    from utils.metrics import scraper_fetch_duration_seconds, scraper_parse_duration_seconds
+except ImportError:
+    scraper_fetch_duration_seconds = scraper_parse_duration_seconds = None
+
+@lru_cache(maxsize=1)
+def load_news_sources():
+    """Source definitions from data/sources.json, read on first use."""
+    with open("data/sources.json") as f:
+        return json.load(f)
 
 class RSSFeedScraper:
     def __init__(self, source, processed_urls_file='data/processed_urls.json'):
         self.source = source
 
-        with open("data/sources.json") as f:
-            self.feed_url = json.load(f).get(self.source, {}).get('rss_feed')
+        self.feed_url = load_news_sources().get(self.source, {}).get('rss_feed')
         
         if not self.feed_url:
             raise ValueError(f"No RSS feed URL defined for source: {self.source}")
@@ -216,7 +225,7 @@ class WebScraper:
         date, and content.
         """
         soup = BeautifulSoup(self.html_content, "html.parser")
-        source_rules = NEWS_SOURCES.get(self.source)
+        source_rules = load_news_sources().get(self.source)
         if not source_rules:
             raise ValueError(f"No parsing rules defined for source: {self.source}")
 
@@ -277,8 +286,15 @@ class WebScraper:
 
     def scrape(self):
         """Perform the complete scraping process."""
-        self.fetch_content()
-        self.parse_content()
+        if scraper_fetch_duration_seconds is None:
+            self.fetch_content()
+            self.parse_content()
+            return self.article_data
+
+        with scraper_fetch_duration_seconds.labels(source=self.source).time():
+            self.fetch_content()
+        with scraper_parse_duration_seconds.labels(source=self.source).time():
+            self.parse_content()
         return self.article_data
 
 
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Backend Startup Benchmark
+
+This script measures how long the backend takes to start: the import time of
+every module (from python -X importtime) and the time until the first request
+is answered. Each run uses a fresh interpreter, and the median of several runs
+is compared with a budget so startup regressions fail CI.
+
+Usage:
+  python startup_benchmark.py [--runs 5] [--import-budget-ms 1500]
+                              [--first-request-budget-ms 2000] [--top 15] [--json]
+
+Returns:
+  Exit code 0 if startup is within budget
+  Exit code 1 if the import or first-request time exceeds its budget
+  Exit code 2 if the backend fails to start
+
+This makes it suitable for use in CI/CD pipelines and automated scripts.
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger("startup_benchmark")
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Timed in a fresh interpreter; prints one JSON line with the timings
+PROBE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {backend_dir!r})
+import backend
+imported = time.perf_counter()
+response = backend.app.test_client().get('/ready')
+answered = time.perf_counter()
+sys.__stdout__.write('STARTUP_RESULT ' + json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'first_request_ms': (answered - start) * 1000,
+    'status_code': response.status_code,
+    'modules': len(sys.modules)
+}}) + '\\n')
+"""
+
+
+def probe_environment(log_dir: str) -> dict:
+    """Environment of a benchmark run: no Elasticsearch and logs kept out of the tree."""
+    env = dict(os.environ)
+    env.update({
+        'LOG_DIR': log_dir,
+        'LOG_LEVEL': 'WARNING',
+        # measure the app itself, not the engine's connection attempts
+        'BACKEND_DEFER_ENGINE_INIT': 'true',
+        'ENABLE_TRACING': 'false'
+    })
+    for name in ('ELASTICSEARCH_URL', 'ELASTICSEARCH_ENDPOINT', 'ELASTICSEARCH_API_KEY'):
+        env.pop(name, None)
+    return env
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Parse 'import time: self | cumulative | module' lines into {module: (self_us, cumulative_us)}."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return modules
+
+
+def run_once(env: dict) -> dict:
+    """Start the backend in a fresh interpreter and collect its timings."""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE_SCRIPT.format(backend_dir=BACKEND_DIR)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    result = None
+    for line in process.stdout.splitlines():
+        if line.startswith('STARTUP_RESULT '):
+            result = json.loads(line[len('STARTUP_RESULT '):])
+    if process.returncode != 0 or result is None:
+        raise RuntimeError(f"Backend failed to start (exit code {process.returncode}): {process.stderr[-2000:]}")
+    result['imports'] = parse_importtime(process.stderr)
+    return result
+
+
+def summarize_imports(runs: list, top: int) -> list:
+    """Median self and cumulative import time of the slowest modules."""
+    names = set().union(*(run['imports'] for run in runs))
+    rows = []
+    for name in names:
+        samples = [run['imports'][name] for run in runs if name in run['imports']]
+        rows.append({
+            'module': name,
+            'self_ms': round(statistics.median(s[0] for s in samples) / 1000, 2),
+            'cumulative_ms': round(statistics.median(s[1] for s in samples) / 1000, 2)
+        })
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure backend import and first-request time")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh-interpreter runs")
+    parser.add_argument("--import-budget-ms", type=float,
+                        default=float(os.getenv('STARTUP_IMPORT_BUDGET_MS', '1500')),
+                        help="Maximum median time to import backend")
+    parser.add_argument("--first-request-budget-ms", type=float,
+                        default=float(os.getenv('STARTUP_FIRST_REQUEST_BUDGET_MS', '2000')),
+                        help="Maximum median time from interpreter start to the first response")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to report")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="startup-benchmark-") as log_dir:
+        env = probe_environment(log_dir)
+        for i in range(max(args.runs, 1)):
+            try:
+                runs.append(run_once(env))
+            except Exception as e:
+                logger.error(str(e))
+                return 2
+            logger.info(f"Run {i + 1}: import {runs[-1]['import_ms']:.0f}ms, "
+                        f"first request {runs[-1]['first_request_ms']:.0f}ms")
+
+    report = {
+        'runs': len(runs),
+        'import_ms': round(statistics.median(run['import_ms'] for run in runs), 1),
+        'first_request_ms': round(statistics.median(run['first_request_ms'] for run in runs), 1),
+        'modules_loaded': runs[-1]['modules'],
+        'import_budget_ms': args.import_budget_ms,
+        'first_request_budget_ms': args.first_request_budget_ms,
+        'slowest_imports': summarize_imports(runs, args.top)
+    }
+    report['within_budget'] = (
+        report['import_ms'] <= args.import_budget_ms
+        and report['first_request_ms'] <= args.first_request_budget_ms
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        logger.info(f"Median import time: {report['import_ms']}ms (budget {args.import_budget_ms:.0f}ms)")
+        logger.info(f"Median time to first request: {report['first_request_ms']}ms "
+                    f"(budget {args.first_request_budget_ms:.0f}ms)")
+        logger.info(f"Modules loaded: {report['modules_loaded']}")
+        logger.info("Slowest imports (cumulative / self):")
+        for row in report['slowest_imports']:
+            logger.info(f"  {row['cumulative_ms']:>8.1f}ms {row['self_ms']:>8.1f}ms  {row['module']}")
+
+    if not report['within_budget']:
+        logger.error("Startup exceeded its budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
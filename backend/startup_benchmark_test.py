@@ -0,0 +1,88 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import startup_benchmark
+
+IMPORTTIME_STDERR = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2500 |      40000 | flask
+import time:       800 |        900 |   json.decoder
+not an import line
+"""
+
+
+def fake_run(import_ms, first_request_ms):
+    return {
+        'import_ms': import_ms,
+        'first_request_ms': first_request_ms,
+        'status_code': 503,
+        'modules': 500,
+        'imports': {'flask': (2500, 40000), 'utils.logger': (900, 1200)}
+    }
+
+
+class TestParsing(unittest.TestCase):
+    def test_parse_importtime(self):
+        self.assertEqual(startup_benchmark.parse_importtime(IMPORTTIME_STDERR), {
+            '_io': (120, 120),
+            'flask': (2500, 40000),
+            'json.decoder': (800, 900)
+        })
+
+    def test_summarize_imports_takes_medians(self):
+        runs = [
+            {'imports': {'flask': (1000, 30000), 'json': (100, 100)}},
+            {'imports': {'flask': (3000, 50000), 'json': (300, 300)}},
+            {'imports': {'flask': (2000, 40000)}}
+        ]
+
+        rows = startup_benchmark.summarize_imports(runs, top=1)
+
+        self.assertEqual(rows, [{'module': 'flask', 'self_ms': 2.0, 'cumulative_ms': 40.0}])
+
+    def test_probe_environment(self):
+        with patch.dict(os.environ, {'ELASTICSEARCH_URL': 'http://es:9200'}):
+            env = startup_benchmark.probe_environment('/tmp/benchmark-logs')
+
+        self.assertNotIn('ELASTICSEARCH_URL', env)
+        self.assertEqual(env['BACKEND_DEFER_ENGINE_INIT'], 'true')
+        self.assertEqual(env['LOG_DIR'], '/tmp/benchmark-logs')
+
+
+class TestBudget(unittest.TestCase):
+    def run_main(self, *runs_or_error, args=()):
+        argv = ['startup_benchmark.py', '--runs', str(len(runs_or_error)), '--import-budget-ms', '500',
+                '--first-request-budget-ms', '800', *args]
+        with patch.object(sys, 'argv', argv), patch.object(startup_benchmark, 'run_once', side_effect=runs_or_error):
+            return startup_benchmark.main()
+
+    def test_within_budget(self):
+        self.assertEqual(self.run_main(fake_run(300, 400), fake_run(900, 1200), fake_run(350, 450)), 0)
+
+    def test_import_over_budget(self):
+        self.assertEqual(self.run_main(fake_run(600, 700), fake_run(650, 750), fake_run(300, 400)), 1)
+
+    def test_first_request_over_budget(self):
+        self.assertEqual(self.run_main(fake_run(300, 900)), 1)
+
+    def test_start_failure(self):
+        self.assertEqual(self.run_main(RuntimeError('Backend failed to start')), 2)
+
+
+class TestStartup(unittest.TestCase):
+    def test_fresh_interpreter_startup(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            result = startup_benchmark.run_once(startup_benchmark.probe_environment(log_dir))
+
+        # the engine is attached later, so the first /ready is 503
+        self.assertEqual(result['status_code'], 503)
+        self.assertIn('flask', result['imports'])
+        for heavy in ('elasticsearch', 'yfinance', 'numpy'):
+            self.assertNotIn(heavy, result['imports'])
+
+
+if __name__ == '__main__':
+    unittest.main()
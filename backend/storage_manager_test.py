@@ -0,0 +1,143 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from es_database.EngineConfig import EngineConfig
+from es_database.StorageManager import StorageManager, parse_date_bound
+
+
+def epoch_millis(day):
+    return datetime(2024, 5, day, tzinfo=timezone.utc).timestamp() * 1000
+
+
+class TestParseDateBound(unittest.TestCase):
+    now = datetime(2024, 5, 10, 15, 30, 0)
+
+    def test_now(self):
+        self.assertEqual(parse_date_bound('now', self.now), self.now)
+
+    def test_offset(self):
+        self.assertEqual(parse_date_bound('now-7d', self.now), datetime(2024, 5, 3, 15, 30, 0))
+        self.assertEqual(parse_date_bound('now+2h', self.now), datetime(2024, 5, 10, 17, 30, 0))
+
+    def test_lower_bounds_round_down(self):
+        self.assertEqual(parse_date_bound('now-7d/d', self.now), datetime(2024, 5, 3))
+        self.assertEqual(parse_date_bound('now/h', self.now), datetime(2024, 5, 10, 15))
+        self.assertEqual(parse_date_bound('now/M', self.now), datetime(2024, 5, 1))
+        # 2024-05-10 is a Friday
+        self.assertEqual(parse_date_bound('now/w', self.now), datetime(2024, 5, 6))
+
+    def test_upper_bounds_round_up(self):
+        self.assertEqual(parse_date_bound('now/d', self.now, round_up=True),
+                         datetime(2024, 5, 10, 23, 59, 59, 999000))
+        self.assertEqual(parse_date_bound('now/M', datetime(2024, 12, 5), round_up=True),
+                         datetime(2024, 12, 31, 23, 59, 59, 999000))
+        self.assertEqual(parse_date_bound('now/y', self.now, round_up=True),
+                         datetime(2024, 12, 31, 23, 59, 59, 999000))
+
+    def test_iso(self):
+        self.assertEqual(parse_date_bound('2024-05-01T00:00:00Z'), datetime(2024, 5, 1))
+        self.assertEqual(parse_date_bound('2024-05-01'), datetime(2024, 5, 1))
+
+    def test_iso_offsets_are_converted_to_utc(self):
+        self.assertEqual(parse_date_bound('2024-05-01T02:00:00+02:00'), datetime(2024, 5, 1))
+        self.assertEqual(parse_date_bound('2024-04-30T20:00:00-04:00'), datetime(2024, 5, 1))
+
+    def test_unparsable(self):
+        self.assertIsNone(parse_date_bound(None))
+        self.assertIsNone(parse_date_bound('last week'))
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return cls(2024, 5, 4, 9, 0, 0)
+
+
+class PartitionedStorageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.config = EngineConfig()
+        self.config.index_name = 'news'
+        self.config.index_partitioning = 'daily'
+        self.config.read_alias = 'news-read'
+        self.config.write_alias = 'news-write'
+        self.es = MagicMock()
+        with patch('es_database.StorageManager.get_client', return_value=self.es):
+            self.storage = StorageManager(self.config)
+
+        self.es.indices.get_alias.side_effect = lambda name: {
+            'news-read': {'news-1': {}, 'news-2': {}, 'news-3': {}, 'news-empty': {}},
+            'news-write': {'news-3': {'aliases': {'news-write': {'is_write_index': True}}}}
+        }[name]
+        self.es.search.return_value = {'aggregations': {'per_index': {'buckets': [
+            {'key': 'news-1', 'min_published': {'value': epoch_millis(1)}, 'max_published': {'value': epoch_millis(3)}},
+            {'key': 'news-2', 'min_published': {'value': epoch_millis(4)}, 'max_published': {'value': epoch_millis(6)}},
+            {'key': 'news-3', 'min_published': {'value': epoch_millis(7)}, 'max_published': {'value': epoch_millis(8)}}
+        ]}}}
+
+
+class TestGetSearchIndex(PartitionedStorageTestCase):
+    def test_unpartitioned_uses_index(self):
+        self.config.index_partitioning = 'none'
+        self.assertEqual(self.storage.get_search_index('2024-05-05', '2024-05-06'), 'news')
+        self.es.search.assert_not_called()
+
+    def test_no_range_uses_read_alias(self):
+        self.assertEqual(self.storage.get_search_index(), 'news-read')
+        self.assertEqual(self.storage.get_search_index('sometime'), 'news-read')
+        self.es.search.assert_not_called()
+
+    def test_selects_overlapping_indices(self):
+        index = self.storage.get_search_index('2024-05-05T00:00:00', '2024-05-05T12:00:00')
+        # the write index and empty indices are always searched
+        self.assertEqual(index, 'news-2,news-3,news-empty')
+
+    def test_open_ended_range(self):
+        self.assertEqual(self.storage.get_search_index('2024-05-02T00:00:00'),
+                         'news-1,news-2,news-3,news-empty')
+        self.assertEqual(self.storage.get_search_index(None, '2024-05-02T00:00:00'),
+                         'news-1,news-3,news-empty')
+
+    def test_bounds_are_cached(self):
+        self.storage.get_search_index('2024-05-05T00:00:00')
+        self.storage.get_search_index('2024-05-01T00:00:00')
+        self.assertEqual(self.es.search.call_count, 1)
+
+    def test_upper_date_math_bound_covers_the_whole_unit(self):
+        with patch('es_database.StorageManager.datetime', FrozenDatetime):
+            index = self.storage.get_search_index('2024-05-02T00:00:00', 'now/d')
+        # news-2 starts at midnight of the current day
+        self.assertEqual(index, 'news-1,news-2,news-3,news-empty')
+
+    def test_falls_back_to_read_alias_on_error(self):
+        self.es.indices.get_alias.side_effect = Exception("unavailable")
+        self.assertEqual(self.storage.get_search_index('2024-05-05T00:00:00'), 'news-read')
+
+
+
+class TestGetArticleIndex(PartitionedStorageTestCase):
+    def test_unpartitioned_uses_index(self):
+        self.config.index_partitioning = 'none'
+        self.assertEqual(self.storage.get_article_index('id'), 'news')
+        self.es.mget.assert_not_called()
+
+    def test_existing_article_stays_in_its_index(self):
+        self.es.mget.return_value = {'docs': [
+            {'_index': 'news-empty', '_id': 'id', 'found': False},
+            {'_index': 'news-3', '_id': 'id', 'found': False},
+            {'_index': 'news-2', '_id': 'id', 'found': True},
+            {'_index': 'news-1', '_id': 'id', 'found': False}
+        ]}
+        self.assertEqual(self.storage.get_article_index('id'), 'news-2')
+        docs = self.es.mget.call_args.kwargs['body']['docs']
+        self.assertEqual([doc['_index'] for doc in docs], ['news-empty', 'news-3', 'news-2', 'news-1'])
+        self.es.search.assert_called_once()
+
+    def test_new_article_goes_to_write_alias(self):
+        self.es.mget.return_value = {'docs': [{'_index': index, '_id': 'id', 'found': False}
+                                              for index in ('news-empty', 'news-3', 'news-2', 'news-1')]}
+        self.assertEqual(self.storage.get_article_index('id'), 'news-write')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import json
+import unittest
+
+from utils.stream_hub import IndexPoller, StreamClient, StreamHub, format_sse
+
+
+def article(source='Reuters', ticker='AAPL', sentiment='positive'):
+    return {
+        'headline': f"{ticker} news",
+        'source': source,
+        'sentiment': sentiment,
+        'companies': [{'name': ticker, 'ticker': ticker}],
+        'embeddings': [0.1, 0.2]
+    }
+
+
+def hit(article_id, updated_at, version=1):
+    return {'_id': article_id, '_version': version, '_source': article(), 'sort': [updated_at]}
+
+
+class TestStreamHub(unittest.TestCase):
+    def setUp(self):
+        self.hub = StreamHub(history_size=3, max_clients=2)
+
+    def test_article_event(self):
+        event = StreamHub.article_event('a1', article())
+        self.assertEqual(event['id'], 'a1')
+        self.assertEqual(event['tickers'], ['AAPL'])
+        self.assertNotIn('embeddings', event)
+
+    def test_publish_respects_filters(self):
+        reuters = StreamClient(sources='reuters')
+        msft = StreamClient(tickers='MSFT,GOOG')
+        self.hub.subscribe(reuters)
+        self.hub.subscribe(msft)
+        self.hub.publish('a1', article())
+        self.hub.publish('a2', article(source='CNBC', ticker='MSFT'))
+        self.assertEqual([event['id'] for _, event in reuters.get(0)], ['a1'])
+        self.assertEqual([event['id'] for _, event in msft.get(0)], ['a2'])
+
+    def test_client_limit(self):
+        self.hub.subscribe(StreamClient())
+        self.hub.subscribe(StreamClient())
+        with self.assertRaises(OverflowError):
+            self.hub.subscribe(StreamClient())
+
+    def test_resume_replays_missed_events(self):
+        for i in range(3):
+            self.hub.publish(f"a{i}", article())
+        first_id = f"{self.hub.boot}-1"
+        client = StreamClient()
+        self.assertTrue(self.hub.subscribe(client, first_id))
+        self.assertEqual([event['id'] for _, event in client.get(0)], ['a1', 'a2'])
+
+    def test_resume_beyond_history_or_from_another_process_resets(self):
+        for i in range(5):
+            self.hub.publish(f"a{i}", article())
+        self.assertFalse(self.hub.subscribe(StreamClient(), f"{self.hub.boot}-1"))
+        self.assertFalse(self.hub.subscribe(StreamClient(), 'otherboot-4'))
+
+    def test_stream_yields_events_and_unsubscribes(self):
+        client = StreamClient()
+        self.hub.subscribe(client)
+        self.hub.publish('a1', article())
+        stream = self.hub.stream(client, resumed=False, heartbeat_seconds=0)
+        self.assertEqual(next(stream), "retry: 3000\n\n")
+        self.assertIn('event: reset', next(stream))
+        message = next(stream)
+        self.assertIn('event: article', message)
+        self.assertIn(f"id: {self.hub.boot}-1", message)
+        stream.close()
+        self.assertEqual(self.hub.clients, set())
+
+
+class TestStreamClient(unittest.TestCase):
+    def test_drop_oldest(self):
+        client = StreamClient(buffer_size=2)
+        for i in range(3):
+            client.push(str(i), {'id': i})
+        self.assertEqual([event_id for event_id, _ in client.get(0)], ['1', '2'])
+        self.assertEqual(client.dropped, 1)
+
+    def test_disconnect_policy(self):
+        client = StreamClient(buffer_size=1, drop_policy='disconnect')
+        client.push('1', {})
+        client.push('2', {})
+        self.assertTrue(client.closed)
+        self.assertEqual(client.dropped, 1)
+
+    def test_format_sse(self):
+        message = format_sse({'a': 1}, event_id='b-1', event='article')
+        self.assertEqual(message, 'id: b-1\nevent: article\ndata: {"a": 1}\n\n')
+        self.assertEqual(json.loads(format_sse({'a': 1}).split('data: ')[1]), {'a': 1})
+
+
+class TestIndexPoller(unittest.TestCase):
+    def setUp(self):
+        self.hub = StreamHub()
+        self.client = StreamClient()
+        self.hub.subscribe(self.client)
+        self.pages = []
+        self.requests = []
+        self.poller = IndexPoller(self.hub, self.fetch, overlap=10, batch_size=2)
+        self.poller._cursor = 100000
+
+    def fetch(self, since, size):
+        self.requests.append(since)
+        return self.pages.pop(0) if self.pages else []
+
+    def published(self):
+        return [event['id'] for _, event in self.client.get(0)]
+
+    def test_publishes_new_articles_once(self):
+        self.pages = [[hit('a1', 95000), hit('a2', 101000)], [hit('a3', 102000)]]
+        self.assertEqual(self.poller.poll(), 3)
+        self.assertEqual(self.requests[:2], [90000, 101000])
+        self.assertEqual(self.published(), ['a1', 'a2', 'a3'])
+        # the next poll overlaps the previous one without republishing
+        self.pages = [[hit('a2', 101000), hit('a3', 102000)], [hit('a4', 103000)]]
+        self.assertEqual(self.poller.poll(), 1)
+        self.assertEqual(self.published(), ['a4'])
+
+    def test_updated_articles_are_not_announced(self):
+        self.pages = [[hit('a1', 101000, version=2)]]
+        self.assertEqual(self.poller.poll(), 0)
+        self.assertEqual(self.published(), [])
+
+    def test_seen_ids_are_pruned_outside_the_overlap(self):
+        self.pages = [[hit('a1', 101000)]]
+        self.poller.poll()
+        self.pages = [[hit('a2', 120000)]]
+        self.poller.poll()
+        self.assertEqual(list(self.poller._seen), ['a2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
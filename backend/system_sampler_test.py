@@ -0,0 +1,108 @@
+import os
+import time
+import unittest
+
+from utils.system_sampler import SAMPLE_METRICS, SystemSampler, parse_duration
+
+
+def fake_sample(age, pid, **values):
+    sample = {name: 0 for name in SAMPLE_METRICS}
+    sample.update(values, time=time.time() - age, process_pid=pid)
+    return sample
+
+
+class TestParseDuration(unittest.TestCase):
+    def test_units(self):
+        self.assertEqual(parse_duration('90'), 90)
+        self.assertEqual(parse_duration('30s'), 30)
+        self.assertEqual(parse_duration(' 5M '), 300)
+        self.assertEqual(parse_duration('1h'), 3600)
+        self.assertEqual(parse_duration('2d'), 172800)
+
+    def test_invalid(self):
+        for value in ('', 'm', '5w', '-5m', '1.5h'):
+            with self.assertRaises(ValueError):
+                parse_duration(value)
+
+
+class TestSystemSampler(unittest.TestCase):
+    def setUp(self):
+        # a long interval keeps the background thread from adding samples
+        self.sampler = SystemSampler(interval=3600, history_size=5)
+        self.addCleanup(self.sampler.stop)
+
+    def test_sample(self):
+        sample = self.sampler.sample()
+
+        self.assertEqual(sample['process_pid'], os.getpid())
+        for name in SAMPLE_METRICS:
+            self.assertIn(name, sample)
+        self.assertEqual(list(self.sampler.samples), [sample])
+        self.assertTrue(self.sampler._thread.is_alive())
+
+    def test_ensure_running_starts_one_thread(self):
+        self.sampler.ensure_running()
+        thread = self.sampler._thread
+        self.sampler.ensure_running()
+        self.assertIs(self.sampler._thread, thread)
+
+    def test_history_is_bounded(self):
+        for _ in range(8):
+            self.sampler.sample()
+        self.assertEqual(len(self.sampler.samples), 5)
+
+    def test_latest_reuses_last_sample(self):
+        first = self.sampler.latest()
+        self.assertIs(self.sampler.latest(), first)
+        self.assertEqual(len(self.sampler.samples), 1)
+
+    def test_summarize_window(self):
+        self.sampler.ensure_running()
+        pid = os.getpid()
+        self.sampler.samples.extend([
+            fake_sample(600, pid, cpu_percent=90.0),
+            fake_sample(50, pid, cpu_percent=10.0, process_threads=4),
+            fake_sample(20, pid, cpu_percent=20.0, process_threads=6),
+            fake_sample(5, pid, cpu_percent=60.0, process_threads=5)
+        ])
+
+        summary = self.sampler.summarize(60)
+
+        self.assertEqual(summary['samples'], 3)
+        self.assertEqual(summary['metrics']['cpu_percent'], {'min': 10.0, 'avg': 30.0, 'max': 60.0})
+        self.assertEqual(summary['metrics']['process_threads'], {'min': 4, 'avg': 5.0, 'max': 6})
+        self.assertLess(summary['start'], summary['end'])
+
+    def test_summarize_empty_window(self):
+        self.sampler.ensure_running()
+        summary = self.sampler.summarize(60)
+        self.assertEqual(summary['samples'], 0)
+        self.assertIsNone(summary['start'])
+        self.assertTrue(all(value is None for value in summary['metrics'].values()))
+
+    def test_new_process_drops_inherited_samples(self):
+        self.sampler.ensure_running()
+        self.sampler.samples.append(fake_sample(1, pid=-1))
+        # what a forked child sees: its parent's pid and samples
+        self.sampler._pid = -1
+
+        self.sampler.ensure_running()
+
+        self.assertEqual(self.sampler._pid, os.getpid())
+        self.assertEqual(len(self.sampler.samples), 0)
+
+    def test_reset_after_fork(self):
+        self.sampler.sample()
+        lock = self.sampler._lock
+
+        self.sampler.reset_after_fork()
+
+        self.assertEqual(len(self.sampler.samples), 0)
+        self.assertIsNone(self.sampler._thread)
+        self.assertIsNone(self.sampler._pid)
+        self.assertIsNot(self.sampler._lock, lock)
+        self.assertEqual(self.sampler.latest()['process_pid'], os.getpid())
+
+
+if __name__ == '__main__':
+    unittest.main()
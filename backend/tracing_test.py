@@ -0,0 +1,188 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+
+from utils import tracing
+from utils.tracing import OTLPFileExporter, Tracer
+
+
+class FakeDeserializer:
+    def loads(self, data, mimetype=None):
+        return json.loads(data)
+
+
+class FakeTransport:
+    def __init__(self, response):
+        self.response = response
+        self.deserializer = FakeDeserializer()
+
+    def perform_request(self, method, url, params=None, body=None):
+        return self.deserializer.loads(json.dumps(self.response))
+
+
+class FakeElasticsearch:
+    def __init__(self, response):
+        self.transport = FakeTransport(response)
+
+
+class TracingTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(tracing, 'TRACE_SAMPLE_RATE', 1.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tracer = Tracer(buffer_size=3)
+
+
+class TestTracer(TracingTestCase):
+    def test_nested_spans(self):
+        root = self.tracer.start_trace('req-1', 'GET /query')
+        with self.tracer.span('search_news', index='news') as outer:
+            with self.tracer.span('es GET /news/_search') as inner:
+                self.assertIs(Tracer.current_span(), inner)
+            self.assertIs(Tracer.current_span(), outer)
+        self.tracer.finish_trace(root)
+
+        trace = self.tracer.get_trace('req-1')
+        names = [span['name'] for span in trace['spans']]
+        self.assertEqual(names, ['GET /query', 'search_news', 'es GET /news/_search'])
+        spans = trace['spans']
+        self.assertIsNone(spans[0]['parent_id'])
+        self.assertEqual(spans[1]['parent_id'], spans[0]['span_id'])
+        self.assertEqual(spans[2]['parent_id'], spans[1]['span_id'])
+        self.assertEqual(spans[1]['attributes'], {'index': 'news'})
+        self.assertIsNone(Tracer.current_span())
+
+    def test_span_outside_trace_records_nothing(self):
+        with self.tracer.span('orphan') as span:
+            self.assertIsNone(span)
+        self.assertEqual(self.tracer.recent(), [])
+
+    def test_error_span(self):
+        root = self.tracer.start_trace('req-1', 'GET /query')
+        with self.assertRaises(KeyError):
+            with self.tracer.span('lookup'):
+                raise KeyError('missing')
+        self.tracer.finish_trace(root)
+
+        span = self.tracer.get_trace('req-1')['spans'][1]
+        self.assertEqual(span['status'], 'error')
+        self.assertEqual(span['attributes']['error.type'], 'KeyError')
+
+    def test_buffer_keeps_most_recent_traces(self):
+        for i in range(5):
+            self.tracer.finish_trace(self.tracer.start_trace(f"req-{i}", 'GET /'))
+
+        self.assertEqual([trace['request_id'] for trace in self.tracer.recent()], ['req-4', 'req-3', 'req-2'])
+        self.assertIsNone(self.tracer.get_trace('req-0'))
+
+    def test_span_limit(self):
+        with patch.object(tracing, 'TRACE_MAX_SPANS', 3):
+            root = self.tracer.start_trace('req-1', 'GET /')
+            for i in range(5):
+                with self.tracer.span(f"step {i}"):
+                    pass
+            self.tracer.finish_trace(root)
+
+        trace = self.tracer.get_trace('req-1')
+        self.assertEqual(len(trace['spans']), 3)
+        self.assertEqual(trace['dropped_spans'], 3)
+
+    def test_unsampled_request(self):
+        with patch.object(tracing, 'TRACE_SAMPLE_RATE', 0.0):
+            self.assertIsNone(self.tracer.start_trace('req-1', 'GET /'))
+        self.tracer.finish_trace(None)
+        self.assertEqual(self.tracer.recent(), [])
+
+
+class TestInstrumentElasticsearch(TracingTestCase):
+    def test_call_and_deserialize_spans(self):
+        es = FakeElasticsearch({'took': 7, 'hits': {'hits': []}})
+        self.tracer.instrument_elasticsearch(es)
+        self.tracer.instrument_elasticsearch(es)
+
+        root = self.tracer.start_trace('req-1', 'GET /query')
+        with self.tracer.span('search_news') as engine_span:
+            result = es.transport.perform_request('GET', '/news/_search')
+            self.assertEqual(Tracer.children_took_ms(engine_span), 7)
+        self.tracer.finish_trace(root)
+
+        self.assertEqual(result['took'], 7)
+        spans = self.tracer.get_trace('req-1')['spans']
+        self.assertEqual(
+            [span['name'] for span in spans],
+            ['GET /query', 'search_news', 'es GET /news/_search', 'es deserialize']
+        )
+        self.assertEqual(spans[2]['attributes'], {'db.system': 'elasticsearch', 'es.took_ms': 7})
+        self.assertEqual(spans[3]['parent_id'], spans[2]['span_id'])
+
+
+class TestOTLPFileExporter(TracingTestCase):
+    def test_export_writes_otlp_json_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'traces.jsonl')
+            exporter = OTLPFileExporter(path)
+            tracer = Tracer(exporter=exporter)
+
+            root = tracer.start_trace('req-1', 'GET /query', **{'http.method': 'GET'})
+            with tracer.span('search_news', hits=3, cached=False):
+                pass
+            tracer.finish_trace(root)
+            exporter.pending.join()
+
+            with open(path) as f:
+                lines = f.readlines()
+
+        self.assertEqual(len(lines), 1)
+        spans = json.loads(lines[0])['resourceSpans'][0]['scopeSpans'][0]['spans']
+        root_span, child = spans
+        self.assertEqual(root_span['kind'], 2)
+        self.assertNotIn('parentSpanId', root_span)
+        self.assertEqual(child['parentSpanId'], root_span['spanId'])
+        self.assertEqual(child['traceId'], root_span['traceId'])
+        self.assertEqual(child['attributes'], [
+            {'key': 'hits', 'value': {'intValue': '3'}},
+            {'key': 'cached', 'value': {'boolValue': False}}
+        ])
+        self.assertLessEqual(int(root_span['startTimeUnixNano']), int(child['startTimeUnixNano']))
+
+
+class TestSetupTracing(TracingTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = patch.object(tracing, 'tracer', self.tracer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.app = Flask(__name__)
+
+        @self.app.route('/items/<item_id>')
+        def item(item_id):
+            with tracing.tracer.span('load item'):
+                return item_id
+
+        tracing.setup_tracing(self.app)
+        self.client = self.app.test_client()
+
+    def test_request_trace_by_request_id(self):
+        self.client.get('/items/1', headers={'X-Request-ID': 'abc'})
+
+        response = self.client.get('/debug/traces/abc')
+
+        self.assertEqual(response.status_code, 200)
+        trace = response.get_json()
+        self.assertEqual(trace['name'], 'GET /items/<item_id>')
+        self.assertEqual(trace['spans'][0]['attributes']['http.status_code'], 200)
+        self.assertEqual(trace['spans'][1]['name'], 'load item')
+        listed = [trace['request_id'] for trace in self.client.get('/debug/traces').get_json()['traces']]
+        self.assertIn('abc', listed)
+
+    def test_unknown_trace(self):
+        self.assertEqual(self.client.get('/debug/traces/missing').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
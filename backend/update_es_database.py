@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import argparse
 import os
 import json
 import sys
@@ -12,6 +13,7 @@ BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 # Import Engine directly from the absolute path
 sys.path.insert(0, BACKEND_DIR)  # Add backend to path
 from es_database.Engine import Engine
+from es_database.RollupStore import RollupStore
 
 def load_articles_from_file(filepath):
     """Load articles from a JSON file."""
@@ -76,5 +78,24 @@ def load_articles_to_db():
     
     print(f"Database update complete. Processed {total_processed} articles, added {total_added} to the database.")
 
+def rebuild_rollups(since=None):
+    """Build the analytics rollup buckets from the stored articles."""
+    engine = Engine()
+    # Rollups can be backfilled before ENABLE_ROLLUPS is turned on
+    rollups = engine.rollups or RollupStore(engine.es, engine.config)
+    rollups.ensure_index()
+    start = datetime.fromisoformat(since) if since else None
+    print(f"Rebuilding rollups{f' since {start.isoformat()}' if start else ''}...")
+    processed = rollups.rebuild(start)
+    print(f"Rollup rebuild complete. Aggregated {processed} articles.")
+
 if __name__ == "__main__":
-    load_articles_to_db() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load scraped articles into Elasticsearch")
+    parser.add_argument('--rebuild-rollups', action='store_true',
+                        help="Rebuild the analytics rollup buckets instead of loading articles")
+    parser.add_argument('--since', help="With --rebuild-rollups, only rebuild buckets from this ISO date on")
+    args = parser.parse_args()
+    if args.rebuild_rollups:
+        rebuild_rollups(args.since)
+    else:
+        load_articles_to_db()
@@ -0,0 +1,244 @@
+"""
+Circuit breakers for Elasticsearch operations.
+
+This module provides count-based circuit breakers that open when too many of
+the recent calls of an operation category failed or exceeded the category's
+latency budget. While a circuit is open calls are rejected immediately with
+CircuitOpenError instead of waiting for the client timeout; after a cool-down
+a few probe calls are let through (half-open) to decide whether to close it.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from .logger import get_logger
+from .metrics import circuit_breaker_rejections_total, circuit_breaker_state
+
+logger = get_logger('circuit_breaker')
+
+ENABLE_CIRCUIT_BREAKER = os.getenv('ENABLE_CIRCUIT_BREAKER', 'true').lower() == 'true'
+# Fraction of failed calls in the window that opens the circuit
+CIRCUIT_FAILURE_RATE = float(os.getenv('CIRCUIT_FAILURE_RATE', '0.5'))
+# Fraction of calls over the latency budget that opens the circuit
+CIRCUIT_SLOW_CALL_RATE = float(os.getenv('CIRCUIT_SLOW_CALL_RATE', '0.5'))
+# Number of most recent calls the rates are computed over
+CIRCUIT_WINDOW_SIZE = int(os.getenv('CIRCUIT_WINDOW_SIZE', '20'))
+# Calls needed in the window before the circuit can open
+CIRCUIT_MIN_CALLS = int(os.getenv('CIRCUIT_MIN_CALLS', '10'))
+# Seconds an open circuit rejects calls before probing
+CIRCUIT_OPEN_SECONDS = float(os.getenv('CIRCUIT_OPEN_SECONDS', '30'))
+# Probe calls let through while half-open; all must succeed to close the circuit
+CIRCUIT_HALF_OPEN_CALLS = int(os.getenv('CIRCUIT_HALF_OPEN_CALLS', '3'))
+# Latency budget per operation category in milliseconds; slower calls count as slow
+CIRCUIT_BUDGETS_MS = {
+    'search': float(os.getenv('CIRCUIT_SEARCH_BUDGET_MS', '2000')),
+    'analytics': float(os.getenv('CIRCUIT_ANALYTICS_BUDGET_MS', '5000')),
+    'write': float(os.getenv('CIRCUIT_WRITE_BUDGET_MS', '5000'))
+}
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+# circuit_breaker_state values
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Set while a guarded call runs, so nested guarded calls are not counted twice
+_guarded: ContextVar[bool] = ContextVar('circuit_guarded', default=False)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling Elasticsearch while a circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """
+    Whether an exception means Elasticsearch is unhealthy.
+
+    Connection errors and timeouts (status 'N/A'), 429 and 5xx responses
+    count; client errors such as a 404 or a rejected query do not, and
+    neither do exceptions raised by our own code (ValueError and the like).
+    """
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        return isinstance(error, (TimeoutError, ConnectionError))
+    return not isinstance(status, int) or status == 429 or status >= 500
+
+
+class CircuitBreaker:
+    """
+    Count-based circuit breaker.
+
+    Closed: calls pass and their outcome is recorded in a window of the last
+    CIRCUIT_WINDOW_SIZE calls; when the failure or slow-call rate reaches its
+    threshold the circuit opens. Open: calls are rejected until
+    CIRCUIT_OPEN_SECONDS have passed. Half-open: up to CIRCUIT_HALF_OPEN_CALLS
+    probes pass; one bad probe reopens the circuit, all good ones close it.
+    """
+
+    def __init__(self, name: str, budget_ms: float,
+                 failure_rate: float = CIRCUIT_FAILURE_RATE,
+                 slow_call_rate: float = CIRCUIT_SLOW_CALL_RATE,
+                 window_size: int = CIRCUIT_WINDOW_SIZE,
+                 min_calls: int = CIRCUIT_MIN_CALLS,
+                 open_seconds: float = CIRCUIT_OPEN_SECONDS,
+                 half_open_calls: int = CIRCUIT_HALF_OPEN_CALLS):
+        self.name = name
+        self.budget_ms = budget_ms
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = max(min(min_calls, window_size), 1)
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(half_open_calls, 1)
+        # (failed, slow) of the most recent calls
+        self.window = deque(maxlen=max(window_size, 1))
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.last_reason: Optional[str] = None
+        self.rejected = 0
+        self._probes_started = 0
+        self._probes_passed = 0
+        self._lock = threading.Lock()
+        circuit_breaker_state.labels(operation=name).set(STATE_VALUES[CLOSED])
+
+    def _transition(self, state: str, reason: Optional[str] = None) -> None:
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self.last_reason = reason
+            logger.warning(f"Circuit '{self.name}' opened for {self.open_seconds:.0f}s: {reason}")
+        elif state == CLOSED:
+            self.window.clear()
+            logger.info(f"Circuit '{self.name}' closed")
+        self._probes_started = 0
+        self._probes_passed = 0
+        circuit_breaker_state.labels(operation=self.name).set(STATE_VALUES[state])
+
+    def before_call(self) -> None:
+        """
+        Admit a call or reject it.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or its probe slots are taken
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    self._reject()
+                    raise CircuitOpenError(self.name, remaining)
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probes_started >= self.half_open_calls:
+                    self._reject()
+                    raise CircuitOpenError(self.name, 1.0)
+                self._probes_started += 1
+
+    def _reject(self) -> None:
+        self.rejected += 1
+        circuit_breaker_rejections_total.labels(operation=self.name).inc()
+
+    def after_call(self, duration_ms: float, failed: bool) -> None:
+        """Record the outcome of an admitted call."""
+        slow = duration_ms > self.budget_ms
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._transition(OPEN, 'probe failed' if failed else f"probe took {duration_ms:.0f}ms")
+                else:
+                    self._probes_passed += 1
+                    if self._probes_passed >= self.half_open_calls:
+                        self._transition(CLOSED)
+                return
+            if self.state == OPEN:
+                # admitted before the circuit opened
+                return
+
+            self.window.append((failed, slow))
+            if len(self.window) < self.min_calls:
+                return
+            failures = sum(1 for call_failed, _ in self.window if call_failed) / len(self.window)
+            slow_calls = sum(1 for _, call_slow in self.window if call_slow) / len(self.window)
+            if failures >= self.failure_rate:
+                self._transition(OPEN, f"{failures:.0%} of recent calls failed")
+            elif slow_calls >= self.slow_call_rate:
+                self._transition(OPEN, f"{slow_calls:.0%} of recent calls exceeded {self.budget_ms:.0f}ms")
+
+    def status(self) -> Dict:
+        with self._lock:
+            calls = len(self.window)
+            status = {
+                'state': self.state,
+                'budget_ms': self.budget_ms,
+                'calls': calls,
+                'failure_rate': round(sum(1 for failed, _ in self.window if failed) / calls, 3) if calls else 0.0,
+                'slow_call_rate': round(sum(1 for _, slow in self.window if slow) / calls, 3) if calls else 0.0,
+                'rejected': self.rejected,
+                'last_reason': self.last_reason
+            }
+            if self.state == OPEN:
+                status['retry_after_seconds'] = round(
+                    max(self.opened_at + self.open_seconds - time.monotonic(), 0.0), 1
+                )
+            return status
+
+
+class CircuitBreakerRegistry:
+    """One breaker per operation category, created on first use."""
+
+    def __init__(self, budgets_ms: Optional[Dict[str, float]] = None):
+        self.budgets_ms = dict(budgets_ms or CIRCUIT_BUDGETS_MS)
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, category: str) -> CircuitBreaker:
+        breaker = self.breakers.get(category)
+        if breaker is None:
+            with self._lock:
+                breaker = self.breakers.get(category)
+                if breaker is None:
+                    budget = self.budgets_ms.get(category, max(self.budgets_ms.values()))
+                    breaker = self.breakers[category] = CircuitBreaker(category, budget)
+        return breaker
+
+    @contextmanager
+    def guard(self, category: Optional[str]):
+        """
+        Run a block as a call of a category's circuit.
+
+        Blocks nested in a guarded block pass through, so an operation that
+        calls another one is counted once.
+
+        Raises:
+            CircuitOpenError: If the category's circuit rejects the call
+        """
+        if not ENABLE_CIRCUIT_BREAKER or category is None or _guarded.get():
+            yield
+            return
+        breaker = self.get(category)
+        breaker.before_call()
+        token = _guarded.set(True)
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException as e:
+            failed = is_backend_failure(e)
+            raise
+        finally:
+            _guarded.reset(token)
+            breaker.after_call((time.perf_counter() - start) * 1000, failed)
+
+    def status(self) -> Dict[str, Dict]:
+        return {name: breaker.status() for name, breaker in list(self.breakers.items())}
+
+
+# Singleton instance shared by Engine and AsyncEngine
+circuit_breakers = CircuitBreakerRegistry()
@@ -13,11 +13,13 @@ import platform
 import psutil
 import time
 from datetime import datetime, timedelta
-from flask import Flask, request, jsonify, Blueprint
+from flask import Flask, Response, request, jsonify, Blueprint, stream_with_context
 from typing import Dict, List, Optional
 
 from .logger import get_logger, performance_monitor
 from .network import network_diagnostics, test_es_connection
+from .log_tail import tail_log, parse_time_bound
+from .system_sampler import system_sampler, parse_duration
 
 logger = get_logger('diagnostics')
 
@@ -32,6 +34,19 @@ diagnostic_history = {
 # Maximum history items to store
 MAX_HISTORY_ITEMS = 20
 
+# (pid, create time) of the process serving requests, resolved on first use so
+# forked workers do not report the start time of the preloading master
+_process_start: Optional[tuple] = None
+
+
+def get_process_start_time() -> float:
+    """Start time of the current process as a UNIX timestamp."""
+    global _process_start
+    pid = os.getpid()
+    if _process_start is None or _process_start[0] != pid:
+        _process_start = (pid, psutil.Process(pid).create_time())
+    return _process_start[1]
+
 def register_diagnostic_endpoints(app: Flask) -> Blueprint:
     """
     Register diagnostic endpoints with the Flask app.
@@ -45,6 +60,11 @@ def register_diagnostic_endpoints(app: Flask) -> Blueprint:
     logger.info("Registering diagnostic endpoints")
     diagnostics_bp = Blueprint('diagnostics', __name__, url_prefix='/diagnostic')
     
+    # Start sampling in the process serving requests, never in a preloading master
+    @diagnostics_bp.before_app_request
+    def start_system_sampler():
+        system_sampler.ensure_running()
+    
     # Add explicit after_request handler for CORS on diagnostic blueprint
     @diagnostics_bp.after_request
     def add_cors_headers(response):
@@ -167,6 +187,14 @@ def register_diagnostic_endpoints(app: Flask) -> Blueprint:
         """System diagnostic endpoint with detailed stats."""
         stats = get_system_stats(detailed=True)
         
+        # Summarize the sampled history when a window is requested (e.g. ?window=5m)
+        window = request.args.get('window')
+        if window:
+            try:
+                stats["history"] = system_sampler.summarize(parse_duration(window))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        
         # Store system stats in history
         if len(diagnostic_history['system_stats']) >= MAX_HISTORY_ITEMS:
             diagnostic_history['system_stats'].pop(0)
@@ -210,20 +238,43 @@ def register_diagnostic_endpoints(app: Flask) -> Blueprint:
                 "elasticsearch.com" # Elasticsearch main site
             ]
         
-        # Run diagnostics
-        results = network_diagnostics.run_full_diagnostics(targets)
+        try:
+            deadline = float(request.args['deadline']) if request.args.get('deadline') else None
+        except ValueError:
+            return jsonify({"error": "Invalid deadline"}), 400
+        use_cache = request.args.get('refresh', 'false').lower() != 'true'
+        
+        def record_history(timestamp: str, tests: Dict) -> None:
+            # Store diagnostics in history
+            if len(diagnostic_history['network_tests']) >= MAX_HISTORY_ITEMS:
+                diagnostic_history['network_tests'].pop(0)
+            diagnostic_history['network_tests'].append({
+                "timestamp": timestamp,
+                "targets_tested": len(targets),
+                "successful_connections": sum(1 for target, data in tests.items()
+                                            if "http" in data and data["http"]["success"])
+            })
         
-        # Store diagnostics in history
-        if len(diagnostic_history['network_tests']) >= MAX_HISTORY_ITEMS:
-            diagnostic_history['network_tests'].pop(0)
+        # Stream partial results as NDJSON when requested
+        if (request.args.get('stream', 'false').lower() == 'true'
+                or 'application/x-ndjson' in request.headers.get('Accept', '')):
+            def generate():
+                timestamp = None
+                tests = {target: {} for target in targets}
+                for event in network_diagnostics.iter_full_diagnostics(targets, deadline, use_cache):
+                    if event["type"] == "start":
+                        timestamp = event["timestamp"]
+                    elif event["type"] == "result":
+                        tests[event["target"]][event["probe"]] = event["result"]
+                    else:
+                        record_history(timestamp, tests)
+                    yield json.dumps(event, default=str) + "\n"
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
         
-        summary = {
-            "timestamp": results["timestamp"],
-            "targets_tested": len(targets),
-            "successful_connections": sum(1 for target, data in results["tests"].items() 
-                                        if "http" in data and data["http"]["success"])
-        }
-        diagnostic_history['network_tests'].append(summary)
+        # Run diagnostics
+        results = network_diagnostics.run_full_diagnostics(targets, deadline, use_cache)
+        record_history(results["timestamp"], results["tests"])
         
         return jsonify(results)
     
@@ -249,25 +300,21 @@ def register_diagnostic_endpoints(app: Flask) -> Blueprint:
         log_dir = os.getenv('LOG_DIR', 'logs')
         error_log_file = f"{log_dir}/error.log"
         
-        errors = []
-        
-        if os.path.exists(error_log_file):
-            try:
-                with open(error_log_file, 'r') as f:
-                    lines = f.readlines()
-                    for line in lines[-limit:]:
-                        try:
-                            # Try to parse as JSON
-                            error = json.loads(line)
-                            errors.append(error)
-                        except json.JSONDecodeError:
-                            # Handle non-JSON log format
-                            errors.append({"raw": line.strip()})
-            except Exception as e:
-                logger.error(f"Failed to read error log: {str(e)}")
-                return jsonify({
-                    "error": f"Failed to read error log: {str(e)}"
-                }), 500
+        try:
+            errors = tail_log(
+                error_log_file,
+                limit,
+                since=parse_time_bound(request.args.get('since')),
+                until=parse_time_bound(request.args.get('until')),
+                request_id=request.args.get('request_id')
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            logger.error(f"Failed to read error log: {str(e)}")
+            return jsonify({
+                "error": f"Failed to read error log: {str(e)}"
+            }), 500
         
         return jsonify({
             "errors": errors,
@@ -369,18 +416,10 @@ def register_diagnostic_endpoints(app: Flask) -> Blueprint:
         log_dir = os.getenv('LOG_DIR', 'logs')
         error_log_file = f"{log_dir}/error.log"
         
-        if os.path.exists(error_log_file):
-            try:
-                with open(error_log_file, 'r') as f:
-                    lines = f.readlines()
-                    for line in lines[-10:]:  # Last 10 errors
-                        try:
-                            error = json.loads(line)
-                            report["recent_errors"].append(error)
-                        except json.JSONDecodeError:
-                            report["recent_errors"].append({"raw": line.strip()})
-            except Exception as e:
-                logger.error(f"Failed to read error log: {str(e)}")
+        try:
+            report["recent_errors"] = tail_log(error_log_file, 10)  # Last 10 errors
+        except Exception as e:
+            logger.error(f"Failed to read error log: {str(e)}")
         
         # Add diagnostic history
         report["history"] = diagnostic_history
@@ -430,45 +469,48 @@ def get_system_stats(detailed: bool = False) -> Dict:
     Returns:
         Dict containing system stats
     """
+    sample = system_sampler.latest()
     stats = {
         "hostname": socket.gethostname(),
         "platform": platform.system(),
         "platform_version": platform.version(),
         "python_version": platform.python_version(),
+        "sampled_at": datetime.utcfromtimestamp(sample["time"]).isoformat(),
         "cpu": {
             "count": psutil.cpu_count(),
-            "percent": psutil.cpu_percent(interval=0.1)
+            "percent": sample["cpu_percent"]
         },
         "memory": {
-            "total": psutil.virtual_memory().total,
-            "available": psutil.virtual_memory().available,
-            "used": psutil.virtual_memory().used,
-            "percent_used": psutil.virtual_memory().percent
+            "total": sample["memory_total"],
+            "available": sample["memory_available"],
+            "used": sample["memory_used"],
+            "percent_used": sample["memory_percent"]
         },
         "disk": {
-            "total": psutil.disk_usage('/').total,
-            "used": psutil.disk_usage('/').used,
-            "free": psutil.disk_usage('/').free,
-            "percent_used": psutil.disk_usage('/').percent
+            "total": sample["disk_total"],
+            "used": sample["disk_used"],
+            "free": sample["disk_free"],
+            "percent_used": sample["disk_percent"]
         },
         "process": {
-            "pid": os.getpid(),
-            "memory_used": psutil.Process(os.getpid()).memory_info().rss,
-            "cpu_percent": psutil.Process(os.getpid()).cpu_percent(interval=0.1),
-            "threads": len(psutil.Process(os.getpid()).threads())
+            "pid": sample["process_pid"],
+            "memory_used": sample["process_memory_rss"],
+            "cpu_percent": sample["process_cpu_percent"],
+            "threads": sample["process_threads"]
         },
         "uptime": {
             "system": time.time() - psutil.boot_time(),
-            "process": time.time() - psutil.Process(os.getpid()).create_time()
+            "process": time.time() - get_process_start_time()
         }
     }
     
     if detailed:
         # Add more detailed system information
+        swap = psutil.swap_memory()
         stats["memory"]["swap"] = {
-            "total": psutil.swap_memory().total,
-            "used": psutil.swap_memory().used,
-            "percent": psutil.swap_memory().percent
+            "total": swap.total,
+            "used": swap.used,
+            "percent": swap.percent
         }
         
         # Get network interfaces
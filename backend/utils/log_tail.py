@@ -0,0 +1,174 @@
+"""
+Reverse log tailing.
+
+This module reads log files backwards in fixed-size blocks from the end,
+filtering entries as they are read, and continues into rotated backups
+(backend.log.1, backend.log.2, ...) when more history is needed. Reading the
+last N entries costs O(N) rather than O(file size).
+"""
+
+import os
+import re
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+# Size of the blocks read backwards from the end of a file
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# Upper bound on lines examined per request when filters match little
+LOG_TAIL_MAX_SCAN = int(os.getenv('LOG_TAIL_MAX_SCAN', '200000'))
+
+# Text log lines: '%(asctime)s - %(levelname)s - [%(request_id)s] - %(name)s - %(message)s'
+TEXT_LINE_PATTERN = re.compile(
+    r'^(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - (?P<level>[A-Z]+) - '
+    r'\[(?P<request_id>[^\]]*)\] - (?P<logger>\S+) - (?P<message>.*)$'
+)
+
+RELATIVE_TIME_PATTERN = re.compile(r'^(\d+)([smhd])$')
+RELATIVE_TIME_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}
+
+
+def read_lines_reverse(path: str, block_size: int = TAIL_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Yield the lines of a file from last to first.
+
+    Args:
+        path: File to read
+        block_size: Number of bytes read per seek
+
+    Yields:
+        str: Lines without their trailing newline
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b''
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + remainder
+            lines = block.split(b'\n')
+            # the first piece may continue in the previous block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode('utf-8', errors='replace').rstrip('\r')
+        if remainder.strip():
+            yield remainder.decode('utf-8', errors='replace').rstrip('\r')
+
+
+def log_files(path: str) -> List[str]:
+    """The log file followed by its existing rotated backups, newest first."""
+    files = [path] if os.path.exists(path) else []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        files.append(f"{path}.{index}")
+        index += 1
+    return files
+
+
+def parse_entry(line: str) -> Dict:
+    """Parse a JSON or text log line into a dictionary."""
+    try:
+        entry = json.loads(line)
+        if isinstance(entry, dict):
+            return entry
+    except json.JSONDecodeError:
+        pass
+    match = TEXT_LINE_PATTERN.match(line)
+    if match:
+        entry = match.groupdict()
+        entry['raw'] = line
+        return entry
+    return {"raw": line}
+
+
+def parse_time_bound(value: Optional[str], now: Optional[datetime] = None) -> Optional[str]:
+    """
+    Parse a relative ('15m', '2h', '1d') or ISO time into a comparable ISO string.
+
+    Returns:
+        Optional[str]: ISO timestamp (UTC for relative bounds), or None
+    """
+    if not value:
+        return None
+    match = RELATIVE_TIME_PATTERN.match(value.strip())
+    if match:
+        now = now or datetime.utcnow()
+        delta = timedelta(**{RELATIVE_TIME_UNITS[match.group(2)]: int(match.group(1))})
+        return (now - delta).isoformat()
+    try:
+        return datetime.fromisoformat(value.strip().replace('Z', '')).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid time: {value}")
+
+
+def _entry_timestamp(entry: Dict) -> Optional[str]:
+    timestamp = entry.get('timestamp')
+    return timestamp.replace(' ', 'T') if isinstance(timestamp, str) else None
+
+
+def tail_log(
+    path: str,
+    count: int = 100,
+    min_level: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    request_id: Optional[str] = None,
+    follow_rotated: bool = True,
+    max_scan: int = LOG_TAIL_MAX_SCAN
+) -> List[Dict]:
+    """
+    Get the last matching entries of a log file.
+
+    Args:
+        path: Log file path
+        count: Maximum number of entries to return
+        min_level: Minimum level name (e.g. 'WARNING')
+        since: Only entries at or after this ISO time
+        until: Only entries at or before this ISO time
+        request_id: Only entries of this request
+        follow_rotated: Continue into rotated backups when more entries are needed
+        max_scan: Maximum number of lines examined
+
+    Returns:
+        List[Dict]: Matching entries in chronological order
+    """
+    min_levelno = logging.getLevelName(min_level.upper()) if min_level else None
+    if min_levelno is not None and not isinstance(min_levelno, int):
+        raise ValueError(f"Invalid level: {min_level}")
+
+    files = log_files(path)
+    if not follow_rotated:
+        files = files[:1]
+
+    entries: List[Dict] = []
+    scanned = 0
+    for file_path in files:
+        for line in read_lines_reverse(file_path):
+            scanned += 1
+            if scanned > max_scan:
+                return list(reversed(entries))
+
+            entry = parse_entry(line)
+            timestamp = _entry_timestamp(entry)
+            if timestamp is not None:
+                if until and timestamp > until:
+                    continue
+                if since and timestamp < since:
+                    # files are chronological: everything further back is older
+                    return list(reversed(entries))
+            if min_levelno is not None:
+                levelno = logging.getLevelName(str(entry.get('level', '')).upper())
+                if not isinstance(levelno, int) or levelno < min_levelno:
+                    continue
+            if request_id and entry.get('request_id') != request_id:
+                continue
+
+            entries.append(entry)
+            if len(entries) >= count:
+                return list(reversed(entries))
+    return list(reversed(entries))
@@ -7,10 +7,18 @@ import uuid
 import traceback
 import socket
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from functools import wraps
-from flask import request, g, Flask, Blueprint
+from flask import request, g, Flask, Blueprint, has_app_context
 import threading
+import queue
+import atexit
+import psutil
+from collections import OrderedDict
+from contextvars import ContextVar
+from .performance import PerformanceStore
+from .log_tail import tail_log, parse_time_bound
+from .metrics import operation_duration_seconds
 
 # Environment configuration
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
@@ -19,128 +27,113 @@ ENABLE_REQUEST_LOGGING = os.getenv('ENABLE_REQUEST_LOGGING', 'true').lower() ==
 ENABLE_PERFORMANCE_LOGGING = os.getenv('ENABLE_PERFORMANCE_LOGGING', 'true').lower() == 'true'
 LOG_DIR = os.getenv('LOG_DIR', 'logs')
 SERVICE_NAME = os.getenv('SERVICE_NAME', 'financial-news-engine')
-# Max number of consecutive duplicate log messages to allow before suppressing
+# Max number of duplicate log messages to allow per window before suppressing
 MAX_CONSECUTIVE_DUPLICATES = int(os.getenv('MAX_CONSECUTIVE_DUPLICATES', '1'))
+# Length of the duplicate suppression window in seconds
+DUPLICATE_WINDOW_SECONDS = float(os.getenv('DUPLICATE_WINDOW_SECONDS', '60'))
+# Maximum number of message fingerprints remembered by the duplicate filter
+DUPLICATE_CACHE_SIZE = int(os.getenv('DUPLICATE_CACHE_SIZE', '1024'))
+# Maximum records waiting for the log writer thread
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# What happens when the log queue is full: 'drop_new', 'drop_oldest' or 'block'
+LOG_QUEUE_OVERFLOW = os.getenv('LOG_QUEUE_OVERFLOW', 'drop_new').lower()
+HOSTNAME = socket.gethostname()
 
-# Create logs directory if it doesn't exist
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
-
-# Configure the root logger
-root_logger = logging.getLogger()
-root_logger.setLevel(getattr(logging, LOG_LEVEL))
-
-# Clear existing handlers
-for handler in root_logger.handlers[:]:
-    root_logger.removeHandler(handler)
-
-# Create handlers
+# Create handlers (the file handlers open their files on the first record)
 console_handler = logging.StreamHandler(sys.stdout)
 file_handler = RotatingFileHandler(
     f"{LOG_DIR}/backend.log", 
     maxBytes=10*1024*1024,  # 10 MB
-    backupCount=5
+    backupCount=5,
+    delay=True  # opened by the log writer thread on the first record
 )
 debug_file_handler = RotatingFileHandler(
     f"{LOG_DIR}/debug.log", 
     maxBytes=20*1024*1024,  # 20 MB
-    backupCount=10
+    backupCount=10,
+    delay=True
 )
 error_file_handler = RotatingFileHandler(
     f"{LOG_DIR}/error.log", 
     maxBytes=10*1024*1024,  # 10 MB
-    backupCount=10
+    backupCount=10,
+    delay=True
 )
 
-# Filter for deduplicating consecutive identical log messages
+# Filter for deduplicating identical log messages
 class DuplicateFilter(logging.Filter):
-    """Filter that prevents logging the same message consecutively more than MAX_CONSECUTIVE_DUPLICATES times."""
+    """
+    Filter that allows each message at most MAX_CONSECUTIVE_DUPLICATES times per window.
+    
+    Messages are identified by a hash of their level, text, module and
+    function, plus the exception type and innermost frame for errors, so no
+    message text or traceback is kept. Fingerprints live in a bounded LRU,
+    which keeps memory flat regardless of how many distinct messages a
+    long-running worker logs. The first message after a window reports how
+    many copies were suppressed.
+    """
     
-    def __init__(self):
+    def __init__(self, max_duplicates=MAX_CONSECUTIVE_DUPLICATES,
+                 window_seconds=DUPLICATE_WINDOW_SECONDS, max_entries=DUPLICATE_CACHE_SIZE):
         super().__init__()
-        self.last_log = {}  # Dict to track last log per thread
-        self.repeat_count = {}  # Count of repetitions
-        # Store the last suppressed message count to report on the next different message
-        self.last_suppressed = {}
+        self.max_duplicates = max_duplicates
+        self.window_seconds = window_seconds
+        self.max_entries = max(max_entries, 1)
+        # fingerprint -> [window start, count in window, suppressed in window]
+        self.entries = OrderedDict()
+        self.suppressed_total = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def fingerprint(record):
+        """Hash identifying a log message without formatting its traceback."""
+        exception = None
+        if record.exc_info and record.exc_info[0] is not None:
+            tb = record.exc_info[2]
+            while tb is not None and tb.tb_next is not None:
+                tb = tb.tb_next
+            frame = (tb.tb_frame.f_code.co_filename, tb.tb_lineno) if tb is not None else None
+            exception = (record.exc_info[0].__name__, frame)
+        return hash((record.levelno, record.getMessage(), record.module, record.funcName, exception))
     
     def filter(self, record):
-        # Create a key that uniquely identifies this log message
-        # Include thread to avoid false suppression between threads
-        thread_id = threading.get_ident()
-        
-        # Create message key (level + message + module + function)
-        msg_key = f"{record.levelno}:{record.getMessage()}:{record.module}:{record.funcName}"
+        key = self.fingerprint(record)
+        now = record.created
         
-        # Special handling for specific known errors like "ImportError: cannot import name 'WebScraper'"
-        if record.exc_info and record.levelno >= logging.ERROR:
-            if isinstance(record.exc_info[1], ImportError) and "WebScraper" in str(record.exc_info[1]):
-                # Don't include the traceback for these specific import errors
-                # as they may have different line numbers but are the same error
-                msg_key = f"ImportError:WebScraper:{record.module}:{record.funcName}"
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or now - entry[0] >= self.window_seconds:
+                suppressed = entry[2] if entry is not None else 0
+                self.entries[key] = [now, 1, 0]
+                self.entries.move_to_end(key)
+                if len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
             else:
-                # For other errors, include the traceback to uniquely identify the error
-                tb_str = "".join(traceback.format_exception(*record.exc_info))
-                msg_key += f":{tb_str}"
-        
-        # Thread-specific tracking key
-        track_key = f"{thread_id}:{msg_key}"
-        
-        # If this is a repeat of the last message
-        if track_key in self.last_log:
-            self.repeat_count[track_key] += 1
-            
-            # Only log the first MAX_CONSECUTIVE_DUPLICATES occurrences
-            if self.repeat_count[track_key] <= MAX_CONSECUTIVE_DUPLICATES:
-                return True
-            
-            # For every 100th occurrence after suppression starts, log a summary
-            if self.repeat_count[track_key] % 100 == 0:
-                record.msg = f"Previous message repeated {self.repeat_count[track_key]} times: {record.msg}"
+                self.entries.move_to_end(key)
+                entry[1] += 1
+                if entry[1] <= self.max_duplicates:
+                    return True
+                entry[2] += 1
+                self.suppressed_total += 1
+                # Let every 100th duplicate through as a summary
+                if entry[2] % 100 != 0:
+                    return False
+                suppressed = entry[2]
+                record.msg = f"Previous message repeated {suppressed} times: {record.msg}"
                 return True
-                
-            # Remember this for the next different message
-            self.last_suppressed[thread_id] = track_key
-            
-            # Suppress this duplicate
-            return False
-        else:
-            # Check if we just finished a series of duplicates
-            if thread_id in self.last_suppressed:
-                old_key = self.last_suppressed[thread_id]
-                old_count = self.repeat_count.pop(old_key, 0)
-                
-                if old_count > MAX_CONSECUTIVE_DUPLICATES:
-                    # The previous message type was suppressed, insert a summary before the new message
-                    old_msg_parts = old_key.split(':', 2)
-                    level = int(old_msg_parts[1]) if len(old_msg_parts) > 1 else logging.INFO
-                    old_msg = old_msg_parts[2] if len(old_msg_parts) > 2 else "unknown message"
-                    
-                    # For specific import errors, customize the message
-                    if "ImportError:WebScraper" in old_key:
-                        old_msg = "ImportError: cannot import name 'WebScraper' from 'scraper'"
-                    
-                    # Log a summary message then continue with the new message
-                    summary_record = logging.LogRecord(
-                        name=record.name,
-                        level=level,
-                        pathname=record.pathname,
-                        lineno=record.lineno,
-                        msg=f"Previous message was suppressed, occurred {old_count} times: {old_msg}",
-                        args=(),
-                        exc_info=None
-                    )
-                    logger = logging.getLogger(record.name)
-                    logger.handle(summary_record)
-                
-                # Clear this key
-                del self.last_suppressed[thread_id]
-                if old_key in self.last_log:
-                    del self.last_log[old_key]
-            
-            # New message, reset counter
-            self.last_log[track_key] = time.time()
-            self.repeat_count[track_key] = 1
-            return True
+        
+        if suppressed:
+            record.msg = f"{record.msg} (suppressed {suppressed} duplicates in the previous {self.window_seconds:g}s)"
+        return True
+    
+    def get_stats(self):
+        with self._lock:
+            return {
+                "tracked_messages": len(self.entries),
+                "max_tracked_messages": self.max_entries,
+                "window_seconds": self.window_seconds,
+                "suppressed_total": self.suppressed_total
+            }
 
 # Set log levels
 console_handler.setLevel(getattr(logging, LOG_LEVEL))
@@ -152,22 +145,25 @@ error_file_handler.setLevel(logging.ERROR)
 if LOG_FORMAT.lower() == 'json':
     class JsonFormatter(logging.Formatter):
         def format(self, record):
+            # Records are formatted on the log writer thread, so everything
+            # comes from the record rather than the current thread or request
             log_data = {
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
                 "level": record.levelname,
                 "message": record.getMessage(),
                 "module": record.module,
                 "function": record.funcName,
                 "line": record.lineno,
                 "service": SERVICE_NAME,
-                "hostname": socket.gethostname(),
-                "thread": threading.current_thread().name,
-                "process": os.getpid(),
+                "hostname": HOSTNAME,
+                "thread": record.threadName,
+                "process": record.process,
             }
             
             # Add request_id if available
-            if hasattr(g, 'request_id'):
-                log_data["request_id"] = g.request_id
+            request_id = getattr(record, 'request_id', 'no-request-id')
+            if request_id != 'no-request-id':
+                log_data["request_id"] = request_id
             
             # Add extra fields from the log record
             if hasattr(record, 'extra'):
@@ -190,36 +186,170 @@ else:
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
-# Apply formatter to handlers
-console_handler.setFormatter(formatter)
-file_handler.setFormatter(formatter)
-debug_file_handler.setFormatter(formatter)
-error_file_handler.setFormatter(formatter)
+class CachingFormatter(logging.Formatter):
+    """Formats a record once and reuses the text for every handler sharing this formatter."""
+    
+    def __init__(self, formatter):
+        super().__init__()
+        self.formatter = formatter
+    
+    def format(self, record):
+        formatted = record.__dict__.get('formatted_message')
+        if formatted is None:
+            formatted = self.formatter.format(record)
+            record.formatted_message = formatted
+        return formatted
 
-# Add handlers to the root logger
-root_logger.addHandler(console_handler)
-root_logger.addHandler(file_handler)
-root_logger.addHandler(debug_file_handler)
-root_logger.addHandler(error_file_handler)
+# Apply the shared formatter to handlers
+shared_formatter = CachingFormatter(formatter)
+console_handler.setFormatter(shared_formatter)
+file_handler.setFormatter(shared_formatter)
+debug_file_handler.setFormatter(shared_formatter)
+error_file_handler.setFormatter(shared_formatter)
 
-# Create a specific logger for the application
-logger = logging.getLogger('search_engine_backend')
-logger.setLevel(getattr(logging, LOG_LEVEL))
+# Request ID of requests served outside Flask (the ASGI app's native routes)
+request_id_var: ContextVar[str] = ContextVar('request_id', default='no-request-id')
 
-# Add duplicate filter to file handlers (especially for error logs)
-duplicate_filter = DuplicateFilter()
-file_handler.addFilter(duplicate_filter)
-error_file_handler.addFilter(duplicate_filter)
-debug_file_handler.addFilter(duplicate_filter)
+def current_request_id():
+    """Get the request ID of the current request, if any."""
+    if has_app_context():
+        return getattr(g, 'request_id', 'no-request-id')
+    return request_id_var.get()
 
 # Add request_id filter to all loggers
 class RequestIdFilter(logging.Filter):
     def filter(self, record):
-        record.request_id = getattr(g, 'request_id', 'no-request-id')
+        record.request_id = current_request_id()
         return True
 
-for handler in root_logger.handlers:
-    handler.addFilter(RequestIdFilter())
+class SuppressDuplicatesFilter(logging.Filter):
+    """Drops records the duplicate filter marked as suppressed."""
+    
+    def filter(self, record):
+        return not getattr(record, 'duplicate', False)
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Queue handler that hands records to the log writer thread.
+    
+    Only the request ID and the message text are resolved on the calling
+    thread; formatting and file I/O happen on the writer thread. When the
+    queue is full LOG_QUEUE_OVERFLOW decides whether the new record or the
+    oldest queued record is dropped, or whether the caller blocks.
+    """
+    
+    def __init__(self, log_queue, overflow=LOG_QUEUE_OVERFLOW):
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self.addFilter(RequestIdFilter())
+    
+    def prepare(self, record):
+        # Resolve the message now (arguments may change later), but keep
+        # exc_info so the writer thread formats the traceback only once
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        
+        if self.overflow == 'block' and threading.current_thread() is not log_listener._thread:
+            self.queue.put(record)
+            return
+        
+        self.dropped += 1
+        if self.overflow == 'drop_oldest':
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+
+class LogListener(QueueListener):
+    """Writes queued records, applying the duplicate filter once per record."""
+    
+    def handle(self, record):
+        record = self.prepare(record)
+        record.duplicate = not duplicate_filter.filter(record)
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+# Add duplicate filter to file handlers (especially for error logs)
+duplicate_filter = DuplicateFilter()
+for handler in (file_handler, debug_file_handler, error_file_handler):
+    handler.addFilter(SuppressDuplicatesFilter())
+
+# Only the queue handler runs on the logging thread; the writer thread owns the sinks
+log_queue = queue.Queue(maxsize=max(LOG_QUEUE_SIZE, 1))
+queue_handler = BoundedQueueHandler(log_queue)
+log_listener = LogListener(log_queue, console_handler, file_handler, debug_file_handler, error_file_handler)
+
+def _restart_log_listener():
+    """Give a forked worker its own queue and writer thread."""
+    global log_queue, log_listener
+    log_queue = queue.Queue(maxsize=max(LOG_QUEUE_SIZE, 1))
+    queue_handler.queue = log_queue
+    log_listener = LogListener(log_queue, console_handler, file_handler, debug_file_handler, error_file_handler)
+    log_listener.start()
+
+def stop_log_listener():
+    """Flush queued records and stop the writer thread."""
+    if log_listener._thread is not None:
+        log_listener.stop()
+
+# Create a specific logger for the application
+logger = logging.getLogger('search_engine_backend')
+
+_logging_initialized = False
+_logging_init_lock = threading.Lock()
+
+def init_logging():
+    """
+    Route all logging through the log writer thread.
+    
+    Creates LOG_DIR, replaces the root logger's handlers with the queue
+    handler and starts the writer thread, which is restarted in forked
+    workers and flushed at exit. The server entry points call this once;
+    importing this module configures nothing. Later calls do nothing.
+    """
+    global _logging_initialized
+    with _logging_init_lock:
+        if _logging_initialized:
+            return
+        os.makedirs(LOG_DIR, exist_ok=True)
+        
+        root_logger = logging.getLogger()
+        root_logger.setLevel(getattr(logging, LOG_LEVEL))
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+        root_logger.addHandler(queue_handler)
+        logger.setLevel(getattr(logging, LOG_LEVEL))
+        
+        log_listener.start()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=_restart_log_listener)
+        atexit.register(stop_log_listener)
+        _logging_initialized = True
+    
+    logger.info(f"Logger initialized with level {LOG_LEVEL} and format {LOG_FORMAT}")
+
+def get_logging_stats():
+    """Get statistics about the logging queue."""
+    return {
+        "queue_size": log_queue.qsize(),
+        "queue_capacity": log_queue.maxsize,
+        "overflow_policy": queue_handler.overflow,
+        "dropped_records": queue_handler.dropped,
+        "writer_alive": log_listener._thread is not None and log_listener._thread.is_alive(),
+        "duplicates": duplicate_filter.get_stats()
+    }
 
 def get_logger(name=None):
     """Get a logger with the specified name."""
@@ -227,8 +357,8 @@ def get_logger(name=None):
         return logging.getLogger(f"{SERVICE_NAME}.{name}")
     return logger
 
-# Performance monitoring
-performance_data = {}
+# Performance monitoring: bounded recent samples and per-operation histograms
+performance_data = PerformanceStore()
 
 def log_performance(name, elapsed_ms, metadata=None):
     """Log performance data for a specific operation."""
@@ -238,8 +368,9 @@ def log_performance(name, elapsed_ms, metadata=None):
     metadata = metadata or {}
     
     # Add request_id if available
-    if hasattr(g, 'request_id'):
-        metadata['request_id'] = g.request_id
+    request_id = current_request_id()
+    if request_id != 'no-request-id':
+        metadata['request_id'] = request_id
     
     logger.info(
         f"Performance: {name} took {elapsed_ms:.2f}ms", 
@@ -255,18 +386,7 @@ def log_performance(name, elapsed_ms, metadata=None):
     )
     
     # Store in memory for the /debug/performance endpoint
-    global performance_data
-    request_id = getattr(g, 'request_id', 'no-request-id')
-    
-    if request_id not in performance_data:
-        performance_data[request_id] = []
-    
-    performance_data[request_id].append({
-        'operation': name,
-        'elapsed_ms': elapsed_ms,
-        'timestamp': datetime.utcnow().isoformat(),
-        **metadata
-    })
+    performance_data.record(name, elapsed_ms, metadata)
 
 def performance_monitor(name=None):
     """Decorator to monitor the performance of a function."""
@@ -274,9 +394,10 @@ def performance_monitor(name=None):
         @wraps(func)
         def wrapper(*args, **kwargs):
             operation_name = name or func.__name__
-            start_time = time.time()
+            start_time = time.perf_counter()
             result = func(*args, **kwargs)
-            elapsed_ms = (time.time() - start_time) * 1000
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            operation_duration_seconds.labels(operation=operation_name).observe(elapsed_ms / 1000)
             log_performance(operation_name, elapsed_ms)
             return result
         return wrapper
@@ -312,7 +433,10 @@ def setup_request_logging(app):
     def after_request(response):
         if hasattr(g, 'start_time'):
             elapsed_ms = (time.time() - g.start_time) * 1000
-            log_performance(f"{request.method} {request.path}", elapsed_ms, {
+            # Keyed by URL rule: one histogram per route, not per article ID or 404 probe
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            log_performance(f"{request.method} {route}", elapsed_ms, {
+                'path': request.path,
                 'status_code': response.status_code,
                 'content_length': response.content_length
             })
@@ -355,6 +479,9 @@ def setup_request_logging(app):
             "timestamp": datetime.utcnow().isoformat()
         }, 500
 
+# Guards app.request_count / app.error_count, updated from every request thread
+_app_stats_lock = threading.Lock()
+
 def setup_debug_endpoints(app: Flask):
     """Add debugging endpoints to the Flask app."""
     debug_bp = Blueprint('debug', __name__, url_prefix='/debug')
@@ -396,22 +523,24 @@ def setup_debug_endpoints(app: Flask):
             if not os.path.exists(log_file):
                 return {"error": "Log file not found"}, 404
             
-            # Get the last 'count' lines from the log file
-            with open(log_file, 'r') as f:
-                lines = f.readlines()
-                lines = lines[-count:]
+            try:
+                entries = tail_log(
+                    log_file,
+                    count,
+                    min_level=request.args.get('min_level'),
+                    since=parse_time_bound(request.args.get('since')),
+                    until=parse_time_bound(request.args.get('until')),
+                    request_id=request.args.get('request_id'),
+                    follow_rotated=request.args.get('rotated', 'true').lower() == 'true'
+                )
+            except ValueError as e:
+                return {"error": str(e)}, 400
             
             # Parse JSON logs if using JSON format
             if LOG_FORMAT.lower() == 'json':
-                logs = []
-                for line in lines:
-                    try:
-                        logs.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        logs.append({"raw": line.strip()})
-                return {"logs": logs}
+                return {"logs": entries}
             else:
-                return {"logs": [line.strip() for line in lines]}
+                return {"logs": [entry.get('raw', '') for entry in entries]}
                 
         except Exception as e:
             logger.exception(f"Error retrieving logs: {str(e)}")
@@ -423,16 +552,11 @@ def setup_debug_endpoints(app: Flask):
             request_id = request.args.get('request_id')
             limit = min(int(request.args.get('limit', 100)), 1000)
             
-            if request_id:
-                data = performance_data.get(request_id, [])
-            else:
-                # Flatten all performance data, sorted by timestamp (newest first)
-                data = []
-                for req_data in performance_data.values():
-                    data.extend(req_data)
-                data.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-            
-            return {"performance_data": data[:limit]}
+            return {
+                "operations": performance_data.summaries(),
+                "performance_data": performance_data.recent(limit, request_id),
+                "buffer_size": performance_data.samples.maxlen
+            }
                 
         except Exception as e:
             logger.exception(f"Error retrieving performance data: {str(e)}")
@@ -452,11 +576,13 @@ def setup_debug_endpoints(app: Flask):
                 "thread_count": threading.active_count(),
                 "python_version": sys.version,
                 "memory_usage": {
-                    "rss": os.popen(f'ps -p {os.getpid()} -o rss=').read().strip()
+                    # KB, as reported by ps; /debug/memory has the full breakdown
+                    "rss": str(psutil.Process(os.getpid()).memory_info().rss // 1024)
                 },
                 "log_level": LOG_LEVEL,
                 "log_format": LOG_FORMAT,
                 "log_directory": LOG_DIR,
+                "log_queue": get_logging_stats(),
                 "configuration": {
                     "ENABLE_REQUEST_LOGGING": ENABLE_REQUEST_LOGGING,
                     "ENABLE_PERFORMANCE_LOGGING": ENABLE_PERFORMANCE_LOGGING
@@ -484,11 +610,13 @@ def setup_debug_endpoints(app: Flask):
     # Update request and error counters
     @app.before_request
     def count_request():
-        app.request_count = getattr(app, 'request_count', 0) + 1
+        with _app_stats_lock:
+            app.request_count = getattr(app, 'request_count', 0) + 1
     
     @app.errorhandler(Exception)
     def count_error(e):
-        app.error_count = getattr(app, 'error_count', 0) + 1
+        with _app_stats_lock:
+            app.error_count = getattr(app, 'error_count', 0) + 1
         # Re-raise to let other error handlers process it
         raise e
     
@@ -546,6 +674,3 @@ def log_elasticsearch_error(url, method, error):
             }
         }
     )
-
-# Initialize the logger when this module is loaded
-logger.info(f"Logger initialized with level {LOG_LEVEL} and format {LOG_FORMAT}") 
\ No newline at end of file
@@ -0,0 +1,361 @@
+"""
+Memory diagnostics.
+
+This module provides runtime control of tracemalloc (start, stop, snapshots,
+snapshot diffs with top allocation sites) and a registry of long-lived
+in-process structures whose entry counts and deep sizes can be reported,
+so worker memory growth can be investigated without a restart.
+"""
+
+import os
+import gc
+import sys
+import hmac
+import time
+import types
+import threading
+import tracemalloc
+from collections import OrderedDict, deque
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+import psutil
+from flask import Flask, jsonify, request
+
+from .logger import get_logger
+
+logger = get_logger('memory')
+
+ENABLE_MEMORY_DIAGNOSTICS = os.getenv('ENABLE_MEMORY_DIAGNOSTICS', 'false').lower() == 'true'
+# Secret the memory token header must carry; the endpoints stay off without one
+MEMORY_DIAGNOSTICS_TOKEN = os.getenv('MEMORY_DIAGNOSTICS_TOKEN')
+# Request header carrying MEMORY_DIAGNOSTICS_TOKEN
+MEMORY_TOKEN_HEADER = os.getenv('MEMORY_TOKEN_HEADER', 'X-Memory-Token')
+# Number of tracemalloc snapshots kept per process
+MEMORY_MAX_SNAPSHOTS = int(os.getenv('MEMORY_MAX_SNAPSHOTS', '5'))
+# Default number of frames tracemalloc records per allocation
+MEMORY_TRACE_FRAMES = int(os.getenv('MEMORY_TRACE_FRAMES', '1'))
+# Upper bound on objects visited when measuring one structure
+MEMORY_SIZEOF_MAX_OBJECTS = int(os.getenv('MEMORY_SIZEOF_MAX_OBJECTS', '200000'))
+
+# Allocations of the tracing machinery itself are left out of reports
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def deep_sizeof(obj: Any, max_objects: int = MEMORY_SIZEOF_MAX_OBJECTS) -> Dict:
+    """
+    Approximate the memory held by an object and everything it references.
+
+    Containers, dict values and object __dict__/__slots__ are followed; shared
+    objects are counted once. Modules, classes and functions are not followed.
+
+    Returns:
+        Dict with 'bytes', 'objects' and 'truncated' (True when max_objects was hit)
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        if len(seen) >= max_objects:
+            return {'bytes': total, 'objects': len(seen), 'truncated': True}
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, (type, types.ModuleType)) or callable(current):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current, 0)
+        if isinstance(current, (str, bytes, bytearray, int, float, bool)) or current is None:
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        else:
+            if hasattr(current, '__dict__'):
+                stack.append(vars(current))
+            for slot in getattr(type(current), '__slots__', ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return {'bytes': total, 'objects': len(seen), 'truncated': False}
+
+
+class StructureRegistry:
+    """Named long-lived structures reported by /debug/memory."""
+
+    def __init__(self):
+        self.structures: 'OrderedDict[str, Dict[str, Callable]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, getter: Callable[[], Any], stats: Optional[Callable[[], Dict]] = None) -> None:
+        """
+        Register a structure.
+
+        Args:
+            name: Name shown in reports
+            getter: Returns the structure to measure
+            stats: Optional callable returning extra statistics of the structure
+        """
+        with self._lock:
+            self.structures[name] = {'getter': getter, 'stats': stats}
+
+    def report(self, deep: bool = False) -> Dict[str, Dict]:
+        """Entry count, deep size and extra statistics of every registered structure."""
+        with self._lock:
+            structures = list(self.structures.items())
+        report = {}
+        for name, entry in structures:
+            try:
+                obj = entry['getter']()
+                info = {'type': type(obj).__name__}
+                if hasattr(obj, '__len__'):
+                    info['entries'] = len(obj)
+                if deep:
+                    start = time.perf_counter()
+                    info.update(deep_sizeof(obj))
+                    info['measure_ms'] = round((time.perf_counter() - start) * 1000, 3)
+                if entry['stats'] is not None:
+                    info['stats'] = entry['stats']()
+            except Exception as e:
+                # structures can change size while they are being walked
+                info = {'error': str(e)}
+            report[name] = info
+        return report
+
+
+class TracemallocManager:
+    """Starts and stops tracemalloc and keeps a few snapshots for comparison."""
+
+    def __init__(self, max_snapshots: int = MEMORY_MAX_SNAPSHOTS):
+        self.max_snapshots = max(max_snapshots, 1)
+        self.snapshots: 'OrderedDict[int, Dict]' = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def start(self, frames: int = MEMORY_TRACE_FRAMES) -> Dict:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(max(frames, 1))
+            logger.info(f"tracemalloc started with {frames} frames")
+        return self.status()
+
+    def stop(self) -> Dict:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+        with self._lock:
+            # snapshots keep their own traces; drop them with the tracing session
+            self.snapshots.clear()
+        return self.status()
+
+    def status(self) -> Dict:
+        tracing = tracemalloc.is_tracing()
+        status = {'tracing': tracing}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            status.update({
+                'frames': tracemalloc.get_traceback_limit(),
+                'traced_bytes': current,
+                'traced_peak_bytes': peak,
+                'overhead_bytes': tracemalloc.get_tracemalloc_memory()
+            })
+        with self._lock:
+            status['snapshots'] = [
+                {'id': snapshot_id, 'taken_at': entry['taken_at'], 'traced_bytes': entry['traced_bytes']}
+                for snapshot_id, entry in self.snapshots.items()
+            ]
+        return status
+
+    def take_snapshot(self) -> int:
+        """
+        Take a snapshot and keep it, dropping the oldest beyond the limit.
+
+        Raises:
+            RuntimeError: If tracemalloc is not tracing
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing")
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self.snapshots[snapshot_id] = {
+                'snapshot': snapshot,
+                'taken_at': datetime.utcnow().isoformat(),
+                'traced_bytes': tracemalloc.get_traced_memory()[0]
+            }
+            while len(self.snapshots) > self.max_snapshots:
+                self.snapshots.popitem(last=False)
+        return snapshot_id
+
+    def _get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        with self._lock:
+            entry = self.snapshots.get(snapshot_id)
+        if entry is None:
+            raise KeyError(f"Snapshot {snapshot_id} not found")
+        return entry['snapshot']
+
+    @staticmethod
+    def _format_stat(stat) -> Dict:
+        frame = stat.traceback[0]
+        return {
+            'file': frame.filename,
+            'line': frame.lineno,
+            'size_bytes': stat.size,
+            'count': stat.count,
+            'traceback': [f"{f.filename}:{f.lineno}" for f in stat.traceback] if len(stat.traceback) > 1 else None
+        }
+
+    def top(self, snapshot_id: int, group_by: str = 'lineno', limit: int = 25) -> List[Dict]:
+        """Top allocation sites of a snapshot."""
+        stats = self._get(snapshot_id).statistics(group_by)
+        return [self._format_stat(stat) for stat in stats[:limit]]
+
+    def diff(self, from_id: int, to_id: int, group_by: str = 'lineno', limit: int = 25) -> List[Dict]:
+        """Allocation sites that grew the most between two snapshots."""
+        stats = self._get(to_id).compare_to(self._get(from_id), group_by)
+        results = []
+        for stat in stats[:limit]:
+            result = self._format_stat(stat)
+            result['size_diff_bytes'] = stat.size_diff
+            result['count_diff'] = stat.count_diff
+            results.append(result)
+        return results
+
+
+# Singleton instances used by the /debug/memory endpoints
+structure_registry = StructureRegistry()
+tracemalloc_manager = TracemallocManager()
+
+
+def register_structure(name: str, getter: Callable[[], Any], stats: Optional[Callable[[], Dict]] = None) -> None:
+    """Register a long-lived structure with the memory report."""
+    structure_registry.register(name, getter, stats)
+
+
+def memory_request_authorized() -> bool:
+    """Whether the current request carries the memory diagnostics token."""
+    value = request.headers.get(MEMORY_TOKEN_HEADER)
+    if not value or not MEMORY_DIAGNOSTICS_TOKEN:
+        return False
+    return hmac.compare_digest(value.encode(), MEMORY_DIAGNOSTICS_TOKEN.encode())
+
+
+def require_memory_token(view):
+    """Reject requests to a memory endpoint without a valid token header."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not memory_request_authorized():
+            return jsonify({'error': f"A valid {MEMORY_TOKEN_HEADER} header is required"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def setup_memory_diagnostics(app: Flask) -> Flask:
+    """
+    Expose tracemalloc control and structure sizes under /debug/memory.
+
+    Every endpoint needs MEMORY_DIAGNOSTICS_TOKEN in the token header;
+    without a token the endpoints are not set up at all.
+    """
+    if not ENABLE_MEMORY_DIAGNOSTICS:
+        return app
+    if not MEMORY_DIAGNOSTICS_TOKEN:
+        logger.warning("ENABLE_MEMORY_DIAGNOSTICS is set but MEMORY_DIAGNOSTICS_TOKEN is not; memory diagnostics stay disabled")
+        return app
+
+    from .logger import performance_data, duplicate_filter
+    from .diagnostics import diagnostic_history
+    from .stream_hub import stream_hub
+    from .tracing import tracer
+
+    register_structure('performance_data', lambda: performance_data.samples,
+                       lambda: {'operations': len(performance_data.histograms)})
+    register_structure('duplicate_filter', lambda: duplicate_filter.entries, duplicate_filter.get_stats)
+    register_structure('diagnostic_history', lambda: diagnostic_history)
+    register_structure('stream_history', lambda: stream_hub.history, stream_hub.get_stats)
+    register_structure('traces', lambda: tracer.traces)
+
+    def parse_group_by():
+        group_by = request.args.get('group_by', 'lineno')
+        if group_by not in ('lineno', 'filename', 'traceback'):
+            raise ValueError("group_by must be lineno, filename or traceback")
+        return group_by, min(int(request.args.get('limit', 25)), 500)
+
+    @app.route('/debug/memory', methods=['GET'])
+    @require_memory_token
+    def memory_report():
+        process = psutil.Process(os.getpid())
+        memory_info = process.memory_info()
+        return jsonify({
+            'timestamp': datetime.utcnow().isoformat(),
+            'process': {'pid': process.pid, 'rss_bytes': memory_info.rss, 'vms_bytes': memory_info.vms},
+            'gc': {'counts': gc.get_count(), 'objects': len(gc.get_objects()) if request.args.get('gc') == 'true' else None},
+            'tracemalloc': tracemalloc_manager.status(),
+            'structures': structure_registry.report(deep=request.args.get('deep', 'false').lower() == 'true')
+        })
+
+    @app.route('/debug/memory/tracemalloc/start', methods=['POST'])
+    @require_memory_token
+    def start_tracemalloc():
+        try:
+            frames = int(request.args.get('frames', MEMORY_TRACE_FRAMES))
+        except ValueError:
+            return jsonify({'error': 'frames must be an integer'}), 400
+        return jsonify(tracemalloc_manager.start(min(frames, 64)))
+
+    @app.route('/debug/memory/tracemalloc/stop', methods=['POST'])
+    @require_memory_token
+    def stop_tracemalloc():
+        return jsonify(tracemalloc_manager.stop())
+
+    @app.route('/debug/memory/snapshots', methods=['POST'])
+    @require_memory_token
+    def take_snapshot():
+        try:
+            group_by, limit = parse_group_by()
+            snapshot_id = tracemalloc_manager.take_snapshot()
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 409
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'id': snapshot_id, 'top': tracemalloc_manager.top(snapshot_id, group_by, limit)})
+
+    @app.route('/debug/memory/snapshots/<int:snapshot_id>', methods=['GET'])
+    @require_memory_token
+    def get_snapshot(snapshot_id):
+        try:
+            group_by, limit = parse_group_by()
+            return jsonify({'id': snapshot_id, 'top': tracemalloc_manager.top(snapshot_id, group_by, limit)})
+        except KeyError as e:
+            return jsonify({'error': e.args[0]}), 404
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    @app.route('/debug/memory/diff', methods=['GET'])
+    @require_memory_token
+    def diff_snapshots():
+        """Compare two snapshots; 'to' defaults to a new snapshot taken now."""
+        if not request.args.get('from'):
+            return jsonify({'error': "'from' snapshot ID is required"}), 400
+        try:
+            group_by, limit = parse_group_by()
+            from_id = int(request.args['from'])
+            to_id = int(request.args['to']) if request.args.get('to') else tracemalloc_manager.take_snapshot()
+            return jsonify({
+                'from': from_id,
+                'to': to_id,
+                'top': tracemalloc_manager.diff(from_id, to_id, group_by, limit)
+            })
+        except KeyError as e:
+            return jsonify({'error': e.args[0]}), 404
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 409
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    return app
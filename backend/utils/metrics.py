@@ -0,0 +1,161 @@
+"""
+Prometheus metrics for the backend service.
+
+This module defines the service's metrics with prometheus_client, serves
+the Prometheus text exposition on /metrics and installs the Flask hooks
+recording request latency.
+
+When PROMETHEUS_MULTIPROC_DIR is set before the first import, the client
+runs in multiprocess mode: every process writes its values to its own
+files in that directory and a scrape aggregates all of them, so any
+gunicorn worker can answer /metrics for the whole server. The managed
+gunicorn configuration empties it before the workers start.
+"""
+
+import os
+import glob
+import time
+from typing import Dict
+
+from flask import Flask, Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+
+METRICS_MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+ENABLE_METRICS = os.getenv('ENABLE_METRICS', 'true').lower() == 'true'
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+# Application metrics
+http_requests_total = Counter(
+    'http_requests_total', 'HTTP requests by route, method and status', ['method', 'route', 'status']
+)
+http_request_duration_seconds = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route, method and status',
+    ['method', 'route', 'status'], buckets=DEFAULT_BUCKETS
+)
+http_requests_in_progress = Gauge(
+    'http_requests_in_progress', 'HTTP requests currently being handled', multiprocess_mode='livesum'
+)
+operation_duration_seconds = Histogram(
+    'operation_duration_seconds', 'Latency of operations timed by performance_monitor', ['operation'],
+    buckets=DEFAULT_BUCKETS
+)
+engine_call_duration_seconds = Histogram(
+    'engine_call_duration_seconds', 'Latency of Engine methods, including Elasticsearch calls',
+    ['method', 'outcome'], buckets=DEFAULT_BUCKETS
+)
+es_requests_in_flight = Gauge(
+    'es_requests_in_flight', 'Elasticsearch requests currently in flight by client', ['client'],
+    multiprocess_mode='livesum'
+)
+es_pool_max_connections = Gauge(
+    'es_pool_max_connections', 'Elasticsearch connection pool size by client', ['client'],
+    multiprocess_mode='livesum'
+)
+es_request_retries_total = Counter(
+    'es_request_retries_total', 'Elasticsearch requests retried after a failure by client and reason',
+    ['client', 'reason']
+)
+circuit_breaker_state = Gauge(
+    'circuit_breaker_state', 'Circuit breaker state by operation category (0 closed, 1 half-open, 2 open)',
+    ['operation'], multiprocess_mode='livemax'
+)
+circuit_breaker_rejections_total = Counter(
+    'circuit_breaker_rejections_total', 'Engine calls rejected by an open circuit by operation category',
+    ['operation']
+)
+search_cache_requests_total = Counter(
+    'search_cache_requests_total', 'Search result cache lookups by result (hit or miss)', ['result']
+)
+scraper_fetch_duration_seconds = Histogram(
+    'scraper_fetch_duration_seconds', 'Time spent fetching article pages', ['source'], buckets=DEFAULT_BUCKETS
+)
+scraper_parse_duration_seconds = Histogram(
+    'scraper_parse_duration_seconds', 'Time spent parsing article pages', ['source'], buckets=DEFAULT_BUCKETS
+)
+articles_ingested_total = Counter(
+    'articles_ingested_total', 'Articles indexed through the ingestion path', ['source']
+)
+
+
+def record_ingested_article(article_id: str, article: Dict) -> None:
+    """Engine ingest listener counting indexed articles."""
+    articles_ingested_total.labels(source=article.get('source') or 'unknown').inc()
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of an exited worker (call from gunicorn's child_exit hook)."""
+    if METRICS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid, METRICS_MULTIPROC_DIR)
+
+
+def clear_multiproc_dir() -> int:
+    """
+    Empty PROMETHEUS_MULTIPROC_DIR of earlier runs (call from gunicorn's on_starting hook).
+
+    Counters of processes that no longer exist would otherwise be added to
+    every scrape after a restart. Files of the calling process are kept.
+    """
+    if not METRICS_MULTIPROC_DIR:
+        return 0
+    own_suffix = f"_{os.getpid()}.db"
+    removed = 0
+    for path in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, '*.db')):
+        if path.endswith(own_suffix):
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def generate_metrics() -> bytes:
+    """Render the exposition, aggregated over all processes in multiprocess mode."""
+    if METRICS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=METRICS_MULTIPROC_DIR)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def setup_metrics(app: Flask) -> Flask:
+    """Record request metrics for a Flask app and expose them on /metrics."""
+    if not ENABLE_METRICS:
+        return app
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_in_progress = True
+        http_requests_in_progress.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            labels = {
+                'method': request.method,
+                # the URL rule keeps label cardinality bounded
+                'route': request.url_rule.rule if request.url_rule else 'unmatched',
+                'status': str(response.status_code)
+            }
+            http_requests_total.labels(**labels).inc()
+            http_request_duration_seconds.labels(**labels).observe(time.perf_counter() - start)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        if g.pop('metrics_in_progress', False):
+            http_requests_in_progress.dec()
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(generate_metrics(), mimetype=CONTENT_TYPE_LATEST)
+
+    return app
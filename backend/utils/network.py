@@ -8,28 +8,49 @@ and testing upstream service connections.
 import os
 import requests
 import socket
-import json
 import time
 from datetime import datetime
 import subprocess
 import platform
 import traceback
-from typing import Dict, List, Tuple, Optional, Any, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from typing import Dict, Iterator, List, Tuple, Optional, Any, Union
 
 from .logger import get_logger, performance_monitor
 
 logger = get_logger('network')
 
+# Maximum probes (ping, traceroute, HTTP) running at once
+NETWORK_DIAG_WORKERS = int(os.getenv('NETWORK_DIAG_WORKERS', '8'))
+
+# Overall time limit for a full diagnostic run, in seconds
+NETWORK_DIAG_DEADLINE = float(os.getenv('NETWORK_DIAG_DEADLINE', '20'))
+
+# Seconds a full diagnostic result is reused for the same targets
+NETWORK_DIAG_CACHE_TTL = float(os.getenv('NETWORK_DIAG_CACHE_TTL', '30'))
+
 class NetworkDiagnostics:
     """Network diagnostic utilities for the backend service."""
     
     def __init__(self):
         """Initialize the network diagnostics utilities."""
         self.hostname = socket.gethostname()
-        self.local_ip = self._get_local_ip()
+        self._local_ip: Optional[str] = None
         self.platform = platform.system()
         self.session = requests.Session()
         self.timeout = 10  # Default timeout in seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._cache: Dict[Tuple[str, ...], Tuple[float, Dict]] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def local_ip(self) -> str:
+        """Local IP address, looked up on first use rather than at import."""
+        if self._local_ip is None:
+            self._local_ip = self._get_local_ip()
+        return self._local_ip
     
     def _get_local_ip(self) -> str:
         """Get the local IP address of the host."""
@@ -170,13 +191,14 @@ class NetworkDiagnostics:
             })
             return result
     
-    def ping_host(self, host: str, count: int = 4) -> Dict:
+    def ping_host(self, host: str, count: int = 4, timeout: Optional[float] = None) -> Dict:
         """
         Ping a host and return results.
         
         Args:
             host: Hostname or IP to ping
             count: Number of ping packets to send
+            timeout: Seconds before the ping process is killed
             
         Returns:
             Dict containing ping results
@@ -211,7 +233,15 @@ class NetworkDiagnostics:
                 stderr=subprocess.PIPE,
                 universal_newlines=True
             )
-            stdout, stderr = process.communicate()
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                stdout, stderr = process.communicate()
+                result["output"] = stdout
+                result["error"] = f"Ping timed out after {timeout}s"
+                logger.error(f"Ping to {host} timed out after {timeout}s")
+                return result
             
             result["output"] = stdout
             
@@ -283,13 +313,14 @@ class NetworkDiagnostics:
             })
             return result
     
-    def trace_route(self, host: str, max_hops: int = 30) -> Dict:
+    def trace_route(self, host: str, max_hops: int = 30, timeout: Optional[float] = None) -> Dict:
         """
         Perform a traceroute to a host.
         
         Args:
             host: Hostname or IP to trace
             max_hops: Maximum number of hops
+            timeout: Seconds before the traceroute process is killed
             
         Returns:
             Dict containing traceroute results
@@ -320,7 +351,15 @@ class NetworkDiagnostics:
                 stderr=subprocess.PIPE,
                 universal_newlines=True
             )
-            stdout, stderr = process.communicate()
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                stdout, stderr = process.communicate()
+                result["output"] = stdout
+                result["error"] = f"Traceroute timed out after {timeout}s"
+                logger.error(f"Traceroute to {host} timed out after {timeout}s")
+                return result
             
             result["output"] = stdout
             
@@ -352,53 +391,153 @@ class NetworkDiagnostics:
             })
             return result
 
-    def run_full_diagnostics(self, targets: List[str]) -> Dict:
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """The probe thread pool of this process, created on first use."""
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=NETWORK_DIAG_WORKERS,
+                    thread_name_prefix="network-diag"
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+    
+    def _system_info(self) -> Dict:
+        return {
+            "hostname": self.hostname,
+            "local_ip": self.local_ip,
+            "platform": self.platform,
+            "python_version": platform.python_version()
+        }
+    
+    def _get_cached(self, targets: List[str]) -> Optional[Dict]:
+        key = tuple(sorted(targets))
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._cache[key]
+                return None
+            return entry[1]
+    
+    def _set_cached(self, targets: List[str], results: Dict) -> None:
+        if NETWORK_DIAG_CACHE_TTL <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            # drop expired entries so the cache stays as small as the set of live target lists
+            for key in [key for key, (expires, _) in self._cache.items() if expires < now]:
+                del self._cache[key]
+            self._cache[tuple(sorted(targets))] = (now + NETWORK_DIAG_CACHE_TTL, results)
+    
+    def iter_full_diagnostics(self, targets: List[str], deadline: Optional[float] = None,
+                              use_cache: bool = True) -> Iterator[Dict]:
         """
-        Run a full network diagnostic suite against multiple targets.
+        Run the diagnostic suite against multiple targets, yielding results as they finish.
+        
+        All probes of all targets run concurrently on a bounded thread pool.
+        Probes still running when the deadline passes are reported as timed out.
         
         Args:
             targets: List of URLs or hostnames to test
+            deadline: Overall time limit in seconds
+            use_cache: Whether to reuse a recent result for the same targets
             
-        Returns:
-            Dict containing comprehensive diagnostic results
+        Yields:
+            Dict: A 'start' event, one 'result' event per probe and an 'end' event
         """
+        cached = self._get_cached(targets) if use_cache else None
+        if cached is not None:
+            yield {"type": "start", "timestamp": cached["timestamp"], "system_info": cached["system_info"],
+                   "targets": targets, "cached": True}
+            for target, target_results in cached["tests"].items():
+                for probe, result in target_results.items():
+                    yield {"type": "result", "target": target, "probe": probe, "result": result}
+            yield {"type": "end", "elapsed_ms": 0.0, "deadline_exceeded": cached["deadline_exceeded"],
+                   "cached": True}
+            return
+        
+        # callers may shorten the deadline but not extend it
+        deadline = min(deadline, NETWORK_DIAG_DEADLINE) if deadline else NETWORK_DIAG_DEADLINE
+        start_time = time.time()
         results = {
             "timestamp": datetime.utcnow().isoformat(),
-            "system_info": {
-                "hostname": self.hostname,
-                "local_ip": self.local_ip,
-                "platform": self.platform,
-                "python_version": platform.python_version()
-            },
-            "tests": {}
+            "system_info": self._system_info(),
+            "tests": {target: {} for target in targets},
+            "deadline_exceeded": False
         }
+        yield {"type": "start", "timestamp": results["timestamp"], "system_info": results["system_info"],
+               "targets": targets, "cached": False}
         
+        executor = self._get_executor()
+        futures = {}
         for target in targets:
             logger.info(f"Running full diagnostics for target: {target}")
             
-            target_results = {}
-            
             # Determine if target is a URL or hostname
             is_url = target.startswith(("http://", "https://"))
             hostname = target.split("://")[-1].split("/")[0].split(":")[0] if is_url else target
             
-            # Run ping test
-            ping_result = self.ping_host(hostname)
-            target_results["ping"] = ping_result
-            
-            # Run traceroute
-            trace_result = self.trace_route(hostname)
-            target_results["traceroute"] = trace_result
-            
+            futures[executor.submit(self.ping_host, hostname, timeout=deadline)] = (target, "ping")
+            futures[executor.submit(self.trace_route, hostname, timeout=deadline)] = (target, "traceroute")
             # Run HTTP connection test if target is a URL
             if is_url:
-                connection_result = self.test_connection(target)
-                target_results["http"] = connection_result
-            
-            results["tests"][target] = target_results
-            
-            logger.info(f"Completed diagnostics for {target}")
+                futures[executor.submit(self.test_connection, target, timeout=min(self.timeout, deadline))] = (target, "http")
         
+        try:
+            for future in as_completed(futures, timeout=max(deadline - (time.time() - start_time), 0)):
+                target, probe = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"success": False, "error": f"{probe} failed: {str(e)}"}
+                results["tests"][target][probe] = result
+                yield {"type": "result", "target": target, "probe": probe, "result": result}
+        except FuturesTimeoutError:
+            results["deadline_exceeded"] = True
+            for future, (target, probe) in futures.items():
+                if not future.done():
+                    future.cancel()
+                    result = {
+                        "success": False,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "error": f"Deadline of {deadline}s exceeded"
+                    }
+                    results["tests"][target][probe] = result
+                    yield {"type": "result", "target": target, "probe": probe, "result": result}
+            logger.warning(f"Network diagnostics exceeded the {deadline}s deadline")
+        
+        elapsed_ms = (time.time() - start_time) * 1000
+        logger.info(f"Completed diagnostics for {len(targets)} targets in {elapsed_ms:.2f}ms")
+        self._set_cached(targets, results)
+        yield {"type": "end", "elapsed_ms": elapsed_ms, "deadline_exceeded": results["deadline_exceeded"],
+               "cached": False}
+    
+    def run_full_diagnostics(self, targets: List[str], deadline: Optional[float] = None,
+                             use_cache: bool = True) -> Dict:
+        """
+        Run a full network diagnostic suite against multiple targets.
+        
+        Args:
+            targets: List of URLs or hostnames to test
+            deadline: Overall time limit in seconds
+            use_cache: Whether to reuse a recent result for the same targets
+            
+        Returns:
+            Dict containing comprehensive diagnostic results
+        """
+        results = {"tests": {target: {} for target in targets}}
+        for event in self.iter_full_diagnostics(targets, deadline, use_cache):
+            if event["type"] == "start":
+                results["timestamp"] = event["timestamp"]
+                results["system_info"] = event["system_info"]
+                results["cached"] = event["cached"]
+            elif event["type"] == "result":
+                results["tests"][event["target"]][event["probe"]] = event["result"]
+            else:
+                results["elapsed_ms"] = event["elapsed_ms"]
+                results["deadline_exceeded"] = event["deadline_exceeded"]
         return results
 
 
@@ -474,38 +613,10 @@ def test_es_connection():
             timeout=10  # Increase timeout for potentially slow connections
         )
         
-        # Test a sample query if connection was successful
+        # Test a sample query through the application's shared client (same pool, timeouts and retries)
         query_result = None
         if http_result["success"]:
-            es_index = os.getenv('ELASTICSEARCH_INDEX', 'financial_news')
-            query_url = f"{es_url}/{es_index}/_search"
-            query = {
-                "query": {
-                    "match_all": {}
-                },
-                "size": 1
-            }
-            
-            query_result = network_diagnostics.test_connection(
-                url=query_url,
-                method="POST",
-                headers=headers,
-                data=json.dumps(query),
-                timeout=10
-            )
-            
-            # Parse sample document if query was successful
-            if query_result["success"] and query_result["status_code"] == 200:
-                try:
-                    response_data = json.loads(query_result["response_sample"])
-                    hit_count = response_data['hits']['total']['value'] if 'hits' in response_data else 0
-                    query_result["hit_count"] = hit_count
-                    
-                    if hit_count > 0:
-                        sample_doc = response_data['hits']['hits'][0]['_source']
-                        query_result["sample_document_fields"] = list(sample_doc.keys())
-                except Exception as e:
-                    query_result["parsing_error"] = str(e)
+            query_result = test_es_query(es_url, es_api_key, os.getenv('ELASTICSEARCH_INDEX', 'financial_news'))
         
         return {
             "timestamp": datetime.utcnow().isoformat(),
@@ -536,4 +647,30 @@ def test_es_connection():
                 "region": os.getenv('AWS_REGION', 'Not configured'),
                 "environment": os.getenv('ENVIRONMENT', 'development')
             }
-        } 
\ No newline at end of file
+        } 
+
+
+def test_es_query(es_url: str, es_api_key: str, index: str) -> Dict:
+    """Run a one-document search with the shared Elasticsearch client."""
+    # imported here so elasticsearch stays off the import path of the app
+    from es_database import EngineConfig
+    from es_database.ClientFactory import get_client, pool_stats
+    
+    start_time = time.time()
+    result = {"success": False, "index": index}
+    try:
+        config = EngineConfig()
+        config.elasticsearch_url = es_url
+        config.api_key = es_api_key
+        client = get_client(config)
+        response = client.search(index=index, body={"query": {"match_all": {}}}, size=1)
+        result["success"] = True
+        result["hit_count"] = response['hits']['total']['value'] if 'hits' in response else 0
+        if response['hits']['hits']:
+            result["sample_document_fields"] = list(response['hits']['hits'][0]['_source'].keys())
+        result["pool"] = pool_stats(client)
+    except Exception as e:
+        result["error"] = str(e)
+        result["error_type"] = type(e).__name__
+    result["latency_ms"] = (time.time() - start_time) * 1000
+    return result
@@ -0,0 +1,149 @@
+"""
+In-memory performance store.
+
+This module keeps a fixed-size ring buffer of recent timing samples and a
+log-bucketed latency histogram per operation, so percentiles can be
+reported without keeping every sample.
+"""
+
+import os
+import math
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Number of recent samples kept for /debug/performance
+PERFORMANCE_BUFFER_SIZE = int(os.getenv('PERFORMANCE_BUFFER_SIZE', '1000'))
+
+# Maximum number of operations with their own histogram; later operations
+# share the OVERFLOW_OPERATION histogram so memory stays bounded
+PERFORMANCE_MAX_OPERATIONS = int(os.getenv('PERFORMANCE_MAX_OPERATIONS', '200'))
+
+# Histogram shared by operations recorded after PERFORMANCE_MAX_OPERATIONS
+OVERFLOW_OPERATION = 'other'
+
+# Relative width of a histogram bucket (about 4% error on percentiles)
+HISTOGRAM_GROWTH = 1.09
+
+# Latencies below this are counted in the first bucket (milliseconds)
+HISTOGRAM_MIN_MS = 0.01
+
+_LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+
+
+class LatencyHistogram:
+    """
+    Streaming latency histogram with logarithmic buckets.
+
+    Bucket i covers [MIN * GROWTH**i, MIN * GROWTH**(i+1)), so memory depends
+    only on the range of observed latencies (a few hundred buckets between
+    microseconds and hours) and percentiles have a bounded relative error.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    @staticmethod
+    def bucket_index(value_ms: float) -> int:
+        if value_ms <= HISTOGRAM_MIN_MS:
+            return 0
+        return int(math.log(value_ms / HISTOGRAM_MIN_MS) / _LOG_GROWTH)
+
+    @staticmethod
+    def bucket_value(index: int) -> float:
+        """Representative value of a bucket (its geometric midpoint)."""
+        return HISTOGRAM_MIN_MS * HISTOGRAM_GROWTH ** (index + 0.5)
+
+    def record(self, value_ms: float) -> None:
+        index = self.bucket_index(value_ms)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value_ms
+        self.min = min(self.min, value_ms)
+        self.max = max(self.max, value_ms)
+
+    def percentiles(self, quantiles=(0.5, 0.9, 0.99)) -> List[float]:
+        """Estimate several quantiles in one pass over the buckets."""
+        if not self.count:
+            return [0.0 for _ in quantiles]
+        ranks = [max(1, math.ceil(q * self.count)) for q in quantiles]
+        results: List[Optional[float]] = [None] * len(quantiles)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            for i, rank in enumerate(ranks):
+                if results[i] is None and seen >= rank:
+                    value = self.bucket_value(index)
+                    results[i] = min(max(value, self.min), self.max)
+            if all(result is not None for result in results):
+                break
+        return results
+
+    def summary(self) -> Dict:
+        p50, p90, p99 = self.percentiles((0.5, 0.9, 0.99))
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'min_ms': round(self.min, 3) if self.count else 0.0,
+            'p50_ms': round(p50, 3),
+            'p90_ms': round(p90, 3),
+            'p99_ms': round(p99, 3),
+            'max_ms': round(self.max, 3)
+        }
+
+
+class PerformanceStore:
+    """Ring buffer of recent samples plus one latency histogram per operation."""
+
+    def __init__(self, buffer_size: int = PERFORMANCE_BUFFER_SIZE,
+                 max_operations: int = PERFORMANCE_MAX_OPERATIONS):
+        self.samples: deque = deque(maxlen=max(buffer_size, 1))
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.max_operations = max(max_operations, 1)
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, elapsed_ms: float, metadata: Optional[Dict] = None) -> None:
+        """Record one timing sample."""
+        sample = {
+            'operation': operation,
+            'elapsed_ms': elapsed_ms,
+            'timestamp': datetime.utcnow().isoformat(),
+            **(metadata or {})
+        }
+        with self._lock:
+            self.samples.append(sample)
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                if len(self.histograms) >= self.max_operations:
+                    operation = OVERFLOW_OPERATION
+                histogram = self.histograms.get(operation)
+                if histogram is None:
+                    histogram = self.histograms[operation] = LatencyHistogram()
+            histogram.record(elapsed_ms)
+
+    def recent(self, limit: int = 100, request_id: Optional[str] = None) -> List[Dict]:
+        """Most recent samples first, optionally for a single request."""
+        with self._lock:
+            samples = list(self.samples)
+        samples.reverse()
+        if request_id:
+            samples = [sample for sample in samples if sample.get('request_id') == request_id]
+        return samples[:limit]
+
+    def summaries(self) -> Dict[str, Dict]:
+        """Latency summary of every operation."""
+        with self._lock:
+            return {operation: histogram.summary() for operation, histogram in sorted(self.histograms.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples.clear()
+            self.histograms.clear()
+
+    def __len__(self) -> int:
+        return len(self.samples)
@@ -0,0 +1,220 @@
+"""
+On-demand profiling.
+
+This module provides a sampling profiler that periodically captures the
+stacks of all threads via sys._current_frames() and reports them as
+collapsed stacks (the flamegraph input format), plus opt-in deterministic
+cProfile profiling of single requests attached to their trace.
+"""
+
+import os
+import sys
+import hmac
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+from flask import Flask, Response, g, jsonify, request
+
+from .logger import get_logger
+
+logger = get_logger('profiler')
+
+ENABLE_PROFILING = os.getenv('ENABLE_PROFILING', 'false').lower() == 'true'
+# Secret the profile header must carry; profiling stays off without one
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN')
+# Longest sampling run a single request may ask for, in seconds
+PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', '60'))
+# Default sampling rate in Hz
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '100'))
+# Request header that turns on cProfile for that request and authorizes /debug/profile
+PROFILE_REQUEST_HEADER = os.getenv('PROFILE_REQUEST_HEADER', 'X-Profile')
+# Number of functions kept from a request profile
+PROFILE_TOP_N = int(os.getenv('PROFILE_TOP_N', '40'))
+# Frames kept per sampled stack (deeper stacks are truncated at the root)
+PROFILE_MAX_DEPTH = 128
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler over all threads of the process.
+
+    A background thread wakes up at the sampling rate and walks the current
+    frame of every other thread. Only code objects are read, so the cost is
+    proportional to stack depth and the profiled threads are never paused
+    beyond the interpreter's normal thread switching.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def profile(self, seconds: float, rate: float = PROFILE_SAMPLE_RATE,
+                exclude_thread_ids: Optional[set] = None) -> Dict:
+        """
+        Sample all thread stacks for a period.
+
+        Args:
+            seconds: Sampling duration
+            rate: Samples per second
+            exclude_thread_ids: Threads left out of the profile
+
+        Returns:
+            Dict with the sample count, duration and collapsed stack counts
+
+        Raises:
+            RuntimeError: If another sampling run is in progress
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            stacks: Counter = Counter()
+            result = {'samples': 0, 'rate': rate}
+            excluded = set(exclude_thread_ids or ())
+
+            def sample():
+                excluded.add(threading.get_ident())
+                interval = 1.0 / rate
+                deadline = time.perf_counter() + seconds
+                next_sample = time.perf_counter()
+                while next_sample < deadline:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    for thread_id, frame in sys._current_frames().items():
+                        if thread_id in excluded:
+                            continue
+                        labels = []
+                        while frame is not None and len(labels) < PROFILE_MAX_DEPTH:
+                            labels.append(_frame_label(frame.f_code))
+                            frame = frame.f_back
+                        labels.append(names.get(thread_id, f"thread-{thread_id}"))
+                        stacks[';'.join(reversed(labels))] += 1
+                    result['samples'] += 1
+                    next_sample += interval
+                    delay = next_sample - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        # fell behind: skip missed ticks rather than sampling in a burst
+                        next_sample = time.perf_counter()
+
+            start = time.perf_counter()
+            sampler = threading.Thread(target=sample, name="sampling-profiler", daemon=True)
+            sampler.start()
+            sampler.join()
+            result['duration_seconds'] = round(time.perf_counter() - start, 3)
+            result['stacks'] = stacks
+            return result
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def collapse(stacks: Counter) -> str:
+        """Format stack counts as collapsed stacks, one 'frame;frame;frame count' line each."""
+        return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+# Singleton instance used by /debug/profile
+sampling_profiler = SamplingProfiler()
+
+
+def profile_stats(profile: cProfile.Profile, limit: int = PROFILE_TOP_N) -> List[Dict]:
+    """Top functions of a cProfile run by cumulative time."""
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            'function': f"{name} ({os.path.basename(filename)}:{line})",
+            'calls': total_calls,
+            'primitive_calls': primitive_calls,
+            'total_time_ms': round(total_time * 1000, 3),
+            'cumulative_time_ms': round(cumulative_time * 1000, 3)
+        }
+        for (filename, line, name), (primitive_calls, total_calls, total_time, cumulative_time, _) in rows
+    ]
+
+
+def profile_requested() -> bool:
+    """Whether the current request carries the profile token in the profile header."""
+    value = request.headers.get(PROFILE_REQUEST_HEADER)
+    if not value or not PROFILE_TOKEN:
+        return False
+    return hmac.compare_digest(value.encode(), PROFILE_TOKEN.encode())
+
+
+def setup_profiling(app: Flask) -> Flask:
+    """
+    Add the sampling profiler endpoint and header-triggered request profiling.
+
+    Both need PROFILE_TOKEN in the profile header; without a token
+    profiling is not set up at all.
+
+    Register after setup_tracing so request profiles can be attached to the
+    request's trace.
+    """
+    if not ENABLE_PROFILING:
+        return app
+    if not PROFILE_TOKEN:
+        logger.warning("ENABLE_PROFILING is set but PROFILE_TOKEN is not; profiling stays disabled")
+        return app
+
+    @app.before_request
+    def start_request_profile():
+        if not profile_requested():
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # another profiler is already active on this thread
+            return
+        g.request_profile = profile
+
+    @app.after_request
+    def finish_request_profile(response):
+        profile = g.pop('request_profile', None)
+        if profile is None:
+            return response
+        profile.disable()
+        stats = profile_stats(profile)
+        root = g.get('trace_root')
+        if root is not None:
+            root.trace.profile = stats
+            response.headers['X-Profile-Trace'] = root.trace.request_id
+        else:
+            logger.info("Request profile recorded without a trace", extra={'extra': {'profile': stats}})
+        return response
+
+    @app.route('/debug/profile', methods=['POST'])
+    def sample_profile():
+        if not profile_requested():
+            return jsonify({'error': f"A valid {PROFILE_REQUEST_HEADER} header is required"}), 403
+        try:
+            seconds = min(float(request.args.get('seconds', 10)), PROFILE_MAX_SECONDS)
+            rate = min(max(float(request.args.get('rate', PROFILE_SAMPLE_RATE)), 1.0), 1000.0)
+        except ValueError:
+            return jsonify({'error': 'seconds and rate must be numbers'}), 400
+        if seconds <= 0:
+            return jsonify({'error': 'seconds must be positive'}), 400
+
+        logger.info(f"Sampling profile for {seconds}s at {rate}Hz")
+        try:
+            result = sampling_profiler.profile(seconds, rate, exclude_thread_ids={threading.get_ident()})
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 409
+
+        if request.args.get('format') == 'json':
+            return jsonify({
+                'samples': result['samples'],
+                'rate': result['rate'],
+                'duration_seconds': result['duration_seconds'],
+                'stacks': [{'stack': stack, 'count': count} for stack, count in result['stacks'].most_common()]
+            })
+        return Response(SamplingProfiler.collapse(result['stacks']), mimetype='text/plain')
+
+    return app
@@ -0,0 +1,227 @@
+"""
+JSON responses.
+
+This module provides fast JSON serialization (orjson when installed, the
+standard library otherwise), Accept-Encoding negotiation with gzip and brotli
+compression, ETag-based conditional responses, and EncodedBody: a response
+body serialized once whose compressed variants are kept with it, so cached
+responses are served without serializing or compressing them again.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+from typing import Any, Dict, Optional
+
+from flask import Flask, Response, request
+from werkzeug.http import parse_etags
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENABLE_RESPONSE_COMPRESSION = os.getenv('ENABLE_RESPONSE_COMPRESSION', 'true').lower() == 'true'
+# Bodies smaller than this are sent uncompressed
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+# gzip compression level (1-9)
+RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', '6'))
+# brotli quality (0-11); higher levels are too slow for dynamic responses
+RESPONSE_BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', '5'))
+
+# Supported encodings in order of preference among equally weighted ones
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Serialize a payload to compact JSON bytes.
+
+    Values JSON cannot represent are converted with str(), as in the rest of
+    the backend.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, default=str, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. integers above 64 bits; the standard library handles these
+            pass
+    return json.dumps(payload, default=str, separators=(',', ':')).encode()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress a body with a content coding.
+
+    Args:
+        data: Uncompressed body
+        encoding: 'gzip' or 'br'
+
+    Returns:
+        bytes: Compressed body
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=RESPONSE_BROTLI_QUALITY)
+    if encoding == 'gzip':
+        # mtime=0 keeps the output identical for identical bodies
+        return gzip.compress(data, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported content coding: {encoding}")
+
+
+def negotiate_encoding(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    """
+    Pick the content coding for a response.
+
+    Args:
+        accept_encoding: Accept-Encoding request header
+        size: Uncompressed body size in bytes
+
+    Returns:
+        Optional[str]: 'br' or 'gzip', or None to send the body uncompressed
+    """
+    if not ENABLE_RESPONSE_COMPRESSION or not accept_encoding or size < RESPONSE_COMPRESSION_MIN_BYTES:
+        return None
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def payload_etag(payload: Any) -> str:
+    """
+    Compute an ETag value from the JSON serialization of a payload.
+
+    Payloads that serialize identically get the same tag, so only values
+    describing the resource should be passed in (not request IDs or
+    timestamps).
+    """
+    return hashlib.md5(dumps(payload)).hexdigest()
+
+
+def is_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match request header matches an ETag.
+
+    Uses the weak comparison required for If-None-Match, so a tag matches
+    whatever content coding the cached copy was sent with.
+    """
+    return bool(if_none_match) and parse_etags(if_none_match).contains_weak(etag)
+
+
+class EncodedBody:
+    """
+    JSON body serialized once, with its compressed variants.
+
+    Each variant is compressed the first time a client asks for it and kept,
+    so a body stored in a cache is compressed at most once per encoding.
+    """
+
+    __slots__ = ('identity', 'variants')
+
+    def __init__(self, identity: bytes):
+        self.identity = identity
+        self.variants: Dict[str, bytes] = {}
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> 'EncodedBody':
+        return cls(dumps(payload))
+
+    def __len__(self) -> int:
+        return len(self.identity)
+
+    def encode(self, encoding: Optional[str]) -> bytes:
+        """Get the body in a content coding (None for the uncompressed body)."""
+        if encoding is None:
+            return self.identity
+        data = self.variants.get(encoding)
+        if data is None:
+            data = self.variants[encoding] = compress(self.identity, encoding)
+        return data
+
+
+def encoded_response(body: EncodedBody, status: int = 200, headers: Optional[Dict[str, str]] = None,
+                     etag: Optional[str] = None) -> Response:
+    """
+    Build a JSON response for the current request from an encoded body.
+
+    Args:
+        body: Serialized body
+        status: HTTP status code
+        headers: Additional response headers (e.g. Cache-Control)
+        etag: ETag value of the body; sent as a weak ETag, and a 304 without a
+            body is returned if it matches the request's If-None-Match
+
+    Returns:
+        Response: Response compressed according to the request's Accept-Encoding
+    """
+    if etag is not None and status == 200 and is_not_modified(request.headers.get('If-None-Match'), etag):
+        response = Response(status=304)
+    else:
+        encoding = negotiate_encoding(request.headers.get('Accept-Encoding'), len(body))
+        response = Response(body.encode(encoding), status=status, mimetype='application/json')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+    if len(body) >= RESPONSE_COMPRESSION_MIN_BYTES:
+        response.vary.add('Accept-Encoding')
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    if headers:
+        response.headers.update(headers)
+    return response
+
+
+def json_response(payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None,
+                  etag: Optional[str] = None) -> Response:
+    """Serialize a payload and build a JSON response for the current request (see encoded_response)."""
+    return encoded_response(EncodedBody.from_payload(payload), status, headers, etag)
+
+
+def setup_response_compression(app: Flask) -> Flask:
+    """
+    Compress the JSON responses of every route according to Accept-Encoding.
+
+    Responses built by encoded_response are already negotiated and are left
+    alone, as are streamed responses such as the SSE feed. Register after the
+    other middleware so its after_request handler runs first and the others
+    see the compressed response.
+    """
+    if not ENABLE_RESPONSE_COMPRESSION:
+        return app
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers or response.mimetype != 'application/json'):
+            return response
+        data = response.get_data()
+        encoding = negotiate_encoding(request.headers.get('Accept-Encoding'), len(data))
+        if len(data) >= RESPONSE_COMPRESSION_MIN_BYTES:
+            response.vary.add('Accept-Encoding')
+        if encoding is not None:
+            response.set_data(compress(data, encoding))
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    return app
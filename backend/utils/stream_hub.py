@@ -0,0 +1,369 @@
+"""
+Live feed of newly indexed articles.
+
+This module provides an in-process fan-out hub, the poller feeding it with
+articles created in Elasticsearch, and the Server-Sent Events formatting
+used by the /stream endpoint.
+"""
+
+import os
+import json
+import time
+import calendar
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .logger import get_logger
+
+logger = get_logger('stream')
+
+# Number of recent events kept for Last-Event-ID resume
+STREAM_HISTORY_SIZE = int(os.getenv('STREAM_HISTORY_SIZE', '1000'))
+
+# Maximum events buffered for a single slow client
+STREAM_CLIENT_BUFFER = int(os.getenv('STREAM_CLIENT_BUFFER', '100'))
+
+# What happens when a client buffer is full: 'drop_oldest' or 'disconnect'
+STREAM_DROP_POLICY = os.getenv('STREAM_DROP_POLICY', 'drop_oldest').lower()
+
+# Seconds between heartbeat comments on an idle stream
+STREAM_HEARTBEAT_SECONDS = float(os.getenv('STREAM_HEARTBEAT_SECONDS', '15'))
+
+# Maximum concurrently connected clients per process; every client holds a
+# worker thread for as long as it is connected, so the default leaves most of
+# the GUNICORN_THREADS to regular requests
+STREAM_MAX_CLIENTS = int(os.getenv(
+    'STREAM_MAX_CLIENTS', str(max(int(os.getenv('GUNICORN_THREADS', '8')) // 4, 1))
+))
+
+# Seconds between polls for newly indexed articles while clients are connected
+STREAM_POLL_SECONDS = float(os.getenv('STREAM_POLL_SECONDS', '2'))
+
+# Seconds each poll looks back, covering articles that became searchable late
+STREAM_POLL_OVERLAP_SECONDS = float(os.getenv('STREAM_POLL_OVERLAP_SECONDS', '10'))
+
+# Articles fetched per poll request
+STREAM_POLL_BATCH = int(os.getenv('STREAM_POLL_BATCH', '500'))
+
+# Article fields pushed to clients (embeddings and full content stay out)
+EVENT_FIELDS = (
+    'headline', 'summary', 'url', 'source', 'author', 'categories', 'regions',
+    'sentiment', 'sentiment_score', 'published_at'
+)
+
+
+def format_sse(data: Dict, event_id: Optional[str] = None, event: Optional[str] = None) -> str:
+    """Format a Server-Sent Events message."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _parse_filter(value) -> Set[str]:
+    """Parse a comma-separated filter into a set of lowercase values."""
+    if not value:
+        return set()
+    if isinstance(value, str):
+        value = value.split(',')
+    return {item.strip().lower() for item in value if item and item.strip()}
+
+
+class StreamClient:
+    """A connected stream client with its filters and bounded event buffer."""
+
+    def __init__(self, sources=None, tickers=None, sentiments=None,
+                 buffer_size: int = STREAM_CLIENT_BUFFER, drop_policy: str = STREAM_DROP_POLICY):
+        self.sources = _parse_filter(sources)
+        self.tickers = _parse_filter(tickers)
+        self.sentiments = _parse_filter(sentiments)
+        self.buffer: deque = deque()
+        self.buffer_size = max(int(buffer_size), 1)
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self.closed = False
+        self.connected_at = datetime.now().isoformat()
+        self._condition = threading.Condition()
+
+    def accepts(self, event: Dict) -> bool:
+        """Whether an event passes the client filters."""
+        if self.sources and str(event.get('source', '')).lower() not in self.sources:
+            return False
+        if self.sentiments and str(event.get('sentiment', '')).lower() not in self.sentiments:
+            return False
+        if self.tickers and self.tickers.isdisjoint(t.lower() for t in event.get('tickers', [])):
+            return False
+        return True
+
+    def push(self, event_id: str, event: Dict) -> None:
+        """Buffer an event, applying the drop policy when the buffer is full."""
+        with self._condition:
+            if self.closed:
+                return
+            if len(self.buffer) >= self.buffer_size:
+                self.dropped += 1
+                if self.drop_policy == 'disconnect':
+                    # the client reconnects and resumes from its Last-Event-ID
+                    self.closed = True
+                    self._condition.notify()
+                    return
+                self.buffer.popleft()
+            self.buffer.append((event_id, event))
+            self._condition.notify()
+
+    def get(self, timeout: float) -> List[Tuple[str, Dict]]:
+        """Wait up to timeout seconds and return all buffered events."""
+        with self._condition:
+            if not self.buffer and not self.closed:
+                self._condition.wait(timeout)
+            events = list(self.buffer)
+            self.buffer.clear()
+            return events
+
+    def close(self) -> None:
+        with self._condition:
+            self.closed = True
+            self._condition.notify()
+
+
+class StreamHub:
+    """
+    Fans out newly indexed articles to connected stream clients.
+
+    Events get IDs of the form '<boot>-<sequence>'; the boot token changes with
+    every process, so a Last-Event-ID issued by another worker or before a
+    restart is recognized and answered with a reset event instead of a replay.
+    """
+
+    def __init__(self, history_size: int = STREAM_HISTORY_SIZE, max_clients: int = STREAM_MAX_CLIENTS):
+        self.boot = format(int(time.time() * 1000), 'x')
+        self.history: deque = deque(maxlen=max(int(history_size), 1))
+        self.max_clients = max_clients
+        self.clients: Set[StreamClient] = set()
+        self.published = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def article_event(article_id: str, article: Dict) -> Dict:
+        """Build the event payload of an indexed article."""
+        event = {field: article[field] for field in EVENT_FIELDS if article.get(field) is not None}
+        event['id'] = article_id
+        event['tickers'] = [
+            company.get('ticker') for company in article.get('companies') or []
+            if isinstance(company, dict) and company.get('ticker')
+        ]
+        return event
+
+    def publish(self, article_id: str, article: Dict) -> None:
+        """Push a newly indexed article to matching clients."""
+        event = self.article_event(article_id, article)
+        with self._lock:
+            self._sequence += 1
+            event_id = f"{self.boot}-{self._sequence}"
+            self.history.append((self._sequence, event_id, event))
+            clients = list(self.clients)
+            self.published += 1
+
+        for client in clients:
+            if client.accepts(event):
+                client.push(event_id, event)
+
+    def subscribe(self, client: StreamClient, last_event_id: Optional[str] = None) -> bool:
+        """
+        Register a client and queue the events it missed.
+
+        Args:
+            client: Client to register
+            last_event_id: ID of the last event the client received
+
+        Returns:
+            bool: False when the client could not resume and should reset its view
+        """
+        with self._lock:
+            if len(self.clients) >= self.max_clients:
+                raise OverflowError("Too many stream clients")
+            self.clients.add(client)
+            if not last_event_id:
+                return True
+
+            boot, _, sequence = last_event_id.rpartition('-')
+            if boot != self.boot or not sequence.isdigit():
+                return False
+            last_sequence = int(sequence)
+            oldest = self.history[0][0] if self.history else self._sequence + 1
+            # replayed under the lock so newer events cannot overtake them
+            for seq, event_id, event in self.history:
+                if seq > last_sequence and client.accepts(event):
+                    client.push(event_id, event)
+            return last_sequence >= oldest - 1
+
+    def unsubscribe(self, client: StreamClient) -> None:
+        client.close()
+        with self._lock:
+            self.clients.discard(client)
+
+    def stream(self, client: StreamClient, resumed: bool = True,
+               heartbeat_seconds: float = STREAM_HEARTBEAT_SECONDS) -> Iterator[str]:
+        """
+        Yield Server-Sent Events for a subscribed client until it disconnects.
+
+        Heartbeat comments keep proxies from closing an idle connection.
+        """
+        try:
+            yield "retry: 3000\n\n"
+            if not resumed:
+                yield format_sse({'reason': 'history_unavailable'}, event='reset')
+            while not client.closed:
+                events = client.get(heartbeat_seconds)
+                if not events:
+                    if not client.closed:
+                        yield f": heartbeat {datetime.now().isoformat()}\n\n"
+                    continue
+                yield ''.join(format_sse(event, event_id, 'article') for event_id, event in events)
+        finally:
+            self.unsubscribe(client)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            clients = list(self.clients)
+        return {
+            'clients': len(clients),
+            'max_clients': self.max_clients,
+            'published': self.published,
+            'history_size': len(self.history),
+            'buffered': sum(len(client.buffer) for client in clients),
+            'dropped': sum(client.dropped for client in clients)
+        }
+
+    def reset_after_fork(self) -> None:
+        """Give a forked worker its own boot token, history and client set."""
+        self.boot = format(int(time.time() * 1000), 'x') + format(os.getpid(), 'x')
+        self.history.clear()
+        self.clients = set()
+        self.published = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+
+def _now_millis() -> int:
+    """Current time in epoch milliseconds as Elasticsearch reads a stored updated_at."""
+    # add_article writes updated_at as a naive local time, which Elasticsearch reads as UTC
+    return calendar.timegm(datetime.now().timetuple()) * 1000
+
+
+class IndexPoller:
+    """
+    Feeds a hub with articles newly created in Elasticsearch.
+
+    Articles are indexed by the loader (update_es_database.py), not by the API
+    workers, so every worker polls the articles with a recent updated_at while
+    it has stream clients. Only first versions are published: re-ingesting an
+    article bumps its _version and updated_at without announcing it again.
+    Each poll looks back STREAM_POLL_OVERLAP_SECONDS and skips the IDs it has
+    already seen, since documents become searchable up to a refresh interval
+    after their updated_at.
+    """
+
+    def __init__(self, hub: 'StreamHub', fetch: Callable[[int, int], Optional[List[Dict]]],
+                 interval: float = STREAM_POLL_SECONDS, overlap: float = STREAM_POLL_OVERLAP_SECONDS,
+                 batch_size: int = STREAM_POLL_BATCH):
+        """
+        Args:
+            hub: Hub the articles are published to
+            fetch: Callable receiving a lower updated_at bound in epoch milliseconds
+                and a batch size, returning hits sorted by updated_at (with _id,
+                _version, _source and sort), or None while Elasticsearch is unavailable
+            interval: Seconds between polls
+            overlap: Seconds each poll looks back
+            batch_size: Hits requested per fetch
+        """
+        self.hub = hub
+        self.fetch = fetch
+        self.interval = interval
+        self.overlap_millis = int(overlap * 1000)
+        self.batch_size = max(int(batch_size), 1)
+        self.polls = 0
+        self.errors = 0
+        self._cursor = _now_millis()
+        # article ID -> updated_at of the hits inside the overlap window
+        self._seen: 'OrderedDict[str, int]' = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def ensure_running(self) -> None:
+        """Start the polling thread in this process (again after a fork)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self._cursor = _now_millis()
+            self._seen.clear()
+            self._thread = threading.Thread(target=self._run, name="stream-poller", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            if not self.hub.clients:
+                # nobody to publish to; do not replay the idle period later
+                self._cursor = max(self._cursor, _now_millis() - self.overlap_millis)
+                continue
+            try:
+                self.poll()
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Stream poll failed: {str(e)}")
+
+    def poll(self) -> int:
+        """
+        Publish the articles created since the previous poll.
+
+        Returns:
+            int: Number of articles published
+        """
+        self.polls += 1
+        since = self._cursor - self.overlap_millis
+        published = 0
+        while True:
+            hits = self.fetch(since, self.batch_size)
+            if not hits:
+                break
+            for hit in hits:
+                updated_at = int(hit['sort'][0])
+                self._cursor = max(self._cursor, updated_at)
+                if hit['_id'] in self._seen:
+                    continue
+                self._seen[hit['_id']] = updated_at
+                if hit.get('_version', 1) == 1:
+                    self.hub.publish(hit['_id'], hit['_source'])
+                    published += 1
+            last = int(hits[-1]['sort'][0])
+            if len(hits) < self.batch_size or last <= since:
+                break
+            since = last
+
+        window_start = self._cursor - self.overlap_millis
+        while self._seen and next(iter(self._seen.values())) < window_start:
+            self._seen.popitem(last=False)
+        return published
+
+    def get_stats(self) -> Dict:
+        return {
+            'polls': self.polls,
+            'poll_errors': self.errors,
+            'poll_interval_seconds': self.interval
+        }
+
+
+# Singleton instance fed by an IndexPoller in each worker
+stream_hub = StreamHub()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=stream_hub.reset_after_fork)
@@ -0,0 +1,188 @@
+"""
+Background system statistics sampler.
+
+This module provides a sampler thread that records system and process
+metrics on a fixed interval into a bounded time series, so diagnostic
+endpoints can read current values and windowed min/avg/max without
+blocking on psutil calls.
+"""
+
+import os
+import re
+import time
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import psutil
+
+from .logger import get_logger
+
+logger = get_logger('system_sampler')
+
+# Seconds between samples
+SYSTEM_SAMPLE_INTERVAL = float(os.getenv('SYSTEM_SAMPLE_INTERVAL', '5'))
+
+# Number of samples kept (one hour at the default interval)
+SYSTEM_SAMPLE_HISTORY = int(os.getenv('SYSTEM_SAMPLE_HISTORY', '720'))
+
+# Numeric sample fields summarized over a window
+SAMPLE_METRICS = (
+    'cpu_percent', 'memory_percent', 'memory_available', 'disk_percent',
+    'process_cpu_percent', 'process_memory_rss', 'process_threads'
+)
+
+DURATION_PATTERN = re.compile(r'^(\d+)([smhd]?)$')
+DURATION_SECONDS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_duration(value: str) -> int:
+    """Parse a duration such as '90', '30s', '5m' or '1h' into seconds."""
+    match = DURATION_PATTERN.match(value.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+    return int(match.group(1)) * DURATION_SECONDS[match.group(2)]
+
+
+class SystemSampler:
+    """
+    Samples system and process metrics on a background thread.
+
+    psutil's cpu_percent(interval=None) reports usage since the previous call,
+    so sampling on a fixed interval gives CPU figures without sleeping in the
+    caller. The thread is started lazily by the first caller in each process,
+    so a preloading gunicorn master forks its workers without one.
+    """
+
+    def __init__(self, interval: float = SYSTEM_SAMPLE_INTERVAL, history_size: int = SYSTEM_SAMPLE_HISTORY):
+        self.interval = max(interval, 0.1)
+        self.samples: deque = deque(maxlen=max(history_size, 1))
+        self._process: Optional[psutil.Process] = None
+        self._pid: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _collect(self) -> Dict:
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        process = self._process
+        with process.oneshot():
+            memory_info = process.memory_info()
+            process_cpu = process.cpu_percent(interval=None)
+            threads = process.num_threads()
+        return {
+            'time': time.time(),
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_total': memory.total,
+            'memory_available': memory.available,
+            'memory_used': memory.used,
+            'memory_percent': memory.percent,
+            'disk_total': disk.total,
+            'disk_used': disk.used,
+            'disk_free': disk.free,
+            'disk_percent': disk.percent,
+            'process_pid': self._pid,
+            'process_cpu_percent': process_cpu,
+            'process_memory_rss': memory_info.rss,
+            'process_threads': threads
+        }
+
+    def sample(self) -> Dict:
+        """Take a sample now and add it to the series."""
+        self.ensure_running()
+        sample = self._collect()
+        with self._lock:
+            self.samples.append(sample)
+        return sample
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                sample = self._collect()
+                with self._lock:
+                    self.samples.append(sample)
+            except Exception as e:
+                logger.error(f"System sampling failed: {str(e)}", extra={'extra': {'error': str(e)}})
+
+    def ensure_running(self) -> None:
+        """Start the sampler thread in this process if it is not running."""
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != pid:
+                # a forked child inherits samples and CPU baselines of its parent
+                self.samples.clear()
+                self._process = psutil.Process(pid)
+                self._pid = pid
+                self._stop = threading.Event()
+                # prime the CPU counters so the first sample covers one interval
+                psutil.cpu_percent(interval=None)
+                self._process.cpu_percent(interval=None)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def reset_after_fork(self) -> None:
+        """Drop the parent's thread, samples and lock in a forked child."""
+        self.samples.clear()
+        self._process = None
+        self._pid = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def latest(self) -> Dict:
+        """The most recent sample, taking one if none exists yet."""
+        self.ensure_running()
+        with self._lock:
+            if self.samples and self.samples[-1]['process_pid'] == self._pid:
+                return self.samples[-1]
+        return self.sample()
+
+    def window(self, seconds: float) -> List[Dict]:
+        """Samples taken within the last `seconds` seconds."""
+        self.ensure_running()
+        cutoff = time.time() - seconds
+        with self._lock:
+            return [sample for sample in self.samples if sample['time'] >= cutoff]
+
+    def summarize(self, seconds: float) -> Dict:
+        """
+        Min/avg/max of every sampled metric over a time window.
+
+        Args:
+            seconds: Window length in seconds
+
+        Returns:
+            Dict with the window bounds, sample count and per-metric summary
+        """
+        samples = self.window(seconds)
+        metrics = {}
+        for name in SAMPLE_METRICS:
+            values = [sample[name] for sample in samples]
+            metrics[name] = {
+                'min': min(values),
+                'avg': round(sum(values) / len(values), 2),
+                'max': max(values)
+            } if values else None
+        return {
+            'window_seconds': seconds,
+            'interval_seconds': self.interval,
+            'samples': len(samples),
+            'start': datetime.utcfromtimestamp(samples[0]['time']).isoformat() if samples else None,
+            'end': datetime.utcfromtimestamp(samples[-1]['time']).isoformat() if samples else None,
+            'metrics': metrics
+        }
+
+
+# Singleton instance read by the diagnostic endpoints
+system_sampler = SystemSampler()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=system_sampler.reset_after_fork)
@@ -0,0 +1,362 @@
+"""
+Lightweight request tracing.
+
+This module records nested spans with monotonic timers for every request,
+keyed by g.request_id, and can export finished traces as OTLP JSON lines
+to a local file.
+"""
+
+import os
+import json
+import asyncio
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, g, jsonify, request
+
+ENABLE_TRACING = os.getenv('ENABLE_TRACING', 'true').lower() == 'true'
+# Fraction of requests traced
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '1.0'))
+# Number of finished traces kept for /debug/traces
+TRACE_BUFFER_SIZE = int(os.getenv('TRACE_BUFFER_SIZE', '200'))
+# Maximum spans recorded per trace
+TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS', '500'))
+# OTLP JSON lines file receiving finished traces (disabled when empty)
+TRACE_EXPORT_FILE = os.getenv('TRACE_EXPORT_FILE', '')
+SERVICE_NAME = os.getenv('SERVICE_NAME', 'financial-news-engine')
+
+_current_span: ContextVar[Optional['Span']] = ContextVar('current_span', default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ('trace', 'name', 'span_id', 'parent_id', 'start_ns', 'end_ns', 'attributes', 'status')
+
+    def __init__(self, trace: 'Trace', name: str, parent: Optional['Span'] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.status = 'ok'
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.perf_counter_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_offset_ms': round((self.start_ns - self.trace.start_ns) / 1e6, 3),
+            'duration_ms': round(self.duration_ms, 3),
+            'status': self.status,
+            'attributes': self.attributes
+        }
+
+
+class Trace:
+    """All spans recorded for one request."""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.trace_id = uuid.uuid4().hex
+        self.start_ns = time.perf_counter_ns()
+        self.start_unix_ns = time.time_ns()
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        # cProfile stats of a request profiled on demand
+        self.profile: Optional[List[Dict]] = None
+
+    def add(self, span: Span) -> None:
+        if len(self.spans) < TRACE_MAX_SPANS:
+            self.spans.append(span)
+        else:
+            self.dropped_spans += 1
+
+    def unix_ns(self, perf_ns: int) -> int:
+        return self.start_unix_ns + (perf_ns - self.start_ns)
+
+    def to_dict(self) -> Dict:
+        root = self.spans[0] if self.spans else None
+        return {
+            'request_id': self.request_id,
+            'trace_id': self.trace_id,
+            'name': root.name if root else None,
+            'duration_ms': round(root.duration_ms, 3) if root else 0.0,
+            'dropped_spans': self.dropped_spans,
+            'spans': [span.to_dict() for span in self.spans],
+            **({'profile': self.profile} if self.profile is not None else {})
+        }
+
+
+class OTLPFileExporter:
+    """
+    Writes finished traces as OTLP/JSON ExportTraceServiceRequest lines.
+
+    Writing happens on a background thread; when the queue is full traces
+    are dropped rather than delaying requests.
+    """
+
+    def __init__(self, path: str, maxsize: int = 1000):
+        self.path = path
+        self.pending: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> Dict:
+        if isinstance(value, bool):
+            encoded = {'boolValue': value}
+        elif isinstance(value, int):
+            encoded = {'intValue': str(value)}
+        elif isinstance(value, float):
+            encoded = {'doubleValue': value}
+        else:
+            encoded = {'stringValue': str(value)}
+        return {'key': key, 'value': encoded}
+
+    def encode(self, trace: Trace) -> Dict:
+        spans = []
+        for span in trace.spans:
+            encoded = {
+                'traceId': trace.trace_id,
+                'spanId': span.span_id,
+                'name': span.name,
+                'kind': 2 if span.parent_id is None else 1,
+                'startTimeUnixNano': str(trace.unix_ns(span.start_ns)),
+                'endTimeUnixNano': str(trace.unix_ns(span.end_ns or span.start_ns)),
+                'attributes': [self._attribute(key, value) for key, value in span.attributes.items()],
+                'status': {'code': 2 if span.status == 'error' else 1}
+            }
+            if span.parent_id:
+                encoded['parentSpanId'] = span.parent_id
+            spans.append(encoded)
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [
+                    self._attribute('service.name', SERVICE_NAME),
+                    self._attribute('process.pid', os.getpid())
+                ]},
+                'scopeSpans': [{'scope': {'name': 'utils.tracing'}, 'spans': spans}]
+            }]
+        }
+
+    def export(self, trace: Trace) -> None:
+        self._ensure_worker()
+        try:
+            self.pending.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            trace = self.pending.get()
+            try:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(self.encode(trace), default=str) + '\n')
+            except Exception:
+                self.dropped += 1
+            finally:
+                self.pending.task_done()
+
+
+class Tracer:
+    """Creates spans and keeps the most recent finished traces by request ID."""
+
+    def __init__(self, buffer_size: int = TRACE_BUFFER_SIZE, exporter: Optional[OTLPFileExporter] = None):
+        self.traces: 'OrderedDict[str, Trace]' = OrderedDict()
+        self.buffer_size = max(buffer_size, 1)
+        self.exporter = exporter
+        self._lock = threading.Lock()
+
+    def start_trace(self, request_id: str, name: str, **attributes) -> Optional[Span]:
+        """Start the root span of a request and make it current."""
+        if not ENABLE_TRACING or random.random() >= TRACE_SAMPLE_RATE:
+            return None
+        trace = Trace(request_id)
+        root = Span(trace, name, attributes=attributes)
+        trace.add(root)
+        _current_span.set(root)
+        return root
+
+    def finish_trace(self, root: Optional[Span]) -> None:
+        """End a request's root span, keep the trace and export it."""
+        if root is None:
+            return
+        root.end()
+        _current_span.set(None)
+        with self._lock:
+            self.traces[root.trace.request_id] = root.trace
+            self.traces.move_to_end(root.trace.request_id)
+            while len(self.traces) > self.buffer_size:
+                self.traces.popitem(last=False)
+        if self.exporter is not None:
+            self.exporter.export(root.trace)
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Time a block as a child of the current span.
+
+        Outside a traced request this yields None and records nothing.
+        """
+        parent = _current_span.get()
+        if parent is None:
+            yield None
+            return
+        span = Span(parent.trace, name, parent, attributes)
+        parent.trace.add(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = 'error'
+            span.set_attribute('error.type', type(e).__name__)
+            raise
+        finally:
+            span.end()
+            _current_span.reset(token)
+
+    @staticmethod
+    def children_took_ms(span: Span) -> int:
+        """Sum of the Elasticsearch 'took' reported to direct children of a span."""
+        return sum(
+            child.attributes.get('es.took_ms', 0) for child in span.trace.spans
+            if child.parent_id == span.span_id
+        )
+
+    def instrument_elasticsearch(self, es) -> None:
+        """
+        Trace every request of an Elasticsearch or AsyncElasticsearch client.
+
+        Each call gets a span with the server-reported 'took' next to its wall
+        time, and response deserialization gets a span of its own.
+        """
+        transport = es.transport
+        if getattr(transport, '_traced', False):
+            return
+        perform_request = transport.perform_request
+        deserializer = transport.deserializer
+        loads = deserializer.loads
+
+        def record_took(span, result):
+            if span is not None and isinstance(result, dict) and 'took' in result:
+                span.set_attribute('es.took_ms', result['took'])
+
+        if asyncio.iscoroutinefunction(perform_request):
+            # AsyncElasticsearch: keep the span open until the response arrives
+            async def traced_perform_request(method, url, *args, **kwargs):
+                with self.span(f"es {method} {url}", **{'db.system': 'elasticsearch'}) as span:
+                    result = await perform_request(method, url, *args, **kwargs)
+                    record_took(span, result)
+                    return result
+        else:
+            def traced_perform_request(method, url, *args, **kwargs):
+                with self.span(f"es {method} {url}", **{'db.system': 'elasticsearch'}) as span:
+                    result = perform_request(method, url, *args, **kwargs)
+                    record_took(span, result)
+                    return result
+
+        def traced_loads(*args, **kwargs):
+            with self.span('es deserialize'):
+                return loads(*args, **kwargs)
+
+        transport.perform_request = traced_perform_request
+        deserializer.loads = traced_loads
+        transport._traced = True
+
+    def get_trace(self, request_id: str) -> Optional[Dict]:
+        with self._lock:
+            trace = self.traces.get(request_id)
+        return trace.to_dict() if trace is not None else None
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        with self._lock:
+            traces = list(self.traces.values())[-limit:]
+        return [
+            {
+                'request_id': trace.request_id,
+                'name': trace.spans[0].name,
+                'duration_ms': round(trace.spans[0].duration_ms, 3),
+                'spans': len(trace.spans)
+            }
+            for trace in reversed(traces)
+        ]
+
+
+# Singleton instance used by the Flask hooks and the Engine
+tracer = Tracer(exporter=OTLPFileExporter(TRACE_EXPORT_FILE) if TRACE_EXPORT_FILE else None)
+
+
+def setup_tracing(app: Flask) -> Flask:
+    """Trace every request of a Flask app and expose traces on /debug/traces."""
+    if not ENABLE_TRACING:
+        return app
+
+    @app.before_request
+    def start_request_trace():
+        if not hasattr(g, 'request_id'):
+            g.request_id = request.headers.get('X-Request-ID', str(uuid.uuid4()))
+        g.trace_root = tracer.start_trace(
+            g.request_id, f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+            **{'http.method': request.method, 'http.target': request.full_path}
+        )
+
+    @app.after_request
+    def record_response(response):
+        root = g.get('trace_root')
+        if root is not None:
+            root.set_attribute('http.status_code', response.status_code)
+        return response
+
+    @app.teardown_request
+    def finish_request_trace(exc):
+        root = g.pop('trace_root', None)
+        if root is not None and exc is not None:
+            root.status = 'error'
+        tracer.finish_trace(root)
+
+    @app.route('/debug/traces', methods=['GET'])
+    def list_traces():
+        return jsonify({'traces': tracer.recent()})
+
+    @app.route('/debug/traces/<request_id>', methods=['GET'])
+    def get_trace(request_id):
+        trace = tracer.get_trace(request_id)
+        if trace is None:
+            return jsonify({'error': 'Trace not found'}), 404
+        return jsonify(trace)
+
+    return app